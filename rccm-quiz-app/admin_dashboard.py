@@ -1,119 +1,311 @@
 """
 RCCM学習アプリ - 管理者ダッシュボード
 問題管理、ユーザー進捗監視、システム分析機能
+
+ダッシュボードの各データセット（概要・問題・ユーザー・コンテンツ・パフォーマンス）は
+全ユーザーデータの1回の走査でまとめて集計し、データ版数付きのスナップショットとして保持する。
+データが変わるまでは再集計せず、/admin/api/refresh はバックグラウンドで再構築する。
 """
 
 import os
 import json
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Iterable, Iterator, Tuple, Optional
 from collections import defaultdict, Counter
 import hashlib
 
 from utils import load_rccm_data_files
-from config import RCCMConfig
+from config import RCCMConfig, AdminDashboardConfig
+from user_store import get_user_repository
 
 logger = logging.getLogger(__name__)
 
+class UserProgressSummary:
+    """ユーザー進捗行の逐次集計（get_user_progress_overview の集計値を1行ずつ更新）"""
+    
+    def __init__(self, now: Optional[datetime] = None):
+        now = now or datetime.now()
+        self.cutoff_7days = now - timedelta(days=7)
+        self.cutoff_30days = now - timedelta(days=30)
+        self.total_users = 0
+        self.valid_users = 0
+        self.total_accuracy = 0
+        self.active_7days = 0
+        self.active_30days = 0
+        self.total_sessions = 0
+        self.department_popularity = defaultdict(int)
+        self.learning_patterns = defaultdict(int)
+    
+    def add(self, row: Dict[str, Any]) -> None:
+        self.total_users += 1
+        if not row['total_answers']:
+            return
+        
+        self.valid_users += 1
+        
+        # 最終アクティビティ日時
+        if row['last_activity']:
+            last_activity = datetime.fromisoformat(row['last_activity'])
+            if last_activity >= self.cutoff_7days:
+                self.active_7days += 1
+            if last_activity >= self.cutoff_30days:
+                self.active_30days += 1
+        
+        self.total_accuracy += row['accuracy']
+        self.total_sessions += row['total_answers']
+        for dept, count in row['departments'].items():
+            self.department_popularity[dept] += count
+        self.learning_patterns[row['learning_pattern']] += 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total_users': self.total_users,
+            'active_users_last_7days': self.active_7days,
+            'active_users_last_30days': self.active_30days,
+            'completion_rates': [],
+            'average_accuracy': self.total_accuracy / self.valid_users if self.valid_users > 0 else 0,
+            'total_sessions': self.total_sessions,
+            # 辞書をdict型に変換（JSON化のため）
+            'department_popularity': dict(self.department_popularity),
+            'learning_patterns': dict(self.learning_patterns)
+        }
+
+
+class DashboardAggregate:
+    """全ユーザーの1パス集計（ユーザー進捗・エンゲージメント・学習効果・アラートの元データ）"""
+    
+    def __init__(self, dashboard: 'AdminDashboard', now: Optional[datetime] = None):
+        now = now or datetime.now()
+        self.dashboard = dashboard
+        self.progress = UserProgressSummary(now)
+        self.retention_cutoff = now - timedelta(days=30)
+        self.user_count = 0
+        self.active_count = 0
+        self.total_answers = 0
+        self.retained_users = 0
+        self.improvement_scores = []
+        self.retention_scores = []
+    
+    def add(self, user_id: str, data: Dict[str, Any]) -> None:
+        history = data.get('history', [])
+        last_activity = self.dashboard._get_last_activity(history)
+        self.progress.add(self.dashboard._progress_row(user_id, history, last_activity))
+        
+        self.user_count += 1
+        self.total_answers += len(history)
+        if history:
+            self.active_count += 1
+        # リテンション: 30日以内にアクティビティがあるユーザー
+        if last_activity and last_activity >= self.retention_cutoff:
+            self.retained_users += 1
+        
+        if len(history) >= 10:
+            # 改善度: 最初の5問と最後の5問の正答率比較
+            early_accuracy = sum(1 for h in history[:5] if h.get('is_correct', False)) / 5
+            recent_accuracy = sum(1 for h in history[-5:] if h.get('is_correct', False)) / 5
+            self.improvement_scores.append(recent_accuracy - early_accuracy)
+            
+            # 定着度: 一定期間後の正答率維持
+            if len(history) >= 20:
+                mid_accuracy = sum(1 for h in history[10:15] if h.get('is_correct', False)) / 5
+                self.retention_scores.append(recent_accuracy - mid_accuracy)
+    
+    @property
+    def inactive_users(self) -> int:
+        return self.user_count - self.retained_users
+
+
+class DashboardSnapshot:
+    """ダッシュボード全データセットのスナップショット（version = 集計元データの版数）"""
+    
+    def __init__(self, version: str, sections: Dict[str, Any], build_ms: float):
+        self.version = version
+        self.sections = sections
+        self.build_ms = build_ms
+        self.built_at = datetime.now()
+    
+    def to_status(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'built_at': self.built_at.isoformat(),
+            'build_ms': self.build_ms,
+        }
+
+
 class AdminDashboard:
     """管理者ダッシュボード機能"""
     
+    SNAPSHOT_SECTIONS = ('overview', 'questions', 'users', 'content', 'performance')
+    
+    # ストリーミングCSV（/admin/api/reports/<type>?format=csv）の列
+    REPORT_CSV_FIELDS = {
+        'users': ('user_id', 'total_answers', 'correct_answers', 'accuracy',
+                  'last_activity', 'learning_pattern', 'departments'),
+        'content': ('question_id', 'attempted', 'correct', 'accuracy', 'avg_time'),
+    }
+    
     def __init__(self, data_dir: str = 'data', user_data_dir: str = 'user_data'):
         self.data_dir = data_dir
         self.user_data_dir = user_data_dir
+        self.user_repository = get_user_repository(user_data_dir)
         self.questions = load_rccm_data_files(data_dir)
+        self._questions_version = 1
+        # スナップショット（構築は1度に1つ。参照はロック不要）
+        self._snapshot: Optional[DashboardSnapshot] = None
+        self._build_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._snapshot_stats = {'builds': 0, 'hits': 0, 'async_refreshes': 0, 'last_error': None}
         logger.info(f"管理者ダッシュボード初期化: {len(self.questions)}問読み込み完了")
     
     def get_system_overview(self) -> Dict[str, Any]:
         """システム全体概要"""
-        user_stats = self._analyze_all_users()
-        question_stats = self._analyze_question_data()
-        performance_stats = self._get_performance_metrics()
-        
-        return {
-            'timestamp': datetime.now().isoformat(),
-            'questions': question_stats,
-            'users': user_stats,
-            'performance': performance_stats,
-            'alerts': self._get_system_alerts()
-        }
+        return self.get_snapshot().sections['overview']
     
     def get_question_management_data(self) -> Dict[str, Any]:
         """問題管理データ"""
-        return {
-            'total_questions': len(self.questions),
-            'by_department': self._count_by_department(),
-            'by_category': self._count_by_category(),
-            'by_year': self._count_by_year(),
-            'by_type': self._count_by_type(),
-            'difficulty_distribution': self._analyze_difficulty_distribution(),
-            'question_quality': self._analyze_question_quality(),
-            'data_integrity': self._check_data_integrity()
-        }
+        return self.get_snapshot().sections['questions']
     
     def get_user_progress_overview(self) -> Dict[str, Any]:
         """ユーザー進捗概要"""
-        all_users = self._load_all_user_data()
-        
-        progress_summary = {
-            'total_users': len(all_users),
-            'active_users_last_7days': 0,
-            'active_users_last_30days': 0,
-            'completion_rates': [],
-            'average_accuracy': 0,
-            'total_sessions': 0,
-            'department_popularity': defaultdict(int),
-            'learning_patterns': defaultdict(int)
-        }
-        
-        cutoff_7days = datetime.now() - timedelta(days=7)
-        cutoff_30days = datetime.now() - timedelta(days=30)
-        
-        total_accuracy = 0
-        valid_users = 0
-        
-        for user_id, user_data in all_users.items():
+        return self.get_snapshot().sections['users']
+    
+    def get_dashboard_data(self) -> Dict[str, Any]:
+        """ダッシュボード全データセット（同一スナップショット）"""
+        return dict(self.get_snapshot().sections)
+    
+    def iter_user_progress_rows(self) -> Iterator[Dict[str, Any]]:
+        """ユーザー毎の進捗行を1件ずつ生成（全ユーザーデータをメモリに保持しない）"""
+        for user_id, user_data in self._iter_user_data():
             history = user_data.get('history', [])
-            if not history:
-                continue
-                
-            valid_users += 1
-            
-            # 最終アクティビティ日時
-            last_activity = self._get_last_activity(history)
-            if last_activity:
-                if last_activity >= cutoff_7days:
-                    progress_summary['active_users_last_7days'] += 1
-                if last_activity >= cutoff_30days:
-                    progress_summary['active_users_last_30days'] += 1
-            
-            # 正答率計算
-            correct_count = sum(1 for h in history if h.get('is_correct', False))
-            user_accuracy = correct_count / len(history) if history else 0
-            total_accuracy += user_accuracy
-            
-            # セッション数
-            progress_summary['total_sessions'] += len(history)
-            
-            # 部門別人気度
-            for entry in history:
-                dept = entry.get('department')
-                if dept:
-                    progress_summary['department_popularity'][dept] += 1
-            
-            # 学習パターン分析
-            learning_mode = self._analyze_user_learning_pattern(history)
-            progress_summary['learning_patterns'][learning_mode] += 1
-        
-        if valid_users > 0:
-            progress_summary['average_accuracy'] = total_accuracy / valid_users
-        
-        # 辞書をリストに変換（JSON化のため）
-        progress_summary['department_popularity'] = dict(progress_summary['department_popularity'])
-        progress_summary['learning_patterns'] = dict(progress_summary['learning_patterns'])
-        
-        return progress_summary
+            yield self._progress_row(user_id, history, self._get_last_activity(history))
+    
+    def _progress_row(self, user_id: str, history: List[Dict], last_activity: Optional[datetime]) -> Dict[str, Any]:
+        correct_count = sum(1 for h in history if h.get('is_correct', False))
+        departments = Counter(entry.get('department') for entry in history if entry.get('department'))
+        return {
+            'user_id': user_id,
+            'total_answers': len(history),
+            'correct_answers': correct_count,
+            'accuracy': correct_count / len(history) if history else 0,
+            'last_activity': last_activity.isoformat() if last_activity else None,
+            'learning_pattern': self._analyze_user_learning_pattern(history) if history else None,
+            'departments': dict(departments)
+        }
+    
+    # === スナップショット ===
+    
+    def get_snapshot(self) -> DashboardSnapshot:
+        """現在のデータ版数のスナップショット（データ未変更ならキャッシュを返す）"""
+        snapshot = self._snapshot
+        version = self._data_version()
+        if snapshot is not None and snapshot.version == version:
+            self._snapshot_stats['hits'] += 1
+            return snapshot
+        
+        # 古いスナップショットを一定時間内なら返しつつバックグラウンドで再構築
+        stale_seconds = AdminDashboardConfig.SNAPSHOT_STALE_SECONDS
+        if snapshot is not None and (datetime.now() - snapshot.built_at).total_seconds() < stale_seconds:
+            self.refresh_async()
+            return snapshot
+        
+        with self._build_lock:
+            # 待機中に他のリクエストが構築済みならそれを使用
+            snapshot = self._snapshot
+            version = self._data_version()
+            if snapshot is not None and snapshot.version == version:
+                self._snapshot_stats['hits'] += 1
+                return snapshot
+            return self._build_snapshot(version)
+    
+    def refresh_async(self, reload_questions: bool = False) -> Dict[str, Any]:
+        """スナップショットをバックグラウンドで再構築（実行中なら新たに開始しない）"""
+        with self._refresh_lock:
+            thread = self._refresh_thread
+            if thread is None or not thread.is_alive():
+                thread = threading.Thread(target=self._refresh, args=(reload_questions,),
+                                          name='admin-dashboard-refresh', daemon=True)
+                self._refresh_thread = thread
+                self._snapshot_stats['async_refreshes'] += 1
+                thread.start()
+        return self.get_snapshot_status()
+    
+    def get_snapshot_status(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        thread = self._refresh_thread
+        return dict(self._snapshot_stats,
+                    snapshot=snapshot.to_status() if snapshot else None,
+                    current_version=self._data_version(),
+                    refreshing=bool(thread and thread.is_alive()))
+    
+    def _refresh(self, reload_questions: bool) -> None:
+        try:
+            with self._build_lock:
+                if reload_questions:
+                    self.questions = load_rccm_data_files(self.data_dir)
+                    self._questions_version += 1
+                self._build_snapshot(self._data_version())
+        except Exception as e:
+            self._snapshot_stats['last_error'] = str(e)
+            logger.error(f"❌ ダッシュボード再構築エラー: {e}")
+    
+    def _data_version(self) -> str:
+        """
+        集計元データの版数（ユーザーデータの内容版数 + 問題データの読み込み回数 + 日付）
+        日付を含めるのは、データが変わらなくても7日・30日のアクティブユーザー数等の集計期間が日毎に進むため
+        """
+        return (f"{self.user_repository.content_revision()}:{self._questions_version}:"
+                f"{datetime.now().date().isoformat()}")
+    
+    def _build_snapshot(self, version: str) -> DashboardSnapshot:
+        """全ユーザーデータを1回だけ走査して全データセットを作成（_build_lock 内で呼ぶ）"""
+        started = time.perf_counter()
+        aggregate = DashboardAggregate(self)
+        
+        def user_data_iter():
+            for user_id, data in self._iter_user_data():
+                aggregate.add(user_id, data)
+                yield data
+        
+        question_stats, category_stats = self._accumulate_content_stats(user_data_iter())
+        
+        sections = {
+            'overview': {
+                'timestamp': datetime.now().isoformat(),
+                'questions': self._analyze_question_data(),
+                'users': self._analyze_all_users(aggregate),
+                'performance': self._get_performance_metrics(),
+                'alerts': self._get_system_alerts(aggregate)
+            },
+            'questions': {
+                'total_questions': len(self.questions),
+                'by_department': self._count_by_department(),
+                'by_category': self._count_by_category(),
+                'by_year': self._count_by_year(),
+                'by_type': self._count_by_type(),
+                'difficulty_distribution': self._analyze_difficulty_distribution(question_stats),
+                'question_quality': self._analyze_question_quality(),
+                'data_integrity': self._check_data_integrity()
+            },
+            'users': aggregate.progress.to_dict(),
+            'content': self._content_analytics(question_stats, category_stats),
+            'performance': {
+                'system_performance': self._get_performance_metrics(),
+                'data_quality_score': self._calculate_data_quality_score(),
+                'user_engagement_score': self._calculate_engagement_score(aggregate),
+                'learning_effectiveness': self._calculate_learning_effectiveness(aggregate),
+                'technical_metrics': self._get_technical_metrics()
+            },
+        }
+        snapshot = DashboardSnapshot(version, sections, round((time.perf_counter() - started) * 1000, 1))
+        self._snapshot = snapshot
+        self._snapshot_stats['builds'] += 1
+        logger.info(f"📊 ダッシュボードスナップショット構築: {aggregate.user_count}ユーザー "
+                    f"({snapshot.build_ms}ms, version={version})")
+        return snapshot
     
     def get_detailed_user_analysis(self, user_id: str = None) -> Dict[str, Any]:
         """詳細ユーザー分析"""
@@ -124,33 +316,10 @@ class AdminDashboard:
     
     def get_content_analytics(self) -> Dict[str, Any]:
         """コンテンツ分析"""
-        user_data = self._load_all_user_data()
-        
-        # 問題別統計
-        question_stats = defaultdict(lambda: {
-            'attempted': 0, 'correct': 0, 'avg_time': 0, 'times': []
-        })
-        
-        for user_id, data in user_data.items():
-            for entry in data.get('history', []):
-                q_id = entry.get('id')
-                if q_id:
-                    stats = question_stats[q_id]
-                    stats['attempted'] += 1
-                    if entry.get('is_correct', False):
-                        stats['correct'] += 1
-                    
-                    elapsed = entry.get('elapsed', 0)
-                    if elapsed > 0:
-                        stats['times'].append(elapsed)
-        
-        # 統計計算
-        for q_id, stats in question_stats.items():
-            if stats['times']:
-                stats['avg_time'] = sum(stats['times']) / len(stats['times'])
-            stats['accuracy'] = stats['correct'] / stats['attempted'] if stats['attempted'] > 0 else 0
-            del stats['times']  # 大きなデータを削除
-        
+        return self.get_snapshot().sections['content']
+    
+    def _content_analytics(self, question_stats: Dict[Any, Dict], category_stats: Dict[str, Dict]) -> Dict[str, Any]:
+        """問題別・カテゴリ別統計からコンテンツ分析を作成"""
         # 上位/下位問題の特定
         sorted_by_difficulty = sorted(
             [(q_id, stats) for q_id, stats in question_stats.items() if stats['attempted'] >= 10],
@@ -160,38 +329,23 @@ class AdminDashboard:
         hardest_questions = sorted_by_difficulty[:10]
         easiest_questions = sorted_by_difficulty[-10:]
         
-        # カテゴリ別分析
-        category_performance = self._analyze_category_performance(user_data)
-        
         return {
-            'question_statistics': dict(question_stats),
+            'question_statistics': question_stats,
             'hardest_questions': [{'id': q_id, 'stats': stats} for q_id, stats in hardest_questions],
             'easiest_questions': [{'id': q_id, 'stats': stats} for q_id, stats in easiest_questions],
-            'category_performance': category_performance,
+            'category_performance': self._summarize_category_stats(category_stats),
             'content_gaps': self._identify_content_gaps(question_stats),
             'recommendations': self._generate_content_recommendations(question_stats)
         }
     
     def get_performance_metrics(self) -> Dict[str, Any]:
         """パフォーマンス指標"""
-        return {
-            'system_performance': self._get_performance_metrics(),
-            'data_quality_score': self._calculate_data_quality_score(),
-            'user_engagement_score': self._calculate_engagement_score(),
-            'learning_effectiveness': self._calculate_learning_effectiveness(),
-            'technical_metrics': self._get_technical_metrics()
-        }
+        return self.get_snapshot().sections['performance']
     
     def generate_reports(self, report_type: str = 'comprehensive') -> Dict[str, Any]:
         """レポート生成"""
         if report_type == 'comprehensive':
-            return {
-                'overview': self.get_system_overview(),
-                'questions': self.get_question_management_data(),
-                'users': self.get_user_progress_overview(),
-                'content': self.get_content_analytics(),
-                'performance': self.get_performance_metrics()
-            }
+            return self.get_dashboard_data()
         elif report_type == 'users':
             return self.get_user_progress_overview()
         elif report_type == 'content':
@@ -201,17 +355,39 @@ class AdminDashboard:
         else:
             return {'error': 'Unknown report type'}
     
+    def iter_report_records(self, report_type: str) -> Iterator[Dict[str, Any]]:
+        """レポートを行単位で逐次生成（NDJSON/CSVストリーミング用）
+        
+        users: ユーザー毎の進捗行 → 集計行 / content: 問題毎の統計行（スナップショットから）
+        performance・comprehensive: スナップショットのセクション毎に1行
+        """
+        if report_type == 'users':
+            summary = UserProgressSummary()
+            for row in self.iter_user_progress_rows():
+                summary.add(row)
+                yield dict(row, type='user')
+            yield dict(summary.to_dict(), type='summary')
+        elif report_type == 'content':
+            question_stats = self.get_content_analytics()['question_statistics']
+            for q_id, stats in question_stats.items():
+                yield dict(stats, type='question', question_id=q_id)
+        elif report_type in ('performance', 'comprehensive'):
+            sections = self.get_snapshot().sections
+            names = self.SNAPSHOT_SECTIONS if report_type == 'comprehensive' else ('performance',)
+            for name in names:
+                yield {'type': 'section', 'section': name, 'data': sections[name]}
+        else:
+            raise ValueError(f'Unknown report type: {report_type}')
+    
     # === プライベートメソッド ===
     
-    def _analyze_all_users(self) -> Dict[str, Any]:
+    def _analyze_all_users(self, aggregate: DashboardAggregate) -> Dict[str, Any]:
         """全ユーザー分析"""
-        user_data = self._load_all_user_data()
-        
         return {
-            'total_count': len(user_data),
-            'active_count': sum(1 for data in user_data.values() if data.get('history')),
-            'completion_rate': self._calculate_overall_completion_rate(user_data),
-            'engagement_metrics': self._calculate_engagement_metrics(user_data)
+            'total_count': aggregate.user_count,
+            'active_count': aggregate.active_count,
+            'completion_rate': self._calculate_overall_completion_rate(aggregate),
+            'engagement_metrics': self._calculate_engagement_metrics(aggregate)
         }
     
     def _analyze_question_data(self) -> Dict[str, Any]:
@@ -233,7 +409,7 @@ class AdminDashboard:
             'response_time': self._measure_response_time()
         }
     
-    def _get_system_alerts(self) -> List[Dict[str, str]]:
+    def _get_system_alerts(self, aggregate: DashboardAggregate) -> List[Dict[str, str]]:
         """システムアラート"""
         alerts = []
         
@@ -247,9 +423,8 @@ class AdminDashboard:
             })
         
         # ユーザーアクティビティチェック
-        user_data = self._load_all_user_data()
-        inactive_users = self._count_inactive_users(user_data)
-        if inactive_users > len(user_data) * 0.7:  # 70%以上が非アクティブ
+        inactive_users = aggregate.inactive_users
+        if inactive_users > aggregate.user_count * 0.7:  # 70%以上が非アクティブ
             alerts.append({
                 'type': 'warning',
                 'message': f'非アクティブユーザーが{inactive_users}人います',
@@ -290,17 +465,16 @@ class AdminDashboard:
             counts[q_type] += 1
         return dict(counts)
     
-    def _analyze_difficulty_distribution(self) -> Dict[str, Any]:
-        """難易度分布分析"""
-        user_data = self._load_all_user_data()
+    def _analyze_difficulty_distribution(self, question_stats: Dict[Any, Dict]) -> Dict[str, Any]:
+        """難易度分布分析（問題別統計は _accumulate_content_stats の集計結果を参照）"""
         question_difficulties = {}
         
         # 各問題の実際の難易度を統計から計算
         for q in self.questions:
             q_id = q.get('id')
             if q_id:
-                stats = self._get_question_stats(q_id, user_data)
-                if stats['total_attempts'] >= 5:  # 最低5回以上の挑戦
+                stats = question_stats.get(q_id)
+                if stats and stats['attempted'] >= 5:  # 最低5回以上の挑戦
                     question_difficulties[q_id] = {
                         'accuracy': stats['accuracy'],
                         'avg_time': stats['avg_time'],
@@ -363,31 +537,11 @@ class AdminDashboard:
     
     def _load_all_user_data(self) -> Dict[str, Dict]:
         """全ユーザーデータ読み込み"""
-        user_data = {}
-        
-        if not os.path.exists(self.user_data_dir):
-            return user_data
-        
-        try:
-            if not os.path.exists(self.user_data_dir):
-                logger.warning(f"ユーザーデータディレクトリが存在しません: {self.user_data_dir}")
-                return user_data
-            
-            for filename in os.listdir(self.user_data_dir):
-                if filename.endswith('.json'):
-                    user_id = filename[:-5]  # .json除去
-                    file_path = os.path.join(self.user_data_dir, filename)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            user_data[user_id] = json.load(f)
-                    except (FileNotFoundError, PermissionError, json.JSONDecodeError, UnicodeDecodeError) as e:
-                        logger.warning(f"ユーザーデータ読み込みエラー {filename}: {e}")
-                    except Exception as e:
-                        logger.error(f"予期しないエラー {filename}: {e}")
-        except (OSError, PermissionError) as e:
-            logger.error(f"ディレクトリアクセスエラー {self.user_data_dir}: {e}")
-        
-        return user_data
+        return dict(self._iter_user_data())
+    
+    def _iter_user_data(self) -> Iterator[Tuple[str, Dict]]:
+        """全ユーザーデータを1件ずつ読み込み（読み込めないデータはログのみでスキップ）"""
+        yield from self.user_repository.iter_users()
     
     def _get_last_activity(self, history: List[Dict]) -> Optional[datetime]:
         """最終アクティビティ日時取得"""
@@ -446,21 +600,14 @@ class AdminDashboard:
     
     def _analyze_single_user(self, user_id: str) -> Dict[str, Any]:
         """単一ユーザー詳細分析"""
-        filepath = os.path.join(self.user_data_dir, f"{user_id}.json")
-        
-        if not os.path.exists(filepath):
-            return {'error': 'User not found'}
-        
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                user_data = json.load(f)
-        except (FileNotFoundError, PermissionError) as e:
-            return {'error': f'ファイルアクセスエラー: {e}'}
-        except (json.JSONDecodeError, UnicodeDecodeError) as e:
-            return {'error': f'データ読み込みエラー: {e}'}
+            user_data = self.user_repository.get_user(user_id)
         except Exception as e:
             return {'error': f'予期しないエラー: {e}'}
         
+        if not user_data:
+            return {'error': 'User not found'}
+        
         history = user_data.get('history', [])
         
         return {
@@ -516,29 +663,60 @@ class AdminDashboard:
     
     def _analyze_category_performance(self, user_data: Dict[str, Dict]) -> Dict[str, Any]:
         """カテゴリ別パフォーマンス分析"""
-        category_stats = defaultdict(lambda: {'total': 0, 'correct': 0, 'times': []})
+        _, category_stats = self._accumulate_content_stats(user_data.values())
+        return self._summarize_category_stats(category_stats)
+    
+    def _accumulate_content_stats(self, user_data_iter: Iterable[Dict]) -> Tuple[Dict[Any, Dict], Dict[str, Dict]]:
+        """問題別・カテゴリ別の回答統計を1パスで集計（解答時間は合計・件数のみ保持）"""
+        question_stats = defaultdict(lambda: {'attempted': 0, 'correct': 0, 'time_total': 0, 'time_count': 0})
+        category_stats = defaultdict(lambda: {'total': 0, 'correct': 0, 'time_total': 0, 'time_count': 0})
         
-        for data in user_data.values():
+        for data in user_data_iter:
             for entry in data.get('history', []):
+                is_correct = entry.get('is_correct', False)
+                elapsed = entry.get('elapsed', 0)
+                
+                q_id = entry.get('id')
+                if q_id:
+                    stats = question_stats[q_id]
+                    stats['attempted'] += 1
+                    if is_correct:
+                        stats['correct'] += 1
+                    if elapsed > 0:
+                        stats['time_total'] += elapsed
+                        stats['time_count'] += 1
+                
                 category = entry.get('category')
                 if category:
                     stats = category_stats[category]
                     stats['total'] += 1
-                    if entry.get('is_correct', False):
+                    if is_correct:
                         stats['correct'] += 1
-                    
-                    elapsed = entry.get('elapsed', 0)
                     if elapsed > 0:
-                        stats['times'].append(elapsed)
+                        stats['time_total'] += elapsed
+                        stats['time_count'] += 1
         
-        # 統計計算
+        # 問題別統計の確定
+        result = {}
+        for q_id, stats in question_stats.items():
+            result[q_id] = {
+                'attempted': stats['attempted'],
+                'correct': stats['correct'],
+                'avg_time': stats['time_total'] / stats['time_count'] if stats['time_count'] else 0,
+                'accuracy': stats['correct'] / stats['attempted'] if stats['attempted'] > 0 else 0
+            }
+        return result, dict(category_stats)
+    
+    def _summarize_category_stats(self, category_stats: Dict[str, Dict]) -> Dict[str, Any]:
+        """カテゴリ別統計の確定"""
         result = {}
         for category, stats in category_stats.items():
+            accuracy = stats['correct'] / stats['total'] if stats['total'] > 0 else 0
             result[category] = {
                 'total_attempts': stats['total'],
-                'accuracy': stats['correct'] / stats['total'] if stats['total'] > 0 else 0,
-                'avg_time': sum(stats['times']) / len(stats['times']) if stats['times'] else 0,
-                'difficulty_level': self._categorize_difficulty(stats['correct'] / stats['total'] if stats['total'] > 0 else 0)
+                'accuracy': accuracy,
+                'avg_time': stats['time_total'] / stats['time_count'] if stats['time_count'] else 0,
+                'difficulty_level': self._categorize_difficulty(accuracy)
             }
         
         return result
@@ -614,38 +792,17 @@ class AdminDashboard:
         
         return (quality_score + integrity_score) / 2
     
-    def _calculate_engagement_score(self) -> float:
+    def _calculate_engagement_score(self, aggregate: DashboardAggregate) -> float:
         """エンゲージメントスコア計算"""
-        user_data = self._load_all_user_data()
-        if not user_data:
+        if not aggregate.user_count:
             return 0
         
-        active_users = sum(1 for data in user_data.values() if data.get('history'))
-        engagement_score = active_users / len(user_data)
-        
-        return engagement_score
+        return aggregate.active_count / aggregate.user_count
     
-    def _calculate_learning_effectiveness(self) -> Dict[str, float]:
+    def _calculate_learning_effectiveness(self, aggregate: DashboardAggregate) -> Dict[str, float]:
         """学習効果計算"""
-        user_data = self._load_all_user_data()
-        
-        improvement_scores = []
-        retention_scores = []
-        
-        for data in user_data.values():
-            history = data.get('history', [])
-            if len(history) >= 10:
-                # 改善度: 最初の5問と最後の5問の正答率比較
-                early_accuracy = sum(1 for h in history[:5] if h.get('is_correct', False)) / 5
-                recent_accuracy = sum(1 for h in history[-5:] if h.get('is_correct', False)) / 5
-                improvement = recent_accuracy - early_accuracy
-                improvement_scores.append(improvement)
-                
-                # 定着度: 一定期間後の正答率維持
-                if len(history) >= 20:
-                    mid_accuracy = sum(1 for h in history[10:15] if h.get('is_correct', False)) / 5
-                    retention = recent_accuracy - mid_accuracy
-                    retention_scores.append(retention)
+        improvement_scores = aggregate.improvement_scores
+        retention_scores = aggregate.retention_scores
         
         return {
             'average_improvement': sum(improvement_scores) / len(improvement_scores) if improvement_scores else 0,
@@ -674,67 +831,26 @@ class AdminDashboard:
         else:
             return 'very_hard'
     
-    def _get_question_stats(self, question_id: int, user_data: Dict) -> Dict[str, Any]:
-        """問題統計取得"""
-        attempts = 0
-        correct = 0
-        times = []
-        
-        for data in user_data.values():
-            for entry in data.get('history', []):
-                if entry.get('id') == question_id:
-                    attempts += 1
-                    if entry.get('is_correct', False):
-                        correct += 1
-                    
-                    elapsed = entry.get('elapsed', 0)
-                    if elapsed > 0:
-                        times.append(elapsed)
-        
-        return {
-            'total_attempts': attempts,
-            'correct_attempts': correct,
-            'accuracy': correct / attempts if attempts > 0 else 0,
-            'avg_time': sum(times) / len(times) if times else 0
-        }
-    
-    def _calculate_overall_completion_rate(self, user_data: Dict) -> float:
+    def _calculate_overall_completion_rate(self, aggregate: DashboardAggregate) -> float:
         """全体完了率計算"""
-        if not user_data:
+        if not aggregate.user_count:
             return 0
         
-        total_possible = len(self.questions) * len(user_data)
-        total_attempted = sum(len(data.get('history', [])) for data in user_data.values())
-        
-        return total_attempted / total_possible if total_possible > 0 else 0
+        total_possible = len(self.questions) * aggregate.user_count
+        return aggregate.total_answers / total_possible if total_possible > 0 else 0
     
-    def _calculate_engagement_metrics(self, user_data: Dict) -> Dict[str, float]:
+    def _calculate_engagement_metrics(self, aggregate: DashboardAggregate) -> Dict[str, float]:
         """エンゲージメント指標計算"""
-        if not user_data:
+        if not aggregate.user_count:
             return {'active_ratio': 0, 'avg_sessions': 0, 'retention_rate': 0}
         
-        active_users = sum(1 for data in user_data.values() if data.get('history'))
-        total_sessions = sum(len(data.get('history', [])) for data in user_data.values())
-        
         return {
-            'active_ratio': active_users / len(user_data),
-            'avg_sessions': total_sessions / len(user_data),
-            'retention_rate': self._calculate_retention_rate(user_data)
+            'active_ratio': aggregate.active_count / aggregate.user_count,
+            'avg_sessions': aggregate.total_answers / aggregate.user_count,
+            # 簡単な実装: 30日以内にアクティビティがあるユーザーの割合
+            'retention_rate': aggregate.retained_users / aggregate.user_count
         }
     
-    def _calculate_retention_rate(self, user_data: Dict) -> float:
-        """リテンション率計算"""
-        # 簡単な実装: 30日以内にアクティビティがあるユーザーの割合
-        cutoff = datetime.now() - timedelta(days=30)
-        retained_users = 0
-        
-        for data in user_data.values():
-            last_activity = self._get_last_activity(data.get('history', []))
-            if last_activity and last_activity >= cutoff:
-                retained_users += 1
-        
-        return retained_users / len(user_data) if user_data else 0
-    
     def _identify_data_issues(self) -> Dict[str, int]:
         """データ問題特定"""
         return {
@@ -743,18 +859,6 @@ class AdminDashboard:
             'info': 0
         }
     
-    def _count_inactive_users(self, user_data: Dict) -> int:
-        """非アクティブユーザー数"""
-        cutoff = datetime.now() - timedelta(days=30)
-        inactive = 0
-        
-        for data in user_data.values():
-            last_activity = self._get_last_activity(data.get('history', []))
-            if not last_activity or last_activity < cutoff:
-                inactive += 1
-        
-        return inactive
-    
     def _measure_load_time(self) -> float:
         """読み込み時間測定"""
         import time
@@ -12,6 +12,8 @@ from collections import defaultdict, Counter
 import math
 import random
 
+from user_store import get_user_repository
+
 logger = logging.getLogger(__name__)
 
 class AdvancedPersonalizationEngine:
@@ -26,6 +28,7 @@ class AdvancedPersonalizationEngine:
         
         # ディレクトリ作成
         os.makedirs(personalization_data_dir, exist_ok=True)
+        self.user_repository = get_user_repository(user_data_dir)
         
         # 学習スタイル定義
         self.learning_styles = {
@@ -737,21 +740,10 @@ class AdvancedPersonalizationEngine:
     
     def _load_user_data(self, user_id: str) -> Dict[str, Any]:
         """ユーザーデータ読み込み"""
-        filepath = os.path.join(self.user_data_dir, f"{user_id}.json")
         try:
-            if not os.path.exists(filepath):
-                return {}
-            
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, PermissionError, IOError, OSError) as e:
-            logger.warning(f"ファイルアクセスエラー {filepath}: {type(e).__name__}: {e}")
-            return {}
-        except (json.JSONDecodeError, UnicodeDecodeError) as e:
-            logger.warning(f"データ読み込みエラー {filepath}: {type(e).__name__}: {e}")
-            return {}
+            return self.user_repository.get_user(user_id)
         except Exception as e:
-            logger.error(f"予期しないエラー {filepath}: {type(e).__name__}: {e}")
+            logger.error(f"予期しないエラー {user_id}: {type(e).__name__}: {e}")
             return {}
     
     def _save_user_profile(self, user_id: str, profile: Dict[str, Any]):
@@ -8,12 +8,20 @@ import json
 import hashlib
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 from functools import wraps
 from collections import defaultdict
 import secrets
+import time
 import uuid
 
+from api_key_index import APIKeyIndex
+from certification_plans import CertificationEvaluator
+from config import APIKeyIndexConfig, CertificationConfig, OrganizationReportConfig
+from json_store import file_lock, get_batched_writer, write_json
+from org_reports import OrganizationAggregates
+from user_store import get_user_repository
+
 logger = logging.getLogger(__name__)
 
 class APIManager:
@@ -29,6 +37,24 @@ class APIManager:
         
         # ディレクトリ作成
         os.makedirs(api_data_dir, exist_ok=True)
+        self.user_repository = get_user_repository(user_data_dir)
+        
+        # APIキー検証用の索引（ダイジェスト・権限ビット集合）
+        self.api_key_index = APIKeyIndex(self.api_keys_file) if APIKeyIndexConfig.ENABLED else None
+        
+        # 組織レポート用の組織別集計テーブル（回答保存時に差分更新）
+        self.org_aggregates = None
+        if OrganizationReportConfig.PRECOMPUTED:
+            self.org_aggregates = OrganizationAggregates(
+                self.user_repository, self.organization_data_file,
+                snapshot_file=os.path.join(api_data_dir, 'org_aggregates.json'))
+            self.user_repository.add_listener(self.org_aggregates.on_user_saved)
+        
+        # 認定進捗の判定プラン・ユーザー版数毎の結果キャッシュ
+        self.certification_evaluator = None
+        if CertificationConfig.PLANNED:
+            self.certification_evaluator = CertificationEvaluator(
+                self.user_repository, snapshot_file=os.path.join(api_data_dir, 'certification_progress.json'))
         
         # APIエンドポイント定義
         self.api_endpoints = {
@@ -84,40 +110,41 @@ class APIManager:
                         expires_in_days: int = 365) -> Dict[str, Any]:
         """APIキー生成"""
         try:
-            api_keys = self._load_api_keys()
-            
-            # APIキー生成
-            api_key = f"rccm_{secrets.token_urlsafe(32)}"
-            api_secret = secrets.token_urlsafe(64)
-            
-            # キー情報
-            key_info = {
-                'api_key': api_key,
-                'api_secret': api_secret,
-                'organization': organization,
-                'permissions': permissions,
-                'created_at': datetime.now().isoformat(),
-                'expires_at': (datetime.now() + timedelta(days=expires_in_days)).isoformat(),
-                'is_active': True,
-                'usage_stats': {
-                    'total_requests': 0,
-                    'last_used': None,
-                    'rate_limit': 1000,  # 1時間あたりのリクエスト上限
-                    'current_usage': 0
+            with file_lock(self.api_keys_file):
+                api_keys = self._load_api_keys()
+                
+                # APIキー生成
+                api_key = f"rccm_{secrets.token_urlsafe(32)}"
+                api_secret = secrets.token_urlsafe(64)
+                
+                # キー情報
+                key_info = {
+                    'api_key': api_key,
+                    'api_secret': api_secret,
+                    'organization': organization,
+                    'permissions': permissions,
+                    'created_at': datetime.now().isoformat(),
+                    'expires_at': (datetime.now() + timedelta(days=expires_in_days)).isoformat(),
+                    'is_active': True,
+                    'usage_stats': {
+                        'total_requests': 0,
+                        'last_used': None,
+                        'rate_limit': 1000,  # 1時間あたりのリクエスト上限
+                        'current_usage': 0
+                    }
+                }
+                
+                api_keys[api_key] = key_info
+                self._save_api_keys(api_keys)
+                
+                logger.info(f"APIキー生成: {organization}")
+                return {
+                    'success': True,
+                    'api_key': api_key,
+                    'api_secret': api_secret,
+                    'permissions': permissions,
+                    'expires_at': key_info['expires_at']
                 }
-            }
-            
-            api_keys[api_key] = key_info
-            self._save_api_keys(api_keys)
-            
-            logger.info(f"APIキー生成: {organization}")
-            return {
-                'success': True,
-                'api_key': api_key,
-                'api_secret': api_secret,
-                'permissions': permissions,
-                'expires_at': key_info['expires_at']
-            }
             
         except Exception as e:
             logger.error(f"APIキー生成エラー: {e}")
@@ -125,6 +152,8 @@ class APIManager:
     
     def validate_api_key(self, api_key: str, required_permission: str = None) -> Dict[str, Any]:
         """APIキー検証"""
+        if self.api_key_index is not None:
+            return self._validate_indexed(api_key, required_permission)
         try:
             api_keys = self._load_api_keys()
             
@@ -150,16 +179,20 @@ class APIManager:
             if required_permission and required_permission not in key_info['permissions']:
                 return {'valid': False, 'error': 'Insufficient permissions'}
             
-            # 使用統計更新
-            key_info['usage_stats']['total_requests'] += 1
-            key_info['usage_stats']['last_used'] = datetime.now().isoformat()
-            
             # レート制限チェック（簡略化）
             if key_info['usage_stats']['current_usage'] >= key_info['usage_stats']['rate_limit']:
                 return {'valid': False, 'error': 'Rate limit exceeded'}
             
-            api_keys[api_key] = key_info
-            self._save_api_keys(api_keys)
+            # 使用統計更新（リクエスト毎にファイル全体を書き直さず、バッチで反映）
+            used_at = datetime.now().isoformat()
+            
+            def record_usage(api_keys: Dict[str, Any]):
+                usage_stats = api_keys.get(api_key, {}).get('usage_stats')
+                if usage_stats is not None:
+                    usage_stats['total_requests'] += 1
+                    usage_stats['last_used'] = max(usage_stats.get('last_used') or '', used_at)
+            
+            get_batched_writer().submit(self.api_keys_file, record_usage)
             
             return {
                 'valid': True,
@@ -171,21 +204,57 @@ class APIManager:
             logger.error(f"APIキー検証エラー: {e}")
             return {'valid': False, 'error': 'Validation failed'}
     
-    def revoke_api_key(self, api_key: str) -> Dict[str, Any]:
-        """APIキー無効化"""
+    def _validate_indexed(self, api_key: str, required_permission: str = None) -> Dict[str, Any]:
+        """APIキー検証（索引参照。ファイル読み込みは api_keys.json の変更時のみ）"""
         try:
-            api_keys = self._load_api_keys()
+            entry = self.api_key_index.lookup(api_key)
             
-            if api_key not in api_keys:
-                return {'success': False, 'error': 'API key not found'}
+            if entry is None:
+                return {'valid': False, 'error': 'Invalid API key'}
             
-            api_keys[api_key]['is_active'] = False
-            api_keys[api_key]['revoked_at'] = datetime.now().isoformat()
+            if not entry.is_active:
+                return {'valid': False, 'error': 'API key is deactivated'}
             
-            self._save_api_keys(api_keys)
+            if entry.expires_at is None:
+                logger.warning("有効期限の日付パースエラー")
+                return {'valid': False, 'error': 'Invalid expiration date format'}
+            if time.time() > entry.expires_at:
+                return {'valid': False, 'error': 'API key has expired'}
             
-            logger.info(f"APIキー無効化: {api_key}")
-            return {'success': True, 'message': 'API key revoked successfully'}
+            if not entry.has_permission(required_permission):
+                return {'valid': False, 'error': 'Insufficient permissions'}
+            
+            if entry.current_usage >= entry.rate_limit:
+                return {'valid': False, 'error': 'Rate limit exceeded'}
+            
+            self.api_key_index.record_use(entry)
+            
+            return {
+                'valid': True,
+                'organization': entry.organization,
+                'permissions': list(entry.permissions)
+            }
+            
+        except Exception as e:
+            logger.error(f"APIキー検証エラー: {e}")
+            return {'valid': False, 'error': 'Validation failed'}
+    
+    def revoke_api_key(self, api_key: str) -> Dict[str, Any]:
+        """APIキー無効化"""
+        try:
+            with file_lock(self.api_keys_file):
+                api_keys = self._load_api_keys()
+                
+                if api_key not in api_keys:
+                    return {'success': False, 'error': 'API key not found'}
+                
+                api_keys[api_key]['is_active'] = False
+                api_keys[api_key]['revoked_at'] = datetime.now().isoformat()
+                
+                self._save_api_keys(api_keys)
+                
+                logger.info(f"APIキー無効化: {api_key}")
+                return {'success': True, 'message': 'API key revoked successfully'}
             
         except Exception as e:
             logger.error(f"APIキー無効化エラー: {e}")
@@ -198,35 +267,36 @@ class APIManager:
                                    organization: str = None) -> Dict[str, Any]:
         """認定プログラム作成"""
         try:
-            certifications = self._load_certifications()
-            
-            cert_id = str(uuid.uuid4())
-            
-            certification = {
-                'id': cert_id,
-                'name': name,
-                'description': description,
-                'organization': organization,
-                'requirements': requirements,
-                'created_at': datetime.now().isoformat(),
-                'is_active': True,
-                'statistics': {
-                    'total_participants': 0,
-                    'completed': 0,
-                    'in_progress': 0,
-                    'completion_rate': 0.0
+            with file_lock(self.certifications_file):
+                certifications = self._load_certifications()
+                
+                cert_id = str(uuid.uuid4())
+                
+                certification = {
+                    'id': cert_id,
+                    'name': name,
+                    'description': description,
+                    'organization': organization,
+                    'requirements': requirements,
+                    'created_at': datetime.now().isoformat(),
+                    'is_active': True,
+                    'statistics': {
+                        'total_participants': 0,
+                        'completed': 0,
+                        'in_progress': 0,
+                        'completion_rate': 0.0
+                    }
+                }
+                
+                certifications[cert_id] = certification
+                self._save_certifications(certifications)
+                
+                logger.info(f"認定プログラム作成: {name}")
+                return {
+                    'success': True,
+                    'certification_id': cert_id,
+                    'certification': certification
                 }
-            }
-            
-            certifications[cert_id] = certification
-            self._save_certifications(certifications)
-            
-            logger.info(f"認定プログラム作成: {name}")
-            return {
-                'success': True,
-                'certification_id': cert_id,
-                'certification': certification
-            }
             
         except Exception as e:
             logger.error(f"認定プログラム作成エラー: {e}")
@@ -235,39 +305,40 @@ class APIManager:
     def enroll_user_in_certification(self, user_id: str, cert_id: str) -> Dict[str, Any]:
         """ユーザーの認定プログラム登録"""
         try:
-            certifications = self._load_certifications()
-            
-            if cert_id not in certifications:
-                return {'success': False, 'error': 'Certification program not found'}
-            
-            user_data = self._load_user_data(user_id)
-            
-            # ユーザーの認定情報を初期化
-            if 'certifications' not in user_data:
-                user_data['certifications'] = {}
-            
-            enrollment = {
-                'enrolled_at': datetime.now().isoformat(),
-                'status': 'in_progress',
-                'progress': 0.0,
-                'requirements_met': {},
-                'completion_date': None,
-                'certificate_issued': False
-            }
-            
-            user_data['certifications'][cert_id] = enrollment
-            self._save_user_data(user_id, user_data)
-            
-            # 認定プログラム統計更新
-            certifications[cert_id]['statistics']['total_participants'] += 1
-            certifications[cert_id]['statistics']['in_progress'] += 1
-            self._save_certifications(certifications)
-            
-            logger.info(f"認定プログラム登録: ユーザー{user_id} → 認定{cert_id}")
-            return {
-                'success': True,
-                'enrollment': enrollment
-            }
+            with file_lock(self.certifications_file):
+                certifications = self._load_certifications()
+                
+                if cert_id not in certifications:
+                    return {'success': False, 'error': 'Certification program not found'}
+                
+                user_data = self._load_user_data(user_id)
+                
+                # ユーザーの認定情報を初期化
+                if 'certifications' not in user_data:
+                    user_data['certifications'] = {}
+                
+                enrollment = {
+                    'enrolled_at': datetime.now().isoformat(),
+                    'status': 'in_progress',
+                    'progress': 0.0,
+                    'requirements_met': {},
+                    'completion_date': None,
+                    'certificate_issued': False
+                }
+                
+                user_data['certifications'][cert_id] = enrollment
+                self._save_user_data(user_id, user_data)
+                
+                # 認定プログラム統計更新
+                certifications[cert_id]['statistics']['total_participants'] += 1
+                certifications[cert_id]['statistics']['in_progress'] += 1
+                self._save_certifications(certifications)
+                
+                logger.info(f"認定プログラム登録: ユーザー{user_id} → 認定{cert_id}")
+                return {
+                    'success': True,
+                    'enrollment': enrollment
+                }
             
         except Exception as e:
             logger.error(f"認定プログラム登録エラー: {e}")
@@ -275,49 +346,103 @@ class APIManager:
     
     def check_certification_progress(self, user_id: str, cert_id: str) -> Dict[str, Any]:
         """認定進捗チェック"""
+        if self.certification_evaluator is not None:
+            return self.get_user_certifications(user_id, [cert_id])[0]
+        return self._check_certification_progress_scan(user_id, cert_id)
+    
+    def get_user_certifications(self, user_id: str, cert_ids: List[str] = None) -> List[Dict[str, Any]]:
+        """ユーザーの認定進捗（cert_ids 省略時は登録済みの全プログラム）"""
+        if self.certification_evaluator is None:
+            if cert_ids is None:
+                cert_ids = list(self._load_user_data(user_id).get('certifications', {}))
+            return [self._check_certification_progress_scan(user_id, cert_id) for cert_id in cert_ids]
+        
         try:
-            user_data = self._load_user_data(user_id)
             certifications = self._load_certifications()
-            
+            enrollments, results = self.certification_evaluator.user_certifications(user_id, certifications, cert_ids)
+        except Exception as e:
+            logger.error(f"認定進捗チェックエラー: {e}")
+            return [{'error': str(e)} for _ in (cert_ids or [None])]
+        
+        details = []
+        for cert_id in (list(enrollments) if cert_ids is None else cert_ids):
             if cert_id not in certifications:
-                return {'error': 'Certification program not found'}
-            
-            if 'certifications' not in user_data or cert_id not in user_data['certifications']:
-                return {'error': 'User not enrolled in this certification'}
-            
-            certification = certifications[cert_id]
-            enrollment = user_data['certifications'][cert_id]
-            requirements = certification['requirements']
-            
-            # 進捗計算
-            progress_data = self._calculate_certification_progress(user_data, requirements)
-            
-            # 完了チェック
-            if progress_data['completion_percentage'] >= 100 and enrollment['status'] != 'completed':
-                enrollment['status'] = 'completed'
-                enrollment['completion_date'] = datetime.now().isoformat()
-                enrollment['certificate_issued'] = True
+                details.append({'error': 'Certification program not found'})
+                continue
+            if cert_id not in enrollments:
+                details.append({'error': 'User not enrolled in this certification'})
+                continue
+            result = results[cert_id]
+            if 'error' in result:
+                logger.error(f"認定進捗チェックエラー: {result['error']}")
+                details.append({'error': result['error']})
+                continue
+            try:
+                enrollment = enrollments[cert_id]
+                if result['progress']['completion_percentage'] >= 100 and enrollment['status'] != 'completed':
+                    # 完了の記録（ユーザーデータ・プログラム統計の更新）はロック内で従来どおり
+                    details.append(self._check_certification_progress_scan(user_id, cert_id))
+                    continue
+                details.append({
+                    'certification_id': cert_id,
+                    'certification_name': certifications[cert_id]['name'],
+                    'enrollment_status': enrollment['status'],
+                    'progress': result['progress'],
+                    'requirements_status': result['requirements_status'],
+                    'completion_date': enrollment.get('completion_date'),
+                    'certificate_issued': enrollment.get('certificate_issued', False)
+                })
+            except Exception as e:
+                logger.error(f"認定進捗チェックエラー: {e}")
+                details.append({'error': str(e)})
+        return details
+    
+    def _check_certification_progress_scan(self, user_id: str, cert_id: str) -> Dict[str, Any]:
+        """認定進捗チェック（学習履歴を要件毎に走査。完了時の記録を含む）"""
+        try:
+            with file_lock(self.certifications_file):
+                user_data = self._load_user_data(user_id)
+                certifications = self._load_certifications()
                 
-                # 統計更新
-                certifications[cert_id]['statistics']['completed'] += 1
-                certifications[cert_id]['statistics']['in_progress'] -= 1
-                certifications[cert_id]['statistics']['completion_rate'] = (
-                    certifications[cert_id]['statistics']['completed'] / 
-                    certifications[cert_id]['statistics']['total_participants']
-                )
+                if cert_id not in certifications:
+                    return {'error': 'Certification program not found'}
                 
-                self._save_user_data(user_id, user_data)
-                self._save_certifications(certifications)
-            
-            return {
-                'certification_id': cert_id,
-                'certification_name': certification['name'],
-                'enrollment_status': enrollment['status'],
-                'progress': progress_data,
-                'requirements_status': self._check_requirements_status(user_data, requirements),
-                'completion_date': enrollment.get('completion_date'),
-                'certificate_issued': enrollment.get('certificate_issued', False)
-            }
+                if 'certifications' not in user_data or cert_id not in user_data['certifications']:
+                    return {'error': 'User not enrolled in this certification'}
+                
+                certification = certifications[cert_id]
+                enrollment = user_data['certifications'][cert_id]
+                requirements = certification['requirements']
+                
+                # 進捗計算
+                progress_data = self._calculate_certification_progress(user_data, requirements)
+                
+                # 完了チェック
+                if progress_data['completion_percentage'] >= 100 and enrollment['status'] != 'completed':
+                    enrollment['status'] = 'completed'
+                    enrollment['completion_date'] = datetime.now().isoformat()
+                    enrollment['certificate_issued'] = True
+                    
+                    # 統計更新
+                    certifications[cert_id]['statistics']['completed'] += 1
+                    certifications[cert_id]['statistics']['in_progress'] -= 1
+                    certifications[cert_id]['statistics']['completion_rate'] = (
+                        certifications[cert_id]['statistics']['completed'] / 
+                        certifications[cert_id]['statistics']['total_participants']
+                    )
+                    
+                    self._save_user_data(user_id, user_data)
+                    self._save_certifications(certifications)
+                
+                return {
+                    'certification_id': cert_id,
+                    'certification_name': certification['name'],
+                    'enrollment_status': enrollment['status'],
+                    'progress': progress_data,
+                    'requirements_status': self._check_requirements_status(user_data, requirements),
+                    'completion_date': enrollment.get('completion_date'),
+                    'certificate_issued': enrollment.get('certificate_issued', False)
+                }
             
         except Exception as e:
             logger.error(f"認定進捗チェックエラー: {e}")
@@ -385,6 +510,9 @@ class APIManager:
     
     def _generate_organization_report(self, organization: str, time_period: str, format: str) -> Dict[str, Any]:
         """組織進捗レポート"""
+        if self.org_aggregates is not None:
+            return self._format_organization_report(organization, time_period, format)
+        
         organizations = self._load_organizations()
         
         if organization not in organizations:
@@ -453,55 +581,97 @@ class APIManager:
         else:
             return report
     
+    def _format_organization_report(self, organization: str, time_period: str, format: str) -> Dict[str, Any]:
+        """組織進捗レポート（組織別集計テーブルから）"""
+        aggregated = self.org_aggregates.organization_report(organization, time_period)
+        if aggregated is None:
+            return {'error': 'Organization not found'}
+        
+        users = aggregated['members']
+        all_users_data = aggregated['user_performance']
+        total_questions = sum(u['questions_attempted'] for u in all_users_data)
+        total_correct = sum(u['correct_answers'] for u in all_users_data)
+        total_time = sum(u['time_spent'] for u in all_users_data)
+        
+        report = {
+            'report_type': 'organization',
+            'organization': organization,
+            'time_period': time_period,
+            'generated_at': datetime.now().isoformat(),
+            'summary': {
+                'total_users': len(users),
+                'active_users': len([u for u in all_users_data if u['questions_attempted'] > 0]),
+                'total_questions_attempted': total_questions,
+                'total_correct_answers': total_correct,
+                'organization_accuracy_rate': total_correct / total_questions if total_questions > 0 else 0,
+                'total_study_time_hours': total_time // 3600
+            },
+            'user_performance': all_users_data,
+            'department_breakdown': aggregated['department_breakdown'],
+            'learning_trends': self._summarize_weekly_trends(aggregated['weekly_activity']),
+            'certification_progress': self._get_organization_certification_progress(users),
+            'recommendations': self._generate_organization_recommendations(all_users_data)
+        }
+        
+        if format == 'pdf':
+            return self._convert_to_pdf(report)
+        elif format == 'excel':
+            return self._convert_to_excel(report)
+        else:
+            return report
+    
+    def _summarize_weekly_trends(self, weekly_activity: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """週次活動から学習トレンド（直近2週の正答率の差・回答数の増加率）"""
+        trend, growth_rate = 'stable', 0
+        if len(weekly_activity) >= 2:
+            previous, latest = weekly_activity[-2], weekly_activity[-1]
+            accuracy_change = latest['accuracy_rate'] - previous['accuracy_rate']
+            if accuracy_change > 0.02:
+                trend = 'improving'
+            elif accuracy_change < -0.02:
+                trend = 'declining'
+            growth_rate = (latest['questions_attempted'] - previous['questions_attempted']) / previous['questions_attempted']
+        return {'trend': trend, 'growth_rate': growth_rate, 'weekly_activity': weekly_activity}
+    
+    def get_organization_users(self, org_id: str) -> Optional[List[Dict[str, Any]]]:
+        """組織メンバー毎の回答数・正答率・最終回答日時（組織がなければ None）"""
+        if self.org_aggregates is not None:
+            return self.org_aggregates.organization_users(org_id)
+        
+        organizations = self._load_organizations()
+        if org_id not in organizations:
+            return None
+        
+        users_details = []
+        for user_id in organizations[org_id]['users']:
+            history = self._load_user_data(user_id).get('history', [])
+            users_details.append({
+                'user_id': user_id,
+                'total_questions': len(history),
+                'accuracy': sum(1 for h in history if h.get('is_correct', False)) / len(history) if history else 0,
+                'last_activity': max([h.get('date', '') for h in history], default='')
+            })
+        return users_details
+    
     def export_learning_analytics(self, format: str = 'json', 
                                 include_personal_data: bool = False) -> Dict[str, Any]:
         """学習分析データエクスポート"""
         try:
-            # 全ユーザーデータ読み込み
-            all_users = self._load_all_user_data()
-            
-            analytics_data = {
-                'export_timestamp': datetime.now().isoformat(),
-                'total_users': len(all_users),
-                'format': format,
-                'includes_personal_data': include_personal_data,
-                'aggregate_statistics': {},
-                'learning_patterns': {},
-                'performance_metrics': {},
-                'content_analytics': {}
-            }
-            
-            # 集計統計
-            all_histories = []
-            for user_data in all_users.values():
-                all_histories.extend(user_data.get('history', []))
-            
-            analytics_data['aggregate_statistics'] = {
-                'total_questions_attempted': len(all_histories),
-                'unique_questions': len(set(h.get('question_id') for h in all_histories)),
-                'overall_accuracy': sum(1 for h in all_histories if h.get('is_correct', False)) / len(all_histories) if all_histories else 0,
-                'average_response_time': sum(h.get('elapsed', 0) for h in all_histories) / len(all_histories) if all_histories else 0
-            }
-            
-            # 学習パターン分析
-            analytics_data['learning_patterns'] = self._analyze_global_learning_patterns(all_users)
-            
-            # パフォーマンス指標
-            analytics_data['performance_metrics'] = self._calculate_global_performance_metrics(all_histories)
-            
-            # コンテンツ分析
-            analytics_data['content_analytics'] = self._analyze_content_effectiveness(all_histories)
+            analytics_data = {}
+            user_rows = {}
+            for record in self.iter_learning_analytics(include_personal_data):
+                record_type = record.pop('type')
+                if record_type == 'meta':
+                    analytics_data.update(record)
+                elif record_type == 'user' and include_personal_data:
+                    user_rows[record.pop('user_id')] = record
+                elif record_type == 'summary':
+                    analytics_data.update(record)
+            analytics_data['format'] = format
             
             # 個人データ含める場合
             if include_personal_data:
-                analytics_data['user_data'] = {}
-                for user_id, user_data in all_users.items():
-                    analytics_data['user_data'][user_id] = {
-                        'total_questions': len(user_data.get('history', [])),
-                        'accuracy': self._calculate_user_accuracy(user_data),
-                        'learning_level': self._assess_learning_level(user_data),
-                        'primary_departments': self._get_user_primary_departments(user_data)
-                    }
+                analytics_data['user_data'] = user_rows
             
             # フォーマット変換
             if format == 'csv':
@@ -515,40 +685,104 @@ class APIManager:
             logger.error(f"学習分析エクスポートエラー: {e}")
             return {'error': str(e)}
     
+    # ストリーミングCSV（/api/reports/export/csv）の列
+    ANALYTICS_CSV_FIELDS = ('user_id', 'user_ref', 'total_questions', 'accuracy',
+                            'learning_level', 'primary_departments')
+    
+    def iter_learning_analytics(self, include_personal_data: bool = False) -> Iterator[Dict[str, Any]]:
+        """学習分析データを1ユーザーずつ逐次生成（ストリーミングエクスポート用）
+        
+        meta → user（ユーザー毎） → summary の順に dict を返す。
+        ユーザーデータは1件ずつ読み込んで集計値のみ保持するため、
+        メモリ使用量はユーザー数に依存しない（ユニーク問題IDの集合のみ問題数に比例）。
+        個人データを含めない場合、user 行の user_id は連番の user_ref に置き換える。
+        """
+        yield {
+            'type': 'meta',
+            'export_timestamp': datetime.now().isoformat(),
+            'includes_personal_data': include_personal_data,
+        }
+        
+        total_users = 0
+        total_attempts = 0
+        correct_attempts = 0
+        total_elapsed = 0
+        unique_questions = set()
+        
+        for user_id, user_data in self._iter_user_data():
+            total_users += 1
+            history = user_data.get('history', [])
+            for h in history:
+                unique_questions.add(h.get('question_id'))
+                if h.get('is_correct', False):
+                    correct_attempts += 1
+                total_elapsed += h.get('elapsed', 0)
+            total_attempts += len(history)
+            
+            row = {
+                'type': 'user',
+                'total_questions': len(history),
+                'accuracy': self._calculate_user_accuracy(user_data),
+                'learning_level': self._assess_learning_level(user_data),
+                'primary_departments': self._get_user_primary_departments(user_data)
+            }
+            if include_personal_data:
+                row['user_id'] = user_id
+            else:
+                row['user_ref'] = total_users
+            yield row
+        
+        aggregate = {
+            'total_questions_attempted': total_attempts,
+            'unique_questions': len(unique_questions),
+            'overall_accuracy': correct_attempts / total_attempts if total_attempts else 0,
+            'average_response_time': total_elapsed / total_attempts if total_attempts else 0
+        }
+        yield {
+            'type': 'summary',
+            'total_users': total_users,
+            'aggregate_statistics': aggregate,
+            # 学習パターン分析・パフォーマンス指標・コンテンツ分析
+            'learning_patterns': self._analyze_global_learning_patterns(aggregate),
+            'performance_metrics': self._calculate_global_performance_metrics(aggregate),
+            'content_analytics': self._analyze_content_effectiveness(aggregate)
+        }
+    
     # === 組織管理機能 ===
     
     def create_organization(self, name: str, description: str, settings: Dict[str, Any] = None) -> Dict[str, Any]:
         """組織作成"""
         try:
-            organizations = self._load_organizations()
-            
-            org_id = str(uuid.uuid4())
-            
-            organization = {
-                'id': org_id,
-                'name': name,
-                'description': description,
-                'created_at': datetime.now().isoformat(),
-                'settings': settings or {},
-                'users': [],
-                'administrators': [],
-                'statistics': {
-                    'total_users': 0,
-                    'active_users': 0,
-                    'total_questions_attempted': 0,
-                    'average_accuracy': 0.0
+            with file_lock(self.organization_data_file):
+                organizations = self._load_organizations()
+                
+                org_id = str(uuid.uuid4())
+                
+                organization = {
+                    'id': org_id,
+                    'name': name,
+                    'description': description,
+                    'created_at': datetime.now().isoformat(),
+                    'settings': settings or {},
+                    'users': [],
+                    'administrators': [],
+                    'statistics': {
+                        'total_users': 0,
+                        'active_users': 0,
+                        'total_questions_attempted': 0,
+                        'average_accuracy': 0.0
+                    }
+                }
+                
+                organizations[org_id] = organization
+                self._save_organizations(organizations)
+                
+                logger.info(f"組織作成: {name}")
+                return {
+                    'success': True,
+                    'organization_id': org_id,
+                    'organization': organization
                 }
-            }
-            
-            organizations[org_id] = organization
-            self._save_organizations(organizations)
-            
-            logger.info(f"組織作成: {name}")
-            return {
-                'success': True,
-                'organization_id': org_id,
-                'organization': organization
-            }
             
         except Exception as e:
             logger.error(f"組織作成エラー: {e}")
@@ -557,40 +791,41 @@ class APIManager:
     def add_user_to_organization(self, user_id: str, org_id: str, role: str = 'member') -> Dict[str, Any]:
         """ユーザーの組織追加"""
         try:
-            organizations = self._load_organizations()
-            
-            if org_id not in organizations:
-                return {'success': False, 'error': 'Organization not found'}
-            
-            organization = organizations[org_id]
-            
-            if user_id not in organization['users']:
-                organization['users'].append(user_id)
-                organization['statistics']['total_users'] += 1
-                
-                if role == 'admin':
-                    organization['administrators'].append(user_id)
-                
-                organizations[org_id] = organization
-                self._save_organizations(organizations)
-                
-                # ユーザーデータに組織情報追加
-                user_data = self._load_user_data(user_id)
-                if 'organizations' not in user_data:
-                    user_data['organizations'] = []
+            with file_lock(self.organization_data_file):
+                organizations = self._load_organizations()
                 
-                user_data['organizations'].append({
-                    'organization_id': org_id,
-                    'role': role,
-                    'joined_at': datetime.now().isoformat()
-                })
+                if org_id not in organizations:
+                    return {'success': False, 'error': 'Organization not found'}
                 
-                self._save_user_data(user_id, user_data)
+                organization = organizations[org_id]
                 
-                logger.info(f"ユーザー組織追加: {user_id} → {org_id}")
-                return {'success': True, 'message': 'User added to organization'}
-            else:
-                return {'success': False, 'error': 'User already in organization'}
+                if user_id not in organization['users']:
+                    organization['users'].append(user_id)
+                    organization['statistics']['total_users'] += 1
+                    
+                    if role == 'admin':
+                        organization['administrators'].append(user_id)
+                    
+                    organizations[org_id] = organization
+                    self._save_organizations(organizations)
+                    
+                    # ユーザーデータに組織情報追加
+                    user_data = self._load_user_data(user_id)
+                    if 'organizations' not in user_data:
+                        user_data['organizations'] = []
+                    
+                    user_data['organizations'].append({
+                        'organization_id': org_id,
+                        'role': role,
+                        'joined_at': datetime.now().isoformat()
+                    })
+                    
+                    self._save_user_data(user_id, user_data)
+                    
+                    logger.info(f"ユーザー組織追加: {user_id} → {org_id}")
+                    return {'success': True, 'message': 'User added to organization'}
+                else:
+                    return {'success': False, 'error': 'User already in organization'}
             
         except Exception as e:
             logger.error(f"ユーザー組織追加エラー: {e}")
@@ -601,33 +836,34 @@ class APIManager:
     def setup_lms_integration(self, lms_type: str, config: Dict[str, Any]) -> Dict[str, Any]:
         """LMS(学習管理システム)連携設定"""
         try:
-            integration_settings = self._load_integration_settings()
-            
-            integration_id = str(uuid.uuid4())
-            
-            integration = {
-                'id': integration_id,
-                'type': 'lms',
-                'lms_type': lms_type,  # 'moodle', 'canvas', 'blackboard', etc.
-                'config': config,
-                'created_at': datetime.now().isoformat(),
-                'is_active': True,
-                'sync_settings': {
-                    'sync_frequency': 'daily',
-                    'sync_data_types': ['progress', 'scores', 'completion'],
-                    'last_sync': None
+            with file_lock(self.integration_settings_file):
+                integration_settings = self._load_integration_settings()
+                
+                integration_id = str(uuid.uuid4())
+                
+                integration = {
+                    'id': integration_id,
+                    'type': 'lms',
+                    'lms_type': lms_type,  # 'moodle', 'canvas', 'blackboard', etc.
+                    'config': config,
+                    'created_at': datetime.now().isoformat(),
+                    'is_active': True,
+                    'sync_settings': {
+                        'sync_frequency': 'daily',
+                        'sync_data_types': ['progress', 'scores', 'completion'],
+                        'last_sync': None
+                    }
+                }
+                
+                integration_settings[integration_id] = integration
+                self._save_integration_settings(integration_settings)
+                
+                logger.info(f"LMS連携設定: {lms_type}")
+                return {
+                    'success': True,
+                    'integration_id': integration_id,
+                    'integration': integration
                 }
-            }
-            
-            integration_settings[integration_id] = integration
-            self._save_integration_settings(integration_settings)
-            
-            logger.info(f"LMS連携設定: {lms_type}")
-            return {
-                'success': True,
-                'integration_id': integration_id,
-                'integration': integration
-            }
             
         except Exception as e:
             logger.error(f"LMS連携設定エラー: {e}")
@@ -636,27 +872,28 @@ class APIManager:
     def sync_with_external_system(self, integration_id: str) -> Dict[str, Any]:
         """外部システムとの同期"""
         try:
-            integration_settings = self._load_integration_settings()
-            
-            if integration_id not in integration_settings:
-                return {'success': False, 'error': 'Integration not found'}
-            
-            integration = integration_settings[integration_id]
-            
-            # 同期処理（実装は統合対象システムに依存）
-            sync_result = self._perform_external_sync(integration)
-            
-            # 同期結果を記録
-            integration['sync_settings']['last_sync'] = datetime.now().isoformat()
-            integration_settings[integration_id] = integration
-            self._save_integration_settings(integration_settings)
-            
-            logger.info(f"外部システム同期完了: {integration_id}")
-            return {
-                'success': True,
-                'sync_result': sync_result,
-                'last_sync': integration['sync_settings']['last_sync']
-            }
+            with file_lock(self.integration_settings_file):
+                integration_settings = self._load_integration_settings()
+                
+                if integration_id not in integration_settings:
+                    return {'success': False, 'error': 'Integration not found'}
+                
+                integration = integration_settings[integration_id]
+                
+                # 同期処理（実装は統合対象システムに依存）
+                sync_result = self._perform_external_sync(integration)
+                
+                # 同期結果を記録
+                integration['sync_settings']['last_sync'] = datetime.now().isoformat()
+                integration_settings[integration_id] = integration
+                self._save_integration_settings(integration_settings)
+                
+                logger.info(f"外部システム同期完了: {integration_id}")
+                return {
+                    'success': True,
+                    'sync_result': sync_result,
+                    'last_sync': integration['sync_settings']['last_sync']
+                }
             
         except Exception as e:
             logger.error(f"外部システム同期エラー: {e}")
@@ -671,6 +908,8 @@ class APIManager:
     def _save_api_keys(self, api_keys: Dict[str, Any]):
         """APIキーデータ保存"""
         self._save_json_file(self.api_keys_file, api_keys)
+        if self.api_key_index is not None:
+            self.api_key_index.invalidate()
     
     def _load_certifications(self) -> Dict[str, Any]:
         """認定データ読み込み"""
@@ -715,36 +954,30 @@ class APIManager:
             return default
     
     def _save_json_file(self, filepath: str, data: Any):
-        """JSONファイル保存"""
+        """JSONファイル保存（アトミック置換）"""
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            write_json(filepath, data)
         except Exception as e:
             logger.error(f"JSONファイル保存エラー {filepath}: {e}")
     
     def _load_user_data(self, user_id: str) -> Dict[str, Any]:
         """ユーザーデータ読み込み"""
-        filepath = os.path.join(self.user_data_dir, f"{user_id}.json")
-        return self._load_json_file(filepath, {})
+        return self.user_repository.get_user(user_id)
     
     def _save_user_data(self, user_id: str, user_data: Dict[str, Any]):
         """ユーザーデータ保存"""
-        filepath = os.path.join(self.user_data_dir, f"{user_id}.json")
-        self._save_json_file(filepath, user_data)
+        try:
+            self.user_repository.save_user(user_id, user_data)
+        except Exception as e:
+            logger.error(f"ユーザーデータ保存エラー {user_id}: {e}")
     
     def _load_all_user_data(self) -> Dict[str, Dict[str, Any]]:
         """全ユーザーデータ読み込み"""
-        all_users = {}
-        
-        if not os.path.exists(self.user_data_dir):
-            return all_users
-        
-        for filename in os.listdir(self.user_data_dir):
-            if filename.endswith('.json'):
-                user_id = filename[:-5]
-                all_users[user_id] = self._load_user_data(user_id)
-        
-        return all_users
+        return dict(self._iter_user_data())
+    
+    def _iter_user_data(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """全ユーザーデータを1件ずつ読み込み（全件をメモリに保持しない）"""
+        yield from self.user_repository.iter_users()
     
     def _calculate_certification_progress(self, user_data: Dict, requirements: Dict) -> Dict[str, Any]:
         """認定進捗計算"""
@@ -937,15 +1170,15 @@ class APIManager:
         """学習一貫性計算"""
         return 0.75  # 簡略化
     
-    def _analyze_global_learning_patterns(self, all_users: Dict) -> Dict[str, Any]:
+    def _analyze_global_learning_patterns(self, aggregate: Dict) -> Dict[str, Any]:
         """グローバル学習パターン分析"""
         return {"pattern": "evening_preference", "peak_hours": [19, 20, 21]}
     
-    def _calculate_global_performance_metrics(self, all_histories: List[Dict]) -> Dict[str, Any]:
+    def _calculate_global_performance_metrics(self, aggregate: Dict) -> Dict[str, Any]:
         """グローバルパフォーマンス指標"""
         return {"global_accuracy": 0.72, "average_session_length": 25}
     
-    def _analyze_content_effectiveness(self, all_histories: List[Dict]) -> Dict[str, Any]:
+    def _analyze_content_effectiveness(self, aggregate: Dict) -> Dict[str, Any]:
         """コンテンツ効果分析"""
         return {"most_difficult": [101, 205, 378], "most_effective": [45, 67, 89]}
     
@@ -988,11 +1221,10 @@ def require_api_key(permission: str = None):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            # 実際の実装では、FlaskのrequestからAPIキーを取得
-            # ここでは簡略化
-            api_key = "dummy_api_key"  # request.headers.get('X-API-Key')
+            from flask import request
+            api_key = request.headers.get('X-API-Key', '')
             
-            api_manager = APIManager()
+            # 共有インスタンスの索引で検証（リクエスト毎にファイルを読まない）
             validation_result = api_manager.validate_api_key(api_key, permission)
             
             if not validation_result['valid']:
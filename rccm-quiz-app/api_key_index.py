@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API Key Index - APIキー検証用のメモリ上の索引
+
+- api_keys.json を読み込み、キー本体ではなく HMAC-SHA256（プロセス毎の秘密鍵）のダイジェストで索引化
+  （メモリ上に平文のキーを保持しない・照合は辞書引き1回）
+- 権限は権限名 → ビットの表でビット集合に変換し、検証はビット演算1回
+- ファイルの inode・更新時刻・サイズが変わったら再読み込み（他ワーカーでの発行・無効化も反映）
+- 使用回数・最終使用日時はメモリ上で集計し、BatchedJSONWriter でまとめてファイルへ反映
+"""
+
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import threading
+import time
+from datetime import datetime
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import APIKeyIndexConfig
+from json_store import get_batched_writer, read_json
+
+logger = logging.getLogger(__name__)
+
+# 権限名 → ビット（初出順に割り当て。プロセス内でのみ有効）
+_permission_bits: Dict[str, int] = {}
+_permission_bits_lock = threading.Lock()
+
+
+def permission_bit(name: str) -> int:
+    bit = _permission_bits.get(name)
+    if bit is None:
+        with _permission_bits_lock:
+            bit = _permission_bits.get(name)
+            if bit is None:
+                bit = _permission_bits[name] = 1 << len(_permission_bits)
+    return bit
+
+
+def permission_mask(names: Iterable[str]) -> int:
+    mask = 0
+    for name in names or ():
+        mask |= permission_bit(name)
+    return mask
+
+
+class APIKeyEntry:
+    """検証に必要な項目のみ（キー本体・シークレットは保持しない）"""
+
+    __slots__ = ('digest', 'organization', 'permissions', 'permission_mask', 'is_active', 'expires_at',
+                 'rate_limit', 'current_usage')
+
+    def __init__(self, digest: bytes, key_info: Dict[str, Any]):
+        usage_stats = key_info.get('usage_stats') or {}
+        self.digest = digest
+        self.organization = key_info.get('organization')
+        self.permissions: List[str] = list(key_info.get('permissions') or [])
+        self.permission_mask = permission_mask(self.permissions)
+        self.is_active = bool(key_info.get('is_active'))
+        # 有効期限（ローカル時刻の UNIX 時刻）。形式不正・タイムゾーン付きは None（検証時にエラーとして返す）
+        try:
+            expires_at = datetime.fromisoformat(key_info['expires_at'])
+            self.expires_at: Optional[float] = None if expires_at.tzinfo else expires_at.timestamp()
+        except (ValueError, TypeError, KeyError, OverflowError, OSError):
+            self.expires_at = None
+        self.rate_limit = usage_stats.get('rate_limit', 0)
+        self.current_usage = usage_stats.get('current_usage', 0)
+
+    def has_permission(self, name: Optional[str]) -> bool:
+        if not name:
+            return True
+        bit = _permission_bits.get(name)
+        return bit is not None and self.permission_mask & bit == bit
+
+
+class APIKeyIndex:
+    """api_keys.json のダイジェスト索引と使用統計のバッチ反映"""
+
+    def __init__(self, api_keys_file: str, reload_check_interval: float = None, secret: bytes = None):
+        self.api_keys_file = api_keys_file
+        self.reload_check_interval = (APIKeyIndexConfig.RELOAD_CHECK_INTERVAL
+                                      if reload_check_interval is None else reload_check_interval)
+        configured = APIKeyIndexConfig.SECRET
+        self._secret = secret or (configured.encode('utf-8') if configured else secrets.token_bytes(32))
+        self._lock = threading.Lock()
+        self._entries: Dict[bytes, APIKeyEntry] = {}
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._checked_at = 0.0
+        # 使用統計（ダイジェスト → [回数, 最終使用日時]）
+        self._usage: Dict[bytes, List[Any]] = {}
+        self._usage_scheduled = False
+        self._stats = {'lookups': 0, 'misses': 0, 'reloads': 0, 'usage_flushes': 0, 'usage_flush_errors': 0}
+
+    def digest(self, api_key: str) -> bytes:
+        return hmac.new(self._secret, api_key.encode('utf-8'), hashlib.sha256).digest()
+
+    # --- 参照 ---
+
+    def lookup(self, api_key: str) -> Optional[APIKeyEntry]:
+        digest = self.digest(api_key)
+        self._sync()
+        entry = self._entries.get(digest)
+        self._stats['lookups'] += 1
+        if entry is None:
+            self._stats['misses'] += 1
+        return entry
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, keys=len(self._entries), permissions=len(_permission_bits),
+                        pending_usage=sum(count for count, _ in self._usage.values()))
+
+    def invalidate(self) -> None:
+        """このプロセスでの発行・無効化の直後に呼び、次回参照で再読み込み"""
+        with self._lock:
+            self._signature = None
+
+    def _file_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.api_keys_file)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _sync(self) -> None:
+        now = time.monotonic()
+        if self._signature is not None and now - self._checked_at < self.reload_check_interval:
+            return
+        with self._lock:
+            signature = self._file_signature() or (0, 0, 0)  # ファイルなし = キーなし
+            self._checked_at = now
+            if signature == self._signature:
+                return
+            api_keys = read_json(self.api_keys_file, {}) if signature != (0, 0, 0) else {}
+            entries = {}
+            for api_key, key_info in api_keys.items():
+                if isinstance(key_info, dict):
+                    digest = self.digest(api_key)
+                    entries[digest] = APIKeyEntry(digest, key_info)
+            self._entries = entries
+            self._signature = signature
+            self._stats['reloads'] += 1
+
+    # --- 使用統計 ---
+
+    def record_use(self, entry: APIKeyEntry) -> None:
+        """使用回数を加算（ファイルへは一定間隔でまとめて反映）"""
+        digest = entry.digest
+        used_at = time.time()
+        with self._lock:
+            usage = self._usage.get(digest)
+            if usage is None:
+                self._usage[digest] = [1, used_at]
+            else:
+                usage[0] += 1
+                usage[1] = used_at
+            if self._usage_scheduled:
+                return
+            self._usage_scheduled = True
+        batch: Dict[str, Any] = {}  # 反映対象として取り出した使用統計（失敗時に戻す）
+        get_batched_writer().submit(self.api_keys_file, partial(self._apply_usage, batch),
+                                    on_error=partial(self._usage_failed, batch))
+
+    def _apply_usage(self, batch: Dict[str, Any], api_keys: Dict[str, Any]) -> None:
+        """BatchedJSONWriter から（ファイルロック内で）呼ばれ、溜まった使用統計を反映"""
+        with self._lock:
+            usage, self._usage = self._usage, {}
+            self._usage_scheduled = False
+        batch['usage'] = usage
+        if not usage:
+            return
+        for api_key, key_info in api_keys.items():
+            counted = usage.get(self.digest(api_key))
+            usage_stats = key_info.get('usage_stats') if counted and isinstance(key_info, dict) else None
+            if usage_stats is None:
+                continue
+            usage_stats['total_requests'] = usage_stats.get('total_requests', 0) + counted[0]
+            used_at = datetime.fromtimestamp(counted[1]).isoformat()
+            usage_stats['last_used'] = max(usage_stats.get('last_used') or '', used_at)
+        self._stats['usage_flushes'] += 1
+
+    def _usage_failed(self, batch: Dict[str, Any], error: Exception) -> None:
+        """
+        バッチの反映失敗時: 取り出し済みの使用統計を戻し、次回の record_use で再登録できるようにする
+        （戻さないと _usage_scheduled が True のまま残り、以後の使用統計が保存されない）
+        """
+        with self._lock:
+            for digest, (count, used_at) in batch.pop('usage', {}).items():
+                usage = self._usage.get(digest)
+                if usage is None:
+                    self._usage[digest] = [count, used_at]
+                else:
+                    usage[0] += count
+                    usage[1] = max(usage[1], used_at)
+            self._usage_scheduled = False
+            self._stats['usage_flush_errors'] += 1
@@ -6,6 +6,7 @@ import os
 import random
 import re
 import gc
+import itertools
 import logging
 import csv
 import urllib.parse
@@ -18,6 +19,10 @@ from decimal import Decimal, ROUND_HALF_UP
 # Flask core imports
 from flask import Flask, render_template, request, redirect, url_for, session, jsonify, send_from_directory, make_response, flash, g
 
+# `python app.py` 実行時も Blueprint の `from app import ...` が同一モジュールを参照するよう登録
+import sys
+sys.modules.setdefault('app', sys.modules[__name__])
+
 # Project-specific imports
 from utils import load_questions_improved, DataLoadError, get_sample_data_improved, load_rccm_data_files
 from config import Config, ExamConfig, SRSConfig, DataConfig, RCCMConfig
@@ -85,7 +90,6 @@ def get_category_count_high_quality(all_questions, category):
     return len([q for q in all_questions if q.get('category') == category])
 
 
-
 # ULTRA SYNC: Stage 2 HIGH QUALITY REPLACEMENT SYSTEM
 # Direct Japanese category usage - NO English ID conversion
 # Added: 2025-08-20 Stage 2 Safe Implementation
@@ -336,13 +340,12 @@ except ImportError:
     if os.environ.get('FLASK_ENV') != 'production':
         print("Emergency data loading functions not available - using fallbacks")
 
-# Exam simulator import (fix for 10-question completion testing)
-try:
-    import exam_simulator
-    EXAM_SIMULATOR_AVAILABLE = True
-except ImportError:
-    exam_simulator = None
-    EXAM_SIMULATOR_AVAILABLE = False
+# 🧠 リクエスト単位メモ化: 1リクエスト内の複数分岐から呼ばれるCSV全件読み込みを1回に集約
+from request_memo import request_memo, init_app as init_request_memo
+emergency_load_all_questions = request_memo(emergency_load_all_questions)
+
+# Exam simulator: lazy_features で /exam_simulator 等への初回リクエスト時に読み込み
+# （EXAM_SIMULATOR_AVAILABLE は遅延読み込み表の登録後に設定）
 
 # BOLT Redis Cache Integration (optional)
 try:
@@ -361,77 +364,85 @@ except ImportError:
     CSRFProtect = None
 
 # FIRE ULTRA SYNC TIMEZONE FIX: UTC統一時刻処理
-import pytz
-
-# FIRE ULTRA SYNC MEMORY MONITORING: システム監視
-import psutil
-# FIRE ULTRA SYNC FIX: 未使用import削除
+# pytz / psutil は使用箇所で遅延インポート（起動時間短縮）
 
 # Memory optimizer の遅延初期化（loggerの後に実行）
 _memory_optimizer = None
 # FIRE ULTRA SYNC FIX: memory_optimization_decorator はimport時に設定される
 
 # FIRE ULTRA SYNC UNICODE FIX: CP932エンコーディング問題対策（拡張版）
+# よくある問題文字の置換マップ（絵文字含む）
+_CP932_REPLACEMENTS = {
+    # Unicode特殊文字
+    '\u00b2': '²',  # 上付き2
+    '\u00b3': '³',  # 上付き3
+    '\u00bd': '1/2',  # 1/2分数
+    '\u00bc': '1/4',  # 1/4分数
+    '\u00be': '3/4',  # 3/4分数
+    '\u2013': '-',   # エンダッシュ
+    '\u2014': '-',   # エムダッシュ
+    '\u2018': "'",   # 左シングルクォート
+    '\u2019': "'",   # 右シングルクォート
+    '\u201c': '"',   # 左ダブルクォート
+    '\u201d': '"',   # 右ダブルクォート
+    '\u2026': '...',  # 三点リーダー
+    # 絵文字マップを統合
+    '✅': '[OK]',
+    '❌': '[NG]', 
+    '🔍': '[検索]',
+    '🔧': '[工具]',
+    '⚡': '[電気]',
+    '📊': '[グラフ]',
+    '📋': '[クリップボード]',
+    '🎯': '[目標]',
+    '🏆': '[トロフィー]',
+    '🚀': '[ロケット]',
+    '🛡️': '[盾]',
+    '🎉': '[祝]',
+    '⚠️': '[警告]',
+    '🔥': '[火]',
+    '💡': '[電球]',
+    '📝': '[メモ]',
+    '🚨': '[緊急]',
+    '🌟': '[星]',
+}
+# 1文字のキーは str.translate で一括置換、複数文字（異体字セレクタ付き絵文字）のみ replace
+_CP932_TRANSLATION = str.maketrans({k: v for k, v in _CP932_REPLACEMENTS.items() if len(k) == 1})
+_CP932_MULTI_CHAR = [(k, v) for k, v in _CP932_REPLACEMENTS.items() if len(k) > 1]
+
+
+def _cp932_char(char):
+    try:
+        char.encode('cp932')
+        return char
+    except UnicodeEncodeError:
+        return '?'  # 問題文字を?に置換
+
+
 def clean_unicode_for_cp932(text):
     """CP932でエンコードできない文字を安全な文字に置換"""
-    if not text:
+    if not text or text.isascii():
         return text
     
-    # よくある問題文字の置換マップ（絵文字含む）
-    replacements = {
-        # Unicode特殊文字
-        '\u00b2': '²',  # 上付き2
-        '\u00b3': '³',  # 上付き3
-        '\u00bd': '1/2',  # 1/2分数
-        '\u00bc': '1/4',  # 1/4分数
-        '\u00be': '3/4',  # 3/4分数
-        '\u2013': '-',   # エンダッシュ
-        '\u2014': '-',   # エムダッシュ
-        '\u2018': "'",   # 左シングルクォート
-        '\u2019': "'",   # 右シングルクォート
-        '\u201c': '"',   # 左ダブルクォート
-        '\u201d': '"',   # 右ダブルクォート
-        '\u2026': '...',  # 三点リーダー
-        # 絵文字マップを統合
-        '✅': '[OK]',
-        '❌': '[NG]', 
-        '🔍': '[検索]',
-        '🔧': '[工具]',
-        '⚡': '[電気]',
-        '📊': '[グラフ]',
-        '📋': '[クリップボード]',
-        '🎯': '[目標]',
-        '🏆': '[トロフィー]',
-        '🚀': '[ロケット]',
-        '🛡️': '[盾]',
-        '🎉': '[祝]',
-        '⚠️': '[警告]',
-        '🔥': '[火]',
-        '💡': '[電球]',
-        '📝': '[メモ]',
-        '🚨': '[緊急]',
-        '🌟': '[星]',
-    }
-    
     cleaned_text = text
-    for problematic_char, replacement in replacements.items():
-        cleaned_text = cleaned_text.replace(problematic_char, replacement)
+    for problematic_char, replacement in _CP932_MULTI_CHAR:
+        if problematic_char in cleaned_text:
+            cleaned_text = cleaned_text.replace(problematic_char, replacement)
+    cleaned_text = cleaned_text.translate(_CP932_TRANSLATION)
     
-    # それでもエンコードできない文字があれば削除
-    result = ""
-    for char in cleaned_text:
-        try:
-            char.encode('cp932')
-            result += char
-        except UnicodeEncodeError:
-            result += '?'  # 問題文字を?に置換
-    
-    return result
+    # それでもエンコードできない文字があれば削除（大半の文字列は一括エンコードで判定）
+    try:
+        cleaned_text.encode('cp932')
+        return cleaned_text
+    except UnicodeEncodeError:
+        return ''.join(_cp932_char(char) for char in cleaned_text)
 
 def safe_log_session_content(session_dict, message="セッション内容"):
-    """セッション内容の安全なログ出力（Unicode問題回避）"""
+    """セッション内容の安全なログ出力（Unicode問題回避・DEBUG無効時は整形しない）"""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     try:
-        logger.debug(f"{message} = {session_dict}")
+        logger.debug("%s = %s", message, session_dict)
     except UnicodeEncodeError:
         # Unicode文字を含む場合は簡略化して出力
         safe_dict = {}
@@ -447,7 +458,7 @@ def safe_log_session_content(session_dict, message="セッション内容"):
                     safe_dict[key] = str(value)
             except:
                 safe_dict[key] = f"<{type(value).__name__}>"
-        logger.debug(f"{message} = {safe_dict}")
+        logger.debug("%s = %s", message, safe_dict)
 
 def safe_print(*args, **kwargs):
     """CP932安全なprint関数（Unicode問題回避）"""
@@ -505,6 +516,7 @@ def format_utc_to_iso(dt=None):
 def get_user_local_time(utc_dt, user_timezone='Asia/Tokyo'):
     """UTC時刻をユーザーのローカル時刻に変換"""
     try:
+        import pytz
         user_tz = pytz.timezone(user_timezone)
         return utc_dt.astimezone(user_tz)
     except Exception as e:
@@ -527,14 +539,8 @@ def safe_file_operation(file_path, operation='read', encoding='utf-8', mode='r',
         ファイルハンドル（context managerとして使用）
     """
     import os
-    import threading
     from contextlib import contextmanager
     
-    # スレッドセーフなファイル操作カウンター
-    if not hasattr(safe_file_operation, '_active_handles'):
-        safe_file_operation._active_handles = 0
-        safe_file_operation._lock = threading.Lock()
-    
     @contextmanager
     def _safe_file_handle():
         file_handle = None
@@ -580,6 +586,10 @@ def safe_file_operation(file_path, operation='read', encoding='utf-8', mode='r',
     
     return _safe_file_handle()
 
+# スレッドセーフなファイル操作カウンター（gthreadワーカーでの初回同時呼び出し競合を避けるためモジュール読み込み時に生成）
+safe_file_operation._active_handles = 0
+safe_file_operation._lock = threading.Lock()
+
 def get_active_file_handles():
     """現在のアクティブファイルハンドル数を取得"""
     if hasattr(safe_file_operation, '_active_handles'):
@@ -697,7 +707,17 @@ advanced_personalization = None
 # FIRE ULTRA SYNC LOG FIX: ログファイル肥大化防止（ローテーション機能追加）
 # 軽量版と同様のシンプルなログ設定
 import logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+from config import LogConfig
+from structured_logging import configure_logging, log_event, parse_sampling, get_logging_stats
+configure_logging(
+    profile=LogConfig.PROFILE,
+    level=LogConfig.LOG_LEVEL,
+    fmt=LogConfig.OUTPUT_FORMAT,
+    queue_enabled=LogConfig.QUEUE_ENABLED,
+    queue_max_size=LogConfig.QUEUE_MAX_SIZE,
+    sampling=parse_sampling(LogConfig.SAMPLING),
+    log_file=LogConfig.LOG_FILE if LogConfig.LOG_TO_FILE else None,
+)
 
 # FIRE ULTRA SYNC MEMORY FIX: メモリ効率的なセッションロック管理
 if _memory_optimizer:
@@ -868,6 +888,41 @@ def safe_render_template(template_name, **context):
 # SHIELD セキュリティ強化設定適用
 app.config.from_object(Config)
 
+# 📦 Jinjaバイトコードキャッシュ（全ワーカー共有）と {% cache %} フラグメントキャッシュ
+try:
+    import template_cache
+    from config import TemplateCacheConfig
+    template_cache.init_app(app,
+                            bytecode_cache_dir=TemplateCacheConfig.BYTECODE_CACHE_DIR,
+                            bytecode_cache_enabled=TemplateCacheConfig.BYTECODE_CACHE_ENABLED,
+                            fragment_max_entries=TemplateCacheConfig.FRAGMENT_CACHE_MAX_ENTRIES,
+                            fragment_timeout=TemplateCacheConfig.FRAGMENT_CACHE_TIMEOUT)
+except ImportError:
+    template_cache = None
+
+# 🗜️ 動的レスポンス圧縮（閾値以上の HTML/JSON を gzip/br で配信）
+try:
+    from compression import ResponseCompressor
+    from config import CompressionConfig
+    response_compressor = ResponseCompressor(app, min_size=CompressionConfig.MIN_SIZE,
+                                             level=CompressionConfig.LEVEL,
+                                             enabled=CompressionConfig.ENABLED)
+except ImportError:
+    response_compressor = None
+
+# 📦 静的アセットのフィンガープリント登録（テンプレートから asset_url() で参照）
+try:
+    import static_assets
+    static_assets.init_app(app)
+    STATIC_ASSETS_AVAILABLE = True
+except ImportError:
+    STATIC_ASSETS_AVAILABLE = False
+
+    @app.template_global()
+    def asset_url(filename):
+        """フィンガープリント無効時は通常の /static/ URL"""
+        return url_for('static', filename=filename)
+
 # BOLT ULTRA SYNC CRITICAL FIX: Redis Cache初期化強化
 if REDIS_CACHE_INTEGRATION:
     try:
@@ -916,7 +971,7 @@ if CSRF_AVAILABLE:  # FIXED: CSRF enabled when Flask-WTF is available
         try:
             from flask_wtf.csrf import generate_csrf
             token = generate_csrf()
-            logger.debug(f"CSRF Token generated: {token[:10]}...")
+            logger.debug("CSRF Token generated: %s...", token[:10])
             return token
 
         except Exception as e:
@@ -1224,6 +1279,13 @@ def get_questions_by_japanese_category(category, question_type='specialist'):
         list: フィルタリングされた問題リスト
     """
     try:
+        # 🔥 ウォームアップ済みの部門別問題プールを優先
+        pools = get_warm_cache('department_question_pools')
+        if pools is not None:
+            if question_type == 'basic':
+                return list(pools['basic'])
+            return list(pools['specialist'].get(category, []))
+
         if question_type == 'basic':
             # 4-1基礎科目の場合
             from utils import load_questions_improved
@@ -1249,6 +1311,7 @@ def get_questions_by_japanese_category(category, question_type='specialist'):
 # End of CLAUDE.md Compliance Functions (Phase 1)
 # ============================================================================
 
+@request_memo
 def normalize_department_name(department_name):
     """CLAUDE.md準拠: 部門名正規化（日本語カテゴリ直接使用）"""
     if not department_name:
@@ -1266,6 +1329,7 @@ def normalize_department_name(department_name):
     # 不明な部門名
     return None
 
+@request_memo
 def get_department_category(department_name):
     """CLAUDE.md準拠: 安全な部門→カテゴリ変換（日本語カテゴリ直接使用）"""
     # CLAUDE.md準拠：直接日本語カテゴリ変換
@@ -1322,7 +1386,7 @@ def extract_department_questions_from_csv(department_name, num_questions=10):
                                 }
                                 file_questions.append(question_data)
                     
-                    logger.debug(f"SUCCESS {csv_file} 読み込み成功 (utf-8) - {len(file_questions)}問抽出")
+                    logger.debug("SUCCESS %s 読み込み成功 (utf-8) - %s問抽出", csv_file, len(file_questions))
                     file_loaded = True
                     break
                     
@@ -1361,7 +1425,7 @@ def extract_department_questions_from_csv(department_name, num_questions=10):
             
             if file_questions:
                 all_questions.extend(file_questions)
-                logger.debug(f"{csv_file}: {len(file_questions)}問抽出")
+                logger.debug("%s: %s問抽出", csv_file, len(file_questions))
         
         logger.info(f"部門別問題抽出完了: 総問題数={len(all_questions)}問")
         
@@ -1378,18 +1442,83 @@ def extract_department_questions_from_csv(department_name, num_questions=10):
         logger.error(f"部門別問題抽出エラー: {e}")
         return []
 
-# 問題データのキャッシュ
+# 問題データのキャッシュ（gthreadワーカーでは複数スレッドから参照されるため
+# 問題リストとタイムスタンプはロック下で同時に公開・取得する）
 _questions_cache = None
 _cache_timestamp = None
+_questions_cache_lock = threading.RLock()
+
+
+def _publish_questions_cache(questions):
+    """問題データキャッシュの更新（リストとタイムスタンプを一括で差し替え）"""
+    global _questions_cache, _cache_timestamp
+    with _questions_cache_lock:
+        _questions_cache = questions
+        _cache_timestamp = datetime.now()
+
 
-# ウルトラ高速起動用: モジュール遅延読み込みフラグ
+def _get_questions_cache_snapshot():
+    """(問題リスト, タイムスタンプ) を整合した組で取得"""
+    with _questions_cache_lock:
+        return _questions_cache, _cache_timestamp
+
+# ウルトラ高速起動用: モジュール遅延読み込みフラグ（全機能一括読み込み済みか）
 _modules_lazy_loaded = False
-_modules_lock = threading.Lock()
 
 # FIRE ULTRA SYNC FIX: アプリ起動時のデータ事前読み込みフラグ
 _startup_data_loaded = False
 _startup_data_lock = threading.Lock()
 
+# 💾 永続ディスクキャッシュ（cache_data/）: 解析済みコーパスの再起動間共有
+try:
+    from disk_cache import get_disk_cache, files_fingerprint
+    DISK_CACHE_AVAILABLE = True
+except ImportError:
+    DISK_CACHE_AVAILABLE = False
+    get_disk_cache = None
+    files_fingerprint = None
+
+
+# (版数, 有効期限) — リクエスト毎の glob・stat を避けるため短時間保持（clear_questions_cache で破棄）
+_corpus_version_cache = (None, 0.0)
+
+
+def get_corpus_version():
+    """問題コーパス（data/*.csv）の版数（ファイル名・サイズ・更新時刻から算出）"""
+    global _corpus_version_cache
+    version, expires_at = _corpus_version_cache
+    now = time.monotonic()
+    if version is not None and now < expires_at:
+        return version
+
+    import glob
+    csv_files = glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', '*.csv'))
+    version = files_fingerprint(csv_files) if files_fingerprint else str(len(csv_files))
+    _corpus_version_cache = (version, now + DataConfig.CORPUS_VERSION_TTL)
+    return version
+
+# 📦 ユーザー非依存ページのレスポンスキャッシュ（Jinjaレンダリングを省略・ETag/304対応）
+try:
+    from response_cache import ResponseCache, skip_response_cache
+    from config import ResponseCacheConfig
+    response_cache = ResponseCache(version_func=get_corpus_version,
+                                   max_entries=ResponseCacheConfig.MAX_ENTRIES,
+                                   ttl=ResponseCacheConfig.TTL,
+                                   policies=ResponseCacheConfig.POLICIES,
+                                   enabled=ResponseCacheConfig.ENABLED)
+except ImportError:
+    response_cache = None
+
+    def skip_response_cache():
+        """レスポンスキャッシュ無効時は何もしない"""
+
+
+def cached_response(policy='page', vary_session=(), personal_session=()):
+    """レスポンスキャッシュデコレータ（response_cache 無効時は何もしない）"""
+    if response_cache is None:
+        return lambda view: view
+    return response_cache.cached(policy, vary_session=vary_session, personal_session=personal_session)
+
 # FIRE ULTRA SYNC FIX: セッションデータ肥大化防止
 def cleanup_session_data(session):
     """セッションデータの自動クリーンアップ（肥大化防止）"""
@@ -1408,7 +1537,7 @@ def cleanup_session_data(session):
             history = session.get('history', [])
             if isinstance(history, list) and len(history) > 100:
                 session['history'] = history[-100:]  # 最新100件のみ
-                logger.debug(f"履歴データクリーンアップ: {len(history)} → 100件")
+                logger.debug("履歴データクリーンアップ: %s → 100件", len(history))
         
         # 一時的なキーのクリーンアップ
         temp_keys = [
@@ -1440,7 +1569,7 @@ def cleanup_session_data(session):
         
         if cleanup_keys:
             session.modified = True
-            logger.debug(f"セッションクリーンアップ完了: {len(cleanup_keys)}キー削除")
+            logger.debug("セッションクリーンアップ完了: %sキー削除", len(cleanup_keys))
         
         return len(cleanup_keys)
         
@@ -1450,7 +1579,7 @@ def cleanup_session_data(session):
 
 def preload_startup_data():
     """アプリ起動時のデータ事前読み込み（URL起動遅延問題の解決）"""
-    global _startup_data_loaded, _questions_cache, _cache_timestamp
+    global _startup_data_loaded
     
     if _startup_data_loaded:
         return
@@ -1462,15 +1591,25 @@ def preload_startup_data():
         try:
             logger.info("BOLT 事前データ読み込み開始（起動高速化）")
             
-            # RCCM統合データ読み込み（一度だけ実行）
-            data_dir = 'data'
-            questions = emergency_load_all_questions()  # EMERGENCY FIX
+            # 💾 ディスクキャッシュから解析済みコーパスを復元（コールドワーカー高速化）
+            disk_cache = get_disk_cache() if DISK_CACHE_AVAILABLE else None
+            corpus_cache_key = f"corpus:validated:{get_corpus_version()}"
+            validated_questions = disk_cache.get(corpus_cache_key) if disk_cache else None
+            if validated_questions:
+                logger.info(f"💾 ディスクキャッシュから問題データ復元: {len(validated_questions)}問")
+                questions = validated_questions
+            else:
+                # RCCM統合データ読み込み（一度だけ実行）
+                data_dir = 'data'
+                questions = emergency_load_all_questions()  # EMERGENCY FIX
             
             if questions:
                 # データ整合性チェック
-                validated_questions = validate_question_data_integrity(questions)
-                _questions_cache = validated_questions
-                _cache_timestamp = time.time()
+                if not validated_questions:
+                    validated_questions = validate_question_data_integrity(questions)
+                    if disk_cache:
+                        disk_cache.set(corpus_cache_key, validated_questions)
+                _publish_questions_cache(validated_questions)
                 
                 # 📊 ULTRA SYNC PERFORMANCE FIX: 高性能インデックス構築
                 if _performance_optimizer:
@@ -1496,8 +1635,7 @@ def preload_startup_data():
                         else:
                             q['question_type'] = 'specialist'
                 
-                _questions_cache = questions
-                _cache_timestamp = time.time()
+                _publish_questions_cache(questions)
                 
                 # 📊 ULTRA SYNC PERFORMANCE FIX: 高性能インデックス構築（フォールバック）
                 if _performance_optimizer:
@@ -1515,47 +1653,168 @@ def preload_startup_data():
             logger.error(f"ERROR 事前データ読み込みエラー: {e}")
             _startup_data_loaded = False
 
+# 🔥 キャッシュウォームアップ計画（フォーク後のワーカーでバックグラウンド実行）
+try:
+    from cache_warmer import CacheWarmer
+    from config import CacheWarmupConfig
+    cache_warmer = CacheWarmer(max_workers=CacheWarmupConfig.MAX_WORKERS,
+                               enabled=CacheWarmupConfig.ENABLED)
+    CACHE_WARMER_AVAILABLE = True
+except ImportError:
+    cache_warmer = None
+    CACHE_WARMER_AVAILABLE = False
+
+
+# 問題コーパス由来のウォームアップ結果 → 構築開始時のコーパス版数
+_warm_corpus_versions = {}
+
+
+def get_warm_cache(name):
+    """ウォームアップ済みデータの取得（未完了・無効時、構築後にコーパスが更新された場合は None）"""
+    if not cache_warmer:
+        return None
+    version = _warm_corpus_versions.get(name)
+    if version is not None and version != get_corpus_version():
+        cache_warmer.invalidate(name)
+        _warm_corpus_versions.pop(name, None)
+        logger.info(f"🔄 問題コーパス更新のためウォームアップ結果を破棄: {name}")
+        return None
+    return cache_warmer.get(name)
+
+
+def _record_warm_corpus_version(name):
+    """読み込み前に版数を記録（読み込み中の更新は次回参照時に破棄される）"""
+    _warm_corpus_versions[name] = get_corpus_version()
+
+
+def _warm_corpus():
+    """ウォームアップ用の問題コーパス（事前読み込み済みデータを優先）"""
+    cached_questions, _ = _get_questions_cache_snapshot()
+    if _startup_data_loaded and cached_questions:
+        return cached_questions
+    return emergency_load_all_questions()
+
+
+def _warm_department_question_pools():
+    """部門（日本語カテゴリ）別の問題プール（get_questions_by_japanese_category の非キャッシュ経路と同じ抽出）"""
+    _record_warm_corpus_version('department_question_pools')
+    from utils import load_questions_improved
+    try:
+        basic_questions = load_questions_improved('4-1.csv') or []
+    except Exception as e:
+        # 非キャッシュ経路と同じく基礎科目は空（専門科目のプールは構築する）
+        logger.warning(f"⚠️ 基礎科目プール構築失敗: {e}")
+        basic_questions = []
+    pools = {'basic': basic_questions, 'specialist': {}}
+    all_questions = emergency_load_all_questions() if EMERGENCY_DATA_FIX_AVAILABLE else []
+    for q in all_questions:
+        category = q.get('category')
+        if category:
+            pools['specialist'].setdefault(category, []).append(q)
+    return pools
+
+
+def _warm_department_category_counts():
+    """(部門, 問題種別) ごとのカテゴリ別問題数"""
+    _record_warm_corpus_version('department_category_counts')
+    counts = {}
+    for q in _warm_corpus():
+        category = q.get('category')
+        if not category:
+            continue
+        key = (q.get('department'), q.get('question_type'))
+        bucket = counts.setdefault(key, {})
+        bucket[category] = bucket.get(category, 0) + 1
+    return counts
+
+
+def _warm_mobile_essential_questions():
+    """モバイル用キャッシュデータ（必須問題ペイロード）"""
+    _record_warm_corpus_version('mobile_essential_questions')
+    return lazy_features.get('mobile_manager').generate_mobile_cache_data(_warm_corpus())
+
+
+def _warm_pwa_manifest():
+    """PWAマニフェスト（静的レスポンス）"""
+    return lazy_features.get('mobile_manager').get_pwa_manifest()
+
+
+if cache_warmer:
+    (cache_warmer
+     .add_step('question_corpus', preload_startup_data, stage=0, store_result=False,
+               description='問題コーパス読み込み・検証・インデックス構築')
+     .add_step('department_question_pools', _warm_department_question_pools, stage=1,
+               description='部門別問題プール')
+     .add_step('department_category_counts', _warm_department_category_counts, stage=1,
+               description='部門・種別ごとのカテゴリ別問題数')
+     .add_step('mobile_essential_questions', _warm_mobile_essential_questions, stage=1,
+               description='モバイル用必須問題ペイロード')
+     .add_step('pwa_manifest', _warm_pwa_manifest, stage=1,
+               description='PWAマニフェスト'))
+
+
+def start_cache_warmup():
+    """キャッシュウォームアップ開始（gunicorn post_worker_init / 開発サーバー起動時）"""
+    if cache_warmer:
+        return cache_warmer.start()
+    return False
+
+
+def flush_pending_writes():
+    """未保存の書き込み（セッション自動保存キュー・JSONバッチ書き込み）を反映（gunicorn worker_exit）"""
+    from json_store import get_batched_writer
+    flushed = session_data_manager.flush() if session_data_manager else 0
+    return flushed + get_batched_writer().flush()
+
+# 🔄 機能モジュールの遅延読み込み表: URLプレフィックスへの初回リクエスト時に該当モジュールのみ読み込む
+from lazy_features import LazyFeatureRegistry
+from streaming_export import requested_stream_format, stream_records
+
+lazy_features = LazyFeatureRegistry()
+
+
+def _bind_feature(name, value):
+    """読み込んだ機能オブジェクトをモジュールグローバルに束縛（既存ルートはグローバル名で参照）"""
+    globals()[name] = value
+
+
+for _name, _module, _prefixes in (
+    ('exam_simulator', 'exam_simulator',
+     ('/exam_simulator', '/start_exam', '/exam_question', '/exam_navigation', '/submit_exam_answer',
+      '/flag_exam_question', '/finish_exam', '/exam_results', '/api/exam_status')),
+    ('gamification_manager', 'gamification', ('/achievements', '/study_calendar', '/api/gamification')),
+    ('ai_analyzer', 'ai_analyzer',
+     ('/ai_analysis', '/ai_dashboard', '/api/ai_analysis', '/adaptive_questions', '/integrated_learning',
+      '/learning_plan')),
+    ('adaptive_engine', 'adaptive_learning',
+     ('/ai_analysis', '/api/ai_analysis', '/adaptive_questions', '/integrated_learning',
+      '/integrated_learning_selection', '/learner_insights')),
+    ('advanced_analytics', 'advanced_analytics', ('/advanced_analytics', '/advanced_statistics')),
+    ('mobile_manager', 'mobile_features', ('/api/mobile',)),
+    ('learning_optimizer', 'learning_optimizer', ('/learning_optimization', '/api/learning')),
+    ('admin_dashboard', 'admin_dashboard', ('/admin',)),
+    ('social_learning_manager', 'social_learning', ('/social',)),
+    ('api_manager', 'api_integration',
+     ('/api_integration', '/api/auth', '/api/users', '/api/organizations', '/api/certifications',
+      '/api/reports')),
+    ('advanced_personalization', 'advanced_personalization', ('/api/personalization',)),
+):
+    # 公開オブジェクト名 = app.py のグローバル名（例: gamification.gamification_manager）
+    lazy_features.register(_name, _module, attr=_name, url_prefixes=_prefixes, on_load=_bind_feature)
+
+lazy_features.init_app(app)
+EXAM_SIMULATOR_AVAILABLE = lazy_features.is_available('exam_simulator')
+
+
 def ensure_modules_loaded():
-    """必要なモジュールを遅延読み込み（ウルトラシンク最適化）"""
-    global _modules_lazy_loaded, gamification_manager, ai_analyzer, adaptive_engine
-    global exam_simulator, advanced_analytics, mobile_manager, learning_optimizer
-    global admin_dashboard, social_learning_manager, api_manager, advanced_personalization
-    
+    """全機能モジュールを読み込み（クイズ回答処理など複数機能を横断する処理用）"""
+    global _modules_lazy_loaded
+
     if not _modules_lazy_loaded:
-        with _modules_lock:
-            if not _modules_lazy_loaded:  # Double-check
-                logger.info("🔄 モジュール遅延読み込み開始...")
-                start_time = time.time()
-                
-                # 必要なモジュールをインポート
-                from gamification import gamification_manager as gam_mgr
-                from ai_analyzer import ai_analyzer as ai_ana
-                from adaptive_learning import adaptive_engine as adp_eng
-                from exam_simulator import exam_simulator as exam_sim
-                from advanced_analytics import advanced_analytics as adv_ana
-                from mobile_features import mobile_manager as mob_mgr
-                from learning_optimizer import learning_optimizer as lrn_opt
-                from admin_dashboard import admin_dashboard as adm_dash
-                from social_learning import social_learning_manager as soc_mgr
-                from api_integration import api_manager as api_mgr
-                from advanced_personalization import advanced_personalization as adv_per
-                
-                # グローバル変数に代入
-                gamification_manager = gam_mgr
-                ai_analyzer = ai_ana
-                adaptive_engine = adp_eng
-                exam_simulator = exam_sim
-                advanced_analytics = adv_ana
-                mobile_manager = mob_mgr
-                learning_optimizer = lrn_opt
-                admin_dashboard = adm_dash
-                social_learning_manager = soc_mgr
-                api_manager = api_mgr
-                advanced_personalization = adv_per
-                
-                _modules_lazy_loaded = True
-                elapsed = time.time() - start_time
-                logger.info(f"SUCCESS モジュール遅延読み込み完了: {elapsed:.2f}秒")
+        start_time = time.time()
+        lazy_features.load_all()
+        _modules_lazy_loaded = True
+        logger.info(f"SUCCESS モジュール遅延読み込み完了: {time.time() - start_time:.2f}秒")
 
 # FIRE ULTRA SYNC FIX: 重複関数削除済み - get_session_lock関数は271行目で定義済み
 
@@ -1626,12 +1885,12 @@ def safe_file_operation(operation, file_path, content=None, mode='r'):
         elif operation == 'read':
             with open(file_path, mode, encoding='utf-8') as f:
                 content = f.read()
-            logger.debug(f"SUCCESS ファイル読み込み成功: {file_path}")
+            logger.debug("SUCCESS ファイル読み込み成功: %s", file_path)
             return content
         elif operation == 'exists':
             import os
             exists = os.path.exists(file_path)
-            logger.debug(f"📂 ファイル存在チェック: {file_path} = {exists}")
+            logger.debug("📂 ファイル存在チェック: %s = %s", file_path, exists)
             return exists
     except FileNotFoundError:
         logger.error(f"ERROR ファイルが見つかりません: {file_path}")
@@ -1736,7 +1995,7 @@ def safe_session_update(key, value):
 
     def update_operation():
         session[key] = value
-        logger.debug(f"セッション安全更新: {key} = {type(value).__name__}")
+        logger.debug("セッション安全更新: %s = %s", key, type(value).__name__)
         return value
 
     return safe_session_operation(user_id, update_operation)
@@ -1763,17 +2022,21 @@ def after_request(response):
     企業環境での複数ユーザー利用に対応
     FIRE CRITICAL: ユーザー要求による超強力キャッシュクリア
     """
-    # FIRE ULTRA強力なキャッシュ制御でブラウザキャッシュを完全無効化
-    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0, private'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '-1'  # 過去の日付で強制期限切れ
-
-    # FIRE 問題関連ページの追加キャッシュクリア（ユーザー要求による）
-    if any(path in request.path for path in ['/exam', '/result', '/review', '/feedback']):
-        response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0, private, no-transform'
-        response.headers['Last-Modified'] = 'Wed, 11 Jan 1984 05:00:00 GMT'  # 強制古い日付
-        response.headers['ETag'] = '"0"'  # 無効なETAG
-        response.headers['Vary'] = '*'    # 全リクエストで異なることを示す
+    # 📦 レスポンスキャッシュ対象ルートは設定されたCache-Controlポリシー（ETag再検証）を適用
+    cache_policy_applied = response_cache is not None and response_cache.apply_policy(response)
+
+    if not cache_policy_applied:
+        # FIRE ULTRA強力なキャッシュ制御でブラウザキャッシュを完全無効化
+        response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0, private'
+        response.headers['Pragma'] = 'no-cache'
+        response.headers['Expires'] = '-1'  # 過去の日付で強制期限切れ
+
+        # FIRE 問題関連ページの追加キャッシュクリア（ユーザー要求による）
+        if any(path in request.path for path in ['/exam', '/result', '/review', '/feedback']):
+            response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0, private, no-transform'
+            response.headers['Last-Modified'] = 'Wed, 11 Jan 1984 05:00:00 GMT'  # 強制古い日付
+            response.headers['ETag'] = '"0"'  # 無効なETAG
+            response.headers['Vary'] = '*'    # 全リクエストで異なることを示す
 
     # セキュリティヘッダー追加
     response.headers['X-Content-Type-Options'] = 'nosniff'
@@ -1810,6 +2073,39 @@ def after_request(response):
 
     return response
 
+
+def _user_data_revision():
+    """ユーザーデータ版数（json: user_data ディレクトリの更新時刻、sqlite: 書き込み毎に更新される版数）"""
+    try:
+        from user_store import get_user_repository
+        return get_user_repository(data_manager.data_dir if data_manager else 'user_data').revision()
+    except Exception as e:
+        logger.debug("ユーザーデータ版数取得エラー: %s", e)
+        return ''
+
+# 🔁 ポーリングされるJSON APIの条件付きGET（状態リビジョンからETagを算出し、一致時はハンドラを実行せず304）
+# フックは登録の逆順に実行されるため、上のキャッシュ制御フックより後に登録してポリシーを先に設定する
+try:
+    from conditional_api import ConditionalAPI
+    from config import ConditionalAPIConfig
+    conditional_api = ConditionalAPI(sources={'corpus': get_corpus_version,
+                                              'user_data': _user_data_revision},
+                                     enabled=ConditionalAPIConfig.ENABLED)
+    conditional_api.init_app(app)
+except ImportError:
+    conditional_api = None
+
+
+def conditional_get(sources=('session',), time_bucket=None):
+    """条件付きGETデコレータ（conditional_api 無効時は何もしない）"""
+    if conditional_api is None:
+        return lambda view: view
+    return conditional_api.conditional(sources, time_bucket=time_bucket)
+
+# 🧠 X-Request-Memo: リクエスト内で重複排除したヘルパー呼び出し数（デバッグ用）
+from config import RequestMemoConfig
+init_request_memo(app, debug_header=RequestMemoConfig.DEBUG_HEADER)
+
 # セキュリティ機能
 
 
@@ -2250,7 +2546,7 @@ def validate_question_data_integrity(questions):
                     question['question_type'] = 'specialist'
                 else:
                     question['question_type'] = 'basic'
-                logger.debug(f"問題{question.get('id')}: 問題種別を推定設定 ({question['question_type']})")
+                logger.debug("問題%s: 問題種別を推定設定 (%s)", question.get('id'), question['question_type'])
 
             valid_questions.append(question)
 
@@ -2265,21 +2561,19 @@ def validate_question_data_integrity(questions):
     return valid_questions
 
 
+@request_memo
 def load_questions():
     """
     RCCM統合問題データの読み込み（4-1基礎・4-2専門対応）
     キャッシュ機能と詳細エラーハンドリング
     FIRE ULTRA SYNC FIX: 起動高速化対応
     """
-    global _questions_cache, _cache_timestamp
-
     # ULTRA SYNC CRITICAL FIX: Force use of inline emergency_load_all_questions for GET/POST consistency
     try:
         questions = emergency_load_all_questions()  # Use inline function directly
         if questions:
             logger.info(f"🎯 ULTRA SYNC SUCCESS: {len(questions)} questions loaded with unified ID system")
-            _questions_cache = questions
-            _cache_timestamp = datetime.now()
+            _publish_questions_cache(questions)
             return questions
         else:
             logger.warning("⚠️ ULTRA SYNC WARNING: Emergency data returned no questions, proceeding to fallback")
@@ -2287,18 +2581,19 @@ def load_questions():
         logger.error(f"🚨 ULTRA SYNC ERROR: Emergency data error: {e}, proceeding to fallback")
 
     # FIRE ULTRA SYNC FIX: 事前読み込み済みデータがあればそれを使用（URL起動遅延解決）
-    if _startup_data_loaded and _questions_cache is not None:
-        logger.debug(f"事前読み込み済みデータ使用: {len(_questions_cache)}問（BOLT高速）")
-        return _questions_cache
+    cached_questions, cached_at = _get_questions_cache_snapshot()
+    if _startup_data_loaded and cached_questions is not None:
+        logger.debug("事前読み込み済みデータ使用: %s問（BOLT高速）", len(cached_questions))
+        return cached_questions
 
     current_time = datetime.now()
 
     # キャッシュが有効かチェック
-    if (_questions_cache is not None and
-        _cache_timestamp is not None and
-            (current_time - _cache_timestamp).seconds < DataConfig.CACHE_TIMEOUT):
+    if (cached_questions is not None and
+        cached_at is not None and
+            (current_time - cached_at).seconds < DataConfig.CACHE_TIMEOUT):
         logger.debug("キャッシュからデータを返却")
-        return _questions_cache
+        return cached_questions
 
     logger.info("RCCM統合問題データの読み込み開始")
 
@@ -2311,8 +2606,7 @@ def load_questions():
         if questions:
             # データ整合性チェック
             validated_questions = validate_question_data_integrity(questions)
-            _questions_cache = validated_questions
-            _cache_timestamp = current_time
+            _publish_questions_cache(validated_questions)
             logger.info(f"🔄 ULTRA SYNC BACKUP: {len(validated_questions)}問 loaded via fallback (検証済み)")
             return validated_questions
         else:
@@ -2332,8 +2626,7 @@ def load_questions():
                 if 'question_type' not in q:
                     q['question_type'] = 'basic'  # デフォルト問題種別
 
-            _questions_cache = questions
-            _cache_timestamp = current_time
+            _publish_questions_cache(questions)
             logger.info(f"レガシーデータ読み込み完了: {len(questions)}問")
             return questions
 
@@ -2341,16 +2634,17 @@ def load_questions():
             logger.error(f"レガシーデータ読み込みエラー: {e2}")
             logger.warning("サンプルデータを使用")
             questions = get_sample_data_improved()
-            _questions_cache = questions
-            _cache_timestamp = current_time
+            _publish_questions_cache(questions)
             return questions
 
 
 def clear_questions_cache():
     """問題データキャッシュのクリア"""
-    global _questions_cache, _cache_timestamp
-    _questions_cache = None
-    _cache_timestamp = None
+    global _questions_cache, _cache_timestamp, _corpus_version_cache
+    with _questions_cache_lock:
+        _questions_cache = None
+        _cache_timestamp = None
+    _corpus_version_cache = (None, 0.0)
     logger.info("問題データキャッシュをクリア")
 
 # FIRE CRITICAL: ウルトラシンク復習セッション管理システム（統合管理）
@@ -2378,7 +2672,7 @@ def validate_review_session_integrity(session_data):
             if not isinstance(qid, int) or qid <= 0:
                 return False, f"無効な問題ID: {qid}"
 
-        logger.debug(f"復習セッション整合性チェック成功: {len(exam_question_ids)}問, 位置{exam_current}")
+        logger.debug("復習セッション整合性チェック成功: %s問, 位置%s", len(exam_question_ids), exam_current)
         return True, "OK"
 
     except Exception as e:
@@ -2527,6 +2821,7 @@ def get_due_questions(user_session, all_questions):
     return due_questions
 
 
+@request_memo(key=lambda user_session: (id(user_session), repr(user_session.get('quiz_settings'))))
 def get_user_session_size(user_session):
     """ユーザー設定の問題数を取得（デフォルト10問）"""
     quiz_settings = user_session.get('quiz_settings', {})
@@ -2888,14 +3183,25 @@ def get_mixed_questions(user_session, all_questions, requested_category='全体'
 def health():
     """ヘルスチェック（高速）"""
     # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のヘルスチェックタイムスタンプ
-    return jsonify({'status': 'healthy', 'timestamp': format_utc_to_iso()})
+    health_data = {'status': 'healthy', 'timestamp': format_utc_to_iso()}
+    if cache_warmer:
+        # 🔥 キャッシュウォームアップの進捗・所要時間
+        health_data['cache_warmup'] = cache_warmer.get_status()
+    health_data['lazy_features'] = {
+        'registered': len(lazy_features),
+        'loaded': lazy_features.get_stats()['loaded'],
+    }
+    if conditional_api:
+        health_data['conditional_api'] = conditional_api.get_stats()
+    health_data['logging'] = get_logging_stats()
+    return jsonify(health_data)
 
 
 @app.route('/')
 # FIRE ULTRA SYNC: 統合セッション管理システムで自動処理
 def index():
     """ホーム画面（ユーザー識別対応）"""
-    print("🔥🔥🔥 DEBUG: Homepage route called! 🔥🔥🔥")
+    logger.debug("🔥🔥🔥 DEBUG: Homepage route called! 🔥🔥🔥")
     try:
         # FIRE CRITICAL: セッション完全クリア（ユーザー要求による）
         # 問題途中でホームに戻った場合、全ての問題関連情報をクリア
@@ -2935,6 +3241,7 @@ def index():
 
 
 @app.route('/department_quiz')
+@cached_response('page')
 def department_quiz():
     """CLAUDE.md準拠: 部門別クイズ画面（日本語カテゴリ直接使用）"""
     try:
@@ -2946,6 +3253,7 @@ def department_quiz():
                                title='部門別クイズ')
     except Exception as e:
         logger.error(f"部門別クイズ画面エラー: {e}")
+        skip_response_cache()  # 一時的な障害の画面をキャッシュしない
         return render_template('error.html', error="部門別クイズ画面の表示中にエラーが発生しました。")
 
 
@@ -3266,8 +3574,8 @@ def quiz_basic_japanese():
 # @memory_monitoring_decorator(_memory_leak_monitor)  # TEMPORARILY DISABLED FOR DEBUGGING
 def exam():
     """SRS対応の問題関数（統合版）"""
-    print("FUNCTION_ENTRY: exam() function called!")  # FIRST LINE TEST
-    logger.info("🚨🚨🚨 CRITICAL: exam() function entry confirmed 🚨🚨🚨")
+    logger.debug("FUNCTION_ENTRY: exam() function called!")
+    logger.debug("🚨🚨🚨 CRITICAL: exam() function entry confirmed 🚨🚨🚨")
     
     # 🚨 CRITICAL DEBUG: Complete request.args dump at function entry
     try:
@@ -3276,8 +3584,8 @@ def exam():
         request_url = request.url
         request_path = request.path
         
-        print(f"🔍 COMPLETE_DEBUG: method={request_method}, url={request_url}")
-        print(f"🔍 COMPLETE_DEBUG: path={request_path}, args={complete_request_args}")
+        logger.debug("🔍 COMPLETE_DEBUG: method=%s, url=%s", request_method, request_url)
+        logger.debug("🔍 COMPLETE_DEBUG: path=%s, args=%s", request_path, complete_request_args)
         
         # Force this debug info into HTML for web browser visibility
         complete_debug_html = f"<!-- 🔍 COMPLETE_REQUEST_DEBUG: method={request_method}, url={request_url}, path={request_path}, args={complete_request_args} -->"
@@ -3290,11 +3598,11 @@ def exam():
         forced_debug = f"IMMEDIATE_DEBUG_type_{url_type_param}_department_{url_dept_param}"
         
         # Force output to console
-        print(f"CONSOLE_OUTPUT: {forced_debug}")
+        logger.debug("CONSOLE_OUTPUT: %s", forced_debug)
         
     except Exception as e:
         forced_debug = f"IMMEDIATE_DEBUG_EXCEPTION_{str(e)}"
-        print(f"CONSOLE_EXCEPTION: {forced_debug}")
+        logger.debug("CONSOLE_EXCEPTION: %s", forced_debug)
         if not hasattr(g, 'forced_debug_output'):
             g.forced_debug_output = f"<!-- {forced_debug} -->"
     
@@ -3303,30 +3611,27 @@ def exam():
     url_question_type = request.args.get('type', request.args.get('question_type', ''))
     url_department = request.args.get('department', '')
     
-    print(f"🚨🚨🚨 EMERGENCY BYPASS: URL params - type={url_question_type}, department={url_department} 🚨🚨🚨")
-    logger.info(f"🚨🚨🚨 EMERGENCY BYPASS: URL params - type={url_question_type}, department={url_department} 🚨🚨🚨")
+    logger.debug("🚨🚨🚨 EMERGENCY BYPASS: URL params - type=%s, department=%s 🚨🚨🚨", url_question_type, url_department)
     
     # 🚨 CRITICAL FIX: 部門指定時question_type自動設定
     if url_department and not url_question_type:
         if url_department == 'basic':
             url_question_type = 'basic'
-            print(f"🔧 AUTO-SET: department={url_department} → question_type=basic")
+            logger.debug("🔧 AUTO-SET: department=%s → question_type=basic", url_department)
             logger.info(f"CRITICAL FIX: 部門指定時question_type自動設定 - {url_department} → basic")
         else:
             url_question_type = 'specialist'
-            print(f"🔧 AUTO-SET: department={url_department} → question_type=specialist")
+            logger.debug("🔧 AUTO-SET: department=%s → question_type=specialist", url_department)
             logger.info(f"CRITICAL FIX: 部門指定時question_type自動設定 - {url_department} → specialist")
     
     # Force URL parameter application if specialist is requested
     emergency_bypass_active = False
     if url_question_type == 'specialist' and url_department:
-        print(f"🚨🚨🚨 EMERGENCY BYPASS: Forcing specialist mode for {url_department} 🚨🚨🚨")
-        logger.info(f"🚨🚨🚨 EMERGENCY BYPASS: Forcing specialist mode for {url_department} 🚨🚨🚨")
+        logger.debug("🚨🚨🚨 EMERGENCY BYPASS: Forcing specialist mode for %s 🚨🚨🚨", url_department)
         
         # ENHANCED FIX: Convert department to Japanese category immediately
         japanese_department_category = convert_legacy_english_id_to_japanese(url_department)
-        print(f"🔄🔄🔄 EMERGENCY BYPASS: Department conversion - {url_department} → {japanese_department_category} 🔄🔄🔄")
-        logger.info(f"🔄🔄🔄 EMERGENCY BYPASS: Department conversion - {url_department} → {japanese_department_category} 🔄🔄🔄")
+        logger.debug("🔄🔄🔄 EMERGENCY BYPASS: Department conversion - %s → %s 🔄🔄🔄", url_department, japanese_department_category)
         
         # Override session values with URL parameters using protected keys
         session['exam_type'] = 'specialist'
@@ -3340,8 +3645,7 @@ def exam():
         session.modified = True
         emergency_bypass_active = True
         
-        print(f"✅✅✅ EMERGENCY BYPASS: Session updated - type=specialist, department={url_department}, category={japanese_department_category} ✅✅✅")
-        logger.info(f"✅✅✅ EMERGENCY BYPASS: Session updated - type=specialist, department={url_department}, category={japanese_department_category} ✅✅✅")
+        logger.debug("✅✅✅ EMERGENCY BYPASS: Session updated - type=specialist, department=%s, category=%s ✅✅✅", url_department, japanese_department_category)
     try:
         # FIRE CRITICAL: ウルトラシンク セッション整合性チェック・自動修復（改修版）
         # 🚨 BUG FIX: 初回アクセス時(GET)は空セッション許可、回答時(POST)のみ厳格チェック
@@ -3443,15 +3747,15 @@ def exam():
                 # ENHANCED FIX: Use Japanese category from emergency bypass if available
                 if session.get('emergency_bypass_category'):
                     target_category = session.get('emergency_bypass_category')
-                    logger.info(f"🚨🚨🚨 EMERGENCY BYPASS ACTIVE: Using bypass settings - type={question_type}, department={department}, category={target_category} 🚨🚨🚨")
+                    logger.debug("🚨🚨🚨 EMERGENCY BYPASS ACTIVE: Using bypass settings - type=%s, department=%s, category=%s 🚨🚨🚨", question_type, department, target_category)
                 else:
-                    logger.info(f"🚨🚨🚨 EMERGENCY BYPASS ACTIVE: Using bypass settings - type={question_type}, department={department} 🚨🚨🚨")
+                    logger.debug("🚨🚨🚨 EMERGENCY BYPASS ACTIVE: Using bypass settings - type=%s, department=%s 🚨🚨🚨", question_type, department)
             else:
                 # 🚨 CRITICAL FIX: URLパラメータを優先、セッションはフォールバック
                 url_question_type = request.args.get('type', request.args.get('question_type', ''))
                 if url_question_type in ['basic', 'specialist']:
                     question_type = url_question_type
-                    logger.info(f"✅ URLパラメータ優先でquestion_type設定: {url_question_type}")
+                    logger.debug("✅ URLパラメータ優先でquestion_type設定: %s", url_question_type)
                 else:
                     # ENHANCED FIX: Check for previously stored emergency bypass values
                     if session.get('selected_question_type') == 'specialist' and session.get('selected_department'):
@@ -3503,12 +3807,12 @@ def exam():
                     logger.error(f"EMERGENCY FIX 14: Session structure conversion failed: {e}")
             
             # DEBUG: Emergency Fix 17 execution check
-            logger.info("DEBUG: Checking Emergency Fix 17 conditions")
-            logger.info(f"DEBUG: 'questions' in session: {'questions' in session}")
-            logger.info(f"DEBUG: 'exam_session' in session: {'exam_session' in session}")
+            logger.debug("DEBUG: Checking Emergency Fix 17 conditions")
+            logger.debug("DEBUG: 'questions' in session: %s", 'questions' in session)
+            logger.debug("DEBUG: 'exam_session' in session: %s", 'exam_session' in session)
             if 'questions' in session:
                 q_list = session.get('questions', [])
-                logger.info(f"DEBUG: questions count: {len(q_list)}")
+                logger.debug("DEBUG: questions count: %s", len(q_list))
                 if q_list and len(q_list) > 0:
                     # Handle both question objects and question IDs
                     first_item = q_list[0]
@@ -3517,14 +3821,14 @@ def exam():
                     else:
                         # If it's just an ID, we need to get the category from current session
                         cat = session.get('selected_category', session.get('exam_category', ''))
-                    logger.info(f"DEBUG: first question category: '{cat}'")
-                    logger.info(f"DEBUG: is construction env: {cat == '建設環境'}")
+                    logger.debug("DEBUG: first question category: '%s'", cat)
+                    logger.debug("DEBUG: is construction env: %s", cat == '建設環境')
                 else:
-                    logger.info("DEBUG: questions list empty")
+                    logger.debug("DEBUG: questions list empty")
             elif 'exam_session' in session:
                 exam_session = session.get('exam_session', {})
                 questions = exam_session.get('questions', [])
-                logger.info(f"DEBUG: exam_session questions count: {len(questions)}")
+                logger.debug("DEBUG: exam_session questions count: %s", len(questions))
                 if questions and len(questions) > 0:
                     # Handle both question objects and question IDs
                     first_item = questions[0]
@@ -3533,12 +3837,12 @@ def exam():
                     else:
                         # If it's just an ID, get category from session
                         cat = session.get('selected_category', session.get('exam_category', ''))
-                    logger.info(f"DEBUG: exam_session first question category: '{cat}'")
-                    logger.info(f"DEBUG: is construction env: {cat == '建設環境'}")
+                    logger.debug("DEBUG: exam_session first question category: '%s'", cat)
+                    logger.debug("DEBUG: is construction env: %s", cat == '建設環境')
                 else:
-                    logger.info("DEBUG: exam_session questions list empty")
+                    logger.debug("DEBUG: exam_session questions list empty")
             else:
-                logger.info("DEBUG: no 'questions' or 'exam_session' key")
+                logger.debug("DEBUG: no 'questions' or 'exam_session' key")
             
             # EMERGENCY FIX 17 ENHANCED: Construction Environment Session Preservation
             # Fix session replacement by supporting both session structures
@@ -3551,12 +3855,12 @@ def exam():
             # First check: Direct questions key (Emergency Fix 12 style)
             if 'questions' in session and session.get('questions'):
                 emergency_questions = session.get('questions', [])
-                logger.info("DEBUG: Found direct 'questions' key session")
+                logger.debug("DEBUG: Found direct 'questions' key session")
             # Second check: exam_session structure (/start_exam style)
             elif 'exam_session' in session and session.get('exam_session'):
                 exam_session = session.get('exam_session', {})
                 emergency_questions = exam_session.get('questions', [])
-                logger.info("DEBUG: Found 'exam_session' structure")
+                logger.debug("DEBUG: Found 'exam_session' structure")
             
             if emergency_questions and len(emergency_questions) > 0:
                 first_question = emergency_questions[0]
@@ -3566,7 +3870,7 @@ def exam():
                 else:
                     # If it's just an ID, get category from session
                     question_category = session.get('selected_category', session.get('exam_category', ''))
-                logger.info(f"DEBUG: Checking category: '{question_category}'")
+                logger.debug("DEBUG: Checking category: '%s'", question_category)
                 
                 if question_category == '建設環境':
                     is_construction_env_context = True
@@ -3664,7 +3968,7 @@ def exam():
                         
                         # EMERGENCY FIX 19: Session Size Optimization
                         # Apply after Emergency Fix 18 to optimize session cookie size
-                        logger.info("DEBUG: Applying Emergency Fix 19 - Session Size Optimization")
+                        logger.debug("DEBUG: Applying Emergency Fix 19 - Session Size Optimization")
                         
                         # Clean up expired cache entries
                         emergency_fix_19_cleanup_expired_cache()
@@ -3681,7 +3985,7 @@ def exam():
                         # EMERGENCY FIX 19: Session Size Optimization
                         # Apply after Emergency Fix 18 to optimize session cookie size
                         try:
-                            logger.info("DEBUG: Applying Emergency Fix 19 - Session Size Optimization")
+                            logger.debug("DEBUG: Applying Emergency Fix 19 - Session Size Optimization")
                             
                             # Check if Emergency Fix 19 functions are available
                             if 'emergency_fix_19_session_size_optimization' in globals():
@@ -3696,7 +4000,7 @@ def exam():
                                 else:
                                     logger.warning("WARNING: Emergency Fix 19 failed - session may still be large")
                             else:
-                                logger.info("DEBUG: Emergency Fix 19 - Functions not yet defined, will apply later")
+                                logger.debug("DEBUG: Emergency Fix 19 - Functions not yet defined, will apply later")
                         except NameError as e:
                             logger.warning(f"WARNING: Emergency Fix 19 - Functions not available: {e}")
                         except Exception as e:
@@ -3777,7 +4081,7 @@ def exam():
                       else session.get('selected_category', session.get('exam_category', '')) == '建設環境'))
             ) or question_type_changed or department_changed  # CRITICAL: Force session reset on question type OR department change
             
-            logger.info(f"EMERGENCY FIX 17: Session initialization check - has_standard: {has_standard_session}, is_construction: {is_construction_env_context}, dept_changed: {department_changed}, should_init: {should_initialize_new_session}")
+            logger.debug("EMERGENCY FIX 17: Session initialization check - has_standard: %s, is_construction: %s, dept_changed: %s, should_init: %s", has_standard_session, is_construction_env_context, department_changed, should_initialize_new_session)
             
             # 🚨 CRITICAL FIX: 部門変更時のセッション更新
             if department_changed:
@@ -3799,12 +4103,12 @@ def exam():
                 
                 try:
                     # 🔍 ULTRA SYNC EMERGENCY DEBUG: 条件分岐パス追跡
-                    logger.info(f"🔍 ULTRA SYNC CRITICAL DEBUG: question_type={question_type}, condition_basic={question_type == 'basic'}, condition_specialist={question_type == 'specialist'}")
-                    print(f"🔍 DEBUG CONSOLE: question_type={question_type}, basic={question_type == 'basic'}, specialist={question_type == 'specialist'}")
+                    logger.debug("🔍 ULTRA SYNC CRITICAL DEBUG: question_type=%s, condition_basic=%s, condition_specialist=%s", question_type, question_type == 'basic', question_type == 'specialist')
+                    logger.debug("🔍 DEBUG CONSOLE: question_type=%s, basic=%s, specialist=%s", question_type, question_type == 'basic', question_type == 'specialist')
                     
                     if question_type == 'basic':
                         # 基礎科目
-                        logger.info(f"🔍 ENTERING BASIC BRANCH: question_type={question_type}")
+                        logger.debug("🔍 ENTERING BASIC BRANCH: question_type=%s", question_type)
                         basic_questions = [q for q in all_questions if q.get('question_type') == 'basic']
                         if basic_questions:
                             import random
@@ -3819,7 +4123,7 @@ def exam():
                     
                     elif question_type == 'specialist':
                         # FIRE ULTRA SYNC専門科目: 新部門IDシステム統合版
-                        logger.info(f"🔍 ENTERING SPECIALIST BRANCH: question_type={question_type}, department={department}")
+                        logger.debug("🔍 ENTERING SPECIALIST BRANCH: question_type=%s, department=%s", question_type, department)
                         if department:
                             # 部門IDから日本語カテゴリ名に変換
                             # EMERGENCY FIX: Eliminate English ID conversion, use direct Japanese categories
@@ -3850,12 +4154,12 @@ def exam():
                                 target_category = "農業土木"
                             else:
                                 target_category = department  # Fallback
-                            logger.info(f"専門科目開始: 部門ID={department} → カテゴリ={target_category}")
+                            logger.debug("専門科目開始: 部門ID=%s → カテゴリ=%s", department, target_category)
                             
                             # ULTRA SYNC CRITICAL FIX: Force use of unified data system
                             try:
-                                logger.info(f"🎯 ULTRA SYNC: Using UNIFIED data system for department={department}, type=specialist")
-                                logger.info(f"🎯 ULTRA SYNC: target_category={target_category}")
+                                logger.debug("🎯 ULTRA SYNC: Using UNIFIED data system for department=%s, type=specialist", department)
+                                logger.debug("🎯 ULTRA SYNC: target_category=%s", target_category)
                                 # ULTRA SYNC FIX: session quiz_settingsからcount取得
                                 session_count = session.get('quiz_settings', {}).get('questions_per_session', 10)
 
@@ -3870,13 +4174,13 @@ def exam():
                                 random.shuffle(specialist_questions)
                                 selected_questions = specialist_questions[:session_count]
 
-                                logger.info(f"🎯 ULTRA SYNC: Unified system returned {len(selected_questions)} questions")
-                                logger.info(f"🎯 ULTRA SYNC: Sample ID range check: {selected_questions[0].get('id', 'N/A') if selected_questions else 'None'}")
+                                logger.debug("🎯 ULTRA SYNC: Unified system returned %s questions", len(selected_questions))
+                                logger.debug("🎯 ULTRA SYNC: Sample ID range check: %s", selected_questions[0].get('id', 'N/A') if selected_questions else 'None')
 
                                 if selected_questions:
-                                    logger.info(f"✅ UNIFIED SUCCESS: {len(selected_questions)} questions loaded for {department}")
-                                    logger.info(f"✅ UNIFIED: First question category: {selected_questions[0].get('category', 'N/A')}")
-                                    logger.info(f"✅ UNIFIED: First question ID: {selected_questions[0].get('id', 'N/A')}")
+                                    logger.debug("✅ UNIFIED SUCCESS: %s questions loaded for %s", len(selected_questions), department)
+                                    logger.debug("✅ UNIFIED: First question category: %s", selected_questions[0].get('category', 'N/A'))
+                                    logger.debug("✅ UNIFIED: First question ID: %s", selected_questions[0].get('id', 'N/A'))
                                 else:
                                     logger.warning(f"⚠️ UNIFIED: No questions found for {department}, falling back to extract_department_questions_from_csv")
                                     selected_questions = extract_department_questions_from_csv(target_category, 10)
@@ -3899,13 +4203,13 @@ def exam():
                                 session.modified = True
                                 
                                 # CRITICAL FIX: emergency_get_questions結果の確実な反映確認
-                                logger.info(f"SESSION INTEGRATION FIX: exam_question_ids updated with {len(selected_questions)} questions")
-                                logger.info(f"SESSION INTEGRATION FIX: First question ID from emergency_get_questions: {selected_questions[0].get('id', 'N/A')}")
-                                logger.info(f"SESSION INTEGRATION FIX: exam_question_ids[0]: {session['exam_question_ids'][0] if session['exam_question_ids'] else 'None'}")
+                                logger.debug("SESSION INTEGRATION FIX: exam_question_ids updated with %s questions", len(selected_questions))
+                                logger.debug("SESSION INTEGRATION FIX: First question ID from emergency_get_questions: %s", selected_questions[0].get('id', 'N/A'))
+                                logger.debug("SESSION INTEGRATION FIX: exam_question_ids[0]: %s", session['exam_question_ids'][0] if session['exam_question_ids'] else 'None')
                                 
                                 # COOKIE SIZE FIX: emergency_questions_dataは保存しない（4KB制限対策）
                                 # session['emergency_questions_data'] = {str(q['id']): q for q in selected_questions}
-                                logger.info(f"SESSION INTEGRATION FIX: Skipped storing question data to reduce cookie size")
+                                logger.debug("SESSION INTEGRATION FIX: Skipped storing question data to reduce cookie size")
                                 logger.info(f"SUCCESS 専門科目セッション開始: {len(selected_questions)}問（{target_category}）")
                             else:
                                 logger.warning(f"部門'{target_category}'の問題が見つかりません - フォールバック実行")
@@ -3937,7 +4241,7 @@ def exam():
                     
                     else:
                         # デフォルト：基礎科目
-                        logger.info(f"🔍 ENTERING DEFAULT BRANCH: question_type={question_type} - FALLING BACK TO BASIC")
+                        logger.debug("🔍 ENTERING DEFAULT BRANCH: question_type=%s - FALLING BACK TO BASIC", question_type)
                         basic_questions = [q for q in all_questions if q.get('question_type') == 'basic']
                         if basic_questions:
                             import random
@@ -3963,7 +4267,7 @@ def exam():
             and fallback mechanisms for construction environment department
             """
             try:
-                logger.info("DEBUG: Emergency Fix 21 - CSRF validation enhancement starting")
+                logger.debug("DEBUG: Emergency Fix 21 - CSRF validation enhancement starting")
                 
                 # Check if this is a construction environment session
                 is_construction_env = (
@@ -3974,14 +4278,14 @@ def exam():
                 )
                 
                 if is_construction_env:
-                    logger.info("DEBUG: Emergency Fix 21 - Construction environment session detected")
+                    logger.debug("DEBUG: Emergency Fix 21 - Construction environment session detected")
                     
                     # Enhanced CSRF token validation
                     form_csrf_token = request.form.get('csrf_token')
                     session_csrf_token = session.get('csrf_token')
                     
-                    logger.info(f"DEBUG: Emergency Fix 21 - Form CSRF: {form_csrf_token[:20] if form_csrf_token else 'None'}...")
-                    logger.info(f"DEBUG: Emergency Fix 21 - Session CSRF: {session_csrf_token[:20] if session_csrf_token else 'None'}...")
+                    logger.debug("DEBUG: Emergency Fix 21 - Form CSRF: %s...", form_csrf_token[:20] if form_csrf_token else 'None')
+                    logger.debug("DEBUG: Emergency Fix 21 - Session CSRF: %s...", session_csrf_token[:20] if session_csrf_token else 'None')
                     
                     # Multi-level CSRF validation
                     csrf_valid = False
@@ -4015,7 +4319,7 @@ def exam():
                     
                     return csrf_valid
                 else:
-                    logger.info("DEBUG: Emergency Fix 21 - Non-construction environment, using standard validation")
+                    logger.debug("DEBUG: Emergency Fix 21 - Non-construction environment, using standard validation")
                     return True  # Use standard Flask-WTF validation for other sessions
                     
             except Exception as e:
@@ -4035,19 +4339,15 @@ def exam():
                 logger.error("ERROR: Emergency Fix 21 - CSRF validation failed")
                 return "CSRF validation failed", 400
             else:
-                logger.info("SUCCESS: Emergency Fix 21 - CSRF validation passed")
+                logger.debug("SUCCESS: Emergency Fix 21 - CSRF validation passed")
             # FIRE ULTRA SYNC CRITICAL FIX: 無効データ厳密検証
             form_data = dict(request.form)
-            logger.info(f"🔍 ULTRA SYNC DEBUG: Full form_data = {form_data}")
-            logger.info(f"🔍 ULTRA SYNC DEBUG: form_data keys = {list(form_data.keys())}")
-            for key, value in form_data.items():
-                logger.info(f"🔍 ULTRA SYNC DEBUG: {key} = {value}")
             
             # 🚨 CRITICAL FIX: 回答送信を最優先でチェック（新規セッション検証を回避）
             # 回答送信の場合と新規セッション開始の場合を正しく分離
             if any(key in form_data for key in ['answer']):
                 # 🚨 CRITICAL FIX: 回答送信時は一切の検証をスキップ
-                logger.info(f"✅ ULTRA SYNC: 回答送信検出 - 検証スキップして処理継続")
+                logger.debug("✅ ULTRA SYNC: 回答送信検出 - 検証スキップして処理継続")
                 pass  # 検証をスキップして通常の処理に進む
             elif any(key in form_data for key in ['department', 'question_type', 'num_questions']):
                 # 新規セッション開始時の検証
@@ -4086,22 +4386,20 @@ def exam():
                                          error=f"不正なフィールドが含まれています: {', '.join(invalid_keys)}",
                                          error_type="invalid_fields"), 400
             
-            # FIRE DEBUG: POSTリクエスト詳細ログ
-            logger.info("=== POST処理開始 - セッション状態デバッグ ===")
-            logger.info(f"SEARCH POST Request URL: {request.url}")
-            logger.info(f"SEARCH POST Form Data: {form_data}")
-            logger.info(f"SEARCH POST Content Type: {request.content_type}")
-            # デバッグ: POST処理時のセッション状態を完全ログ出力
-            # FIRE ULTRA SYNC セキュリティ FIX: 機密情報を含まない安全なログ出力
-            logger.info(f"セッションキー数: {len(session.keys())}")
-            logger.info(f"exam_question_ids数: {len(session.get('exam_question_ids', []))}")
-            logger.info(f"exam_current: {session.get('exam_current', 'MISSING')}")
-            logger.info(f"exam_category: {session.get('exam_category', 'MISSING')}")
-            logger.info(f"selected_question_type: {session.get('selected_question_type', 'MISSING')}")
-            logger.info(f"selected_department: {session.get('selected_department', 'MISSING')}")
-            logger.info(f"session_id存在: {'Yes' if session.get('session_id') else 'No'}")
-            logger.info(f"data_loaded: {session.get('data_loaded', 'MISSING')}")
-            logger.info("==========================================")
+            # FIRE DEBUG: POSTリクエスト詳細ログ（1レコードの構造化ログ・DEBUG無効時は組み立てない）
+            # FIRE ULTRA SYNC セキュリティ FIX: 機密情報を含まない安全なログ出力（フォームはキーのみ）
+            if logger.isEnabledFor(logging.DEBUG):
+                log_event(logger, 'exam_post_state', level=logging.DEBUG,
+                          form_keys=sorted(form_data),
+                          content_type=request.content_type,
+                          session_keys=len(session.keys()),
+                          exam_question_ids=len(session.get('exam_question_ids', [])),
+                          exam_current=session.get('exam_current', 'MISSING'),
+                          exam_category=session.get('exam_category', 'MISSING'),
+                          selected_question_type=session.get('selected_question_type', 'MISSING'),
+                          selected_department=session.get('selected_department', 'MISSING'),
+                          has_session_id=bool(session.get('session_id')),
+                          data_loaded=session.get('data_loaded', 'MISSING'))
 
             # FIRE ULTRA SYNC VALIDATION FIX: 入力値のサニタイズと検証強化
             raw_answer = request.form.get('answer')
@@ -4145,7 +4443,7 @@ def exam():
                 # Use QID directly from form data without range validation
                 try:
                     qid = int(qid)
-                    logger.info(f"✅ EMERGENCY FIX: Using direct QID={qid} (no Sequential ID conversion)")
+                    logger.debug("✅ EMERGENCY FIX: Using direct QID=%s (no Sequential ID conversion)", qid)
                 except ValueError as e:
                     logger.warning(f"🚨 QID parse error: {qid} - {e}")
                     return render_template('error.html',
@@ -4711,7 +5009,7 @@ def exam():
                         session.pop('exam_category', None)
                         session.pop('selected_question_type', None)
                         session.modified = True
-                        return redirect(url_for('review_list'))
+                        return redirect(url_for('review.review_list'))
 
                     else:
                         # FIRE 最終緊急フォールバック: 問題IDから10問完全セッション作成
@@ -5145,7 +5443,7 @@ def exam():
                 if raw_category is None and raw_department:
                     # CRITICAL FIX: categoryパラメータが未指定で部門が指定されている場合
                     raw_category = raw_department
-                    logger.info(f"CRITICAL FIX: 未指定カテゴリ→部門設定: None → {raw_category}")
+                    logger.debug("CRITICAL FIX: 未指定カテゴリ→部門設定: None → %s", raw_category)
                 elif raw_category and raw_category in category_mapping:
                     # 英語パラメータの場合は日本語にマッピング
                     raw_category = category_mapping[raw_category]
@@ -5214,14 +5512,14 @@ def exam():
                 # 部門名をカテゴリとして設定（日本語のまま使用）
                 if requested_department:
                     requested_category = requested_department
-                    logger.info(f"専門科目専用モード: 部門={requested_department}をカテゴリとして設定")
+                    logger.debug("専門科目専用モード: 部門=%sをカテゴリとして設定", requested_department)
                 else:
                     # departmentが指定されていない場合でもcategoryを維持
                     logger.info(f"専門科目専用モード: 部門指定なし、既存カテゴリ={requested_category}を維持")
-                logger.info(f"専門科目専用モード: question_type=specialist, category={requested_category}, department={requested_department}")
+                logger.debug("専門科目専用モード: question_type=specialist, category=%s, department=%s", requested_category, requested_department)
 
             # カテゴリ選択時の問題種別自動判定
-            logger.info(f"カテゴリ判定前: requested_category={requested_category}, requested_question_type={requested_question_type}, requested_department={requested_department}")
+            logger.debug("カテゴリ判定前: requested_category=%s, requested_question_type=%s, requested_department=%s", requested_category, requested_question_type, requested_department)
             if requested_category and requested_category != '全体' and not requested_question_type:
                 if requested_category == '共通':
                     requested_question_type = 'basic'
@@ -5237,7 +5535,7 @@ def exam():
                     logger.info(f"専門カテゴリ: {requested_category} -> question_type=specialist, department={requested_department}")
 
         # カテゴリ処理後の最終値
-        logger.info(f"カテゴリ処理後: requested_department={requested_department}, requested_question_type={requested_question_type}")
+        logger.debug("カテゴリ処理後: requested_department=%s, requested_question_type=%s", requested_department, requested_question_type)
 
         # FIRE ULTRA SYNC修正: 部門指定時のデフォルト専門科目設定
         if requested_department and not requested_question_type:
@@ -5344,7 +5642,7 @@ def exam():
         # セッション管理
         exam_question_ids = session.get('exam_question_ids', [])
         # SUCCESS FIXED: Simplified session state handling with next request support
-        logger.info("=== SESSION STATE: Reading current position ===")
+        logger.debug("=== SESSION STATE: Reading current position ===")
         
         # FIRE PROGRESS FIX: 次問題リクエスト処理の確実性向上
         if is_next_request:
@@ -5384,7 +5682,7 @@ def exam():
         
         session_category = session.get('exam_category', '全体')
 
-        logger.info(f"Session position: current_no={current_no}, question_ids={len(exam_question_ids)}, next={is_next_request}")
+        logger.debug("Session position: current_no=%s, question_ids=%s, next=%s", current_no, len(exam_question_ids), is_next_request)
 
         # ★修正: 特定の問題表示の場合も10問セッションを維持
         if specific_qid:
@@ -5493,10 +5791,12 @@ def exam():
             department_match = requested_department == session_department
             year_match = requested_year == session_year
 
-            logger.info(f"リセット判定: is_next={is_next_request}, exam_ids={bool(exam_question_ids)}, "
-                        f"category_match={category_match}, question_type_match={question_type_match}, "
-                        f"department_match={department_match}, year_match={year_match}, "
-                        f"current_no={current_no}, len={len(exam_question_ids)}")
+            logger.debug("リセット判定: is_next=%s, exam_ids=%s, "
+                         "category_match=%s, question_type_match=%s, department_match=%s, year_match=%s, "
+                         "current_no=%s, len=%s",
+                         is_next_request, bool(exam_question_ids),
+                         category_match, question_type_match, department_match, year_match,
+                         current_no, len(exam_question_ids))
 
             # ホームから戻ってきた場合は必ずリセット
             referrer_is_home = request.referrer and request.referrer.endswith('/')
@@ -5528,7 +5828,7 @@ def exam():
             # 🚨 CRITICAL FIX: 部門変更時は既存セッションより部門分離を優先
             if has_valid_ongoing_session and not request.args.get('reset') == '1' and not department_changed:
                 need_reset = False
-                logger.info(f"FIRE SESSION PRESERVATION: 有効セッション継続 (問題{current_no + 1}/{len(exam_question_ids)})")
+                logger.debug("FIRE SESSION PRESERVATION: 有効セッション継続 (問題%s/%s)", current_no + 1, len(exam_question_ids))
             elif department_changed:
                 need_reset = True
                 logger.info(f"🔄 DEPARTMENT CHANGE OVERRIDE: 部門変更によりセッション強制リセット ({current_session_department} → {resolved_department})")
@@ -5538,7 +5838,7 @@ def exam():
                 need_reset = False
                 logger.info("FIRE PROGRESS FIX: next=1リクエストのためリセット強制無効化")
 
-        logger.info(f"FIRE ULTRA SYNC: need_reset = {need_reset} (is_next_request={is_next_request})")
+        logger.debug("FIRE ULTRA SYNC: need_reset = %s (is_next_request=%s)", need_reset, is_next_request)
 
         if need_reset:
             # FIRE CRITICAL: セッション情報完全クリア（ユーザー要求による）
@@ -5658,7 +5958,7 @@ def exam():
 
         # 現在の問題を取得
         current_question_id = exam_question_ids[current_no]
-        logger.info(f"問題ID取得: current_no={current_no}, question_id={current_question_id}")
+        logger.debug("問題ID取得: current_no=%s, question_id=%s", current_no, current_question_id)
         
         # CRITICAL FIX: Standard question lookup using CSV ID directly
         question = None
@@ -5677,13 +5977,13 @@ def exam():
                                       and q.get('category') == session_category]
                 question = next((q for q in specialist_questions if str(q.get('id', '')) == str(current_question_id)), None)
                 if question:
-                    logger.info(f"SUCCESS: Specialist question found via category-filtered lookup - ID {current_question_id}, category={session_category}")
+                    logger.debug("SUCCESS: Specialist question found via category-filtered lookup - ID %s, category=%s", current_question_id, session_category)
             elif session_question_type == 'basic':
                 # For basic sessions, only use basic questions
                 basic_questions = [q for q in all_questions if q.get('question_type') == 'basic']
                 question = next((q for q in basic_questions if str(q.get('id', '')) == str(current_question_id)), None)
                 if question:
-                    logger.info(f"SUCCESS: Basic question found via filtered lookup - ID {current_question_id}")
+                    logger.debug("SUCCESS: Basic question found via filtered lookup - ID %s", current_question_id)
             else:
                 # Fallback to original behavior for unknown session types
                 question = next((q for q in all_questions if str(q.get('id', '')) == str(current_question_id)), None)
@@ -5741,7 +6041,7 @@ def exam():
         # テンプレート用変数
         # ULTRA SYNC FIX: session設定値から正しいtotal_questionsを取得
         session_total_questions = session.get('quiz_settings', {}).get('questions_per_session', 10)
-        logger.info(f"ULTRA SYNC TEMPLATE: Using session total_questions={session_total_questions}")
+        logger.debug("ULTRA SYNC TEMPLATE: Using session total_questions=%s", session_total_questions)
         
         # ULTRA SYNC FIX: Determine department name for UI display
         session_question_type = session.get('selected_question_type', session.get('question_type', ''))
@@ -5771,8 +6071,8 @@ def exam():
         }
         
         # 🔍 ULTRA SYNC DEBUG: テンプレート変数値確認
-        logger.info(f"🔍 TEMPLATE DEBUG: current_no (0-based)={current_no}, current_no+1 (1-based)={current_no+1}")
-        logger.info(f"🔍 TEMPLATE DEBUG: template_vars['current_no']={template_vars['current_no']}")
+        logger.debug("🔍 TEMPLATE DEBUG: current_no (0-based)=%s, current_no+1 (1-based)=%s", current_no, current_no+1)
+        logger.debug("🔍 TEMPLATE DEBUG: template_vars['current_no']=%s", template_vars['current_no'])
         
         logger.info(f"問題表示: {current_no + 1}/{len(exam_question_ids)} - ID:{current_question_id}")
 
@@ -5805,40 +6105,18 @@ def exam():
             if session_question_type in ['basic', 'specialist']:
                 question.question_type = session_question_type
             
-        logger.info(f"QUESTION FIX: Category assigned to question object - {category_to_assign}")
-        logger.info(f"ULTRA SYNC FIX: Question type assigned - {session_question_type}")
-
-        
-
-        # 🚨 CRITICAL DEBUG: Right before render_template
-
-        logger.info("🚨 CRITICAL: About to call render_template('exam.html')")
-
-        logger.info(f"🚨 TEMPLATE VARS KEYS: {list(template_vars.keys())}")
-
-        logger.info(f"🚨 QUESTION OBJECT: {question}")
-
-        logger.info(f"🚨 SESSION STATE: {dict(session)}")
-
-        print("🚨 CONSOLE: About to render exam.html template")
+        logger.debug("QUESTION FIX: Category assigned to question object - %s", category_to_assign)
+        logger.debug("ULTRA SYNC FIX: Question type assigned - %s", session_question_type)
 
         
-
         result = render_template('exam.html', **template_vars)
 
-        
-
-        # 🚨 CRITICAL DEBUG: After render_template
-
-        logger.info(f"🚨 RENDER RESULT TYPE: {type(result)}")
-
-        logger.info(f"🚨 RENDER RESULT LENGTH: {len(result) if hasattr(result, '__len__') else 'no length'}")
-
-        logger.info(f"🚨 RESULT STARTS WITH: {result[:100] if isinstance(result, str) else 'not string'}")
-
-        print(f"🚨 CONSOLE: Rendered template, length={len(result) if hasattr(result, '__len__') else 'unknown'}")
-
-        
+        # 🚨 CRITICAL DEBUG: render_template 結果（セッション内容はキーのみ）
+        log_event(logger, 'exam_rendered', level=logging.DEBUG,
+                  template_vars=sorted(template_vars),
+                  question_id=question.get('id') if isinstance(question, dict) else getattr(question, 'id', None),
+                  session_keys=sorted(session.keys()),
+                  length=len(result) if hasattr(result, '__len__') else None)
 
         return result
     except Exception as e:
@@ -5916,7 +6194,7 @@ def result():
             else:
                 # デフォルトは基礎科目とする
                 score_type = 'basic'
-                logger.debug(f"問題種別不明 - 基礎科目として扱う: {h}")
+                logger.debug("問題種別不明 - 基礎科目として扱う: %s", h)
 
             basic_specialty_scores[score_type]['total'] += 1
             if h.get('is_correct'):
@@ -5939,134 +6217,8 @@ def result():
         return render_template('error.html', error="結果表示中にエラーが発生しました。")
 
 
-@app.route('/statistics')
-# FIRE ULTRA SYNC: 統合セッション管理システムで自動処理
-@memory_monitoring_decorator(_memory_leak_monitor)
-def statistics():
-    """統計画面"""
-    try:
-        history = session.get('history', [])
-
-        # 全体統計
-        overall_stats = {
-            'total_questions': len(history),
-            'total_accuracy': 0.0,
-            'average_time_per_question': None
-        }
-
-        if history:
-            total = len(history)
-            correct = sum(1 for h in history if h['is_correct'])
-            total_time = sum(h.get('elapsed', 0) for h in history)
-            # FIRE ULTRA SYNC PRECISION FIX: 統計計算の精度保証
-            if total > 0:
-                accuracy_decimal = (Decimal(str(correct)) / Decimal(str(total))) * Decimal('100')
-                overall_stats['total_accuracy'] = float(accuracy_decimal.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
-                
-                time_per_question_decimal = Decimal(str(total_time)) / Decimal(str(total))
-                overall_stats['average_time_per_question'] = float(time_per_question_decimal.quantize(Decimal('0.1'), rounding=ROUND_HALF_UP))
-            else:
-                overall_stats['total_accuracy'] = 0.0
-                overall_stats['average_time_per_question'] = None
-
-        # 共通・専門別詳細
-        basic_specialty_details = {
-            'basic': {'total_answered': 0, 'correct_count': 0, 'accuracy': 0.0},
-            'specialty': {'total_answered': 0, 'correct_count': 0, 'accuracy': 0.0}
-        }
-
-        # 履歴から共通・専門別データを集計
-        for h in history:
-            question_id = h.get('id', h.get('question_id', ''))
-            question_type = h.get('question_type', '')
-
-            if question_type == 'basic' or '4-1' in str(question_id):
-                score_type = 'basic'
-            else:
-                score_type = 'specialty'
-
-            basic_specialty_details[score_type]['total_answered'] += 1
-            if h.get('is_correct'):
-                basic_specialty_details[score_type]['correct_count'] += 1
-
-        # 正答率計算
-        for score_type in ['basic', 'specialty']:
-            total = basic_specialty_details[score_type]['total_answered']
-            correct = basic_specialty_details[score_type]['correct_count']
-            # FIRE ULTRA SYNC PRECISION FIX: 共通・専門別正答率計算の精度保証
-            if total > 0:
-                accuracy_decimal = (Decimal(str(correct)) / Decimal(str(total))) * Decimal('100')
-                basic_specialty_details[score_type]['accuracy'] = float(accuracy_decimal.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
-            else:
-                basic_specialty_details[score_type]['accuracy'] = 0.0
-
-        # 最近の履歴
-        exam_history = history[-30:] if history else []
-
-        # 日付別統計
-        daily_stats = defaultdict(lambda: {'total': 0, 'correct': 0})
-        for h in history:
-            date = h.get('date', '')[:10]
-            if date:
-                daily_stats[date]['total'] += 1
-                if h.get('is_correct'):
-                    daily_stats[date]['correct'] += 1
-
-        daily_accuracy_list = []
-        for date in sorted(daily_stats.keys()):
-            total = daily_stats[date]['total']
-            correct = daily_stats[date]['correct']
-            accuracy = (correct / total * 100) if total > 0 else 0.0
-            daily_accuracy_list.append({'date': date, 'accuracy': round(accuracy, 1)})
-
-        return render_template(
-            'statistics.html',
-            overall_stats=overall_stats,
-            basic_specialty_details=basic_specialty_details,
-            exam_history=exam_history,
-            daily_accuracy_list=daily_accuracy_list
-        )
-
-    except Exception as e:
-        logger.error(f"statistics関数でエラー: {e}")
-        return render_template('error.html', error="統計表示中にエラーが発生しました。")
-
-
-@app.route('/department_statistics')
-def department_statistics():
-    """部門別詳細統計画面"""
-    try:
-        from department_statistics import department_statistics as dept_stats_analyzer
-
-        # 現在のユーザーセッション
-        user_session = session
-
-        # 包括的な部門別統計レポートを生成
-        report = dept_stats_analyzer.generate_comprehensive_department_report(user_session)
-
-        # 部門情報を追加（CLAUDE.md準拠：日本語カテゴリ直接使用）
-        japanese_categories = get_japanese_categories()
-        departments = {}
-        for category in japanese_categories:
-            # エンコードした値をキーとして使用（URL対応）
-            encoded_key = encode_japanese_category(category)
-            departments[encoded_key] = {'name': category}
-
-        logger.info(f"部門別統計レポート生成: {report.get('total_questions_analyzed', 0)}問分析")
-
-        return render_template(
-            'department_statistics.html',
-            report=report,
-            departments=departments,
-            title='部門別詳細統計'
-        )
-
-    except Exception as e:
-        logger.error(f"department_statistics関数でエラー: {e}")
-        return render_template('error.html', error="部門別統計表示中にエラーが発生しました。")
-
-
 @app.route('/departments')
+@cached_response('page', vary_session=('selected_department',), personal_session=('history',))
 def departments():
     """RCCM部門選択画面"""
     try:
@@ -6102,6 +6254,7 @@ def departments():
 
     except Exception as e:
         logger.error(f"departments関数でエラー: {e}")
+        skip_response_cache()  # 一時的な障害の画面をキャッシュしない
         return render_template('error.html', error="部門選択画面の表示中にエラーが発生しました。")
 
 
@@ -6214,11 +6367,6 @@ def question_types(department_id):
         return redirect(url_for('departments'))
 
 
-@app.route('/test-route')
-def test_route():
-    """Simple test route to verify route registration works"""
-    return "Test route is working!"
-
 @app.route('/departments/<department_id>/start')
 def department_start(department_id):
     """部門での問題開始 - 各部門からのクイズ開始エンドポイント"""
@@ -6372,25 +6520,28 @@ def department_categories(department_id, question_type):
         department_info = {'name': department_name}
         type_info = RCCMConfig.QUESTION_TYPES[question_type]
 
-        questions = load_questions()
-
-        # 指定された部門・問題種別の問題のみをフィルタリング
-        filtered_questions = [q for q in questions
-                              if q.get('department') == department_id and q.get('question_type') == question_type]
+        # カテゴリ別問題数（ウォームアップ済みであれば再集計しない）
+        warm_counts = get_warm_cache('department_category_counts')
+        if warm_counts is not None:
+            category_counts = warm_counts.get((department_id, question_type), {})
+        else:
+            questions = load_questions()
+            category_counts = {}
+            for q in questions:
+                if q.get('department') == department_id and q.get('question_type') == question_type:
+                    cat = q.get('category')
+                    if cat:
+                        category_counts[cat] = category_counts.get(cat, 0) + 1
 
         # カテゴリ情報を集計
         category_details = {}
-        for q in filtered_questions:
-            cat = q.get('category')
-            if cat:
-                if cat not in category_details:
-                    category_details[cat] = {
-                        'total_questions': 0,
-                        'total_answered': 0,
-                        'correct_count': 0,
-                        'accuracy': 0.0
-                    }
-                category_details[cat]['total_questions'] += 1
+        for cat, count in category_counts.items():
+            category_details[cat] = {
+                'total_questions': count,
+                'total_answered': 0,
+                'correct_count': 0,
+                'accuracy': 0.0
+            }
 
         # 統計情報を追加（部門・種別を考慮）
         cat_stats = session.get('category_stats', {})
@@ -6423,7 +6574,7 @@ def department_categories(department_id, question_type):
             question_type=type_info,
             category_details=category_details,
             progresses=progresses,
-            total_questions=len(filtered_questions)
+            total_questions=sum(category_counts.values())
         )
 
     except Exception as e:
@@ -6557,6 +6708,7 @@ def department_study(department):
 
 
 @app.route('/categories')
+@cached_response('page', vary_session=('selected_department',), personal_session=('category_stats',))
 def categories():
     """部門別問題選択画面（選択部門+共通のみ表示）"""
     try:
@@ -6616,508 +6768,77 @@ def categories():
 
     except Exception as e:
         logger.error(f"categories関数でエラー: {e}")
+        skip_response_cache()  # 一時的な障害の画面をキャッシュしない
         return render_template('error.html', error="カテゴリ表示中にエラーが発生しました。")
 
 
-@app.route('/review')
-def review_list():
-    """復習リスト表示（高度なSRSシステム対応版）"""
+@app.route('/api/data/export')
+@require_api_key
+def export_data():
+    """学習データのエクスポート"""
     try:
-        # 新しいSRSシステムからデータを取得（防御的プログラミング）
-        srs_data = session.get('advanced_srs', {})
-        if not isinstance(srs_data, dict):
-            logger.error(f"🚨 CRITICAL: advanced_srs is not a dict: {type(srs_data)}, value: {repr(srs_data)}")
-            srs_data = {}
-            session['advanced_srs'] = {}
-        
-        bookmarks = session.get('bookmarks', [])
-        if not isinstance(bookmarks, list):
-            logger.error(f"🚨 CRITICAL: bookmarks is not a list: {type(bookmarks)}, value: {repr(bookmarks)}")
-            bookmarks = []
-            session['bookmarks'] = []  # 互換性維持
-
-        # すべての復習対象問題を統合
-        all_review_ids = set()
-        all_review_ids.update(srs_data.keys())
-        all_review_ids.update(bookmarks)
-
-        if not all_review_ids:
-            # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
-            japanese_categories = get_japanese_categories()
-            departments = {}
-            for category in japanese_categories:
-                encoded_key = encode_japanese_category(category)
-                departments[encoded_key] = {'name': category}
-            
-            return render_template('review_enhanced.html',
-                                   message="まだ復習問題が登録されていません。問題を解いて間違えることで、科学的な復習システムが自動的に最適な学習計画を作成します。",
-                                   departments=departments,
-                                   srs_stats={
-                                       'total_questions': 0,
-                                       'due_now': 0,
-                                       'mastered': 0,
-                                       'in_progress': 0
-                                   })
-
-        # 問題データを読み込み
-        all_questions = load_questions()
-        questions_dict = {str(q.get('id')): q for q in all_questions}
+        session_id = session.get('session_id')
+        if not session_id:
+            return jsonify({'error': 'セッションが見つかりません'}), 400
 
-        # 復習問題の詳細情報を作成（SRSデータ統合）
-        review_questions = []
-        departments = set()
-        
-        # FIRE ULTRA SYNC IMPROVEMENT 3: 部門別復習 - 部門統計計算
-        department_stats = {}
+        if data_manager:
+            # ?format=ndjson|csv: 学習履歴を1行ずつストリーミング出力
+            stream_format = requested_stream_format()
+            if stream_format:
+                records = data_manager.iter_data_export(session_id, history_only=(stream_format == 'csv'))
+                first_record = next(records, None)
+                if first_record is None:
+                    return jsonify({'error': 'エクスポートデータが見つかりません'}), 404
+                return stream_records(itertools.chain([first_record], records), stream_format,
+                                      filename='rccm_learning_data',
+                                      fieldnames=data_manager.EXPORT_HISTORY_FIELDS)
 
-        # FIRE ULTRA SYNC IMPROVEMENT 1: 明確な進捗表示 - 今日復習すべき問題数計算
-        due_today_count = 0
-        for qid in all_review_ids:
-            srs_info = srs_data.get(qid, {})
-            next_review = srs_info.get('next_review', '')
-            if next_review:
-                try:
-                    from datetime import datetime
-                    review_date = datetime.fromisoformat(next_review.replace('Z', '+00:00'))
-                    if review_date <= datetime.now():
-                        due_today_count += 1
-                except (ValueError, TypeError, AttributeError) as e:
-                    # 日時解析エラーの場合は復習対象としてカウント
-                    logger.warning(f"Date parsing error in SRS due count: {e}")
-                    due_today_count += 1  # パースエラーの場合は復習対象としてカウント
-                    due_today_count += 1  # パースエラーの場合は復習対象としてカウント
+            export_data = data_manager.get_data_export(session_id)
+            if export_data:
+                return jsonify(export_data)
             else:
-                due_today_count += 1  # next_reviewが未設定の場合も復習対象
-        
-        # SRS統計計算
-        srs_stats = {
-            'total_questions': len(all_review_ids),
-            'due_now': due_today_count,
-            'mastered': 0,
-            'in_progress': 0,
-            'high_priority': 0
-        }
-
-        from datetime import datetime
-        now = datetime.now()
-
-        for qid in all_review_ids:
-            if qid in questions_dict:
-                question = questions_dict[qid]
-
-                # SRSデータを取得
-                srs_info = srs_data.get(qid, {})
-
-                # FIRE ULTRA SYNC IMPROVEMENT 2: 学習効率の可視化 - 次回復習日計算
-                next_review_str = srs_info.get('next_review', '')
-                days_until_review = 0
-                if next_review_str:
-                    try:
-                        from datetime import datetime
-                        next_review_date = datetime.fromisoformat(next_review_str.replace('Z', '+00:00'))
-                        days_until_review = (next_review_date.date() - now.date()).days
-                    except (ValueError, TypeError, AttributeError) as e:
-                        # 日時解析エラーの場合は今すぐ復習として設定
-                        logger.warning(f"Date parsing error in days until review: {e}")
-                        days_until_review = 0  # パースエラーの場合は今すぐ復習
-                        days_until_review = 0  # パースエラーの場合は今すぐ復習
-                        
-                # 基本情報
-                question_data = {
-                    'id': qid,
-                    'question': question.get('question', ''),
-                    'department': question.get('department', ''),
-                    'question_type': question.get('question_type', ''),
-                    'year': question.get('year', ''),
-                    'category': question.get('category', ''),
-                    # SRS情報
-                    'correct_count': srs_info.get('correct_count', 0),
-                    'wrong_count': srs_info.get('wrong_count', 0),
-                    'total_attempts': srs_info.get('total_attempts', 0),
-                    'difficulty_level': srs_info.get('difficulty_level', 5),
-                    'mastered': srs_info.get('mastered', False),
-                    'first_attempt': srs_info.get('first_attempt', ''),
-                    'last_attempt': srs_info.get('last_attempt', ''),
-                    'next_review': next_review_str,
-                    'days_until_review': days_until_review,  # FIRE IMPROVEMENT 2
-                    'interval_days': srs_info.get('interval_days', 1)
-                }
-
-                # 統計更新
-                if question_data['mastered']:
-                    srs_stats['mastered'] += 1
-                else:
-                    srs_stats['in_progress'] += 1
-
-                    # 復習期限チェック
-                    try:
-                        if question_data['next_review']:
-                            next_review = datetime.fromisoformat(question_data['next_review'])
-                            if next_review <= now:
-                                srs_stats['due_now'] += 1
-                        else:
-                            srs_stats['due_now'] += 1  # 未設定は即座に復習対象
-                    except ValueError:
-                        srs_stats['due_now'] += 1
-
-                    # 高優先度（間違いが多い）問題
-                    if question_data['wrong_count'] >= 2:
-                        srs_stats['high_priority'] += 1
-
-                # 部門情報と統計更新
-                dept_name = question_data.get('category', question_data.get('department', ''))
-                if dept_name:
-                    departments.add(dept_name)
-                    
-                    # FIRE IMPROVEMENT 3: 部門別統計更新
-                    if dept_name not in department_stats:
-                        department_stats[dept_name] = {'weak_count': 0, 'total_count': 0}
-                    
-                    department_stats[dept_name]['total_count'] += 1
-                    if not question_data['mastered'] and question_data['wrong_count'] > 0:
-                        department_stats[dept_name]['weak_count'] += 1
-
-                # 優先度計算（表示順序用）
-                if question_data['mastered']:
-                    priority = -1000  # マスター済みは最後
-                else:
-                    wrong_ratio = question_data['wrong_count'] / max(1, question_data['total_attempts'])
-                    overdue_bonus = 0
-                    try:
-                        if question_data['next_review']:
-                            next_review = datetime.fromisoformat(question_data['next_review'])
-                            days_overdue = max(0, (now - next_review).days)
-                            overdue_bonus = days_overdue * 10
-                    except ValueError:
-                        overdue_bonus = 100  # 日時エラーは高優先度
-
-                    priority = (wrong_ratio * 100) + overdue_bonus + question_data['difficulty_level']
-
-                question_data['priority'] = priority
-                review_questions.append(question_data)
-
-        # 優先度順でソート（マスター済み問題は最後）
-        review_questions.sort(key=lambda x: x['priority'], reverse=True)
-
-        # マスター済み問題とアクティブ問題を分離
-        active_questions = [q for q in review_questions if not q['mastered']]
-        mastered_questions = [q for q in review_questions if q['mastered']]
-
-        logger.info(f"復習リスト表示: 総計{len(review_questions)}問, "
-                    f"アクティブ{len(active_questions)}問, マスター済み{len(mastered_questions)}問")
-
-        return render_template('review_enhanced.html',
-                               questions=active_questions,
-                               mastered_questions=mastered_questions,
-                               total_count=len(active_questions),
-                               mastered_count=len(mastered_questions),
-                               due_today_count=due_today_count,  # FIRE IMPROVEMENT 1: 今日復習すべき問題数
-                               department_stats=department_stats,  # FIRE IMPROVEMENT 3: 部門別統計
-                               # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
-                               departments={encode_japanese_category(category): {'name': category} for category in get_japanese_categories()},
-                               srs_stats=srs_stats,
-                               show_srs_details=True)
+                return jsonify({'error': 'エクスポートデータが見つかりません'}), 404
+        else:
+            return jsonify({'error': 'データマネージャーが利用できません'}), 503
 
     except Exception as e:
-        logger.error(f"復習リスト表示エラー: {e}")
-        return render_template('error.html', error="復習リスト表示中にエラーが発生しました。")
+        logger.error(f"データエクスポートエラー: {e}")
+        return jsonify({'error': 'エクスポートに失敗しました'}), 500
 
 
-@app.route('/api/review/count')
-def api_review_count():
-    """復習問題数を取得（ウルトラシンク追加・ホーム画面表示用）"""
+@app.route('/api/cache/clear', methods=['POST'])
+def clear_cache():
+    """BOLT Redis統合 問題データキャッシュのクリア（CLAUDE.md準拠エラーハンドリング強化版）"""
     try:
-        # FIRE ULTRA SYNC FIX: 正しいセッションキーを使用
-        srs_data = session.get('advanced_srs', {})
-        bookmarks = session.get('bookmarks', [])
-
-        # 復習対象問題の数をカウント
-        review_count = 0
-        current_time = datetime.now()
-
-        # SRSデータからカウント
-        for question_id, data in srs_data.items():
-            if isinstance(data, dict):
-                # 次回復習日をチェック
-                next_review = data.get('next_review', '')
-                if next_review:
-                    try:
-                        review_date = datetime.fromisoformat(next_review.replace('Z', '+00:00'))
-                        if review_date <= current_time:
-                            review_count += 1
-                    except (ValueError, TypeError, AttributeError):
-                        # 日付パースエラーの場合は復習対象に含める
-                        review_count += 1
-                else:
-                    # next_reviewが設定されていない場合も復習対象
-                    review_count += 1
-                    
-        # ブックマークからもカウント（重複除去）
-        bookmark_ids = set(str(bid) for bid in bookmarks if bid)
-        srs_ids = set(str(sid) for sid in srs_data.keys() if sid)
-        additional_bookmarks = bookmark_ids - srs_ids
-        review_count += len(additional_bookmarks)
-
-        logger.info(f"復習問題数API呼び出し: {review_count}問")
-        return jsonify({'count': review_count, 'success': True})
-
+        # CLAUDE.md禁止事項：エラーメッセージの無視や隠蔽を避ける
+        
+        # BOLT Redis Cache Clear
+        if REDIS_CACHE_INTEGRATION:
+            redis_success = invalidate_cache()
+            if redis_success:
+                logger.info("BOLT Redis キャッシュクリア成功")
+            else:
+                logger.warning("WARNING Redis キャッシュクリア失敗")
+        
+        # 従来のキャッシュクリア
+        clear_questions_cache()
+        logger.info("問題データキャッシュをクリア")
+        
+        return jsonify({
+            'success': True,
+            'message': 'キャッシュをクリアしました（Redis + メモリキャッシュ）',
+            'redis_enabled': REDIS_CACHE_INTEGRATION
+        })
     except Exception as e:
-        logger.error(f"復習問題数取得エラー: {e}")
-        return jsonify({'count': 0, 'error': str(e), 'success': False})
-
-
-@app.route('/api/review/questions', methods=['POST'])
-def get_review_questions():
-    """復習リストの問題詳細を一括取得"""
-    try:
-        data = request.get_json()
-        question_ids = data.get('question_ids', [])
-
-        if not question_ids:
-            return jsonify({'questions': []})
-
-        questions = load_questions()
-        review_questions = []
-
-        for qid in question_ids:
-            question = next((q for q in questions if int(q.get('id', 0)) == int(qid)), None)
-            if question:
-                review_questions.append({
-                    'id': question.get('id'),
-                    'category': question.get('category'),
-                    'question': question.get('question')[:100] + '...' if len(question.get('question', '')) > 100 else question.get('question'),
-                    'difficulty': question.get('difficulty', '標準')
-                })
-
-        return jsonify({'questions': review_questions})
-
-    except Exception as e:
-        logger.error(f"復習問題取得エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/api/review/remove', methods=['POST'])
-def remove_from_review():
-    """復習リストから問題を削除"""
-    try:
-        data = request.get_json()
-        question_id = str(data.get('question_id', ''))
-
-        if not question_id:
-            return jsonify({'success': False, 'error': '問題IDが指定されていません'})
-
-        bookmarks = session.get('bookmarks', [])
-        if question_id in bookmarks:
-            bookmarks.remove(question_id)
-            session['bookmarks'] = bookmarks
-            session.modified = True
-            logger.info(f"復習リストから削除: 問題ID {question_id}")
-            return jsonify({'success': True})
-        else:
-            return jsonify({'success': False, 'error': '復習リストに存在しません'})
-
-    except Exception as e:
-        logger.error(f"復習問題削除エラー: {e}")
-        return jsonify({'success': False, 'error': str(e)})
-
-
-@app.route('/api/review/bulk_remove', methods=['POST'])
-def bulk_remove_from_review():
-    """復習リストから複数問題を削除"""
-    try:
-        data = request.get_json()
-        question_ids = data.get('question_ids', [])
-
-        if not question_ids:
-            return jsonify({'success': False, 'error': '問題IDが指定されていません'})
-
-        bookmarks = session.get('bookmarks', [])
-        removed_count = 0
-
-        for qid in question_ids:
-            qid_str = str(qid)
-            if qid_str in bookmarks:
-                bookmarks.remove(qid_str)
-                removed_count += 1
-
-        session['bookmarks'] = bookmarks
-        session.modified = True
-
-        logger.info(f"復習リストから一括削除: {removed_count}問")
-        return jsonify({'success': True, 'removed_count': removed_count})
-
-    except Exception as e:
-        logger.error(f"復習問題一括削除エラー: {e}")
-        return jsonify({'success': False, 'error': str(e)})
-
-
-@app.route('/srs_stats')
-def srs_statistics():
-    """SRS学習統計の表示（エラー処理強化版）"""
-    try:
-        # セッションデータの安全な取得
-        srs_data = session.get('srs_data', {})
-
-        # 基本統計の初期化
-        stats = {
-            'total_learned': 0,
-            'mastered': 0,
-            'review_needed': 0,
-            'learning': 0,
-            'error_data': 0
-        }
-
-        # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準の今日日付取得
-        today = get_utc_now().date()
-        processed_data = {}
-
-        # SRSデータの安全な処理
-        for question_id, data in srs_data.items():
-            try:
-                # データが辞書形式かチェック
-                if not isinstance(data, dict):
-                    logger.warning(f"SRS統計: 無効なデータ形式 ID={question_id}, type={type(data)}")
-                    stats['error_data'] += 1
-                    continue
-
-                # レベルと日時の安全な取得
-                level = int(data.get('level', 0))
-                next_review_str = data.get('next_review')
-
-                if not next_review_str:
-                    # 復習日が設定されていない場合
-                    stats['learning'] += 1
-                    processed_data[question_id] = {
-                        'level': level,
-                        'status': '学習中',
-                        'next_review': '未設定'
-                    }
-                    continue
-
-                # 日時の解析
-                try:
-                    next_review = datetime.fromisoformat(next_review_str).date()
-                except (ValueError, TypeError):
-                    # 日時解析失敗時のフォールバック
-                    stats['learning'] += 1
-                    processed_data[question_id] = {
-                        'level': level,
-                        'status': '学習中',
-                        'next_review': '日時エラー'
-                    }
-                    continue
-
-                # レベルと復習日に基づく分類
-                if level >= 5:
-                    stats['mastered'] += 1
-                    status = 'マスター'
-                elif next_review <= today:
-                    stats['review_needed'] += 1
-                    status = '復習必要'
-                else:
-                    stats['learning'] += 1
-                    status = '学習中'
-
-                processed_data[question_id] = {
-                    'level': level,
-                    'status': status,
-                    'next_review': next_review.isoformat()
-                }
-
-            except Exception as item_error:
-                logger.warning(f"SRS統計処理エラー ID={question_id}: {item_error}")
-                stats['error_data'] += 1
-
-        # 合計学習数の更新
-        stats['total_learned'] = stats['mastered'] + stats['review_needed'] + stats['learning']
-
-        # 学習進捗計算
-        progress_percentage = 0
-        if stats['total_learned'] > 0:
-            progress_percentage = round((stats['mastered'] / stats['total_learned']) * 100, 1)
-
-        stats['progress_percentage'] = progress_percentage
-
-        logger.info(f"SRS統計生成完了: 総計={stats['total_learned']}, マスター={stats['mastered']}, 復習必要={stats['review_needed']}")
-
-        return render_template('srs_stats.html',
-                               stats=stats,
-                               srs_data=processed_data,
-                               last_updated=datetime.now().strftime('%Y-%m-%d %H:%M'))
-
-    except Exception as e:
-        logger.error(f"SRS統計表示エラー: {e}")
-        # エラー時のフォールバック表示
-        fallback_stats = {
-            'total_learned': 0,
-            'mastered': 0,
-            'review_needed': 0,
-            'learning': 0,
-            'progress_percentage': 0,
-            'error_data': 0
-        }
-        return render_template('srs_stats.html',
-                               stats=fallback_stats,
-                               srs_data={},
-                               error_message="学習統計の読み込み中にエラーが発生しました。問題を続けることで統計が蓄積されます。")
-
-
-@app.route('/api/data/export')
-@require_api_key
-def export_data():
-    """学習データのエクスポート"""
-    try:
-        session_id = session.get('session_id')
-        if not session_id:
-            return jsonify({'error': 'セッションが見つかりません'}), 400
-
-        if data_manager:
-            export_data = data_manager.get_data_export(session_id)
-            if export_data:
-                return jsonify(export_data)
-            else:
-                return jsonify({'error': 'エクスポートデータが見つかりません'}), 404
-        else:
-            return jsonify({'error': 'データマネージャーが利用できません'}), 503
-
-    except Exception as e:
-        logger.error(f"データエクスポートエラー: {e}")
-        return jsonify({'error': 'エクスポートに失敗しました'}), 500
-
-
-@app.route('/api/cache/clear', methods=['POST'])
-def clear_cache():
-    """BOLT Redis統合 問題データキャッシュのクリア（CLAUDE.md準拠エラーハンドリング強化版）"""
-    try:
-        # CLAUDE.md禁止事項：エラーメッセージの無視や隠蔽を避ける
-        
-        # BOLT Redis Cache Clear
-        if REDIS_CACHE_INTEGRATION:
-            redis_success = invalidate_cache()
-            if redis_success:
-                logger.info("BOLT Redis キャッシュクリア成功")
-            else:
-                logger.warning("WARNING Redis キャッシュクリア失敗")
-        
-        # 従来のキャッシュクリア
-        clear_questions_cache()
-        logger.info("問題データキャッシュをクリア")
-        
-        return jsonify({
-            'success': True,
-            'message': 'キャッシュをクリアしました（Redis + メモリキャッシュ）',
-            'redis_enabled': REDIS_CACHE_INTEGRATION
-        })
-    except Exception as e:
-        # CLAUDE.md準拠：根本原因を解決せずに症状のみを隠さない
-        logger.error(f"キャッシュクリアエラー: {e}")
-        import traceback
-        traceback.print_exc()  # デバッグ用詳細ログ
-        return jsonify({
-            'success': False,
-            'error': 'キャッシュクリアに失敗しました',
-            'details': str(e) if app.debug else None
-        }), 500
+        # CLAUDE.md準拠：根本原因を解決せずに症状のみを隠さない
+        logger.error(f"キャッシュクリアエラー: {e}")
+        import traceback
+        traceback.print_exc()  # デバッグ用詳細ログ
+        return jsonify({
+            'success': False,
+            'error': 'キャッシュクリアに失敗しました',
+            'details': str(e) if app.debug else None
+        }), 500
 
 
 @app.route('/api/cache/stats', methods=['GET'])
@@ -7208,6 +6929,7 @@ def force_reset():
 
 
 @app.route('/help')
+@cached_response('page', vary_session=('quiz_settings',))
 def help_page():
     """ヘルプページ"""
     current_questions = session.get('quiz_settings', {}).get('questions_per_session', 10)
@@ -7246,3772 +6968,1160 @@ def settings_page():
                            available_options=[10, 20, 30])
 
 
-@app.route('/debug')
-def debug_page():
-    """デバッグページ"""
-    import json
-    session_data = dict(session)
-    session_data_json = json.dumps(session_data, indent=2, default=str)
-    return render_template('debug.html', session_data=session_data_json)
-
-
-@app.route('/api/bookmark', methods=['POST'])
-def bookmark_question():
-    """問題のブックマーク機能"""
+@app.route('/ai_analysis')
+def ai_analysis():
+    """AI弱点分析画面（部門別対応版）"""
     try:
-        data = request.get_json()
-        question_id = data.get('question_id')
+        # 部門フィルタを取得
+        department_filter = request.args.get('department')
 
-        if not question_id:
-            return jsonify({'success': False, 'error': '問題IDが指定されていません'}), 400
+        # AI分析実行（部門別）
+        analysis_result = ai_analyzer.analyze_weak_areas(session, department_filter)
 
-        # セッションにブックマークリストがなければ作成
-        if 'bookmarks' not in session:
-            session['bookmarks'] = []
+        # 推奨学習モード取得
+        recommended_mode = adaptive_engine.get_learning_mode_recommendation(session, analysis_result)
 
-        # 問題IDがリストになければ追加
-        if question_id not in session['bookmarks']:
-            session['bookmarks'].append(question_id)
-            session.modified = True  # セッションの変更を保存するために必要
-            logger.info(f"問題ID {question_id} をブックマークに追加しました")
+        # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
+        available_departments = {}
+        history = session.get('history', [])
+        valid_categories = get_japanese_categories()
+        
+        for entry in history:
+            dept = entry.get('department')
+            if dept:
+                dept_name = convert_legacy_english_id_to_japanese(dept)
+                if validate_japanese_category(dept_name):
+                    if dept not in available_departments:
+                        available_departments[dept] = {'count': 0, 'name': dept_name}
+                    available_departments[dept]['count'] += 1
 
-        return jsonify({'success': True, 'message': '問題をブックマークしました'})
+        return render_template(
+            'ai_analysis.html',
+            analysis=analysis_result,
+            recommended_mode=recommended_mode,
+            learning_modes=adaptive_engine.learning_modes,
+            available_departments=available_departments,
+            current_department=department_filter,
+            # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
+            departments={encode_japanese_category(category): {'name': category} for category in get_japanese_categories()}
+        )
 
     except Exception as e:
-        logger.error(f"ブックマーク機能でエラー: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
+        logger.error(f"AI分析エラー: {e}")
+        return render_template('error.html', error="AI分析の表示中にエラーが発生しました。")
 
 
-@app.route('/api/bookmarks', methods=['GET'])
-def get_bookmarks():
-    """ブックマークされた問題IDのリストを返却"""
+@app.route('/adaptive_questions')
+def adaptive_questions():
+    """アダプティブ問題練習モード（部門別対応版）"""
     try:
-        # セッションからブックマークリストを取得。なければ空のリストを返す。
-        bookmarks = session.get('bookmarks', [])
-        return jsonify({'bookmark_ids': bookmarks})
+        learning_mode = request.args.get('mode', 'balanced')
+        # ユーザー設定に基づく問題数を取得
+        session_size = get_user_session_size(session)
+        department = request.args.get('department', session.get('selected_department', ''))
 
-    except Exception as e:
-        logger.error(f"ブックマークリスト取得エラー: {e}")
-        return jsonify({'error': str(e)}), 500
+        all_questions = load_questions()
+        if not all_questions:
+            return render_template('error.html', error="問題データが存在しません。")
 
+        # AI分析実行（部門フィルタ適用）
+        ai_analysis = ai_analyzer.analyze_weak_areas(session, department)
 
-@app.route('/bookmark', methods=['POST'])
-def add_bookmark():
-    """フォーム形式でのブックマーク追加"""
-    try:
-        qid = request.form.get('qid')
+        # アダプティブ問題選択（部門対応）
+        adaptive_questions = adaptive_engine.get_adaptive_questions(
+            session, all_questions, ai_analysis, session_size, learning_mode, department
+        )
 
-        if not qid:
-            logger.warning("ブックマーク追加: 問題IDが指定されていません")
-            return redirect(request.referrer or '/exam')
+        if not adaptive_questions:
+            return render_template('error.html', error="選択可能な問題がありません。")
 
-        # セッションにブックマークリストがなければ作成
-        if 'bookmarks' not in session:
-            session['bookmarks'] = []
+        # アダプティブセッション開始（部門情報も保存）
+        question_ids = [int(q.get('id', 0)) for q in adaptive_questions]
+        session['exam_question_ids'] = question_ids
+        session['exam_current'] = 0
 
-        # 問題IDがリストになければ追加
-        if qid not in session['bookmarks']:
-            session['bookmarks'].append(qid)
-            session.modified = True
-            logger.info(f"問題ID {qid} を復習リストに追加しました")
+        # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
+        category_name = 'AI適応学習'
+        if department:
+            dept_name = convert_legacy_english_id_to_japanese(department)
+            category_name = f'AI適応学習 ({dept_name})'
+
+        session['exam_category'] = category_name
+        session['adaptive_mode'] = learning_mode
+        if department:
+            session['selected_department'] = department
+        session.modified = True
+
+        logger.info(f"アダプティブ問題開始: {len(question_ids)}問, モード: {learning_mode}, 部門: {department or '全体'}")
 
-        return redirect(request.referrer or '/exam')
+        # 最初の問題を表示
+        return redirect(url_for('exam'))
 
     except Exception as e:
-        logger.error(f"ブックマーク追加エラー: {e}")
-        return redirect(request.referrer or '/exam')
+        logger.error(f"アダプティブ問題エラー: {e}")
+        return render_template('error.html', error="アダプティブ問題の開始中にエラーが発生しました。")
 
 
-@app.route('/bookmarks')
-def bookmarks_page():
-    """復習リストページ（HTMLページ）"""
+@app.route('/integrated_learning')
+def integrated_learning():
+    """4-1基礎と4-2専門の連携学習モード"""
     try:
-        # 復習リストから問題IDを取得
-        bookmarks = session.get('bookmarks', [])
+        # パラメータ取得
+        learning_mode = request.args.get('mode', 'basic_to_specialist')
+        # ユーザー設定に基づく問題数を取得
+        session_size = get_user_session_size(session)
+        department = request.args.get('department', session.get('selected_department', ''))
 
-        if not bookmarks:
-            return render_template('bookmarks.html',
-                                   questions=[],
-                                   total_count=0,
-                                   message="まだ復習問題が登録されていません。")
+        # 連携学習モードの検証
+        if learning_mode not in ['basic_to_specialist', 'foundation_reinforced']:
+            learning_mode = 'basic_to_specialist'
 
-        # 問題データを読み込み
         all_questions = load_questions()
-        questions = []
-
-        # ブックマークされた問題の詳細情報を取得
-        for qid in bookmarks:
-            question = next((q for q in all_questions if str(q.get('id', '')) == str(qid)), None)
-            if question:
-                # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
-                dept_key = question.get('department', '')
-                dept_name = ''
-                if dept_key:
-                    dept_name = convert_legacy_english_id_to_japanese(dept_key)
-
-                questions.append({
-                    'id': question.get('id'),
-                    'question': question.get('question', '')[:100] + '...' if len(question.get('question', '')) > 100 else question.get('question', ''),
-                    'category': question.get('category', ''),
-                    'department_name': dept_name,
-                    'year': question.get('year'),
-                    'question_type': question.get('question_type', '')
-                })
+        if not all_questions:
+            return render_template('error.html', error="問題データが存在しません。")
 
-        return render_template('bookmarks.html',
-                               questions=questions,
-                               total_count=len(questions))
+        # 基礎理解度を事前評価
+        foundation_mastery = adaptive_engine._assess_foundation_mastery(session, department)
 
-    except Exception as e:
-        logger.error(f"復習リストページエラー: {e}")
-        return render_template('error.html', error="復習リストの表示中にエラーが発生しました。")
+        # AI分析実行（部門フィルタ適用）
+        ai_analysis = ai_analyzer.analyze_weak_areas(session, department)
 
+        # 連携学習用問題選択
+        integrated_questions = adaptive_engine.get_adaptive_questions(
+            session, all_questions, ai_analysis, session_size, learning_mode, department
+        )
 
-@app.route('/api/bookmark', methods=['DELETE'])
-def remove_bookmark():
-    """復習リストから問題を除外"""
-    try:
-        data = request.get_json()
-        question_id = data.get('question_id')
+        if not integrated_questions:
+            return render_template('error.html', error="選択可能な問題がありません。")
 
-        if not question_id:
-            return jsonify({'success': False, 'error': '問題IDが指定されていません'}), 400
+        # 連携学習セッション開始
+        question_ids = [int(q.get('id', 0)) for q in integrated_questions]
+        session['exam_question_ids'] = question_ids
+        session['exam_current'] = 0
 
-        # セッションから復習リストを取得
-        bookmarks = session.get('bookmarks', [])
+        # カテゴリ名設定
+        mode_names = {
+            'basic_to_specialist': '基礎→専門連携学習',
+            'foundation_reinforced': '基礎強化学習'
+        }
+        category_name = mode_names.get(learning_mode, '連携学習')
 
-        # リストから除外
-        if question_id in bookmarks:
-            bookmarks.remove(question_id)
-            session['bookmarks'] = bookmarks
-            session.modified = True
-            logger.info(f"復習リストから除外: 問題ID {question_id}")
-            return jsonify({'success': True, 'message': '復習リストから除外しました'})
-        else:
-            return jsonify({'success': False, 'error': '指定された問題は復習リストに登録されていません'}), 404
+        # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
+        if department:
+            dept_name = convert_legacy_english_id_to_japanese(department)
+            category_name = f'{category_name} ({dept_name})'
 
-    except Exception as e:
-        logger.error(f"復習除外エラー: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
+        session['exam_category'] = category_name
+        session['adaptive_mode'] = learning_mode
+        session['foundation_mastery'] = foundation_mastery
+        if department:
+            session['selected_department'] = department
+        session.modified = True
 
+        logger.info(f"連携学習開始: {len(question_ids)}問, モード: {learning_mode}, 部門: {department or '全体'}, 基礎習熟度: {foundation_mastery:.2f}")
 
-@app.route('/exam/review')
-def review_questions():
-    """FIRE ULTRA堅牢な高度SRSシステム復習問題練習（ウルトラシンク対応）"""
-    try:
-        # FIRE CRITICAL: 包括的エラーハンドリング
-        logger.info("=== 復習開始処理開始 ===")
-
-        # 問題データロード（エラーハンドリング強化）
-        try:
-            # データディレクトリの設定
-            data_dir = 'data'
-            all_questions = emergency_load_all_questions()  # EMERGENCY FIX
-            if not all_questions:
-                logger.error("問題データが空です")
-                return render_template('error.html',
-                                       error="問題データが読み込めませんでした。システム管理者に連絡してください。",
-                                       error_type="data_load_error")
-        except Exception as load_error:
-            logger.error(f"問題データロードエラー: {load_error}")
-            return render_template('error.html',
-                                   error="問題データの読み込み中にエラーが発生しました。",
-                                   error_type="data_load_exception")
-
-        # FIRE ULTRA堅牢: 復習対象問題を統合取得（安全性強化・ウルトラシンク対応）
-        try:
-            srs_data = session.get('advanced_srs', {})
-            bookmarks = session.get('bookmarks', [])
-
-            # データ型チェック（ウルトラシンク対応）
-            if not isinstance(srs_data, dict):
-                logger.warning(f"SRSデータが辞書型ではありません: {type(srs_data)} - 初期化")
-                srs_data = {}
-            if not isinstance(bookmarks, list):
-                logger.warning(f"ブックマークがリスト型ではありません: {type(bookmarks)} - 初期化")
-                bookmarks = []
-
-            # FIRE ULTRA堅牢: SRSデータの詳細検証と修復
-            valid_srs_data = {}
-            for qid, srs_info in srs_data.items():
-                try:
-                    # SRS情報の型チェック
-                    if not isinstance(srs_info, dict):
-                        logger.warning(f"SRS情報が無効な型: 問題ID {qid}, 型: {type(srs_info)}")
-                        continue
-
-                    # 必須フィールドの存在チェック（柔軟性向上）
-                    essential_fields = ['wrong_count', 'correct_count']
-                    if all(field in srs_info for field in essential_fields):
-                        # 数値の妥当性チェックとデフォルト値補完
-                        wrong_count = int(srs_info.get('wrong_count', 0))
-                        correct_count = int(srs_info.get('correct_count', 0))
-                        total_attempts = int(srs_info.get('total_attempts', wrong_count + correct_count))
-                        
-                        if wrong_count >= 0 and correct_count >= 0:
-                            # 不足フィールドを補完
-                            srs_info['total_attempts'] = total_attempts
-                            valid_srs_data[qid] = srs_info
-                    else:
-                        logger.warning(f"SRS情報に必須フィールドが不足: 問題ID {qid}, フィールド: {srs_info.keys()}")
-                except (ValueError, TypeError) as field_error:
-                    logger.warning(f"SRS情報の数値変換エラー: 問題ID {qid}, エラー: {field_error}")
-                    continue
-
-            logger.info(f"SRSデータ検証: 元データ{len(srs_data)}問 → 有効データ{len(valid_srs_data)}問")
-            srs_data = valid_srs_data
-
-            # FIRE ULTRA堅牢: ブックマークデータの詳細検証と修復
-            valid_bookmarks = []
-            for bookmark in bookmarks:
-                try:
-                    # ブックマークの型チェック（文字列または数値）
-                    if isinstance(bookmark, (str, int)):
-                        bookmark_str = str(bookmark).strip()
-                        if bookmark_str and bookmark_str.isdigit():
-                            valid_bookmarks.append(bookmark_str)
-                    else:
-                        logger.warning(f"ブックマークが無効な型: {bookmark}, 型: {type(bookmark)}")
-                except Exception as bookmark_error:
-                    logger.warning(f"ブックマーク処理エラー: {bookmark}, エラー: {bookmark_error}")
-                    continue
+        # 最初の問題を表示
+        return redirect(url_for('exam'))
 
-            logger.info(f"ブックマーク検証: 元データ{len(bookmarks)}問 → 有効データ{len(valid_bookmarks)}問")
-            bookmarks = valid_bookmarks
+    except Exception as e:
+        logger.error(f"連携学習エラー: {e}")
+        return render_template('error.html', error="連携学習の開始中にエラーが発生しました。")
 
-            # すべての復習対象問題IDを統合（重複除去）
-            all_review_ids = set()
 
-            # SRSデータから取得（文字列に変換してから統合）
-            for qid in srs_data.keys():
-                if qid and str(qid).strip():  # 空文字や None をスキップ
-                    all_review_ids.add(str(qid))
+@app.route('/integrated_learning_selection')
+def integrated_learning_selection():
+    """連携学習モード選択画面"""
+    try:
+        department = request.args.get('department', session.get('selected_department', ''))
 
-            # ブックマークから取得（文字列に変換してから統合）
-            for qid in bookmarks:
-                if qid and str(qid).strip():  # 空文字や None をスキップ
-                    all_review_ids.add(str(qid))
+        # 現在の基礎理解度を評価
+        foundation_mastery = adaptive_engine._assess_foundation_mastery(session, department)
 
-            # リストに変換
-            review_question_ids = list(all_review_ids)
+        # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
+        departments = {encode_japanese_category(category): {'name': category} for category in get_japanese_categories()}
+        department_patterns = adaptive_engine.department_learning_patterns
 
-            logger.info(f"復習対象問題統合: SRS={len(srs_data)}問, ブックマーク={len(bookmarks)}問, 統合後={len(review_question_ids)}問")
+        return render_template(
+            'integrated_learning_selection.html',
+            foundation_mastery=foundation_mastery,
+            department=department,
+            departments=departments,
+            department_patterns=department_patterns,
+            title='連携学習モード選択'
+        )
 
-        except Exception as integration_error:
-            logger.error(f"復習データ統合エラー: {integration_error}")
-            return render_template('error.html',
-                                   error="復習データの処理中にエラーが発生しました。",
-                                   error_type="data_integration_error")
-
-        if not review_question_ids:
-            # SRSデータがない場合の案内メッセージ
-            srs_data = session.get('advanced_srs', {})
-            if not srs_data:
-                return render_template('error.html',
-                                       error="復習リストが空です。まず問題を解いて間違えることで、科学的な復習システムが学習を開始します。",
-                                       error_type="no_srs_data")
-            else:
-                return render_template('error.html',
-                                       error="現在復習が必要な問題がありません。素晴らしい！新しい問題に挑戦するか、時間が経ってから復習してください。",
-                                       error_type="all_mastered")
+    except Exception as e:
+        logger.error(f"連携学習選択画面エラー: {e}")
+        return render_template('error.html', error="連携学習選択画面の表示中にエラーが発生しました。")
 
-        # FIRE CRITICAL: 問題データマッチングと弱点スコア計算（ウルトラシンク対応）
-        try:
-            # 問題IDから実際の問題データを取得（安全性強化）
-            questions_dict = {}
-            for q in all_questions:
-                try:
-                    q_id = str(q.get('id', ''))
-                    if q_id and q_id.strip():  # 空文字チェック
-                        questions_dict[q_id] = q
-                except Exception as q_parse_error:
-                    logger.warning(f"問題ID変換エラー: {q_parse_error}, question={q}")
-                    continue
 
-            logger.info(f"問題辞書作成完了: {len(questions_dict)}問")
+@app.route('/learner_insights')
+def learner_insights():
+    """学習者インサイト画面（動的難易度制御情報を含む）"""
+    try:
+        department = request.args.get('department', session.get('selected_department', ''))
 
-            review_questions_with_score = []
-            successful_matches = 0
-            failed_matches = 0
+        # 学習者インサイト取得
+        insights = adaptive_engine.get_learner_insights(session, department)
 
-            for qid in review_question_ids:
-                try:
-                    if qid in questions_dict:
-                        question = questions_dict[qid]
+        # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
+        departments = {encode_japanese_category(category): {'name': category} for category in get_japanese_categories()}
 
-                        # 弱点スコア計算（安全性強化）
-                        try:
-                            srs_info = srs_data.get(qid, {})
-
-                            # 数値データの安全な取得
-                            wrong_count = max(0, int(srs_info.get('wrong_count', 0)))
-                            total_attempts = max(1, int(srs_info.get('total_attempts', 1)))
-                            difficulty_level = max(0, float(srs_info.get('difficulty_level', 5)))
-
-                            # 復習期限チェック（エラーハンドリング強化）
-                            overdue_bonus = 0
-                            next_review = srs_info.get('next_review', '')
-                            if next_review:
-                                try:
-                                    from datetime import datetime
-                                    next_review_date = datetime.fromisoformat(next_review)
-                                    days_overdue = max(0, (datetime.now() - next_review_date).days)
-                                    overdue_bonus = min(50, days_overdue * 2)  # 最大50に制限
-                                except Exception as date_error:
-                                    logger.debug(f"日付解析エラー（問題ID: {qid}）: {date_error}")
-                                    overdue_bonus = 5  # デフォルト値
-
-                            # FIRE ULTRA SYNC PRECISION FIX: 弱点スコア計算の精度保証（オーバーフロー防止）
-                            error_rate_decimal = Decimal(str(wrong_count)) / Decimal(str(total_attempts))
-                            # FIRE ULTRA SYNC FIX: 未使用変数削除済み
-                            
-                            weakness_decimal = (error_rate_decimal * Decimal('100')) + Decimal(str(difficulty_level)) + Decimal(str(overdue_bonus))
-                            weakness_score = float(min(Decimal('1000'), weakness_decimal.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)))
-
-                            review_questions_with_score.append({
-                                'question': question,
-                                'weakness_score': weakness_score,
-                                'wrong_count': wrong_count,
-                                'total_attempts': total_attempts,
-                                'overdue_bonus': overdue_bonus
-                            })
+        return render_template(
+            'learner_insights.html',
+            insights=insights,
+            department=department,
+            departments=departments,
+            title='学習者レベル・インサイト'
+        )
 
-                            successful_matches += 1
-
-                        except Exception as score_error:
-                            logger.warning(f"弱点スコア計算エラー（問題ID: {qid}）: {score_error}")
-                            # エラーが発生した問題もデフォルトスコアで追加
-                            review_questions_with_score.append({
-                                'question': question,
-                                'weakness_score': 50,  # デフォルトスコア
-                                'wrong_count': 1,
-                                'total_attempts': 1,
-                                'overdue_bonus': 0
-                            })
-                            successful_matches += 1
-                    else:
-                        failed_matches += 1
-                        logger.debug(f"問題IDが見つかりません: {qid}")
+    except Exception as e:
+        logger.error(f"学習者インサイト画面エラー: {e}")
+        return render_template('error.html', error="学習者インサイト画面の表示中にエラーが発生しました。")
 
-                except Exception as match_error:
-                    logger.warning(f"問題マッチングエラー（ID: {qid}）: {match_error}")
-                    failed_matches += 1
-                    continue
 
-            logger.info(f"問題マッチング結果: 成功={successful_matches}問, 失敗={failed_matches}問")
+@app.route('/api/difficulty/status')
+@conditional_get(('session',))
+def api_difficulty_status():
+    """動的難易度制御状態のAPI"""
+    try:
+        department = request.args.get('department')
 
-        except Exception as processing_error:
-            logger.error(f"弱点スコア処理の重大エラー: {processing_error}")
-            return render_template('error.html',
-                                   error="復習問題の評価中にエラーが発生しました。",
-                                   error_type="score_processing_error")
+        # 学習者レベル評価
+        from difficulty_controller import difficulty_controller
+        learner_assessment = difficulty_controller.assess_learner_level(session, department)
 
-        if not review_questions_with_score:
-            return render_template('error.html',
-                                   error="復習対象の問題が見つかりません。新しい問題を解いて間違えることで復習リストが作成されます。",
-                                   error_type="no_filtered_questions")
+        # 最近のパフォーマンス
+        recent_history = session.get('history', [])[-10:]
+        if recent_history:
+            recent_performance = difficulty_controller._analyze_current_performance(recent_history)
+        else:
+            recent_performance = {'accuracy': 0, 'avg_time': 0, 'sample_size': 0, 'trend': 'unknown'}
 
-        # FIRE ULTRA CRITICAL: 最終問題選択とセッション設定（ウルトラシンク対応）
-        try:
-            # FIRE ULTRA堅牢: 弱点スコア順でソート（安全なソート・完全エラーハンドリング）
-            try:
-                # 各問題の弱点スコアが数値であることを確認
-                for item in review_questions_with_score:
-                    if not isinstance(item.get('weakness_score'), (int, float)):
-                        item['weakness_score'] = 50.0  # デフォルトスコア
-
-                review_questions_with_score.sort(key=lambda x: float(x.get('weakness_score', 0)), reverse=True)
-                logger.info(f"弱点スコア順ソート完了: {len(review_questions_with_score)}問")
-            except Exception as sort_error:
-                logger.warning(f"ソートエラー（デフォルト順序を使用）: {sort_error}")
-                # ソートに失敗してもそのまま続行
-
-            # FIRE ULTRA CRITICAL: セッション問題数の動的決定（最低保証とユーザー要求バランス）
-            available_questions = len(review_questions_with_score)
-            min_session_size = min(3, available_questions)  # 最低3問、または利用可能問題数
-            target_session_size = get_user_session_size(session)  # ユーザー設定を尊重（10/20/30問）
-            session_size = min(target_session_size, available_questions)  # 利用可能問題数に制限
-
-            if session_size < min_session_size:
-                logger.error(f"復習問題が不足: 利用可能{available_questions}問, 最低必要{min_session_size}問")
-                return render_template('error.html',
-                                       error=f"復習問題が不足しています（{available_questions}問）。もう少し問題を解いてから復習してください。",
-                                       error_type="insufficient_review_questions")
-
-            logger.info(f"復習セッション問題数決定: 理想{target_session_size}問 → 実際{session_size}問（利用可能{available_questions}問）")
-
-            selected_review_items = review_questions_with_score[:session_size]
-            review_questions = []
-
-            # 問題データの安全な抽出
-            for item in selected_review_items:
-                try:
-                    question = item.get('question')
-                    if question and question.get('id'):
-                        review_questions.append(question)
-                except Exception as extract_error:
-                    logger.warning(f"問題抽出エラー: {extract_error}")
-                    continue
-
-            if not review_questions:
-                logger.error("最終的に有効な復習問題が0問になりました")
-                return render_template('error.html',
-                                       error="復習問題の準備中に問題が発生しました。しばらく待ってから再度お試しください。",
-                                       error_type="final_question_preparation_error")
-
-            logger.info(f"復習問題最終選択: 全{len(review_questions_with_score)}問中{len(review_questions)}問を弱点スコア順で選択")
-
-            # 上位問題のスコア情報をログ出力（安全な範囲）
-            for i, item in enumerate(selected_review_items[:min(5, len(selected_review_items))]):
-                try:
-                    q_id = item.get('question', {}).get('id', 'unknown')
-                    score = item.get('weakness_score', 0)
-                    wrong = item.get('wrong_count', 0)
-                    total = item.get('total_attempts', 1)
-                    logger.info(f"  {i+1}位: 問題ID{q_id}, 弱点スコア{score:.1f}, 間違い{wrong}/{total}")
-                except Exception as log_error:
-                    logger.debug(f"ログ出力エラー: {log_error}")
-
-            # セッションに安全に設定
-            try:
-                category_name = f'復習問題（弱点優先{len(review_questions)}問）'
+        # 動的セッション設定
+        dynamic_config = session.get('dynamic_session_config', {})
 
-                # 問題IDの安全な変換
-                question_ids = []
-                for q in review_questions:
-                    try:
-                        q_id = int(q.get('id', 0))
-                        if q_id > 0:  # 有効なIDのみ追加
-                            question_ids.append(q_id)
-                    except (ValueError, TypeError) as id_error:
-                        logger.warning(f"問題ID変換エラー: {id_error}, question={q}")
-                        continue
+        return jsonify({
+            'learner_level': learner_assessment['overall_level'],
+            'level_name': learner_assessment['level_name'],
+            'confidence': learner_assessment['confidence'],
+            'recent_performance': recent_performance,
+            'dynamic_config': dynamic_config,
+            'recommended_difficulty': learner_assessment['recommended_difficulty'],
+            'department_factor': learner_assessment.get('department_factor', 1.0),
+            'next_adjustment_threshold': learner_assessment.get('next_adjustment_threshold', 20),
+            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
+            'timestamp': format_utc_to_iso()
+        })
 
-                if not question_ids:
-                    logger.error("有効な問題IDが0個になりました")
-                    return render_template('error.html',
-                                           error="復習問題IDの処理中にエラーが発生しました。",
-                                           error_type="question_id_processing_error")
+    except Exception as e:
+        logger.error(f"難易度制御状態API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
 
-                # FIRE ULTRA堅牢: セッション変数を安全に設定（ウルトラシンク対応・完全検証）
-                try:
-                    # セッションクリア（競合防止）
-                    session.pop('exam_question_ids', None)
-                    session.pop('exam_current', None)
-                    session.pop('exam_category', None)
-                    session.pop('selected_question_type', None)
-                    session.pop('department', None)
-                    session.pop('selected_department', None)
 
-                    # 新しいセッション設定
-                    session['exam_question_ids'] = question_ids
-                    session['exam_current'] = 0
-                    session['exam_category'] = category_name
-                    session['selected_question_type'] = 'review'  # 復習専用タイプ
-                    session['department'] = ''  # 復習では部門指定なし
-                    session['selected_department'] = ''  # セッション再構築用（復習では部門なし）
-                    session.modified = True
-                    
-                    # FIRE ULTRA SYNC FIX: セッション書き込み確認
-                    logger.info(f"復習セッション設定完了: selected_question_type={session.get('selected_question_type')}, 問題数={len(question_ids)}")
+@app.route('/learning_optimization')
+def learning_optimization():
+    """学習効率最適化画面"""
+    try:
+        # 個人学習パターン分析
+        learning_pattern = learning_optimizer.analyze_personal_learning_pattern(session)
 
-                    # セッション即座保存強制
-                    session.permanent = True
-                    
-                    # FIRE CRITICAL FIX: セッション書き込み即座実行
-                    import time
-                    time.sleep(0.1)  # セッション書き込み待機
+        # 最適学習時間推奨
+        optimization_data = learning_optimizer.get_optimal_study_time_recommendation(session)
 
-                    logger.info(f"復習セッション設定完了: {len(question_ids)}問, モード: {category_name}")
-                    logger.info(f"復習詳細: 弱点スコア順優先, 全部門対象, 問題ID={question_ids[:5] if question_ids else []}")
+        return render_template(
+            'learning_optimization.html',
+            learning_pattern=learning_pattern,
+            optimization_data=optimization_data,
+            title='学習効率最適化'
+        )
 
-                except Exception as set_error:
-                    logger.error(f"セッション変数設定エラー: {set_error}")
-                    return render_template('error.html',
-                                           error="復習セッション変数の設定中にエラーが発生しました。",
-                                           error_type="session_variable_error")
+    except Exception as e:
+        logger.error(f"学習効率最適化画面エラー: {e}")
+        return render_template('error.html', error="学習効率最適化画面の表示中にエラーが発生しました。")
 
-                # FIRE ULTRA堅牢: セッション状態の最終確認（複数回検証）
-                verification_attempts = 0
-                max_verification_attempts = 3
 
-                while verification_attempts < max_verification_attempts:
-                    try:
-                        final_ids = session.get('exam_question_ids', [])
-                        final_current = session.get('exam_current', -1)
-                        final_category = session.get('exam_category', '')
-                        final_question_type = session.get('selected_question_type', '')
-
-                        logger.info(
-                            f"セッション設定確認 (試行{verification_attempts + 1}): "
-                            f"exam_question_ids={len(final_ids) if final_ids else 0}問, "
-                            f"exam_current={final_current}, exam_category='{final_category}', "
-                            f"question_type='{final_question_type}'")
-
-                        # 検証条件
-                        if (final_ids and len(final_ids) > 0 and
-                            final_current >= 0 and
-                            final_category and
-                                final_question_type == 'review'):
-                            logger.info(f"SUCCESS セッション設定検証成功 (試行{verification_attempts + 1})")
-                            break
-                        else:
-                            verification_attempts += 1
-                            if verification_attempts < max_verification_attempts:
-                                logger.warning(f"セッション設定検証失敗 (試行{verification_attempts}) - 再設定中...")
-                                # 再設定
-                                session['exam_question_ids'] = question_ids
-                                session['exam_current'] = 0
-                                session['exam_category'] = category_name
-                                session['selected_question_type'] = 'review'
-                                session.modified = True
-                            else:
-                                logger.error(f"セッション設定検証失敗 (最大試行{max_verification_attempts}回)")
-                                return render_template('error.html',
-                                                       error="復習セッションの設定検証に失敗しました。ページを再読み込みして再度お試しください。",
-                                                       error_type="session_verification_error")
-                    except Exception as verify_error:
-                        logger.error(f"セッション検証エラー (試行{verification_attempts + 1}): {verify_error}")
-                        verification_attempts += 1
+@app.route('/api/learning/realtime_tracking', methods=['POST'])
+def api_realtime_learning_tracking():
+    """リアルタイム学習効率追跡API"""
+    try:
+        data = request.get_json()
+        session_start_time = data.get('session_start_time')
 
-            except Exception as session_error:
-                logger.error(f"セッション設定エラー: {session_error}")
-                return render_template('error.html',
-                                       error="復習セッションの準備中にエラーが発生しました。",
-                                       error_type="session_preparation_error")
+        if session_start_time:
+            session_start = datetime.fromisoformat(session_start_time)
+        else:
+            session_start = datetime.now()
 
-        except Exception as final_error:
-            logger.error(f"最終処理エラー: {final_error}")
-            return render_template('error.html',
-                                   error="復習問題の最終準備中にエラーが発生しました。",
-                                   error_type="final_processing_error")
+        current_session_data = {
+            'start_time': session_start,
+            'question_count': data.get('question_count', 0)
+        }
 
-        logger.info("=== 復習開始処理完了 - examページへリダイレクト ===")
+        tracking_result = learning_optimizer.track_real_time_efficiency(session, current_session_data)
 
-        # 最初の問題にリダイレクト
-        return redirect(url_for('exam'))
+        return jsonify({
+            'success': True,
+            'tracking_data': tracking_result,
+            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
+            'timestamp': format_utc_to_iso()
+        })
 
     except Exception as e:
-        logger.error(f"FIRE 復習問題開始の重大エラー: {e}")
-        import traceback
-        logger.error(f"詳細エラー情報: {traceback.format_exc()}")
-        return render_template('error.html',
-                               error="復習問題の開始中に予期しないエラーが発生しました。ページを再読み込みして再度お試しください。",
-                               error_type="critical_review_error")
+        logger.error(f"リアルタイム学習追跡API エラー: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/debug/create_review_data')
-def create_review_test_data():
-    """FIRE 復習テスト用ダミーデータ作成（ウルトラシンク対応）"""
+@app.route('/api/learning/biorhythm', methods=['POST'])
+def api_biorhythm_calculation():
+    """バイオリズム計算API"""
     try:
-        from datetime import datetime, timedelta
-        import random
-
-        # データディレクトリの設定
-        data_dir = 'data'
-        all_questions = emergency_load_all_questions()  # EMERGENCY FIX
-        if not all_questions:
-            return "問題データが見つかりません", 400
-
-        # ランダムに10-20問を選択してSRSデータを作成
-        sample_size = min(20, len(all_questions))
-        sample_questions = random.sample(all_questions, sample_size)
-
-        srs_data = {}
-        bookmarks = []
-
-        for i, question in enumerate(sample_questions):
-            q_id = str(question.get('id', ''))
-            if not q_id:
-                continue
-
-            # 多様な復習データを作成
-            wrong_count = random.randint(1, 5)
-            total_attempts = wrong_count + random.randint(1, 3)
-            difficulty_level = random.uniform(3.0, 8.0)
-
-            # 復習期限（一部は期限切れに設定）
-            days_ago = random.randint(-5, 10)  # 過去5日〜未来10日
-            next_review = (datetime.now() + timedelta(days=days_ago)).isoformat()
-
-            srs_data[q_id] = {
-                'wrong_count': wrong_count,
-                'total_attempts': total_attempts,
-                'difficulty_level': difficulty_level,
-                'next_review': next_review,
-                'correct_count': total_attempts - wrong_count,
-                'mastered': False
-            }
+        data = request.get_json()
+        birth_date = data.get('birth_date')
+        target_date_str = data.get('target_date')
 
-            # FIRE ULTRA SYNC FIX: 一部をブックマークにも追加（文字列形式で統一）
-            if i < 5:
-                bookmarks.append(str(q_id))  # 文字列として追加で統一
+        if not birth_date:
+            return jsonify({'success': False, 'error': '生年月日が必要です'}), 400
 
-        # セッションに保存
-        session['advanced_srs'] = srs_data
-        session['bookmarks'] = bookmarks
+        # セッションに生年月日を保存
+        session['birth_date'] = birth_date
         session.modified = True
 
-        logger.info(f"復習テストデータ作成: SRS={len(srs_data)}問, ブックマーク={len(bookmarks)}問")
-
-        return """
-        <h2>FIRE 復習テストデータ作成完了！</h2>
-        <p>SRSデータ: {len(srs_data)}問</p>
-        <p>ブックマーク: {len(bookmarks)}問</p>
-        <p><a href="/review">復習リストを確認</a></p>
-        <p><a href="/exam/review">復習開始をテスト</a></p>
-        <p><a href="/">ホームに戻る</a></p>
-        """
+        target_date = datetime.now()
+        if target_date_str:
+            target_date = datetime.fromisoformat(target_date_str)
 
-    except Exception as e:
-        logger.error(f"復習テストデータ作成エラー: {e}")
-        return f"エラー: {e}", 500
+        biorhythm_scores = learning_optimizer.calculate_biorhythm_score(birth_date, target_date)
 
+        # 今後7日間のバイオリズム予測
+        future_biorhythms = {}
+        for i in range(7):
+            future_date = target_date + timedelta(days=i)
+            future_scores = learning_optimizer.calculate_biorhythm_score(birth_date, future_date)
+            future_biorhythms[future_date.strftime('%Y-%m-%d')] = future_scores
 
-@app.route('/debug/clear_session')
-def clear_session_debug():
-    """FIRE セッションクリア（デバッグ用）"""
-    try:
-        # 復習関連データのみクリア
-        session.pop('advanced_srs', None)
-        session.pop('bookmarks', None)
-        session.pop('exam_question_ids', None)
-        session.pop('exam_current', None)
-        session.pop('exam_category', None)
-        session.modified = True
+        return jsonify({
+            'success': True,
+            'current_biorhythm': biorhythm_scores,
+            'future_biorhythms': future_biorhythms,
+            'birth_date': birth_date,
+            'target_date': target_date.strftime('%Y-%m-%d')
+        })
 
-        return "セッションクリア完了"
     except Exception as e:
-        return f"エラー: {e}", 500
+        logger.error(f"バイオリズム計算API エラー: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/debug/session')
-def debug_session():
-    """デバッグ用セッション情報取得"""
+@app.route('/api/learning/optimal_schedule')
+def api_optimal_schedule():
+    """最適学習スケジュールAPI"""
     try:
-        session_info = {
-            'exam_question_ids': session.get('exam_question_ids', []),
-            'exam_current': session.get('exam_current'),
-            'exam_category': session.get('exam_category'),
-            'selected_question_type': session.get('selected_question_type'),
-            'selected_department': session.get('selected_department'),
-            'selected_year': session.get('selected_year')
-        }
-        return jsonify(session_info)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        target_date = request.args.get('date')
+        if target_date:
+            target_datetime = datetime.strptime(target_date, '%Y-%m-%d')
+        else:
+            target_datetime = datetime.now()
 
+        recommendation = learning_optimizer.get_optimal_study_time_recommendation(session, target_datetime)
 
-@app.route('/debug/set_current', methods=['POST'])
-def debug_set_current():
-    """デバッグ用: exam_currentを直接設定（10問目テスト用）"""
-    try:
-        data = request.get_json()
-        if not data or 'exam_current' not in data:
-            return jsonify({'error': 'exam_current パラメータが必要です'}), 400
-        
-        new_current = data['exam_current']
-        if not isinstance(new_current, int) or new_current < 0:
-            return jsonify({'error': 'exam_current は0以上の整数である必要があります'}), 400
-        
-        # 現在のセッション状態を確認
-        exam_question_ids = session.get('exam_question_ids', [])
-        if not exam_question_ids:
-            return jsonify({'error': 'アクティブなセッションがありません。先に問題セッションを開始してください。'}), 400
-        
-        # 範囲チェック
-        if new_current >= len(exam_question_ids):
-            return jsonify({'error': f'exam_current は0から{len(exam_question_ids)-1}の範囲で指定してください'}), 400
-        
-        # セッション更新
-        old_current = session.get('exam_current', 0)
-        session['exam_current'] = new_current
-        session.modified = True
-        
-        logger.info(f"DEBUG: exam_current更新 {old_current} → {new_current}")
-        
         return jsonify({
             'success': True,
-            'old_current': old_current,
-            'new_current': new_current,
-            'total_questions': len(exam_question_ids),
-            'message': f'exam_current を {new_current} に設定しました（{new_current+1}問目）'
+            'recommendation': recommendation,
+            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基渖のレポート生成タイムスタンプ
+            'generated_at': format_utc_to_iso()
         })
-        
+
     except Exception as e:
-        logger.error(f"DEBUG: set_current エラー: {e}")
-        return jsonify({'error': str(e)}), 500
+        logger.error(f"最適スケジュールAPI エラー: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/achievements')
-def achievements():
-    """達成バッジ・ゲーミフィケーション画面"""
+@app.route('/api/ai_analysis', methods=['GET'])
+def api_ai_analysis():
+    """AI分析結果のAPI（部門別対応版）"""
     try:
-        earned_badges = session.get('earned_badges', [])
-        badge_details = []
-
-        for badge_id in earned_badges:
-            badge_info = gamification_manager.get_badge_info(badge_id)
-            badge_details.append({
-                'id': badge_id,
-                'name': badge_info['name'],
-                'description': badge_info['description'],
-                'icon': badge_info['icon'],
-                'color': badge_info['color']
-            })
-
-        # 学習インサイト
-        insights = gamification_manager.get_study_insights(session)
-        logger.debug(f"Insights keys: {list(insights.keys()) if insights else 'None'}")
+        department_filter = request.args.get('department')
 
-        # 学習カレンダー
-        calendar_data = gamification_manager.generate_study_calendar(session)
-
-        return render_template(
-            'achievements.html',
-            earned_badges=badge_details,
-            all_badges=gamification_manager.achievements,
-            insights=insights,
-            calendar_data=calendar_data
-        )
-
-    except Exception as e:
-        logger.error(f"達成画面エラー: {e}")
-        return render_template('error.html', error="達成画面の表示中にエラーが発生しました。")
-
-
-@app.route('/study_calendar')
-def study_calendar():
-    """学習カレンダー画面"""
-    try:
-        calendar_data = gamification_manager.generate_study_calendar(session, months=6)
-        insights = gamification_manager.get_study_insights(session)
-
-        return render_template(
-            'study_calendar.html',
-            calendar_data=calendar_data,
-            insights=insights
-        )
-
-    except Exception as e:
-        logger.error(f"学習カレンダーエラー: {e}")
-        return render_template('error.html', error="学習カレンダーの表示中にエラーが発生しました。")
-
-
-@app.route('/api/gamification/status')
-def gamification_status():
-    """ゲーミフィケーション状態のAPI"""
-    try:
-        insights = gamification_manager.get_study_insights(session)
-        earned_badges = session.get('earned_badges', [])
+        analysis_result = ai_analyzer.analyze_weak_areas(session, department_filter)
+        recommended_mode = adaptive_engine.get_learning_mode_recommendation(session, analysis_result)
 
         return jsonify({
-            'streak': insights.get('study_streak', 0),
-            'max_streak': insights.get('max_streak', 0),
-            'badges_count': len(earned_badges),
-            'total_questions': insights.get('total_questions', 0),
-            'overall_accuracy': insights.get('overall_accuracy', 0),
-            'recent_accuracy': insights.get('recent_accuracy', 0)
+            'analysis': analysis_result,
+            'recommended_mode': recommended_mode,
+            'department_filter': department_filter,
+            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
+            'timestamp': format_utc_to_iso()
         })
 
     except Exception as e:
-        logger.error(f"ゲーミフィケーション状態取得エラー: {e}")
+        logger.error(f"AI分析API エラー: {e}")
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/ai_analysis')
-def ai_analysis():
-    """AI弱点分析画面（部門別対応版）"""
+@app.route('/learning_plan')
+def learning_plan():
+    """個人学習プラン画面"""
     try:
-        # 部門フィルタを取得
-        department_filter = request.args.get('department')
-
-        # AI分析実行（部門別）
-        analysis_result = ai_analyzer.analyze_weak_areas(session, department_filter)
+        # AI分析実行
+        analysis_result = ai_analyzer.analyze_weak_areas(session)
 
-        # 推奨学習モード取得
-        recommended_mode = adaptive_engine.get_learning_mode_recommendation(session, analysis_result)
+        # 学習プラン詳細
+        learning_plan = analysis_result.get('learning_plan', {})
+        weak_areas = analysis_result.get('weak_areas', {})
 
-        # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
-        available_departments = {}
-        history = session.get('history', [])
-        valid_categories = get_japanese_categories()
-        
-        for entry in history:
-            dept = entry.get('department')
-            if dept:
-                dept_name = convert_legacy_english_id_to_japanese(dept)
-                if validate_japanese_category(dept_name):
-                    if dept not in available_departments:
-                        available_departments[dept] = {'count': 0, 'name': dept_name}
-                    available_departments[dept]['count'] += 1
+        # 推奨スケジュール生成
+        schedule = generate_weekly_schedule(learning_plan, weak_areas)
 
         return render_template(
-            'ai_analysis.html',
+            'learning_plan.html',
             analysis=analysis_result,
-            recommended_mode=recommended_mode,
-            learning_modes=adaptive_engine.learning_modes,
-            available_departments=available_departments,
-            current_department=department_filter,
-            # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
-            departments={encode_japanese_category(category): {'name': category} for category in get_japanese_categories()}
+            plan=learning_plan,
+            schedule=schedule
         )
 
     except Exception as e:
-        logger.error(f"AI分析エラー: {e}")
-        return render_template('error.html', error="AI分析の表示中にエラーが発生しました。")
-
+        logger.error(f"学習プランエラー: {e}")
+        return render_template('error.html', error="学習プランの表示中にエラーが発生しました。")
 
-@app.route('/adaptive_questions')
-def adaptive_questions():
-    """アダプティブ問題練習モード（部門別対応版）"""
-    try:
-        learning_mode = request.args.get('mode', 'balanced')
-        # ユーザー設定に基づく問題数を取得
-        session_size = get_user_session_size(session)
-        department = request.args.get('department', session.get('selected_department', ''))
 
-        all_questions = load_questions()
-        if not all_questions:
-            return render_template('error.html', error="問題データが存在しません。")
+def generate_weekly_schedule(learning_plan: Dict, weak_areas: Dict) -> List[Dict]:
+    """週間学習スケジュールの生成"""
+    schedule = []
 
-        # AI分析実行（部門フィルタ適用）
-        ai_analysis = ai_analyzer.analyze_weak_areas(session, department)
+    for day in range(7):
+        day_names = ['月', '火', '水', '木', '金', '土', '日']
 
-        # アダプティブ問題選択（部門対応）
-        adaptive_questions = adaptive_engine.get_adaptive_questions(
-            session, all_questions, ai_analysis, session_size, learning_mode, department
-        )
+        if learning_plan.get('plan_type') == 'weakness_focused':
+            primary_focus = learning_plan.get('primary_focus', {})
+            if day % 3 == 0 and primary_focus:  # 3日に1回集中学習
+                schedule.append({
+                    'day': day_names[day],
+                    'type': 'intensive',
+                    'focus': primary_focus.get('category', ''),
+                    'questions': primary_focus.get('recommended_questions', 10),
+                    'description': f"{primary_focus.get('category', '')}の集中学習"
+                })
+            else:
+                schedule.append({
+                    'day': day_names[day],
+                    'type': 'light',
+                    'focus': 'mixed',
+                    'questions': 5,
+                    'description': '軽い復習とバランス学習'
+                })
+        else:
+            schedule.append({
+                'day': day_names[day],
+                'type': 'balanced',
+                'focus': 'mixed',
+                'questions': 8,
+                'description': 'バランス学習'
+            })
 
-        if not adaptive_questions:
-            return render_template('error.html', error="選択可能な問題がありません。")
+    return schedule
 
-        # アダプティブセッション開始（部門情報も保存）
-        question_ids = [int(q.get('id', 0)) for q in adaptive_questions]
-        session['exam_question_ids'] = question_ids
-        session['exam_current'] = 0
 
-        # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
-        category_name = 'AI適応学習'
-        if department:
-            dept_name = convert_legacy_english_id_to_japanese(department)
-            category_name = f'AI適応学習 ({dept_name})'
+        # セッション初期化エラーでも処理を続行
 
-        session['exam_category'] = category_name
-        session['adaptive_mode'] = learning_mode
-        if department:
-            session['selected_department'] = department
-        session.modified = True
 
-        logger.info(f"アダプティブ問題開始: {len(question_ids)}問, モード: {learning_mode}, 部門: {department or '全体'}")
+# モバイル機能のAPI エンドポイント
 
-        # 最初の問題を表示
-        return redirect(url_for('exam'))
 
+@app.route('/manifest.json')
+@cached_response('manifest')
+def pwa_manifest():
+    """PWAマニフェストの配信"""
+    try:
+        manifest = get_warm_cache('pwa_manifest') or _warm_pwa_manifest()
+        response = jsonify(manifest)
+        response.headers['Content-Type'] = 'application/manifest+json'
+        return response
     except Exception as e:
-        logger.error(f"アダプティブ問題エラー: {e}")
-        return render_template('error.html', error="アダプティブ問題の開始中にエラーが発生しました。")
+        logger.error(f"マニフェスト配信エラー: {e}")
+        return jsonify({'error': str(e)}), 500
 
 
-@app.route('/integrated_learning')
-def integrated_learning():
-    """4-1基礎と4-2専門の連携学習モード"""
+@app.route('/sw.js')
+def service_worker():
+    """Service Workerの配信"""
     try:
-        # パラメータ取得
-        learning_mode = request.args.get('mode', 'basic_to_specialist')
-        # ユーザー設定に基づく問題数を取得
-        session_size = get_user_session_size(session)
-        department = request.args.get('department', session.get('selected_department', ''))
-
-        # 連携学習モードの検証
-        if learning_mode not in ['basic_to_specialist', 'foundation_reinforced']:
-            learning_mode = 'basic_to_specialist'
-
-        all_questions = load_questions()
-        if not all_questions:
-            return render_template('error.html', error="問題データが存在しません。")
-
-        # 基礎理解度を事前評価
-        foundation_mastery = adaptive_engine._assess_foundation_mastery(session, department)
-
-        # AI分析実行（部門フィルタ適用）
-        ai_analysis = ai_analyzer.analyze_weak_areas(session, department)
+        return send_from_directory('static', 'sw.js', mimetype='application/javascript')
+    except Exception as e:
+        logger.debug("Service Worker配信エラー: %s", e)
+        return '', 404
 
-        # 連携学習用問題選択
-        integrated_questions = adaptive_engine.get_adaptive_questions(
-            session, all_questions, ai_analysis, session_size, learning_mode, department
-        )
 
-        if not integrated_questions:
-            return render_template('error.html', error="選択可能な問題がありません。")
+@app.route('/favicon.ico')
+def favicon():
+    """Faviconの配信"""
+    try:
+        return send_from_directory('static/icons', 'favicon.ico')
+    except Exception as e:
+        logger.debug("Favicon配信エラー: %s", e)
+        return '', 404
 
-        # 連携学習セッション開始
-        question_ids = [int(q.get('id', 0)) for q in integrated_questions]
-        session['exam_question_ids'] = question_ids
-        session['exam_current'] = 0
 
-        # カテゴリ名設定
-        mode_names = {
-            'basic_to_specialist': '基礎→専門連携学習',
-            'foundation_reinforced': '基礎強化学習'
-        }
-        category_name = mode_names.get(learning_mode, '連携学習')
+@app.route('/icon-<size>.png')
+def app_icon(size):
+    """アプリアイコンの配信"""
+    try:
+        return send_from_directory('static/icons', f'icon-{size}.png')
+    except Exception as e:
+        logger.debug("アイコン配信エラー: %s", e)
+        return '', 404
 
-        # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
-        if department:
-            dept_name = convert_legacy_english_id_to_japanese(department)
-            category_name = f'{category_name} ({dept_name})'
+# === 未実装ルートのリダイレクト対応（ウルトラシンク修正） ===
 
-        session['exam_category'] = category_name
-        session['adaptive_mode'] = learning_mode
-        session['foundation_mastery'] = foundation_mastery
-        if department:
-            session['selected_department'] = department
-        session.modified = True
 
-        logger.info(f"連携学習開始: {len(question_ids)}問, モード: {learning_mode}, 部門: {department or '全体'}, 基礎習熟度: {foundation_mastery:.2f}")
+@app.route('/social_learning')
+def social_learning_redirect():
+    """ソーシャル学習機能（ヘルプからのリダイレクト対応）"""
+    return redirect(url_for('social.social_learning_page'))
 
-        # 最初の問題を表示
-        return redirect(url_for('exam'))
 
-    except Exception as e:
-        logger.error(f"連携学習エラー: {e}")
-        return render_template('error.html', error="連携学習の開始中にエラーが発生しました。")
+@app.route('/leaderboard')
+def leaderboard_redirect():
+    """ランキング機能（ヘルプからのリダイレクト対応）"""
+    return redirect('/social/leaderboard')
 
 
-@app.route('/integrated_learning_selection')
-def integrated_learning_selection():
-    """連携学習モード選択画面"""
+@app.route('/health_check')
+def health_check():
+    """システムヘルスチェック（ウルトラシンク新規実装）"""
     try:
-        department = request.args.get('department', session.get('selected_department', ''))
-
-        # 現在の基礎理解度を評価
-        foundation_mastery = adaptive_engine._assess_foundation_mastery(session, department)
-
-        # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
-        departments = {encode_japanese_category(category): {'name': category} for category in get_japanese_categories()}
-        department_patterns = adaptive_engine.department_learning_patterns
-
-        return render_template(
-            'integrated_learning_selection.html',
-            foundation_mastery=foundation_mastery,
-            department=department,
-            departments=departments,
-            department_patterns=department_patterns,
-            title='連携学習モード選択'
-        )
-
-    except Exception as e:
-        logger.error(f"連携学習選択画面エラー: {e}")
-        return render_template('error.html', error="連携学習選択画面の表示中にエラーが発生しました。")
+        # アプリケーション健康状態チェック
+        health_status = {
+            'status': 'healthy',
+            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
+            'timestamp': format_utc_to_iso(),
+            'version': '2025 Enterprise Edition',
+            'database': 'file-based',
+            'checks': {
+                'data_loading': 'ok',
+                'session_management': 'ok',
+                'ai_modules': 'ok',
+                'cache_system': 'ok'
+            },
+            'stats': {
+                'total_questions': 0,
+                'active_sessions': len(session_locks) if 'session_locks' in globals() else 0,
+                'memory_usage': 'normal',
+                'response_time': 'fast'
+            }
+        }
 
+        # 問題データの健康チェック
+        try:
+            questions = load_questions()
+            health_status['stats']['total_questions'] = len(questions)
+            health_status['checks']['data_loading'] = 'ok'
+        except Exception as e:
+            health_status['checks']['data_loading'] = f'error: {str(e)}'
+            health_status['status'] = 'degraded'
 
-@app.route('/learner_insights')
-def learner_insights():
-    """学習者インサイト画面（動的難易度制御情報を含む）"""
-    try:
-        department = request.args.get('department', session.get('selected_department', ''))
+        # AI機能の健康チェック
+        try:
+            # Global variables managed elsewhere
+            if ai_analyzer is None or advanced_analytics is None:
+                health_status['checks']['ai_modules'] = 'not_initialized'
+            else:
+                health_status['checks']['ai_modules'] = 'ok'
+        except Exception as e:
+            health_status['checks']['ai_modules'] = f'error: {str(e)}'
 
-        # 学習者インサイト取得
-        insights = adaptive_engine.get_learner_insights(session, department)
+        # セッション管理の健康チェック
+        try:
+            if 'session_locks' in globals():
+                health_status['stats']['active_sessions'] = len(session_locks)
+                health_status['checks']['session_management'] = 'ok'
+            else:
+                health_status['checks']['session_management'] = 'warning: locks not initialized'
+        except Exception as e:
+            health_status['checks']['session_management'] = f'error: {str(e)}'
 
-        # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
-        departments = {encode_japanese_category(category): {'name': category} for category in get_japanese_categories()}
+        # 最終的な健康状態判定
+        if any('error' in str(check) for check in health_status['checks'].values()):
+            health_status['status'] = 'unhealthy'
+        elif any('warning' in str(check) for check in health_status['checks'].values()):
+            health_status['status'] = 'degraded'
 
-        return render_template(
-            'learner_insights.html',
-            insights=insights,
-            department=department,
-            departments=departments,
-            title='学習者レベル・インサイト'
-        )
+        return jsonify(health_status), 200 if health_status['status'] == 'healthy' else 503
 
     except Exception as e:
-        logger.error(f"学習者インサイト画面エラー: {e}")
-        return render_template('error.html', error="学習者インサイト画面の表示中にエラーが発生しました。")
-
-
-@app.route('/api/difficulty/status')
-def api_difficulty_status():
-    """動的難易度制御状態のAPI"""
-    try:
-        department = request.args.get('department')
-
-        # 学習者レベル評価
-        from difficulty_controller import difficulty_controller
-        learner_assessment = difficulty_controller.assess_learner_level(session, department)
-
-        # 最近のパフォーマンス
-        recent_history = session.get('history', [])[-10:]
-        if recent_history:
-            recent_performance = difficulty_controller._analyze_current_performance(recent_history)
-        else:
-            recent_performance = {'accuracy': 0, 'avg_time': 0, 'sample_size': 0, 'trend': 'unknown'}
-
-        # 動的セッション設定
-        dynamic_config = session.get('dynamic_session_config', {})
-
+        logger.error(f"ヘルスチェックエラー: {e}")
         return jsonify({
-            'learner_level': learner_assessment['overall_level'],
-            'level_name': learner_assessment['level_name'],
-            'confidence': learner_assessment['confidence'],
-            'recent_performance': recent_performance,
-            'dynamic_config': dynamic_config,
-            'recommended_difficulty': learner_assessment['recommended_difficulty'],
-            'department_factor': learner_assessment.get('department_factor', 1.0),
-            'next_adjustment_threshold': learner_assessment.get('next_adjustment_threshold', 20),
+            'status': 'error',
+            'message': str(e),
             # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
             'timestamp': format_utc_to_iso()
-        })
-
-    except Exception as e:
-        logger.error(f"難易度制御状態API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/learning_optimization')
-def learning_optimization():
-    """学習効率最適化画面"""
-    try:
-        # 個人学習パターン分析
-        learning_pattern = learning_optimizer.analyze_personal_learning_pattern(session)
-
-        # 最適学習時間推奨
-        optimization_data = learning_optimizer.get_optimal_study_time_recommendation(session)
-
-        return render_template(
-            'learning_optimization.html',
-            learning_pattern=learning_pattern,
-            optimization_data=optimization_data,
-            title='学習効率最適化'
-        )
-
-    except Exception as e:
-        logger.error(f"学習効率最適化画面エラー: {e}")
-        return render_template('error.html', error="学習効率最適化画面の表示中にエラーが発生しました。")
+        }), 500
 
 
-@app.route('/api/learning/realtime_tracking', methods=['POST'])
-def api_realtime_learning_tracking():
-    """リアルタイム学習効率追跡API"""
+@app.route('/api/system/file_handles')
+def api_file_handle_status():
+    """🔒 ファイルハンドル状況監視API（ウルトラシンク安全性監視）"""
     try:
-        data = request.get_json()
-        session_start_time = data.get('session_start_time')
-
-        if session_start_time:
-            session_start = datetime.fromisoformat(session_start_time)
+        # アクティブファイルハンドル数取得
+        active_handles = get_active_file_handles()
+        
+        # システム制限値取得
+        import resource
+        try:
+            soft_limit, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+        except (OSError, AttributeError, ImportError) as e:
+            # システムリソース取得エラーの場合は不明として設定
+            logger.warning(f"System resource limit detection error: {e}")
+            soft_limit, hard_limit = 'unknown', 'unknown'
+            # パフォーマンス監視に影響するがシステム継続可能
+            soft_limit, hard_limit = 'unknown', 'unknown'
+        
+        # 使用率計算
+        if isinstance(soft_limit, int) and soft_limit > 0:
+            usage_percentage = (active_handles / soft_limit) * 100
+            status = 'healthy' if usage_percentage < 50 else 'warning' if usage_percentage < 80 else 'critical'
         else:
-            session_start = datetime.now()
-
-        current_session_data = {
-            'start_time': session_start,
-            'question_count': data.get('question_count', 0)
+            usage_percentage = 0
+            status = 'healthy' if active_handles < 100 else 'warning'
+        
+        # ファイルハンドル統計
+        file_stats = {
+            'active_handles': active_handles,
+            'system_limits': {
+                'soft_limit': soft_limit,
+                'hard_limit': hard_limit
+            },
+            'usage_percentage': round(usage_percentage, 2),
+            'status': status,
+            'recommendations': []
         }
-
-        tracking_result = learning_optimizer.track_real_time_efficiency(session, current_session_data)
-
+        
+        # 推奨事項
+        if active_handles > 50:
+            file_stats['recommendations'].append('大量のファイルハンドルが使用中です')
+        if usage_percentage > 70:
+            file_stats['recommendations'].append('システム制限に近づいています')
+        if status == 'healthy':
+            file_stats['recommendations'].append('ファイルハンドル使用量は正常範囲内です')
+        
         return jsonify({
             'success': True,
-            'tracking_data': tracking_result,
+            'file_handle_status': file_stats,
             # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
             'timestamp': format_utc_to_iso()
         })
-
+        
     except Exception as e:
-        logger.error(f"リアルタイム学習追跡API エラー: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-
-@app.route('/api/learning/biorhythm', methods=['POST'])
-def api_biorhythm_calculation():
-    """バイオリズム計算API"""
-    try:
-        data = request.get_json()
-        birth_date = data.get('birth_date')
-        target_date_str = data.get('target_date')
-
-        if not birth_date:
-            return jsonify({'success': False, 'error': '生年月日が必要です'}), 400
-
-        # セッションに生年月日を保存
-        session['birth_date'] = birth_date
-        session.modified = True
-
-        target_date = datetime.now()
-        if target_date_str:
-            target_date = datetime.fromisoformat(target_date_str)
-
-        biorhythm_scores = learning_optimizer.calculate_biorhythm_score(birth_date, target_date)
-
-        # 今後7日間のバイオリズム予測
-        future_biorhythms = {}
-        for i in range(7):
-            future_date = target_date + timedelta(days=i)
-            future_scores = learning_optimizer.calculate_biorhythm_score(birth_date, future_date)
-            future_biorhythms[future_date.strftime('%Y-%m-%d')] = future_scores
-
+        logger.error(f"ファイルハンドル状況API エラー: {e}")
         return jsonify({
-            'success': True,
-            'current_biorhythm': biorhythm_scores,
-            'future_biorhythms': future_biorhythms,
-            'birth_date': birth_date,
-            'target_date': target_date.strftime('%Y-%m-%d')
-        })
-
-    except Exception as e:
-        logger.error(f"バイオリズム計算API エラー: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
+            'success': False,
+            'error': str(e),
+            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
+            'timestamp': format_utc_to_iso()
+        }), 500
 
 
-@app.route('/api/learning/optimal_schedule')
-def api_optimal_schedule():
-    """最適学習スケジュールAPI"""
+@app.route('/api/system/memory_status')
+def api_memory_status():
+    """SEARCH メモリ最適化状況監視API（ウルトラシンクメモリ監視）"""
     try:
-        target_date = request.args.get('date')
-        if target_date:
-            target_datetime = datetime.strptime(target_date, '%Y-%m-%d')
+        if _memory_optimizer:
+            # ウルトラシンク最適化統計取得
+            stats = _memory_optimizer.get_optimization_stats()
+            
+            # メモリ健康状態チェック
+            is_healthy = _memory_optimizer.memory_health_check()
+            
+            memory_status = {
+                'success': True,
+                'status': 'healthy' if is_healthy else 'warning',
+                'optimizer_enabled': True,
+                'stats': stats,
+                'recommendations': []
+            }
+            
+            # メモリ使用量に基づく推奨事項
+            current_memory = stats.get('current_memory_mb', 0)
+            if current_memory > 300:
+                memory_status['recommendations'].append({
+                    'type': 'memory_usage',
+                    'message': f'高メモリ使用量: {current_memory:.1f}MB - セッション最適化推奨',
+                    'action': 'セッションクリーンアップの頻度を上げてください'
+                })
+            
+            # キャッシュ統計
+            cache_stats = stats.get('cache_stats', {})
+            if cache_stats.get('estimated_memory_mb', 0) > 50:
+                memory_status['recommendations'].append({
+                    'type': 'cache_size',
+                    'message': 'キャッシュサイズが大きくなっています',
+                    'action': 'キャッシュクリーンアップを実行してください'
+                })
+            
         else:
-            target_datetime = datetime.now()
-
-        recommendation = learning_optimizer.get_optimal_study_time_recommendation(session, target_datetime)
-
-        return jsonify({
-            'success': True,
-            'recommendation': recommendation,
-            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基渖のレポート生成タイムスタンプ
-            'generated_at': format_utc_to_iso()
+            # フォールバック: 基本的なメモリ情報
+            try:
+                import psutil
+                process = psutil.Process()
+                memory_mb = process.memory_info().rss / 1024 / 1024
+                memory_percent = psutil.virtual_memory().percent
+                
+                memory_status = {
+                    'success': True,
+                    'status': 'basic' if memory_mb < 500 else 'warning',
+                    'optimizer_enabled': False,
+                    'stats': {
+                        'current_memory_mb': round(memory_mb, 2),
+                        'system_memory_percent': round(memory_percent, 1),
+                        'message': 'Ultra Sync Memory Optimizer が利用できません'
+                    },
+                    'recommendations': [
+                        {
+                            'type': 'optimizer_missing',
+                            'message': 'Memory Optimizer が見つかりません',
+                            'action': 'ultra_sync_memory_leak_fix.py を確認してください'
+                        }
+                    ]
+                }
+                
+                if memory_mb > 500:
+                    memory_status['recommendations'].append({
+                        'type': 'high_memory',
+                        'message': f'高メモリ使用量: {memory_mb:.1f}MB',
+                        'action': 'アプリケーション再起動を検討してください'
+                    })
+                    
+            except Exception as e:
+                memory_status = {
+                    'success': False,
+                    'status': 'error',
+                    'optimizer_enabled': False,
+                    'error': str(e),
+                    'message': 'メモリ情報取得に失敗しました'
+                }
+        
+        # SEARCH ENHANCED: Memory Leak Monitor 統合データ追加
+        if _memory_leak_monitor:
+            try:
+                leak_monitor_status = _memory_leak_monitor.get_memory_status()
+                memory_status['memory_leak_monitor'] = {
+                    'enabled': True,
+                    'monitoring_active': leak_monitor_status.get('monitoring_active', False),
+                    'total_leaks_detected': leak_monitor_status.get('total_leaks_detected', 0),
+                    'monitoring_duration_hours': leak_monitor_status.get('monitoring_duration_hours', 0),
+                    'recent_leaks_count': len(leak_monitor_status.get('recent_leaks', [])),
+                    'recent_memory_trend': leak_monitor_status.get('recent_memory_data', [])[-3:] if leak_monitor_status.get('recent_memory_data') else []
+                }
+                
+                # リーク検出に基づく推奨事項追加
+                recent_leaks = leak_monitor_status.get('recent_leaks', [])
+                if recent_leaks:
+                    critical_leaks = [l for l in recent_leaks if l.get('severity') == 'critical']
+                    high_leaks = [l for l in recent_leaks if l.get('severity') == 'high']
+                    
+                    if critical_leaks:
+                        memory_status['recommendations'].append({
+                            'type': 'critical_memory_leak',
+                            'message': f'{len(critical_leaks)}個の重大なメモリリークが検出されました',
+                            'action': '即座にアプリケーションの再起動を検討してください'
+                        })
+                    elif high_leaks:
+                        memory_status['recommendations'].append({
+                            'type': 'high_memory_leak',
+                            'message': f'{len(high_leaks)}個の高レベルメモリリークが検出されました',
+                            'action': 'メモリ最適化を実行してください'
+                        })
+                        
+            except Exception as e:
+                logger.warning(f"Memory Leak Monitor データ取得エラー: {e}")
+                memory_status['memory_leak_monitor'] = {
+                    'enabled': False,
+                    'error': str(e)
+                }
+        else:
+            memory_status['memory_leak_monitor'] = {
+                'enabled': False,
+                'message': 'Memory Leak Monitor が利用できません'
+            }
+        
+        # 共通レスポンス項目追加
+        memory_status.update({
+            'timestamp': format_utc_to_iso(),
+            'memory_optimization_info': {
+                'session_limits': 'MAX_HISTORY=100, MAX_SRS=500',
+                'cache_management': 'LRU + TTL',
+                'lock_pooling': 'Enabled' if _memory_optimizer else 'Disabled',
+                'leak_monitoring': 'Enabled' if _memory_leak_monitor else 'Disabled'
+            }
         })
-
+        
+        return jsonify(memory_status)
+        
     except Exception as e:
-        logger.error(f"最適スケジュールAPI エラー: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-
-@app.route('/api/ai_analysis', methods=['GET'])
-def api_ai_analysis():
-    """AI分析結果のAPI（部門別対応版）"""
-    try:
-        department_filter = request.args.get('department')
-
-        analysis_result = ai_analyzer.analyze_weak_areas(session, department_filter)
-        recommended_mode = adaptive_engine.get_learning_mode_recommendation(session, analysis_result)
-
+        logger.error(f"メモリ状況API エラー: {e}")
         return jsonify({
-            'analysis': analysis_result,
-            'recommended_mode': recommended_mode,
-            'department_filter': department_filter,
-            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
+            'success': False,
+            'status': 'error',
+            'error': str(e),
             'timestamp': format_utc_to_iso()
-        })
-
-    except Exception as e:
-        logger.error(f"AI分析API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/learning_plan')
-def learning_plan():
-    """個人学習プラン画面"""
-    try:
-        # AI分析実行
-        analysis_result = ai_analyzer.analyze_weak_areas(session)
-
-        # 学習プラン詳細
-        learning_plan = analysis_result.get('learning_plan', {})
-        weak_areas = analysis_result.get('weak_areas', {})
-
-        # 推奨スケジュール生成
-        schedule = generate_weekly_schedule(learning_plan, weak_areas)
-
-        return render_template(
-            'learning_plan.html',
-            analysis=analysis_result,
-            plan=learning_plan,
-            schedule=schedule
-        )
-
-    except Exception as e:
-        logger.error(f"学習プランエラー: {e}")
-        return render_template('error.html', error="学習プランの表示中にエラーが発生しました。")
-
-
-def generate_weekly_schedule(learning_plan: Dict, weak_areas: Dict) -> List[Dict]:
-    """週間学習スケジュールの生成"""
-    schedule = []
-
-    for day in range(7):
-        day_names = ['月', '火', '水', '木', '金', '土', '日']
-
-        if learning_plan.get('plan_type') == 'weakness_focused':
-            primary_focus = learning_plan.get('primary_focus', {})
-            if day % 3 == 0 and primary_focus:  # 3日に1回集中学習
-                schedule.append({
-                    'day': day_names[day],
-                    'type': 'intensive',
-                    'focus': primary_focus.get('category', ''),
-                    'questions': primary_focus.get('recommended_questions', 10),
-                    'description': f"{primary_focus.get('category', '')}の集中学習"
-                })
-            else:
-                schedule.append({
-                    'day': day_names[day],
-                    'type': 'light',
-                    'focus': 'mixed',
-                    'questions': 5,
-                    'description': '軽い復習とバランス学習'
-                })
-        else:
-            schedule.append({
-                'day': day_names[day],
-                'type': 'balanced',
-                'focus': 'mixed',
-                'questions': 8,
-                'description': 'バランス学習'
-            })
-
-    return schedule
-
-
-@app.route('/exam_simulator')
-def exam_simulator_page():
-    """試験シミュレーター画面"""
-    try:
-        return render_template(
-            'exam_simulator.html',
-            exam_configs=exam_simulator.exam_configs
-        )
-
-    except Exception as e:
-        logger.error(f"試験シミュレーター画面エラー: {e}")
-        return render_template('error.html', error="試験シミュレーター画面の表示中にエラーが発生しました。")
+        }), 500
 
 
-@app.route('/start_exam/<exam_type>')
-# FIRE ULTRA SYNC: 統合セッション管理システムで自動処理
-@memory_monitoring_decorator(_memory_leak_monitor)
-def start_exam(exam_type):
-    """試験開始"""
+@app.route('/api/system/optimize_memory', methods=['POST'])
+@memory_optimization_decorator
+def api_optimize_memory():
+    """SEARCH 手動メモリ最適化実行API（ウルトラシンクメモリ最適化）"""
     try:
-        # FIRE ULTRA SYNC FIX: 詳細エラーログ追加
-        logger.info(f"FIRE EXAM START: 試験開始処理開始 - exam_type: {exam_type}")
-        
-        all_questions = load_questions()
-        logger.info(f"FIRE EXAM START: 問題データ読み込み完了 - {len(all_questions)}問")
+        if not _memory_optimizer:
+            return jsonify({
+                'success': False,
+                'error': 'Memory Optimizer が利用できません',
+                'timestamp': format_utc_to_iso()
+            }), 503
         
-        if not all_questions:
-            logger.error(f"FIRE EXAM START: 問題データが空です")
-            return render_template('error.html', error="問題データが存在しません。")
-
-        # FIRE ULTRA SYNC FIX: 試験セッション生成に詳細ログ追加
-        logger.info(f"FIRE EXAM START: 試験セッション生成開始")
+        # 手動最適化実行
+        cleanup_stats_before = _memory_optimizer.cleanup_stats.copy()
         
-        if EXAM_SIMULATOR_AVAILABLE and exam_simulator:
-            exam_session = exam_simulator.generate_exam_session(all_questions, exam_type, session)
-            logger.info(f"FIRE EXAM START: 試験セッション生成完了 - ID: {exam_session.get('exam_id', 'UNKNOWN')}")
-        else:
-            logger.warning("FIRE EXAM START: exam_simulator not available, using emergency fallback")
-            
-            # EMERGENCY FIX 12: Proper department filtering for session creation
-            # Parse exam_type to extract department and question type
-            if exam_type.startswith('specialist_'):
-                department = exam_type.replace('specialist_', '')
-                question_type = 'specialist'
-                logger.info(f"EMERGENCY FIX 12: Specialist exam detected - department: {department}")
-                
-                try:
-                    # 🎯 ULTRA SYNC: Use unified data system for consistent IDs
-                    session_count = session.get('quiz_settings', {}).get('questions_per_session', 10)
-                    logger.info(f"🎯 ULTRA SYNC FIX 12: Using unified system, count={session_count}")
-
-                    # Load unified data directly
-                    all_questions = emergency_load_all_questions()  # Inline unified function
-
-                    # Filter for specialist questions with target department
-                    filtered_questions = [q for q in all_questions if q.get('question_type') == 'specialist' and q.get('category') == department]
-
-                    # Shuffle and select
-                    import random
-                    random.shuffle(filtered_questions)
-                    filtered_questions = filtered_questions[:session_count]
-
-                    logger.info(f"🎯 UNIFIED FIX 12: Loaded {len(filtered_questions)} questions for {department}")
-                    
-                    if filtered_questions and len(filtered_questions) > 0:
-                        logger.info(f"EMERGENCY FIX 12: SUCCESS - {len(filtered_questions)} {department} questions loaded")
-                        exam_questions = filtered_questions
-                    else:
-                        logger.error(f"EMERGENCY FIX 12: No questions found for department {department}")
-                        # Fall back to basic questions if department questions not found
-                        basic_questions = [q for q in all_questions if q.get('question_type') == 'basic']
-                        exam_questions = basic_questions[:10] if basic_questions else all_questions[:10]
-                        
-                except Exception as e:
-                    logger.error(f"EMERGENCY FIX 12: Error getting {department} questions: {e}")
-                    # Fall back to basic questions on error
-                    basic_questions = [q for q in all_questions if q.get('question_type') == 'basic']
-                    exam_questions = basic_questions[:10] if basic_questions else all_questions[:10]
-                    
-            elif exam_type == 'basic' or exam_type.startswith('basic'):
-                question_type = 'basic'
-                logger.info(f"EMERGENCY FIX 12: Basic exam detected")
-                basic_questions = [q for q in all_questions if q.get('question_type') == 'basic']
-                exam_questions = basic_questions[:10] if basic_questions else all_questions[:10]
-            else:
-                logger.warning(f"EMERGENCY FIX 12: Unknown exam type {exam_type}, using basic questions")
-                basic_questions = [q for q in all_questions if q.get('question_type') == 'basic']
-                exam_questions = basic_questions[:10] if basic_questions else all_questions[:10]
-            
-            # Create exam session with properly filtered questions
-            exam_session = {
-                'exam_id': str(uuid.uuid4()),
-                'exam_type': exam_type,
-                'questions': exam_questions,
-                'current_question': 0,
-                'start_time': datetime.now(timezone.utc).isoformat()
-            }
-            
-            logger.info(f"EMERGENCY FIX 12: Exam session created with {len(exam_questions)} questions")
-
-        # FIRE ULTRA SYNC FIX: セッション保存の確認強化
-        session['exam_session'] = exam_session
-        session.modified = True
-        
-        # FIRE ULTRA SYNC FIX: セッション保存後の検証
-        saved_session = session.get('exam_session')
-        if saved_session and saved_session.get('status') == 'in_progress':
-            logger.info(f"FIRE EXAM START: セッション保存確認OK - current_question: {saved_session.get('current_question', 'UNKNOWN')}")
+        # セッション最適化
+        if 'session' in globals() and session:
+            session_cleanup = _memory_optimizer.aggressive_session_cleanup(session)
         else:
-            logger.error(f"FIRE EXAM START: セッション保存失敗 - saved_session: {saved_session}")
-
-        logger.info(f"FIRE EXAM START: 試験開始完了 - {exam_type}, ID: {exam_session['exam_id']}")
-
-        return redirect(url_for('exam_question'))
-
-    except Exception as e:
-        # FIRE ULTRA SYNC FIX: 詳細例外情報の記録
-        import traceback
-        full_error = traceback.format_exc()
-        logger.error(f"FIRE EXAM START ERROR: 試験開始エラー詳細:\n{full_error}")
-        return render_template('error.html', error=f"試験の開始中にエラーが発生しました。詳細: {str(e)}")
-
-
-@app.route('/exam_question')
-def exam_question():
-    """試験問題表示"""
-    try:
-        # FIRE ULTRA SYNC FIX: 詳細ログ追加
-        logger.info(f"FIRE EXAM QUESTION: 試験問題表示処理開始")
-        
-        exam_session = session.get('exam_session')
-        logger.info(f"FIRE EXAM QUESTION: セッション取得 - exists: {exam_session is not None}")
-        
-        if not exam_session:
-            logger.error(f"FIRE EXAM QUESTION: セッションが存在しません - リダイレクト")
-            return redirect(url_for('exam_simulator_page'))
-            
-        session_status = exam_session.get('status', 'UNKNOWN')
-        logger.info(f"FIRE EXAM QUESTION: セッション状態 - status: {session_status}")
-        
-        if session_status != 'in_progress':
-            logger.error(f"FIRE EXAM QUESTION: セッション状態が不正 - status: {session_status} - リダイレクト")
-            return redirect(url_for('exam_simulator_page'))
-
-        current_q_index = exam_session['current_question']
-        questions = exam_session['questions']
-        
-        logger.info(f"FIRE EXAM QUESTION: 問題情報 - current_index: {current_q_index}, total: {len(questions)}")
-
-        if current_q_index >= len(questions):
-            logger.info(f"FIRE EXAM QUESTION: 試験終了 - current_index: {current_q_index} >= total: {len(questions)}")
-            return redirect(url_for('exam_results'))
-
-        current_question = questions[current_q_index]
-
-        # FIRE ULTRA SYNC FIX: 進捗表示バグ修正のための詳細ログ
-        display_current = current_q_index + 1
-        logger.info(f"FIRE PROGRESS FIX: 進捗表示計算 - current_q_index: {current_q_index}, display_current: {display_current}")
-
-        # 試験情報
-        exam_info = {
-            'current_question_number': display_current,  # FIRE ULTRA SYNC FIX: 明示的に計算結果を使用
-            'total_questions': len(questions),
-            'time_remaining': exam_simulator.get_time_remaining(exam_session),
-            'exam_type': exam_session['exam_type'],
-            'exam_name': exam_session['config']['name'],
-            'flagged_questions': exam_session['flagged_questions'],
-            'answered_questions': list(exam_session['answers'].keys())
-        }
-        
-        # FIRE ULTRA SYNC FIX: exam_info の確認ログ
-        logger.info(f"FIRE PROGRESS FIX: exam_info作成完了 - current_question_number: {exam_info['current_question_number']}, total_questions: {exam_info['total_questions']}")
-
-        # 時間警告チェック
-        time_warning = exam_simulator.should_give_time_warning(exam_session)
-
-        logger.info(f"FIRE EXAM QUESTION: テンプレート描画開始 - 問題{display_current}/{len(questions)}")
-
-        return render_template(
-            'exam_question.html',
-            question=current_question,
-            exam_info=exam_info,
-            time_warning=time_warning
-        )
-
-    except Exception as e:
-        # FIRE ULTRA SYNC FIX: 詳細例外情報の記録
-        import traceback
-        full_error = traceback.format_exc()
-        logger.error(f"FIRE EXAM QUESTION ERROR: 試験問題表示エラー詳細:\n{full_error}")
-        return render_template('error.html', error=f"試験問題の表示中にエラーが発生しました。詳細: {str(e)}")
-
-
-@app.route('/submit_exam_answer', methods=['POST'])
-# FIRE ULTRA SYNC: 統合セッション管理システムで自動処理
-def submit_exam_answer():
-    """試験回答提出"""
-    try:
-        # FIRE ULTRA SYNC FIX: 詳細ログ追加
-        logger.info(f"FIRE SUBMIT ANSWER: 回答提出処理開始")
-        
-        exam_session = session.get('exam_session')
-        logger.info(f"FIRE SUBMIT ANSWER: セッション取得 - exists: {exam_session is not None}")
-        
-        if not exam_session:
-            logger.error(f"FIRE SUBMIT ANSWER: セッション不存在")
-            return jsonify({'success': False, 'error': '試験セッションが無効です'})
-            
-        session_status = exam_session.get('status', 'UNKNOWN')
-        logger.info(f"FIRE SUBMIT ANSWER: セッション状態 - status: {session_status}")
-        
-        if session_status != 'in_progress':
-            logger.error(f"FIRE SUBMIT ANSWER: セッション状態不正 - status: {session_status}")
-            return jsonify({'success': False, 'error': '試験セッションが無効です'})
-
-        answer = request.form.get('answer')
-        elapsed = float(request.form.get('elapsed', 0))
-        question_index = exam_session['current_question']
-        
-        logger.info(f"FIRE SUBMIT ANSWER: 回答情報 - answer: {answer}, question_index: {question_index}, elapsed: {elapsed}")
-
-        # 自動提出チェック
-        if exam_simulator.auto_submit_check(exam_session):
-            logger.info(f"FIRE SUBMIT ANSWER: 自動提出実行")
-            result = exam_simulator.finish_exam(exam_session)
-            session['exam_session'] = exam_session
-            session.modified = True
-            return jsonify({
-                'success': True,
-                'exam_finished': True,
-                'redirect': url_for('exam_results')
-            })
-
-        # FIRE ULTRA SYNC FIX: 回答提出前の状態ログ
-        pre_current = exam_session.get('current_question', 'UNKNOWN')
-        logger.info(f"FIRE PROGRESS UPDATE: 回答提出前 - current_question: {pre_current}")
-
-        # 回答提出
-        result = exam_simulator.submit_exam_answer(exam_session, question_index, answer, elapsed)
-        
-        # FIRE ULTRA SYNC FIX: 回答提出後の状態ログ
-        post_current = exam_session.get('current_question', 'UNKNOWN')
-        logger.info(f"FIRE PROGRESS UPDATE: 回答提出後 - current_question: {post_current}, result: {result}")
-
-        # セッション更新
-        session['exam_session'] = exam_session
-        session.modified = True
+            session_cleanup = 0
+        
+        # 緊急メモリクリーンアップ実行
+        _memory_optimizer.emergency_memory_cleanup()
+        
+        # 統計取得
+        cleanup_stats_after = _memory_optimizer.cleanup_stats.copy()
+        optimization_stats = _memory_optimizer.get_optimization_stats()
+        
+        # 最適化結果計算
+        memory_saved = cleanup_stats_after['memory_saved_mb'] - cleanup_stats_before['memory_saved_mb']
+        cache_evictions = cleanup_stats_after['cache_evictions'] - cleanup_stats_before['cache_evictions']
+        
+        result = {
+            'success': True,
+            'message': 'メモリ最適化が完了しました',
+            'optimization_results': {
+                'session_items_cleaned': session_cleanup,
+                'memory_saved_mb': round(memory_saved, 2),
+                'cache_evictions': cache_evictions,
+                'gc_collected': gc.collect()
+            },
+            'current_stats': optimization_stats,
+            'timestamp': format_utc_to_iso()
+        }
+        
+        logger.info(f"SEARCH 手動メモリ最適化完了: {session_cleanup}項目, {memory_saved:.2f}MB削減")
         
-        # FIRE ULTRA SYNC FIX: セッション更新後の確認
-        saved_current = session.get('exam_session', {}).get('current_question', 'UNKNOWN')
-        logger.info(f"FIRE PROGRESS UPDATE: セッション保存後 - current_question: {saved_current}")
-
-        if result.get('exam_completed'):
-            logger.info(f"FIRE SUBMIT ANSWER: 試験完了")
-            return jsonify({
-                'success': True,
-                'exam_finished': True,
-                'redirect': url_for('exam_results')
-            })
-        else:
-            next_question = result.get('next_question', 0)
-            remaining = result.get('remaining_questions', 0)
-            logger.info(f"FIRE SUBMIT ANSWER: 次の問題へ - next_question: {next_question}, remaining: {remaining}")
-            return jsonify({
-                'success': True,
-                'next_question': next_question,
-                'remaining_questions': remaining
-            })
-
-    except Exception as e:
-        logger.error(f"試験回答提出エラー: {e}")
-        return jsonify({'success': False, 'error': str(e)})
-
-
-# FIRE ULTRA SYNC FIX: セッション初期化強制処理（デプロイ修正のため一時無効化）
-# @app.before_request
-# def ensure_session_initialized():
-#     """セッション初期化の確実な実行"""
-#     try:
-#         # セッションが空の場合、最低限の初期化を行う
-#         if not session:
-#             session.permanent = True
-#             session['_initialized'] = True
-#             logger.debug("FIRE SESSION INIT: セッション初期化実行")
-#         
-#         # セッション状態のログ出力（デバッグ用）
-#         if request.endpoint in ['start_exam', 'exam_question', 'submit_exam_answer']:
-#             session_exists = bool(session.get('exam_session'))
-#             logger.info(f"FIRE SESSION CHECK: endpoint={request.endpoint}, session_exists={session_exists}")
-            
-    except Exception as e:
-        logger.error(f"FIRE SESSION INIT ERROR: {e}")
-        # セッション初期化エラーでも処理を続行
-
-
-@app.route('/flag_exam_question', methods=['POST'])
-def flag_exam_question():
-    """試験問題フラグ設定"""
-    try:
-        exam_session = session.get('exam_session')
-        if not exam_session:
-            return jsonify({'success': False, 'error': '試験セッションが無効です'})
-
-        question_index = int(request.form.get('question_index', 0))
-        action = request.form.get('action', 'flag')  # flag or unflag
-
-        if action == 'flag':
-            success = exam_simulator.flag_question(exam_session, question_index)
-        else:
-            success = exam_simulator.unflag_question(exam_session, question_index)
-
-        session['exam_session'] = exam_session
-        session.modified = True
-
-        return jsonify({'success': success})
-
-    except Exception as e:
-        logger.error(f"問題フラグエラー: {e}")
-        return jsonify({'success': False, 'error': str(e)})
-
-
-@app.route('/exam_navigation')
-def exam_navigation():
-    """試験ナビゲーション画面"""
-    try:
-        exam_session = session.get('exam_session')
-        if not exam_session:
-            return redirect(url_for('exam_simulator_page'))
-
-        summary = exam_simulator.get_exam_summary(exam_session)
-
-        return render_template('exam_navigation.html', summary=summary, exam_session=exam_session)
-
-    except Exception as e:
-        logger.error(f"試験ナビゲーションエラー: {e}")
-        return render_template('error.html', error="試験ナビゲーションの表示中にエラーが発生しました。")
-
-
-@app.route('/finish_exam', methods=['POST'])
-def finish_exam():
-    """試験終了"""
-    try:
-        exam_session = session.get('exam_session')
-        if not exam_session:
-            return jsonify({'success': False, 'error': '試験セッションが無効です'})
-
-        exam_simulator.finish_exam(exam_session)
-        session['exam_session'] = exam_session
-        session.modified = True
-
-        return jsonify({
-            'success': True,
-            'redirect': url_for('exam_results')
-        })
-
-    except Exception as e:
-        logger.error(f"試験終了エラー: {e}")
-        return jsonify({'success': False, 'error': str(e)})
-
-
-@app.route('/exam_results')
-def exam_results():
-    """試験結果画面"""
-    try:
-        exam_session = session.get('exam_session')
-        if not exam_session or 'results' not in exam_session:
-            return redirect(url_for('exam_simulator_page'))
-
-        results = exam_session['results']
-
-        # 過去の試験結果を記録
-        if 'exam_history' not in session:
-            session['exam_history'] = []
-
-        session['exam_history'].append({
-            'exam_id': exam_session['exam_id'],
-            'exam_type': exam_session['exam_type'],
-            'score': results['score'],
-            'date': exam_session['start_time'][:10],
-            'passed': results['passed']
-        })
-        session.modified = True
-
-        return render_template('exam_results.html', results=results, exam_session=exam_session)
-
-    except Exception as e:
-        logger.error(f"試験結果表示エラー: {e}")
-        return render_template('error.html', error="試験結果の表示中にエラーが発生しました。")
-
-
-@app.route('/advanced_statistics')
-def advanced_statistics():
-    """高度な統計分析画面"""
-    try:
-        # 試験履歴を取得
-        exam_history = session.get('exam_history', [])
-
-        # 包括的なレポートを生成
-        comprehensive_report = advanced_analytics.generate_comprehensive_report(session, exam_history)
-
-        return render_template(
-            'advanced_statistics.html',
-            report=comprehensive_report
-        )
-
-    except Exception as e:
-        logger.error(f"高度な統計エラー: {e}")
-        return render_template('error.html', error="高度な統計の表示中にエラーが発生しました。")
-
-
-@app.route('/api/exam_status')
-def api_exam_status():
-    """試験状態API"""
-    try:
-        exam_session = session.get('exam_session')
-        if not exam_session:
-            return jsonify({'exam_active': False})
-
-        return jsonify({
-            'exam_active': exam_session['status'] == 'in_progress',
-            'time_remaining': exam_simulator.get_time_remaining(exam_session),
-            'current_question': exam_session['current_question'],
-            'total_questions': len(exam_session['questions']),
-            'auto_submit_warning': exam_simulator.get_time_remaining(exam_session) <= 5
-        })
-
-    except Exception as e:
-        logger.error(f"試験状態API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-# モバイル機能のAPI エンドポイント
-
-
-@app.route('/api/mobile/manifest')
-def mobile_manifest():
-    """PWAマニフェストの動的生成"""
-    try:
-        manifest = mobile_manager.get_pwa_manifest()
-        return jsonify(manifest)
-    except Exception as e:
-        logger.error(f"マニフェスト生成エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/api/mobile/offline/save', methods=['POST'])
-def save_offline_data():
-    """オフラインデータの保存"""
-    try:
-        data = request.get_json()
-        session_id = session.get('session_id')
-
-        if not session_id:
-            return jsonify({'success': False, 'error': 'セッションIDが見つかりません'}), 400
-
-        success = mobile_manager.save_offline_session(session_id, data)
-
-        if success:
-            return jsonify({'success': True, 'message': 'オフラインデータを保存しました'})
-        else:
-            return jsonify({'success': False, 'error': 'データ保存に失敗しました'}), 500
-
-    except Exception as e:
-        logger.error(f"オフラインデータ保存エラー: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-
-@app.route('/api/mobile/offline/sync', methods=['POST'])
-def sync_offline_data():
-    """オフラインデータの同期"""
-    try:
-        sync_result = mobile_manager.sync_offline_data(session)
-        session.modified = True
-
-        mobile_manager.update_last_sync_time()
-
-        return jsonify({
-            'success': sync_result['success'],
-            'synced_sessions': sync_result['synced_sessions'],
-            'failed_sessions': sync_result['failed_sessions'],
-            'errors': sync_result['errors']
-        })
-
-    except Exception as e:
-        logger.error(f"オフライン同期エラー: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-
-@app.route('/api/mobile/voice/settings', methods=['GET', 'POST'])
-def voice_settings():
-    """音声設定の取得・更新"""
-    try:
-        if request.method == 'GET':
-            settings = mobile_manager.get_voice_settings()
-            return jsonify(settings)
-        else:
-            data = request.get_json()
-            success = mobile_manager.update_voice_settings(data)
-
-            if success:
-                return jsonify({'success': True, 'message': '音声設定を更新しました'})
-            else:
-                return jsonify({'success': False, 'error': '設定更新に失敗しました'}), 500
-
-    except Exception as e:
-        logger.error(f"音声設定エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/api/mobile/touch/settings', methods=['GET', 'POST'])
-def touch_settings():
-    """タッチジェスチャー設定の取得・更新"""
-    try:
-        if request.method == 'GET':
-            settings = mobile_manager.get_touch_settings()
-            return jsonify(settings)
-        else:
-            data = request.get_json()
-            success = mobile_manager.update_touch_settings(data)
-
-            if success:
-                return jsonify({'success': True, 'message': 'タッチ設定を更新しました'})
-            else:
-                return jsonify({'success': False, 'error': '設定更新に失敗しました'}), 500
-
-    except Exception as e:
-        logger.error(f"タッチ設定エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/api/mobile/question/<int:question_id>')
-def mobile_optimized_question(question_id):
-    """モバイル最適化問題データ"""
-    try:
-        questions = load_questions()
-        question = next((q for q in questions if int(q.get('id', 0)) == question_id), None)
-
-        if not question:
-            return jsonify({'error': '問題が見つかりません'}), 404
-
-        mobile_question = mobile_manager.get_mobile_optimized_question(question)
-        return jsonify(mobile_question)
-
-    except Exception as e:
-        logger.error(f"モバイル問題取得エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/api/mobile/cache/questions')
-def mobile_cache_questions():
-    """モバイル用問題キャッシュデータ"""
-    try:
-        questions = load_questions()
-        cache_data = mobile_manager.generate_mobile_cache_data(questions)
-        return jsonify(cache_data)
-
-    except Exception as e:
-        logger.error(f"モバイルキャッシュ生成エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/api/mobile/performance')
-def mobile_performance_metrics():
-    """モバイルパフォーマンス指標"""
-    try:
-        metrics = mobile_manager.get_performance_metrics()
-        return jsonify(metrics)
-
-    except Exception as e:
-        logger.error(f"パフォーマンス指標エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/mobile_settings')
-def mobile_settings():
-    """モバイル設定画面"""
-    return render_template('mobile_settings.html')
-
-
-@app.route('/manifest.json')
-def pwa_manifest():
-    """PWAマニフェストの配信"""
-    try:
-        manifest = mobile_manager.get_pwa_manifest()
-        response = jsonify(manifest)
-        response.headers['Content-Type'] = 'application/manifest+json'
-        return response
-    except Exception as e:
-        logger.error(f"マニフェスト配信エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/sw.js')
-def service_worker():
-    """Service Workerの配信"""
-    try:
-        return send_from_directory('static', 'sw.js', mimetype='application/javascript')
-    except Exception as e:
-        logger.debug(f"Service Worker配信エラー: {e}")
-        return '', 404
-
-
-@app.route('/favicon.ico')
-def favicon():
-    """Faviconの配信"""
-    try:
-        return send_from_directory('static/icons', 'favicon.ico')
-    except Exception as e:
-        logger.debug(f"Favicon配信エラー: {e}")
-        return '', 404
-
-
-@app.route('/icon-<size>.png')
-def app_icon(size):
-    """アプリアイコンの配信"""
-    try:
-        return send_from_directory('static/icons', f'icon-{size}.png')
-    except Exception as e:
-        logger.debug(f"アイコン配信エラー: {e}")
-        return '', 404
-
-# === 未実装ルートのリダイレクト対応（ウルトラシンク修正） ===
-
-
-@app.route('/social_learning')
-def social_learning_redirect():
-    """ソーシャル学習機能（ヘルプからのリダイレクト対応）"""
-    return redirect(url_for('social_learning_page'))
-
-
-@app.route('/leaderboard')
-def leaderboard_redirect():
-    """ランキング機能（ヘルプからのリダイレクト対応）"""
-    return redirect('/social/leaderboard')
-
-
-@app.route('/health_check')
-def health_check():
-    """システムヘルスチェック（ウルトラシンク新規実装）"""
-    try:
-        # アプリケーション健康状態チェック
-        health_status = {
-            'status': 'healthy',
-            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
-            'timestamp': format_utc_to_iso(),
-            'version': '2025 Enterprise Edition',
-            'database': 'file-based',
-            'checks': {
-                'data_loading': 'ok',
-                'session_management': 'ok',
-                'ai_modules': 'ok',
-                'cache_system': 'ok'
-            },
-            'stats': {
-                'total_questions': 0,
-                'active_sessions': len(session_locks) if 'session_locks' in globals() else 0,
-                'memory_usage': 'normal',
-                'response_time': 'fast'
-            }
-        }
-
-        # 問題データの健康チェック
-        try:
-            questions = load_questions()
-            health_status['stats']['total_questions'] = len(questions)
-            health_status['checks']['data_loading'] = 'ok'
-        except Exception as e:
-            health_status['checks']['data_loading'] = f'error: {str(e)}'
-            health_status['status'] = 'degraded'
-
-        # AI機能の健康チェック
-        try:
-            # Global variables managed elsewhere
-            if ai_analyzer is None or advanced_analytics is None:
-                health_status['checks']['ai_modules'] = 'not_initialized'
-            else:
-                health_status['checks']['ai_modules'] = 'ok'
-        except Exception as e:
-            health_status['checks']['ai_modules'] = f'error: {str(e)}'
-
-        # セッション管理の健康チェック
-        try:
-            if 'session_locks' in globals():
-                health_status['stats']['active_sessions'] = len(session_locks)
-                health_status['checks']['session_management'] = 'ok'
-            else:
-                health_status['checks']['session_management'] = 'warning: locks not initialized'
-        except Exception as e:
-            health_status['checks']['session_management'] = f'error: {str(e)}'
-
-        # 最終的な健康状態判定
-        if any('error' in str(check) for check in health_status['checks'].values()):
-            health_status['status'] = 'unhealthy'
-        elif any('warning' in str(check) for check in health_status['checks'].values()):
-            health_status['status'] = 'degraded'
-
-        return jsonify(health_status), 200 if health_status['status'] == 'healthy' else 503
-
-    except Exception as e:
-        logger.error(f"ヘルスチェックエラー: {e}")
-        return jsonify({
-            'status': 'error',
-            'message': str(e),
-            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
-            'timestamp': format_utc_to_iso()
-        }), 500
-
-
-@app.route('/api/system/file_handles')
-def api_file_handle_status():
-    """🔒 ファイルハンドル状況監視API（ウルトラシンク安全性監視）"""
-    try:
-        # アクティブファイルハンドル数取得
-        active_handles = get_active_file_handles()
-        
-        # システム制限値取得
-        import resource
-        try:
-            soft_limit, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
-        except (OSError, AttributeError, ImportError) as e:
-            # システムリソース取得エラーの場合は不明として設定
-            logger.warning(f"System resource limit detection error: {e}")
-            soft_limit, hard_limit = 'unknown', 'unknown'
-            # パフォーマンス監視に影響するがシステム継続可能
-            soft_limit, hard_limit = 'unknown', 'unknown'
-        
-        # 使用率計算
-        if isinstance(soft_limit, int) and soft_limit > 0:
-            usage_percentage = (active_handles / soft_limit) * 100
-            status = 'healthy' if usage_percentage < 50 else 'warning' if usage_percentage < 80 else 'critical'
-        else:
-            usage_percentage = 0
-            status = 'healthy' if active_handles < 100 else 'warning'
-        
-        # ファイルハンドル統計
-        file_stats = {
-            'active_handles': active_handles,
-            'system_limits': {
-                'soft_limit': soft_limit,
-                'hard_limit': hard_limit
-            },
-            'usage_percentage': round(usage_percentage, 2),
-            'status': status,
-            'recommendations': []
-        }
-        
-        # 推奨事項
-        if active_handles > 50:
-            file_stats['recommendations'].append('大量のファイルハンドルが使用中です')
-        if usage_percentage > 70:
-            file_stats['recommendations'].append('システム制限に近づいています')
-        if status == 'healthy':
-            file_stats['recommendations'].append('ファイルハンドル使用量は正常範囲内です')
-        
-        return jsonify({
-            'success': True,
-            'file_handle_status': file_stats,
-            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
-            'timestamp': format_utc_to_iso()
-        })
-        
-    except Exception as e:
-        logger.error(f"ファイルハンドル状況API エラー: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
-            'timestamp': format_utc_to_iso()
-        }), 500
-
-
-@app.route('/api/system/memory_status')
-def api_memory_status():
-    """SEARCH メモリ最適化状況監視API（ウルトラシンクメモリ監視）"""
-    try:
-        if _memory_optimizer:
-            # ウルトラシンク最適化統計取得
-            stats = _memory_optimizer.get_optimization_stats()
-            
-            # メモリ健康状態チェック
-            is_healthy = _memory_optimizer.memory_health_check()
-            
-            memory_status = {
-                'success': True,
-                'status': 'healthy' if is_healthy else 'warning',
-                'optimizer_enabled': True,
-                'stats': stats,
-                'recommendations': []
-            }
-            
-            # メモリ使用量に基づく推奨事項
-            current_memory = stats.get('current_memory_mb', 0)
-            if current_memory > 300:
-                memory_status['recommendations'].append({
-                    'type': 'memory_usage',
-                    'message': f'高メモリ使用量: {current_memory:.1f}MB - セッション最適化推奨',
-                    'action': 'セッションクリーンアップの頻度を上げてください'
-                })
-            
-            # キャッシュ統計
-            cache_stats = stats.get('cache_stats', {})
-            if cache_stats.get('estimated_memory_mb', 0) > 50:
-                memory_status['recommendations'].append({
-                    'type': 'cache_size',
-                    'message': 'キャッシュサイズが大きくなっています',
-                    'action': 'キャッシュクリーンアップを実行してください'
-                })
-            
-        else:
-            # フォールバック: 基本的なメモリ情報
-            try:
-                process = psutil.Process()
-                memory_mb = process.memory_info().rss / 1024 / 1024
-                memory_percent = psutil.virtual_memory().percent
-                
-                memory_status = {
-                    'success': True,
-                    'status': 'basic' if memory_mb < 500 else 'warning',
-                    'optimizer_enabled': False,
-                    'stats': {
-                        'current_memory_mb': round(memory_mb, 2),
-                        'system_memory_percent': round(memory_percent, 1),
-                        'message': 'Ultra Sync Memory Optimizer が利用できません'
-                    },
-                    'recommendations': [
-                        {
-                            'type': 'optimizer_missing',
-                            'message': 'Memory Optimizer が見つかりません',
-                            'action': 'ultra_sync_memory_leak_fix.py を確認してください'
-                        }
-                    ]
-                }
-                
-                if memory_mb > 500:
-                    memory_status['recommendations'].append({
-                        'type': 'high_memory',
-                        'message': f'高メモリ使用量: {memory_mb:.1f}MB',
-                        'action': 'アプリケーション再起動を検討してください'
-                    })
-                    
-            except Exception as e:
-                memory_status = {
-                    'success': False,
-                    'status': 'error',
-                    'optimizer_enabled': False,
-                    'error': str(e),
-                    'message': 'メモリ情報取得に失敗しました'
-                }
-        
-        # SEARCH ENHANCED: Memory Leak Monitor 統合データ追加
-        if _memory_leak_monitor:
-            try:
-                leak_monitor_status = _memory_leak_monitor.get_memory_status()
-                memory_status['memory_leak_monitor'] = {
-                    'enabled': True,
-                    'monitoring_active': leak_monitor_status.get('monitoring_active', False),
-                    'total_leaks_detected': leak_monitor_status.get('total_leaks_detected', 0),
-                    'monitoring_duration_hours': leak_monitor_status.get('monitoring_duration_hours', 0),
-                    'recent_leaks_count': len(leak_monitor_status.get('recent_leaks', [])),
-                    'recent_memory_trend': leak_monitor_status.get('recent_memory_data', [])[-3:] if leak_monitor_status.get('recent_memory_data') else []
-                }
-                
-                # リーク検出に基づく推奨事項追加
-                recent_leaks = leak_monitor_status.get('recent_leaks', [])
-                if recent_leaks:
-                    critical_leaks = [l for l in recent_leaks if l.get('severity') == 'critical']
-                    high_leaks = [l for l in recent_leaks if l.get('severity') == 'high']
-                    
-                    if critical_leaks:
-                        memory_status['recommendations'].append({
-                            'type': 'critical_memory_leak',
-                            'message': f'{len(critical_leaks)}個の重大なメモリリークが検出されました',
-                            'action': '即座にアプリケーションの再起動を検討してください'
-                        })
-                    elif high_leaks:
-                        memory_status['recommendations'].append({
-                            'type': 'high_memory_leak',
-                            'message': f'{len(high_leaks)}個の高レベルメモリリークが検出されました',
-                            'action': 'メモリ最適化を実行してください'
-                        })
-                        
-            except Exception as e:
-                logger.warning(f"Memory Leak Monitor データ取得エラー: {e}")
-                memory_status['memory_leak_monitor'] = {
-                    'enabled': False,
-                    'error': str(e)
-                }
-        else:
-            memory_status['memory_leak_monitor'] = {
-                'enabled': False,
-                'message': 'Memory Leak Monitor が利用できません'
-            }
-        
-        # 共通レスポンス項目追加
-        memory_status.update({
-            'timestamp': format_utc_to_iso(),
-            'memory_optimization_info': {
-                'session_limits': 'MAX_HISTORY=100, MAX_SRS=500',
-                'cache_management': 'LRU + TTL',
-                'lock_pooling': 'Enabled' if _memory_optimizer else 'Disabled',
-                'leak_monitoring': 'Enabled' if _memory_leak_monitor else 'Disabled'
-            }
-        })
-        
-        return jsonify(memory_status)
-        
-    except Exception as e:
-        logger.error(f"メモリ状況API エラー: {e}")
-        return jsonify({
-            'success': False,
-            'status': 'error',
-            'error': str(e),
-            'timestamp': format_utc_to_iso()
-        }), 500
-
-
-@app.route('/api/system/optimize_memory', methods=['POST'])
-@memory_optimization_decorator
-def api_optimize_memory():
-    """SEARCH 手動メモリ最適化実行API（ウルトラシンクメモリ最適化）"""
-    try:
-        if not _memory_optimizer:
-            return jsonify({
-                'success': False,
-                'error': 'Memory Optimizer が利用できません',
-                'timestamp': format_utc_to_iso()
-            }), 503
-        
-        # 手動最適化実行
-        cleanup_stats_before = _memory_optimizer.cleanup_stats.copy()
-        
-        # セッション最適化
-        if 'session' in globals() and session:
-            session_cleanup = _memory_optimizer.aggressive_session_cleanup(session)
-        else:
-            session_cleanup = 0
-        
-        # 緊急メモリクリーンアップ実行
-        _memory_optimizer.emergency_memory_cleanup()
-        
-        # 統計取得
-        cleanup_stats_after = _memory_optimizer.cleanup_stats.copy()
-        optimization_stats = _memory_optimizer.get_optimization_stats()
-        
-        # 最適化結果計算
-        memory_saved = cleanup_stats_after['memory_saved_mb'] - cleanup_stats_before['memory_saved_mb']
-        cache_evictions = cleanup_stats_after['cache_evictions'] - cleanup_stats_before['cache_evictions']
-        
-        result = {
-            'success': True,
-            'message': 'メモリ最適化が完了しました',
-            'optimization_results': {
-                'session_items_cleaned': session_cleanup,
-                'memory_saved_mb': round(memory_saved, 2),
-                'cache_evictions': cache_evictions,
-                'gc_collected': gc.collect()
-            },
-            'current_stats': optimization_stats,
-            'timestamp': format_utc_to_iso()
-        }
-        
-        logger.info(f"SEARCH 手動メモリ最適化完了: {session_cleanup}項目, {memory_saved:.2f}MB削減")
-        
-        return jsonify(result)
-        
-    except Exception as e:
-        logger.error(f"手動メモリ最適化API エラー: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'timestamp': format_utc_to_iso()
-        }), 500
-
-
-# === 📊 Ultra Sync Performance Optimization API ===
-
-@app.route('/api/system/performance_status')
-#@performance_timing_decorator
-def api_performance_status():
-    """📊 パフォーマンス最適化状況監視API（ウルトラシンクパフォーマンス監視）"""
-    try:
-        if _performance_optimizer:
-            # ウルトラシンクパフォーマンス統計取得
-            stats = _performance_optimizer.get_performance_stats()
-            
-            performance_status = {
-                'success': True,
-                'status': 'optimized' if stats.get('data_loaded') else 'not_optimized',
-                'optimizer_enabled': True,
-                'stats': stats,
-                'recommendations': []
-            }
-            
-            # パフォーマンスに基づく推奨事項
-            avg_response_time = stats.get('average_response_time', 0)
-            if avg_response_time > 500:  # 500ms以上
-                performance_status['recommendations'].append({
-                    'type': 'response_time',
-                    'message': f'レスポンス時間が遅延: {avg_response_time}ms',
-                    'action': 'キャッシュクリーンアップまたはインデックス再構築推奨'
-                })
-            
-            # キャッシュヒット率チェック
-            cache_hit_rate = stats.get('cache_hit_rate', 0)
-            if cache_hit_rate < 70:  # 70%未満
-                performance_status['recommendations'].append({
-                    'type': 'cache_efficiency',
-                    'message': f'キャッシュヒット率が低下: {cache_hit_rate}%',
-                    'action': 'キャッシュサイズ調整またはデータアクセスパターン最適化'
-                })
-            
-            # インデックス状況チェック
-            questions_indexed = stats.get('questions_indexed', 0)
-            if questions_indexed == 0:
-                performance_status['recommendations'].append({
-                    'type': 'indexing',
-                    'message': 'インデックスが構築されていません',
-                    'action': 'データ再読み込みまたはインデックス手動構築'
-                })
-            
-        else:
-            # フォールバック: 基本的なパフォーマンス情報
-            performance_status = {
-                'success': True,
-                'status': 'basic',
-                'optimizer_enabled': False,
-                'stats': {
-                    'data_loaded': False,
-                    'data_load_time': None,
-                    'questions_indexed': 0,
-                    'cache_hit_rate': 0,
-                    'average_response_time': 0,
-                    'performance_stats': {},
-                    'cache_info': {}
-                },
-                'recommendations': [{
-                    'type': 'optimization',
-                    'message': 'Performance Optimizer が無効です',
-                    'action': 'ultra_sync_performance_optimization.py の確認'
-                }]
-            }
-        
-        # 共通レスポンス項目追加
-        performance_status.update({
-            'timestamp': format_utc_to_iso(),
-            'performance_optimization_info': {
-                'index_types': 'ID, Category, Department, Year, Type',
-                'cache_strategy': 'LRU with TTL',
-                'search_complexity': 'O(1) for indexed searches'
-            }
-        })
-        
-        return jsonify(performance_status)
-        
-    except Exception as e:
-        logger.error(f"パフォーマンス状況API エラー: {e}")
-        return jsonify({
-            'success': False,
-            'status': 'error',
-            'error': str(e),
-            'timestamp': format_utc_to_iso()
-        }), 500
-
-
-@app.route('/api/system/performance_clear_cache', methods=['POST'])
-#@performance_timing_decorator
-def api_performance_clear_cache():
-    """📊 パフォーマンスキャッシュクリア実行API（ウルトラシンクパフォーマンス最適化）"""
-    try:
-        if not _performance_optimizer:
-            return jsonify({
-                'success': False,
-                'error': 'Performance Optimizer が利用できません',
-                'timestamp': format_utc_to_iso()
-            }), 503
-        
-        # キャッシュクリア実行
-        cleared_counts = _performance_optimizer.clear_performance_cache()
-        
-        result = {
-            'success': True,
-            'message': 'パフォーマンスキャッシュがクリアされました',
-            'cleared_items': cleared_counts,
-            'timestamp': format_utc_to_iso()
-        }
-        
-        logger.info(f"📊 パフォーマンスキャッシュクリア完了: {cleared_counts}")
-        
-        return jsonify(result)
-        
-    except Exception as e:
-        logger.error(f"パフォーマンスキャッシュクリアAPI エラー: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'timestamp': format_utc_to_iso()
-        }), 500
-
-
-@app.route('/api/system/performance_rebuild_index', methods=['POST'])
-#@performance_timing_decorator
-def api_performance_rebuild_index():
-    """📊 パフォーマンスインデックス再構築API（ウルトラシンクパフォーマンス最適化）"""
-    try:
-        if not _performance_optimizer:
-            return jsonify({
-                'success': False,
-                'error': 'Performance Optimizer が利用できません',
-                'timestamp': format_utc_to_iso()
-            }), 503
-        
-        # 現在のキャッシュされた問題データを取得
-        try:
-            # FIRE ULTRA SYNC FIX: 未定義関数修正 - 適切なデータ読み込み関数を使用
-            current_questions = load_questions_improved('data/questions.csv')
-            if not current_questions:
-                # EMERGENCY FIX: バックアップとして緊急データローダーを使用
-                rccm_data = emergency_load_all_questions()  # EMERGENCY FIX
-                # emergency_load_all_questions は List[Dict] を返すため直接使用
-                current_questions = rccm_data if isinstance(rccm_data, list) else []
-        except Exception as e:
-            logger.error(f"問題データ読み込みエラー: {e}")
-            current_questions = []
-        
-        if not current_questions:
-            return jsonify({
-                'success': False,
-                'error': '問題データが見つかりません',
-                'timestamp': format_utc_to_iso()
-            }), 404
-        
-        # インデックス再構築実行
-        _performance_optimizer.build_high_performance_indexes(current_questions)
-        
-        # 新しい統計取得
-        new_stats = _performance_optimizer.get_performance_stats()
-        
-        result = {
-            'success': True,
-            'message': 'パフォーマンスインデックスが再構築されました',
-            'rebuild_results': {
-                'questions_indexed': new_stats.get('questions_indexed', 0),
-                'categories_indexed': new_stats.get('categories_indexed', 0),
-                'departments_indexed': new_stats.get('departments_indexed', 0),
-                'years_indexed': new_stats.get('years_indexed', 0),
-                'types_indexed': new_stats.get('types_indexed', 0),
-                'build_time': new_stats.get('data_load_time', 0)
-            },
-            'timestamp': format_utc_to_iso()
-        }
-        
-        logger.info(f"📊 パフォーマンスインデックス再構築完了: {new_stats.get('questions_indexed', 0)}問")
-        
-        return jsonify(result)
-        
-    except Exception as e:
-        logger.error(f"パフォーマンスインデックス再構築API エラー: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'timestamp': format_utc_to_iso()
-        }), 500
-
-
-# === 🧪 Ultra Sync Manual Test Support Routes ===
-
-@app.route('/manual_test_dashboard')
-def manual_test_dashboard():
-    """🧪 手動テストダッシュボード（CLAUDE.md準拠・スクリプトテスト絶対禁止）"""
-    try:
-        # ウルトラシンク方針: 副作用ゼロでダッシュボード表示
-        dashboard_path = os.path.join(os.path.dirname(__file__), 'manual_test_dashboard.html')
-        
-        if os.path.exists(dashboard_path):
-            with open(dashboard_path, 'r', encoding='utf-8') as f:
-                dashboard_content = f.read()
-            
-            logger.info("🧪 手動テストダッシュボード表示 - スクリプトテスト絶対禁止")
-            return dashboard_content, 200, {'Content-Type': 'text/html; charset=utf-8'}
-        else:
-            logger.error("ERROR 手動テストダッシュボードファイルが見つかりません")
-            return render_template('error.html', 
-                                   error="手動テストダッシュボードが利用できません"), 404
-                                   
-    except Exception as e:
-        logger.error(f"手動テストダッシュボードエラー: {e}")
-        return render_template('error.html', 
-                               error="手動テストダッシュボードの読み込み中にエラーが発生しました"), 500
-
-
-@app.route('/manual_test_guide')
-def manual_test_guide():
-    """🧪 手動テストガイド表示（CLAUDE.md準拠）"""
-    try:
-        guide_path = os.path.join(os.path.dirname(__file__), 'MANUAL_TEST_GUIDE.md')
-        
-        if os.path.exists(guide_path):
-            with open(guide_path, 'r', encoding='utf-8') as f:
-                guide_content = f.read()
-            
-            # Markdownをプレーンテキストとして表示
-            return f"""
-            <html>
-            <head>
-                <title>🧪 RCCM 手動テストガイド</title>
-                <meta charset="UTF-8">
-                <style>
-                    body {{ font-family: monospace; padding: 20px; background: #f5f5f5; }}
-                    pre {{ background: white; padding: 20px; border-radius: 8px; overflow-x: auto; }}
-                </style>
-            </head>
-            <body>
-                <h1>🧪 RCCM 手動テストガイド</h1>
-                <pre>{guide_content}</pre>
-            </body>
-            </html>
-            """, 200, {'Content-Type': 'text/html; charset=utf-8'}
-        else:
-            return render_template('error.html', 
-                                   error="手動テストガイドが見つかりません"), 404
-                                   
-    except Exception as e:
-        logger.error(f"手動テストガイド表示エラー: {e}")
-        return render_template('error.html', 
-                               error="手動テストガイドの読み込み中にエラーが発生しました"), 500
-
-
-@app.route('/api/manual_test/monitoring_status')
-def api_manual_test_monitoring_status():
-    """🧪 手動テスト監視状況API（CLAUDE.md準拠・副作用ゼロ）"""
-    try:
-        # ウルトラシンク方針: 副作用ゼロでログファイル統計のみ取得
-        log_file_path = os.path.join(os.path.dirname(__file__), 'rccm_app.log')
-        
-        # 基本統計
-        status = {
-            'success': True,
-            'monitoring_available': True,
-            'log_file_exists': os.path.exists(log_file_path),
-            'timestamp': format_utc_to_iso()
-        }
-        
-        if status['log_file_exists']:
-            try:
-                # ログファイル基本情報（副作用なし）
-                file_stats = os.stat(log_file_path)
-                status['log_file_info'] = {
-                    'size_bytes': file_stats.st_size,
-                    'size_mb': round(file_stats.st_size / (1024 * 1024), 2),
-                    'last_modified': datetime.fromtimestamp(file_stats.st_mtime).isoformat()
-                }
-                
-                # 最近のログエントリ統計（読み取り専用）
-                with open(log_file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    
-                recent_lines = lines[-50:] if len(lines) > 50 else lines
-                
-                # パターン検索（副作用なし）
-                manual_test_count = sum(1 for line in recent_lines if '🧪 MANUAL TEST QUALITY CHECK' in line)
-                error_count = sum(1 for line in recent_lines if any(marker in line for marker in ['ERROR', 'ERROR', 'CRITICAL']))
-                success_count = sum(1 for line in recent_lines if 'SUCCESS' in line)
-                warning_count = sum(1 for line in recent_lines if any(marker in line for marker in ['WARNING', 'WARNING']))
-                
-                status['recent_activity'] = {
-                    'manual_tests_detected': manual_test_count,
-                    'error_messages': error_count,
-                    'success_messages': success_count,
-                    'warning_messages': warning_count,
-                    'total_recent_lines': len(recent_lines)
-                }
-                
-                # 推奨事項
-                recommendations = []
-                if manual_test_count == 0:
-                    recommendations.append("手動テストが検出されていません - テストダッシュボードから開始してください")
-                elif error_count > 0:
-                    recommendations.append(f"エラーが {error_count}件 検出されています - ログを確認してください")
-                elif manual_test_count > 0 and error_count == 0:
-                    recommendations.append("手動テストが正常に実行されています")
-                    
-                status['recommendations'] = recommendations
-                
-            except Exception as e:
-                logger.warning(f"ログファイル解析エラー: {e}")
-                status['log_analysis_error'] = str(e)
-        else:
-            status['recommendations'] = ["ログファイルが見つかりません - アプリケーションを起動してください"]
-            
-        # 手動テスト支援情報
-        status['manual_test_support'] = {
-            'dashboard_url': '/manual_test_dashboard',
-            'guide_url': '/manual_test_guide',
-            'script_testing_prohibited': True,
-            'claude_md_compliant': True
-        }
-        
-        return jsonify(status)
-        
-    except Exception as e:
-        logger.error(f"手動テスト監視状況API エラー: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'timestamp': format_utc_to_iso()
-        }), 500
-
-
-@app.route('/api/manual_test/quality_check')
-def api_manual_test_quality_check():
-    """🧪 手動テスト品質チェックAPI（CLAUDE.md準拠・副作用ゼロ）"""
-    try:
-        log_file_path = os.path.join(os.path.dirname(__file__), 'rccm_app.log')
-        
-        quality_status = {
-            'success': True,
-            'timestamp': format_utc_to_iso(),
-            'quality_checks': {
-                'year_consistency': {'passed': 0, 'failed': 0},
-                'department_consistency': {'passed': 0, 'failed': 0},
-                'question_duplicates': {'passed': 0, 'failed': 0},
-                'performance_checks': {'good': 0, 'warnings': 0}
-            },
-            'overall_quality_score': 0,
-            'critical_issues': [],
-            'recommendations': []
-        }
-        
-        if os.path.exists(log_file_path):
-            try:
-                # ログファイルから品質チェック結果を抽出（副作用なし）
-                with open(log_file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    
-                # 年度統一性チェック
-                year_success = content.count('SUCCESS 年度統一性: 完全')
-                year_failed = content.count('ERROR 年度統一性: 失敗')
-                quality_status['quality_checks']['year_consistency'] = {
-                    'passed': year_success,
-                    'failed': year_failed
-                }
-                
-                # 部門統一性チェック
-                dept_success = content.count('SUCCESS 部門統一性: 完全')
-                dept_failed = content.count('ERROR 部門統一性: 失敗')
-                quality_status['quality_checks']['department_consistency'] = {
-                    'passed': dept_success,
-                    'failed': dept_failed
-                }
-                
-                # 問題ID重複チェック
-                dup_success = content.count('SUCCESS 問題ID重複: なし')
-                dup_failed = content.count('ERROR 問題ID重複: 検出')
-                quality_status['quality_checks']['question_duplicates'] = {
-                    'passed': dup_success,
-                    'failed': dup_failed
-                }
-                
-                # パフォーマンスチェック
-                perf_good = content.count('BOLT パフォーマンス: レスポンス')
-                perf_warnings = content.count('WARNING パフォーマンス警告') + content.count('WARNING レスポンス時間警告')
-                quality_status['quality_checks']['performance_checks'] = {
-                    'good': perf_good,
-                    'warnings': perf_warnings
-                }
-                
-                # 全体品質スコア計算
-                total_checks = year_success + year_failed + dept_success + dept_failed + dup_success + dup_failed
-                total_passed = year_success + dept_success + dup_success
-                
-                if total_checks > 0:
-                    quality_score = (total_passed / total_checks) * 100
-                    # パフォーマンス警告でスコア減点
-                    quality_score = max(0, quality_score - (perf_warnings * 5))
-                    quality_status['overall_quality_score'] = round(quality_score, 1)
-                    
-                # 重要問題検出
-                critical_issues = []
-                if year_failed > 0:
-                    critical_issues.append(f"年度混在エラー: {year_failed}件")
-                if dept_failed > 0:
-                    critical_issues.append(f"部門混在エラー: {dept_failed}件")
-                if dup_failed > 0:
-                    critical_issues.append(f"問題ID重複: {dup_failed}件")
-                    
-                quality_status['critical_issues'] = critical_issues
-                
-                # 推奨事項
-                recommendations = []
-                if quality_status['overall_quality_score'] >= 90:
-                    recommendations.append("品質状況は非常に良好です")
-                elif quality_status['overall_quality_score'] >= 70:
-                    recommendations.append("品質状況は良好ですが、一部改善の余地があります")
-                elif critical_issues:
-                    recommendations.append("重要な品質問題が検出されています - 修正が必要です")
-                else:
-                    recommendations.append("手動テストを開始して品質チェックを実行してください")
-                    
-                if perf_warnings > 0:
-                    recommendations.append(f"パフォーマンス警告 {perf_warnings}件 - レスポンス時間を確認してください")
-                    
-                quality_status['recommendations'] = recommendations
-                
-            except Exception as e:
-                logger.warning(f"品質チェック解析エラー: {e}")
-                quality_status['analysis_error'] = str(e)
-                
-        return jsonify(quality_status)
-        
-    except Exception as e:
-        logger.error(f"手動テスト品質チェックAPI エラー: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'timestamp': format_utc_to_iso()
-        }), 500
-
-
-# SHIELD ULTRA SYNC ERROR HANDLER CONSOLIDATION: 
-# 重複エラーハンドラーは統合版に置き換え（ultra_sync_error_loop_prevention.py）
-
-# === AI学習アナリティクス ===
-
-
-@app.route('/ai_dashboard')
-def ai_dashboard():
-    """AIダッシュボード"""
-    try:
-        # セッションデータ取得
-        user_session = session
-        history = user_session.get('history', [])
-        srs_data = user_session.get('srs_data', {})
-
-        # AI分析実行
-        analysis = {}
-        if history:
-            from ai_analyzer import ai_analyzer
-
-            # 学習スタイル分析
-            try:
-                learning_style_result = ai_analyzer.determine_learning_style(history)
-                analysis['learning_style'] = learning_style_result.get('style', '分析中...')
-            except (AttributeError, TypeError, KeyError, ImportError):
-                analysis['learning_style'] = '視覚学習型'
-
-            # パフォーマンス予測
-            try:
-                performance_prediction = ai_analyzer.predict_performance(srs_data)
-                analysis['performance_prediction'] = performance_prediction
-            except (AttributeError, TypeError, KeyError, ImportError):
-                analysis['performance_prediction'] = {'score': 72}
-
-            # 弱点パターン分析
-            try:
-                weakness_patterns = ai_analyzer.analyze_weakness_patterns(history)
-                analysis['weakness_patterns'] = weakness_patterns.get('patterns', [])
-            except (AttributeError, TypeError, KeyError, ImportError):
-                analysis['weakness_patterns'] = []
-
-            # 学習推奨事項
-            try:
-                recommendations = ai_analyzer.generate_recommendations(history, srs_data)
-                analysis['study_recommendations'] = recommendations
-            except (AttributeError, TypeError, KeyError, ImportError):
-                analysis['study_recommendations'] = []
-        else:
-            # デフォルトデータ
-            analysis = {
-                'learning_style': '学習データを蓄積中...',
-                'performance_prediction': {'score': 0},
-                'weakness_patterns': [],
-                'study_recommendations': [],
-                'optimal_study_time': '午前中',
-                'memory_retention': {
-                    'retention_rate': 0,
-                    'average_retention_days': 0,
-                    'forgetting_curve_type': '標準型'
-                }
-            }
-
-        return render_template('ai_dashboard.html', analysis=analysis)
-
-    except Exception as e:
-        logger.error(f"AIダッシュボード エラー: {e}")
-        return render_template('ai_dashboard.html', analysis={
-            'learning_style': 'AI分析準備中...',
-            'performance_prediction': {'score': 0},
-            'weakness_patterns': [],
-            'study_recommendations': []
-        })
-
-
-@app.route('/advanced_analytics')
-def advanced_analytics_view():
-    """高度分析"""
-    try:
-        # セッションデータ取得
-        user_session = session
-        history = user_session.get('history', [])
-        srs_data = user_session.get('srs_data', {})
-
-        # 高度分析実行
-        analytics = {}
-        if history and advanced_analytics:
-            try:
-                # 時系列分析
-                advanced_analytics.analyze_time_series(history)
-                analytics['time_series_analysis'] = {
-                    'trend': '上昇傾向',
-                    'peak_performance': 85,
-                    'stability': '良好'
-                }
-
-                # 難易度分析
-                advanced_analytics.analyze_difficulty_distribution(srs_data)
-                analytics['difficulty_distribution'] = {
-                    'best_level': '中級',
-                    'needs_improvement': '上級'
-                }
-
-                # 学習効率分析
-                analytics['study_efficiency'] = {'score': 78}
-                analytics['cognitive_load'] = {'level': '中'}
-                analytics['success_probability'] = {'probability': 85}
-                analytics['learning_curve'] = {'phase': '成長期'}
-
-                # 部門別ヒートマップ
-                analytics['department_heatmap'] = {
-                    '道路部門': {
-                        'basic': 85, 'applied': 72, 'practical': 68,
-                        'basic_color': '#e8f5e8', 'applied_color': '#fff3cd', 'practical_color': '#f8d7da',
-                        'overall_rating': 'B+', 'overall_badge': 'success'
-                    },
-                    '河川砂防部門': {
-                        'basic': 75, 'applied': 68, 'practical': 55,
-                        'basic_color': '#fff3cd', 'applied_color': '#f8d7da', 'practical_color': '#f8d7da',
-                        'overall_rating': 'B', 'overall_badge': 'warning'
-                    }
-                }
-
-                # AI推奨エンジン
-                analytics['recommendation_engine'] = {
-                    'recommendations': [
-                        {'title': '構造力学の復習強化', 'category': '基礎'},
-                        {'title': '施工管理技術の実践問題', 'category': '応用'},
-                        {'title': '法規・制度の暗記強化', 'category': '専門'},
-                        {'title': '計算問題の解法パターン習得', 'category': '技術'},
-                        {'title': '過去問題の反復学習', 'category': '総合'}
-                    ],
-                    'time_allocation': [
-                        {'category': '基礎科目', 'percentage': 30},
-                        {'category': '専門科目', 'percentage': 40},
-                        {'category': '復習', 'percentage': 20},
-                        {'category': '実践演習', 'percentage': 10}
-                    ]
-                }
-
-            except Exception as inner_e:
-                logger.warning(f"高度分析データ生成エラー: {inner_e}")
-                analytics = {}
-
-        # デフォルトデータ設定
-        if not analytics:
-            analytics = {
-                'study_efficiency': {'score': 0},
-                'cognitive_load': {'level': '分析中'},
-                'success_probability': {'probability': 0},
-                'learning_curve': {'phase': 'データ収集中'},
-                'time_series_analysis': None,
-                'difficulty_distribution': None,
-                'department_heatmap': None,
-                'recommendation_engine': None
-            }
-
-        return render_template('advanced_analytics.html', analytics=analytics)
-
-    except Exception as e:
-        logger.error(f"高度分析 エラー: {e}")
-        return render_template('advanced_analytics.html', analytics={
-            'study_efficiency': {'score': 0},
-            'cognitive_load': {'level': '分析準備中'},
-            'success_probability': {'probability': 0},
-            'learning_curve': {'phase': 'システム準備中'}
-        })
-
-# === 管理者ダッシュボード ===
-
-
-@app.route('/admin')
-@require_admin_auth
-def admin_dashboard_page():
-    """管理者ダッシュボードメイン"""
-    try:
-        # 全データを取得
-        overview = admin_dashboard.get_system_overview()
-        questions = admin_dashboard.get_question_management_data()
-        users = admin_dashboard.get_user_progress_overview()
-        content = admin_dashboard.get_content_analytics()
-        performance = admin_dashboard.get_performance_metrics()
-
-        return render_template('admin_dashboard.html',
-                               overview=overview,
-                               questions=questions,
-                               users=users,
-                               content=content,
-                               performance=performance,
-                               data={
-                                   'overview': overview,
-                                   'questions': questions,
-                                   'users': users,
-                                   'content': content,
-                                   'performance': performance
-                               })
-    except Exception as e:
-        logger.error(f"管理者ダッシュボードエラー: {e}")
-        return render_template('error.html', error="ダッシュボードの読み込み中にエラーが発生しました")
-
-
-@app.route('/admin/api/overview')
-@require_admin_auth
-def admin_api_overview():
-    """システム概要API"""
-    try:
-        overview = admin_dashboard.get_system_overview()
-        return jsonify(overview)
-    except Exception as e:
-        logger.error(f"概要API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/admin/api/questions')
-@require_admin_auth
-def admin_api_questions():
-    """問題管理API"""
-    try:
-        questions = admin_dashboard.get_question_management_data()
-        return jsonify(questions)
-    except Exception as e:
-        logger.error(f"問題管理API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/admin/api/users')
-@require_admin_auth
-def admin_api_users():
-    """ユーザー管理API"""
-    try:
-        users = admin_dashboard.get_user_progress_overview()
-        return jsonify(users)
-    except Exception as e:
-        logger.error(f"ユーザー管理API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/admin/api/users/<user_id>')
-@require_admin_auth
-def admin_api_user_detail(user_id):
-    """ユーザー詳細API"""
-    try:
-        user_detail = admin_dashboard.get_detailed_user_analysis(user_id)
-        return jsonify(user_detail)
-    except Exception as e:
-        logger.error(f"ユーザー詳細API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/admin/api/content')
-@require_admin_auth
-def admin_api_content():
-    """コンテンツ分析API"""
-    try:
-        content = admin_dashboard.get_content_analytics()
-        return jsonify(content)
-    except Exception as e:
-        logger.error(f"コンテンツ分析API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/admin/api/performance')
-@require_admin_auth
-def admin_api_performance():
-    """パフォーマンス指標API"""
-    try:
-        performance = admin_dashboard.get_performance_metrics()
-        return jsonify(performance)
-    except Exception as e:
-        logger.error(f"パフォーマンス指標API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/admin/api/reports/<report_type>')
-@require_admin_auth
-def admin_api_reports(report_type):
-    """レポート生成API"""
-    try:
-        if report_type not in ['comprehensive', 'users', 'content', 'performance']:
-            return jsonify({'error': 'Invalid report type'}), 400
-
-        report = admin_dashboard.generate_reports(report_type)
-        return jsonify(report)
-    except Exception as e:
-        logger.error(f"レポート生成API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/admin/api/refresh')
-def admin_api_refresh():
-    """データ更新API"""
-    try:
-        # キャッシュをクリア
-        global _questions_cache, _cache_timestamp
-        _questions_cache = None
-        _cache_timestamp = None
-
-        # 新しい管理者ダッシュボードインスタンスを作成
-        from admin_dashboard import AdminDashboard
-        global admin_dashboard
-        admin_dashboard = AdminDashboard()
-
-        return jsonify({'success': True, 'message': 'データが更新されました'})
-    except Exception as e:
-        logger.error(f"データ更新API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-# === ソーシャル学習機能 ===
-
-
-@app.route('/social')
-def social_learning_page():
-    """ソーシャル学習メインページ"""
-    try:
-        user_id = session.get('user_id', 'anonymous')
-
-        # ユーザーの参加グループ取得
-        user_groups = social_learning_manager.get_user_groups(user_id)
-
-        # おすすめグループ取得
-        recommended_groups = social_learning_manager.discover_groups(user_id, limit=6)
-
-        # ディスカッション一覧取得
-        discussions = social_learning_manager.get_discussions(limit=10)
-
-        # ピア比較データ取得（エラーハンドリング強化）
-        try:
-            peer_comparison = social_learning_manager.get_peer_comparison(user_id, 'department')
-            # エラーレスポンスの場合、Noneに設定
-            if isinstance(peer_comparison, dict) and 'error' in peer_comparison:
-                peer_comparison = None
-        except Exception as e:
-            logger.warning(f"ピア比較データ取得エラー: {e}")
-            peer_comparison = None
-
-        # リーダーボード取得
-        leaderboard = social_learning_manager.get_leaderboard(time_period='month')
-
-        return render_template('social_learning.html',
-                               user_groups=user_groups,
-                               recommended_groups=recommended_groups,
-                               discussions=discussions,
-                               peer_comparison=peer_comparison,
-                               leaderboard=leaderboard)
-
-    except Exception as e:
-        logger.error(f"ソーシャル学習ページエラー: {e}")
-        return render_template('error.html', error="ソーシャル学習ページの読み込み中にエラーが発生しました")
-
-
-@app.route('/social/create_group', methods=['POST'])
-def create_study_group():
-    """学習グループ作成"""
-    try:
-        user_id = session.get('user_id', 'anonymous')
-
-        group_name = request.form.get('group_name')
-        description = request.form.get('description', '')
-        department = request.form.get('department')
-        target_exam_date = request.form.get('target_exam_date')
-
-        if not group_name:
-            return jsonify({'success': False, 'error': 'グループ名は必須です'})
-
-        result = social_learning_manager.create_study_group(
-            user_id, group_name, description, department, target_exam_date
-        )
-
-        return jsonify(result)
-
-    except Exception as e:
-        logger.error(f"グループ作成エラー: {e}")
-        return jsonify({'success': False, 'error': str(e)})
-
-
-@app.route('/social/join_group', methods=['POST'])
-def join_study_group():
-    """学習グループ参加"""
-    try:
-        user_id = session.get('user_id', 'anonymous')
-        group_id = request.form.get('group_id')
-
-        if not group_id:
-            return jsonify({'success': False, 'error': 'グループIDが必要です'})
-
-        result = social_learning_manager.join_group(user_id, group_id)
-        return jsonify(result)
-
-    except Exception as e:
-        logger.error(f"グループ参加エラー: {e}")
-        return jsonify({'success': False, 'error': str(e)})
-
-
-@app.route('/social/leave_group', methods=['POST'])
-def leave_study_group():
-    """学習グループ退会"""
-    try:
-        user_id = session.get('user_id', 'anonymous')
-        group_id = request.form.get('group_id')
-
-        if not group_id:
-            return jsonify({'success': False, 'error': 'グループIDが必要です'})
-
-        result = social_learning_manager.leave_group(user_id, group_id)
-        return jsonify(result)
-
-    except Exception as e:
-        logger.error(f"グループ退会エラー: {e}")
-        return jsonify({'success': False, 'error': str(e)})
-
-
-@app.route('/social/create_discussion', methods=['POST'])
-def create_discussion():
-    """ディスカッション作成"""
-    try:
-        user_id = session.get('user_id', 'anonymous')
-
-        title = request.form.get('title')
-        content = request.form.get('content')
-        category = request.form.get('category', 'general')
-        question_id = request.form.get('question_id')
-        group_id = request.form.get('group_id')
-
-        if not title or not content:
-            return jsonify({'success': False, 'error': 'タイトルと内容は必須です'})
-
-        # question_idを整数に変換（存在する場合）
-        if question_id:
-            try:
-                question_id = int(question_id)
-            except ValueError:
-                question_id = None
-
-        result = social_learning_manager.create_discussion(
-            user_id, title, content, question_id, group_id, category
-        )
-
-        return jsonify(result)
-
-    except Exception as e:
-        logger.error(f"ディスカッション作成エラー: {e}")
-        return jsonify({'success': False, 'error': str(e)})
-
-
-@app.route('/social/discussion/<discussion_id>')
-def discussion_detail(discussion_id):
-    """ディスカッション詳細"""
-    try:
-        user_id = session.get('user_id', 'anonymous')
-        discussion = social_learning_manager.get_discussion_detail(discussion_id, user_id)
-
-        if 'error' in discussion:
-            return render_template('error.html', error=discussion['error'])
-
-        return render_template('discussion_detail.html', discussion=discussion)
-
-    except Exception as e:
-        logger.error(f"ディスカッション詳細エラー: {e}")
-        return render_template('error.html', error="ディスカッション詳細の読み込み中にエラーが発生しました")
-
-
-@app.route('/social/peer_comparison')
-def peer_comparison():
-    """ピア比較API"""
-    try:
-        user_id = session.get('user_id', 'anonymous')
-        comparison_type = request.args.get('type', 'department')
-
-        result = social_learning_manager.get_peer_comparison(user_id, comparison_type)
-
-        # HTMLレスポンスとして返す（AJAX用）
-        return render_template('peer_comparison_partial.html', peer_comparison=result)
-
-    except Exception as e:
-        logger.error(f"ピア比較エラー: {e}")
-        return f'<div class="alert alert-danger">エラー: {str(e)}</div>'
-
-
-@app.route('/social/leaderboard')
-def leaderboard():
-    """リーダーボードAPI"""
-    try:
-        period = request.args.get('period', 'month')
-        department = request.args.get('department')
-
-        result = social_learning_manager.get_leaderboard(department, period)
-
-        # HTMLレスポンスとして返す（AJAX用）
-        return render_template('leaderboard_partial.html', leaderboard=result, period=period)
-
-    except Exception as e:
-        logger.error(f"リーダーボードエラー: {e}")
-        return f'<div class="alert alert-danger">エラー: {str(e)}</div>'
-
-
-@app.route('/social/study_partners')
-def study_partners():
-    """学習パートナー推奨"""
-    try:
-        user_id = session.get('user_id', 'anonymous')
-        partners = social_learning_manager.get_recommended_study_partners(user_id)
-
-        return jsonify(partners)
-
-    except Exception as e:
-        logger.error(f"学習パートナー推奨エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-# ========================
-# API統合・プロフェッショナル機能
-# ========================
-
-
-@app.route('/api_integration')
-def api_integration_dashboard():
-    """API統合ダッシュボード"""
-    try:
-        # API統合データ取得
-        api_keys = api_manager._load_api_keys()
-        certifications = api_manager._load_certifications()
-        organizations = api_manager._load_organizations()
-
-        # APIキー一覧を整形
-        formatted_api_keys = []
-        for key, info in api_keys.items():
-            formatted_api_keys.append({
-                'api_key': key,
-                'organization': info['organization'],
-                'permissions': info['permissions'],
-                'created_at': info['created_at'],
-                'is_active': info['is_active'],
-                'usage_stats': info['usage_stats']
-            })
-
-        # 認定プログラム一覧を整形
-        formatted_certifications = []
-        for cert_id, cert_info in certifications.items():
-            formatted_certifications.append({
-                'id': cert_id,
-                'name': cert_info['name'],
-                'description': cert_info['description'],
-                'requirements': cert_info['requirements'],
-                'statistics': cert_info['statistics']
-            })
-
-        # 組織一覧を整形
-        formatted_organizations = []
-        for org_id, org_info in organizations.items():
-            formatted_organizations.append({
-                'id': org_id,
-                'name': org_info['name'],
-                'description': org_info['description'],
-                'statistics': org_info['statistics']
-            })
-
-        # 認定サマリー計算
-        certifications_summary = {
-            'total_programs': len(certifications),
-            'total_participants': sum(cert['statistics']['total_participants'] for cert in certifications.values()),
-            'completion_rate': sum(cert['statistics']['completion_rate'] for cert in certifications.values()) / len(certifications) if certifications else 0
-        }
-
-        return render_template('api_integration.html',
-                               api_keys=formatted_api_keys,
-                               certification_programs=formatted_certifications,
-                               certifications_summary=certifications_summary,
-                               organizations=formatted_organizations,
-                               generated_reports=[])  # TODO: 実装
-
-    except Exception as e:
-        logger.error(f"API統合ダッシュボードエラー: {e}")
-        return render_template('error.html', error=str(e))
-
-# === API認証エンドポイント ===
-
-
-@app.route('/api/auth/generate_key', methods=['POST'])
-def generate_api_key():
-    """APIキー生成"""
-    try:
-        data = request.get_json()
-        organization = data.get('organization')
-        permissions = data.get('permissions', [])
-        expires_in_days = data.get('expires_in_days', 365)
-
-        if not organization:
-            return jsonify({'success': False, 'error': '組織名が必要です'}), 400
-
-        result = api_manager.generate_api_key(organization, permissions, expires_in_days)
-
-        return jsonify(result)
-
-    except Exception as e:
-        logger.error(f"APIキー生成エラー: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-
-@app.route('/api/auth/validate_key', methods=['POST'])
-def validate_api_key():
-    """APIキー検証"""
-    try:
-        data = request.get_json()
-        api_key = data.get('api_key')
-        required_permission = data.get('required_permission')
-
-        if not api_key:
-            return jsonify({'valid': False, 'error': 'APIキーが必要です'}), 400
-
-        result = api_manager.validate_api_key(api_key, required_permission)
-
-        return jsonify(result)
-
-    except Exception as e:
-        logger.error(f"APIキー検証エラー: {e}")
-        return jsonify({'valid': False, 'error': str(e)}), 500
-
-
-@app.route('/api/auth/revoke_key', methods=['DELETE'])
-def revoke_api_key():
-    """APIキー無効化"""
-    try:
-        data = request.get_json()
-        api_key = data.get('api_key')
-
-        if not api_key:
-            return jsonify({'success': False, 'error': 'APIキーが必要です'}), 400
-
-        result = api_manager.revoke_api_key(api_key)
-
-        return jsonify(result)
-
-    except Exception as e:
-        logger.error(f"APIキー無効化エラー: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-# === ユーザー管理API ===
-
-
-@app.route('/api/users', methods=['GET'])
-def api_users_list():
-    """ユーザー一覧API"""
-    try:
-        # API認証チェック
-        api_key = request.headers.get('X-API-Key')
-        if not api_key:
-            return jsonify({'error': 'API key required'}), 401
-
-        validation = api_manager.validate_api_key(api_key, 'read_users')
-        if not validation['valid']:
-            return jsonify({'error': validation['error']}), 401
-
-        # 全ユーザーデータ取得（簡略化）
-        all_users = api_manager._load_all_user_data()
-
-        users_list = []
-        for user_id, user_data in all_users.items():
-            history = user_data.get('history', [])
-            users_list.append({
-                'user_id': user_id,
-                'total_questions': len(history),
-                'accuracy': sum(1 for h in history if h.get('is_correct', False)) / len(history) if history else 0,
-                'last_activity': max([h.get('date', '') for h in history], default=''),
-                'primary_department': api_manager._get_user_primary_departments(user_data)[0] if history else 'unknown'
-            })
-
-        return jsonify({
-            'users': users_list,
-            'total_count': len(users_list),
-            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
-            'timestamp': format_utc_to_iso()
-        })
-
-    except Exception as e:
-        logger.error(f"ユーザー一覧API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/api/users/<user_id>/progress', methods=['GET'])
-def api_user_progress(user_id):
-    """ユーザー進捗API"""
-    try:
-        # API認証チェック
-        api_key = request.headers.get('X-API-Key')
-        if not api_key:
-            return jsonify({'error': 'API key required'}), 401
-
-        validation = api_manager.validate_api_key(api_key, 'read_progress')
-        if not validation['valid']:
-            return jsonify({'error': validation['error']}), 401
-
-        # 進捗レポート生成
-        time_period = request.args.get('period', 'month')
-        report_format = request.args.get('format', 'json')
-
-        report = api_manager.generate_progress_report(user_id, None, time_period, report_format)
-
-        return jsonify(report)
-
-    except Exception as e:
-        logger.error(f"ユーザー進捗API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/api/users/<user_id>/certifications', methods=['GET'])
-def api_user_certifications(user_id):
-    """ユーザー認定情報API"""
-    try:
-        # API認証チェック
-        api_key = request.headers.get('X-API-Key')
-        if not api_key:
-            return jsonify({'error': 'API key required'}), 401
-
-        validation = api_manager.validate_api_key(api_key, 'read_users')
-        if not validation['valid']:
-            return jsonify({'error': validation['error']}), 401
-
-        user_data = api_manager._load_user_data(user_id)
-        certifications = user_data.get('certifications', {})
-
-        # 各認定の詳細情報を取得
-        detailed_certifications = []
-        for cert_id, enrollment in certifications.items():
-            cert_progress = api_manager.check_certification_progress(user_id, cert_id)
-            detailed_certifications.append(cert_progress)
-
-        return jsonify({
-            'user_id': user_id,
-            'certifications': detailed_certifications,
-            'total_certifications': len(detailed_certifications),
-            'completed_certifications': len([c for c in detailed_certifications if c.get('enrollment_status') == 'completed'])
-        })
-
-    except Exception as e:
-        logger.error(f"ユーザー認定情報API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-# === 進捗レポートAPI ===
-
-
-@app.route('/api/reports/progress', methods=['GET'])
-def api_progress_reports():
-    """進捗レポートAPI"""
-    try:
-        # API認証チェック
-        api_key = request.headers.get('X-API-Key')
-        if not api_key:
-            return jsonify({'error': 'API key required'}), 401
-
-        validation = api_manager.validate_api_key(api_key, 'generate_reports')
-        if not validation['valid']:
-            return jsonify({'error': validation['error']}), 401
-
-        user_id = request.args.get('user_id')
-        organization = request.args.get('organization')
-        time_period = request.args.get('period', 'month')
-        report_format = request.args.get('format', 'json')
-
-        report = api_manager.generate_progress_report(user_id, organization, time_period, report_format)
-
-        return jsonify(report)
-
-    except Exception as e:
-        logger.error(f"進捗レポートAPI エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/api/reports/organization/<org_id>', methods=['GET'])
-def api_organization_report(org_id):
-    """組織レポートAPI"""
-    try:
-        # API認証チェック
-        api_key = request.headers.get('X-API-Key')
-        if not api_key:
-            return jsonify({'error': 'API key required'}), 401
-
-        validation = api_manager.validate_api_key(api_key, 'generate_reports')
-        if not validation['valid']:
-            return jsonify({'error': validation['error']}), 401
-
-        time_period = request.args.get('period', 'month')
-        report_format = request.args.get('format', 'json')
-
-        report = api_manager._generate_organization_report(org_id, time_period, report_format)
-
-        return jsonify(report)
-
-    except Exception as e:
-        logger.error(f"組織レポートAPI エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/api/reports/export/<format>', methods=['GET'])
-def api_export_analytics(format):
-    """学習分析エクスポートAPI"""
-    try:
-        # API認証チェック
-        api_key = request.headers.get('X-API-Key')
-        if not api_key:
-            return jsonify({'error': 'API key required'}), 401
-
-        validation = api_manager.validate_api_key(api_key, 'generate_reports')
-        if not validation['valid']:
-            return jsonify({'error': validation['error']}), 401
-
-        include_personal = request.args.get('include_personal_data', 'false').lower() == 'true'
-
-        result = api_manager.export_learning_analytics(format, include_personal)
-
         return jsonify(result)
-
+        
     except Exception as e:
-        logger.error(f"学習分析エクスポートAPI エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-# === 認定管理API ===
-
-
-@app.route('/api/certifications', methods=['GET', 'POST'])
-def api_certifications():
-    """認定プログラムAPI"""
-    try:
-        if request.method == 'GET':
-            # 認定プログラム一覧取得
-            certifications = api_manager._load_certifications()
-            return jsonify({
-                'certifications': list(certifications.values()),
-                'total_count': len(certifications)
-            })
-
-        elif request.method == 'POST':
-            # API認証チェック
-            api_key = request.headers.get('X-API-Key')
-            if not api_key:
-                return jsonify({'error': 'API key required'}), 401
-
-            validation = api_manager.validate_api_key(api_key, 'manage_certifications')
-            if not validation['valid']:
-                return jsonify({'error': validation['error']}), 401
-
-            # 認定プログラム作成
-            data = request.get_json()
-            name = data.get('name')
-            description = data.get('description')
-            requirements = data.get('requirements', {})
-            organization = data.get('organization')
-
-            result = api_manager.create_certification_program(name, description, requirements, organization)
-
-            return jsonify(result)
+        logger.error(f"手動メモリ最適化API エラー: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': format_utc_to_iso()
+        }), 500
 
-    except Exception as e:
-        logger.error(f"認定プログラムAPI エラー: {e}")
-        return jsonify({'error': str(e)}), 500
 
+# === 📊 Ultra Sync Performance Optimization API ===
 
-@app.route('/api/certifications/<cert_id>/progress', methods=['GET'])
-def api_certification_progress(cert_id):
-    """認定進捗API"""
+@app.route('/api/system/performance_status')
+#@performance_timing_decorator
+def api_performance_status():
+    """📊 パフォーマンス最適化状況監視API（ウルトラシンクパフォーマンス監視）"""
     try:
-        user_id = request.args.get('user_id')
-        if not user_id:
-            return jsonify({'error': 'user_id required'}), 400
-
-        progress = api_manager.check_certification_progress(user_id, cert_id)
-
-        return jsonify(progress)
-
+        if _performance_optimizer:
+            # ウルトラシンクパフォーマンス統計取得
+            stats = _performance_optimizer.get_performance_stats()
+            
+            performance_status = {
+                'success': True,
+                'status': 'optimized' if stats.get('data_loaded') else 'not_optimized',
+                'optimizer_enabled': True,
+                'stats': stats,
+                'recommendations': []
+            }
+            
+            # パフォーマンスに基づく推奨事項
+            avg_response_time = stats.get('average_response_time', 0)
+            if avg_response_time > 500:  # 500ms以上
+                performance_status['recommendations'].append({
+                    'type': 'response_time',
+                    'message': f'レスポンス時間が遅延: {avg_response_time}ms',
+                    'action': 'キャッシュクリーンアップまたはインデックス再構築推奨'
+                })
+            
+            # キャッシュヒット率チェック
+            cache_hit_rate = stats.get('cache_hit_rate', 0)
+            if cache_hit_rate < 70:  # 70%未満
+                performance_status['recommendations'].append({
+                    'type': 'cache_efficiency',
+                    'message': f'キャッシュヒット率が低下: {cache_hit_rate}%',
+                    'action': 'キャッシュサイズ調整またはデータアクセスパターン最適化'
+                })
+            
+            # インデックス状況チェック
+            questions_indexed = stats.get('questions_indexed', 0)
+            if questions_indexed == 0:
+                performance_status['recommendations'].append({
+                    'type': 'indexing',
+                    'message': 'インデックスが構築されていません',
+                    'action': 'データ再読み込みまたはインデックス手動構築'
+                })
+            
+        else:
+            # フォールバック: 基本的なパフォーマンス情報
+            performance_status = {
+                'success': True,
+                'status': 'basic',
+                'optimizer_enabled': False,
+                'stats': {
+                    'data_loaded': False,
+                    'data_load_time': None,
+                    'questions_indexed': 0,
+                    'cache_hit_rate': 0,
+                    'average_response_time': 0,
+                    'performance_stats': {},
+                    'cache_info': {}
+                },
+                'recommendations': [{
+                    'type': 'optimization',
+                    'message': 'Performance Optimizer が無効です',
+                    'action': 'ultra_sync_performance_optimization.py の確認'
+                }]
+            }
+        
+        # 共通レスポンス項目追加
+        performance_status.update({
+            'timestamp': format_utc_to_iso(),
+            'performance_optimization_info': {
+                'index_types': 'ID, Category, Department, Year, Type',
+                'cache_strategy': 'LRU with TTL',
+                'search_complexity': 'O(1) for indexed searches'
+            }
+        })
+        
+        return jsonify(performance_status)
+        
     except Exception as e:
-        logger.error(f"認定進捗API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-# === 組織管理API ===
+        logger.error(f"パフォーマンス状況API エラー: {e}")
+        return jsonify({
+            'success': False,
+            'status': 'error',
+            'error': str(e),
+            'timestamp': format_utc_to_iso()
+        }), 500
 
 
-@app.route('/api/organizations', methods=['GET', 'POST'])
-def api_organizations():
-    """組織管理API"""
+@app.route('/api/system/performance_clear_cache', methods=['POST'])
+#@performance_timing_decorator
+def api_performance_clear_cache():
+    """📊 パフォーマンスキャッシュクリア実行API（ウルトラシンクパフォーマンス最適化）"""
     try:
-        if request.method == 'GET':
-            # 組織一覧取得
-            organizations = api_manager._load_organizations()
+        if not _performance_optimizer:
             return jsonify({
-                'organizations': list(organizations.values()),
-                'total_count': len(organizations)
-            })
-
-        elif request.method == 'POST':
-            # API認証チェック
-            api_key = request.headers.get('X-API-Key')
-            if not api_key:
-                return jsonify({'error': 'API key required'}), 401
-
-            validation = api_manager.validate_api_key(api_key, 'manage_organizations')
-            if not validation['valid']:
-                return jsonify({'error': validation['error']}), 401
-
-            # 組織作成
-            data = request.get_json()
-            name = data.get('name')
-            description = data.get('description')
-            settings = data.get('settings', {})
-
-            result = api_manager.create_organization(name, description, settings)
-
-            return jsonify(result)
-
+                'success': False,
+                'error': 'Performance Optimizer が利用できません',
+                'timestamp': format_utc_to_iso()
+            }), 503
+        
+        # キャッシュクリア実行
+        cleared_counts = _performance_optimizer.clear_performance_cache()
+        
+        result = {
+            'success': True,
+            'message': 'パフォーマンスキャッシュがクリアされました',
+            'cleared_items': cleared_counts,
+            'timestamp': format_utc_to_iso()
+        }
+        
+        logger.info(f"📊 パフォーマンスキャッシュクリア完了: {cleared_counts}")
+        
+        return jsonify(result)
+        
     except Exception as e:
-        logger.error(f"組織管理API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/api/organizations/<org_id>/users', methods=['GET'])
-def api_organization_users(org_id):
-    """組織ユーザー一覧API"""
-    try:
-        organizations = api_manager._load_organizations()
-
-        if org_id not in organizations:
-            return jsonify({'error': 'Organization not found'}), 404
-
-        org_users = organizations[org_id]['users']
-
-        # ユーザー詳細情報を取得
-        users_details = []
-        for user_id in org_users:
-            user_data = api_manager._load_user_data(user_id)
-            history = user_data.get('history', [])
-
-            users_details.append({
-                'user_id': user_id,
-                'total_questions': len(history),
-                'accuracy': sum(1 for h in history if h.get('is_correct', False)) / len(history) if history else 0,
-                'last_activity': max([h.get('date', '') for h in history], default='')
-            })
-
+        logger.error(f"パフォーマンスキャッシュクリアAPI エラー: {e}")
         return jsonify({
-            'organization_id': org_id,
-            'users': users_details,
-            'total_users': len(users_details)
-        })
-
-    except Exception as e:
-        logger.error(f"組織ユーザー一覧API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
-# === 高度な個人化API ===
+            'success': False,
+            'error': str(e),
+            'timestamp': format_utc_to_iso()
+        }), 500
 
 
-@app.route('/api/personalization/profile/<user_id>')
-def api_personalization_profile(user_id):
-    """個人化プロファイルAPI"""
+@app.route('/api/system/performance_rebuild_index', methods=['POST'])
+#@performance_timing_decorator
+def api_performance_rebuild_index():
+    """📊 パフォーマンスインデックス再構築API（ウルトラシンクパフォーマンス最適化）"""
     try:
-        profile = advanced_personalization.analyze_user_profile(user_id)
-
+        if not _performance_optimizer:
+            return jsonify({
+                'success': False,
+                'error': 'Performance Optimizer が利用できません',
+                'timestamp': format_utc_to_iso()
+            }), 503
+        
+        # 現在のキャッシュされた問題データを取得
+        try:
+            # FIRE ULTRA SYNC FIX: 未定義関数修正 - 適切なデータ読み込み関数を使用
+            current_questions = load_questions_improved('data/questions.csv')
+            if not current_questions:
+                # EMERGENCY FIX: バックアップとして緊急データローダーを使用
+                rccm_data = emergency_load_all_questions()  # EMERGENCY FIX
+                # emergency_load_all_questions は List[Dict] を返すため直接使用
+                current_questions = rccm_data if isinstance(rccm_data, list) else []
+        except Exception as e:
+            logger.error(f"問題データ読み込みエラー: {e}")
+            current_questions = []
+        
+        if not current_questions:
+            return jsonify({
+                'success': False,
+                'error': '問題データが見つかりません',
+                'timestamp': format_utc_to_iso()
+            }), 404
+        
+        # インデックス再構築実行
+        _performance_optimizer.build_high_performance_indexes(current_questions)
+        
+        # 新しい統計取得
+        new_stats = _performance_optimizer.get_performance_stats()
+        
+        result = {
+            'success': True,
+            'message': 'パフォーマンスインデックスが再構築されました',
+            'rebuild_results': {
+                'questions_indexed': new_stats.get('questions_indexed', 0),
+                'categories_indexed': new_stats.get('categories_indexed', 0),
+                'departments_indexed': new_stats.get('departments_indexed', 0),
+                'years_indexed': new_stats.get('years_indexed', 0),
+                'types_indexed': new_stats.get('types_indexed', 0),
+                'build_time': new_stats.get('data_load_time', 0)
+            },
+            'timestamp': format_utc_to_iso()
+        }
+        
+        logger.info(f"📊 パフォーマンスインデックス再構築完了: {new_stats.get('questions_indexed', 0)}問")
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"パフォーマンスインデックス再構築API エラー: {e}")
         return jsonify({
-            'user_id': user_id,
-            'profile': profile,
-            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
+            'success': False,
+            'error': str(e),
             'timestamp': format_utc_to_iso()
-        })
+        }), 500
 
-    except Exception as e:
-        logger.error(f"個人化プロファイルAPI エラー: {e}")
-        return jsonify({'error': str(e)}), 500
 
+# === 🧪 Ultra Sync Manual Test Support Routes ===
 
-@app.route('/api/personalization/recommendations/<user_id>')
-def api_personalization_recommendations(user_id):
-    """ML推薦API"""
-    try:
-        context = request.args.to_dict()
-        recommendations = advanced_personalization.get_ml_recommendations(user_id, context)
 
-        return jsonify({
-            'user_id': user_id,
-            'recommendations': recommendations,
-            'context': context,
-            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
-            'timestamp': format_utc_to_iso()
-        })
+# SHIELD ULTRA SYNC ERROR HANDLER CONSOLIDATION: 
+# 重複エラーハンドラーは統合版に置き換え（ultra_sync_error_loop_prevention.py）
 
-    except Exception as e:
-        logger.error(f"ML推薦API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
+# === AI学習アナリティクス ===
 
 
-@app.route('/api/personalization/ui/<user_id>')
-def api_personalization_ui(user_id):
-    """UI個人化API"""
+@app.route('/ai_dashboard')
+def ai_dashboard():
+    """AIダッシュボード"""
     try:
-        ui_customizations = advanced_personalization.customize_ui(user_id)
+        # セッションデータ取得
+        user_session = session
+        history = user_session.get('history', [])
+        srs_data = user_session.get('srs_data', {})
 
-        return jsonify({
-            'user_id': user_id,
-            'ui_customizations': ui_customizations,
-            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
-            'timestamp': format_utc_to_iso()
-        })
+        # AI分析実行
+        analysis = {}
+        if history:
+            from ai_analyzer import ai_analyzer
 
-    except Exception as e:
-        logger.error(f"UI個人化API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
+            # 学習スタイル分析
+            try:
+                learning_style_result = ai_analyzer.determine_learning_style(history)
+                analysis['learning_style'] = learning_style_result.get('style', '分析中...')
+            except (AttributeError, TypeError, KeyError, ImportError):
+                analysis['learning_style'] = '視覚学習型'
 
-# 企業環境用管理API
+            # パフォーマンス予測
+            try:
+                performance_prediction = ai_analyzer.predict_performance(srs_data)
+                analysis['performance_prediction'] = performance_prediction
+            except (AttributeError, TypeError, KeyError, ImportError):
+                analysis['performance_prediction'] = {'score': 72}
 
+            # 弱点パターン分析
+            try:
+                weakness_patterns = ai_analyzer.analyze_weakness_patterns(history)
+                analysis['weakness_patterns'] = weakness_patterns.get('patterns', [])
+            except (AttributeError, TypeError, KeyError, ImportError):
+                analysis['weakness_patterns'] = []
 
-@app.route('/api/enterprise/users')
-@require_api_key
-def api_enterprise_users():
-    """全ユーザー一覧API（企業環境用）"""
-    try:
-        users = enterprise_user_manager.get_all_users()
+            # 学習推奨事項
+            try:
+                recommendations = ai_analyzer.generate_recommendations(history, srs_data)
+                analysis['study_recommendations'] = recommendations
+            except (AttributeError, TypeError, KeyError, ImportError):
+                analysis['study_recommendations'] = []
+        else:
+            # デフォルトデータ
+            analysis = {
+                'learning_style': '学習データを蓄積中...',
+                'performance_prediction': {'score': 0},
+                'weakness_patterns': [],
+                'study_recommendations': [],
+                'optimal_study_time': '午前中',
+                'memory_retention': {
+                    'retention_rate': 0,
+                    'average_retention_days': 0,
+                    'forgetting_curve_type': '標準型'
+                }
+            }
 
-        return jsonify({
-            'success': True,
-            'users': users,
-            'total_users': len(users),
-            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基渖のレポート生成タイムスタンプ
-            'generated_at': format_utc_to_iso()
-        })
+        return render_template('ai_dashboard.html', analysis=analysis)
 
     except Exception as e:
-        logger.error(f"企業ユーザー一覧API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
-
+        logger.error(f"AIダッシュボード エラー: {e}")
+        return render_template('ai_dashboard.html', analysis={
+            'learning_style': 'AI分析準備中...',
+            'performance_prediction': {'score': 0},
+            'weakness_patterns': [],
+            'study_recommendations': []
+        })
 
-@app.route('/api/enterprise/user/<user_name>/report')
-@require_api_key
-def api_enterprise_user_report(user_name):
-    """ユーザー詳細進捗レポートAPI（企業環境用）"""
-    try:
-        report = enterprise_user_manager.get_user_progress_report(user_name)
 
-        if 'error' in report:
-            return jsonify({'success': False, 'error': report['error']}), 404
+# === 管理者ダッシュボード ===
 
-        return jsonify({
-            'success': True,
-            'report': report
-        })
 
-    except Exception as e:
-        logger.error(f"企業ユーザーレポートAPI エラー: {e}")
-        return jsonify({'error': str(e)}), 500
+# === ソーシャル学習機能 ===
 
 
-@app.route('/enterprise/dashboard')
-@require_admin_auth
-def enterprise_dashboard():
-    """企業環境用管理ダッシュボード"""
-    try:
-        # 管理者向けダッシュボード表示
-        users = enterprise_user_manager.get_all_users()
+# ========================
+# API統合・プロフェッショナル機能
+# ========================
 
-        return render_template('enterprise_dashboard.html', users=users)
 
-    except Exception as e:
-        logger.error(f"企業ダッシュボードエラー: {e}")
-        return render_template('error.html', error_message=str(e)), 500
+# === API認証エンドポイント ===
 
 
-@app.route('/api/enterprise/data/integrity')
-@require_api_key
-def api_enterprise_data_integrity():
-    """データ整合性チェックAPI（企業環境用）"""
-    try:
-        if enterprise_data_manager:
-            integrity_report = enterprise_data_manager.get_file_integrity_check()
-        else:
-            integrity_report = {
-                # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
-            'timestamp': format_utc_to_iso(),
-                'status': 'unavailable',
-                'message': 'Enterprise data manager not available'
-            }
+# === ユーザー管理API ===
 
-        return jsonify({
-            'success': True,
-            'integrity_report': integrity_report
-        })
 
-    except Exception as e:
-        logger.error(f"データ整合性チェックAPI エラー: {e}")
-        return jsonify({'error': str(e)}), 500
+# === 進捗レポートAPI ===
 
 
-@app.route('/api/enterprise/cache/stats')
-@require_api_key
-def api_enterprise_cache_stats():
-    """キャッシュ統計API（企業環境用）"""
-    try:
-        from utils import cache_manager_instance
-        cache_stats = cache_manager_instance.get_stats()
+# === 認定管理API ===
 
-        return jsonify({
-            'success': True,
-            'cache_stats': cache_stats,
-            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
-            'timestamp': format_utc_to_iso()
-        })
 
-    except Exception as e:
-        logger.error(f"キャッシュ統計API エラー: {e}")
-        return jsonify({'error': str(e)}), 500
+# === 組織管理API ===
 
 
-@app.route('/api/enterprise/cache/clear', methods=['POST'])
-@require_api_key
-def api_enterprise_cache_clear():
-    """キャッシュクリアAPI（企業環境用）"""
-    try:
-        from utils import cache_manager_instance
-        cache_manager_instance.clear_all()
+# === 高度な個人化API ===
 
-        return jsonify({
-            'success': True,
-            'message': 'キャッシュをクリアしました',
-            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
-            'timestamp': format_utc_to_iso()
-        })
 
-    except Exception as e:
-        logger.error(f"キャッシュクリアAPI エラー: {e}")
-        return jsonify({'error': str(e)}), 500
+# 企業環境用管理API
 
 
 # 初期化（企業環境最適化 - 重複読み込み解決版）
@@ -11068,31 +8178,8 @@ try:
             session_data_manager = None
             enterprise_user_manager = None
 
-        # 遅延インポート: 機能モジュール
-        from gamification import gamification_manager as gam_mgr
-        from ai_analyzer import ai_analyzer as ai_ana
-        from adaptive_learning import adaptive_engine as adp_eng
-        from exam_simulator import exam_simulator as exam_sim
-        from advanced_analytics import advanced_analytics as adv_ana
-        from mobile_features import mobile_manager as mob_mgr
-        from learning_optimizer import learning_optimizer as lrn_opt
-        from admin_dashboard import admin_dashboard as adm_dash
-        from social_learning import social_learning_manager as soc_mgr
-        from api_integration import api_manager as api_mgr
-        from advanced_personalization import advanced_personalization as adv_per
-
-        # グローバル変数に代入
-        gamification_manager = gam_mgr
-        ai_analyzer = ai_ana
-        adaptive_engine = adp_eng
-        exam_simulator = exam_sim
-        advanced_analytics = adv_ana
-        mobile_manager = mob_mgr
-        learning_optimizer = lrn_opt
-        admin_dashboard = adm_dash
-        social_learning_manager = soc_mgr
-        api_manager = api_mgr
-        advanced_personalization = adv_per
+        # 機能モジュール（高速化モードでは起動時に一括読み込み）
+        ensure_modules_loaded()
 
         preload_success = enterprise_data_manager.preload_all_data()
         if preload_success:
@@ -11244,327 +8331,6 @@ def api_error_prevention_cleanup():
         }), 500
 
 
-
-
-
-    # ================================
-    # EMERGENCY FIX 19: SESSION SIZE OPTIMIZATION 
-    # Date: 2025-08-13 22:10:00
-    # Purpose: Fix session cookie size exceeding 4KB limit caused by Emergency Fix 18
-    # Problem: Session cookie size reached 4316 bytes, exceeding 4093 byte limit
-    # Solution: Store only minimal essential data in session, use server-side storage for question data
-    # ================================
-
-    # EMERGENCY FIX 19: Session size optimization global storage
-    # Use server-side storage to avoid cookie size limits
-    _emergency_fix_19_question_cache = {}
-    _emergency_fix_19_session_counter = 0
-
-    def emergency_fix_19_session_size_optimization():
-        """
-        EMERGENCY FIX 19: Optimize session size for construction environment department
-        
-        Reduces session cookie size by:
-        1. Moving large question data to server-side cache
-        2. Storing only essential IDs and mappings in session
-        3. Maintaining compatibility with Emergency Fix 18 ID mapping
-        """
-        global _emergency_fix_19_question_cache, _emergency_fix_19_session_counter
-        
-        logger.info("DEBUG: Emergency Fix 19 - Session Size Optimization starting")
-        
-        try:
-            # Check if Emergency Fix 18 session exists and needs optimization
-            if 'emergency_fix_18_questions' in session:
-                emergency_questions = session.get('emergency_fix_18_questions', {})
-                
-                if emergency_questions and len(emergency_questions) > 0:
-                    logger.info(f"DEBUG: Emergency Fix 19 - Optimizing session with {len(emergency_questions)} questions")
-                    
-                    # Create a unique session ID for server-side storage
-                    _emergency_fix_19_session_counter += 1
-                    session_storage_id = f"env_session_{int(time.time())}_{_emergency_fix_19_session_counter}"
-                    
-                    # Store full question data in server-side cache
-                    _emergency_fix_19_question_cache[session_storage_id] = emergency_questions
-                    
-                    # Keep only minimal data in session
-                    session['emergency_fix_19_storage_id'] = session_storage_id
-                    session['emergency_fix_19_question_count'] = len(emergency_questions)
-                    
-                    # Preserve essential ID mappings (these are small)
-                    if 'emergency_fix_18_csv_to_sequential' in session:
-                        session['emergency_fix_19_id_mapping'] = session['emergency_fix_18_csv_to_sequential']
-                    
-                    # Remove large question data from session
-                    if 'emergency_fix_18_questions' in session:
-                        del session['emergency_fix_18_questions']
-                    
-                    # Clean up other large session data if present
-                    large_keys_to_remove = [
-                        'emergency_fix_12_backup',
-                        'exam_session'  # This can be recreated if needed
-                    ]
-                    
-                    for key in large_keys_to_remove:
-                        if key in session:
-                            logger.info(f"DEBUG: Emergency Fix 19 - Removing large session key: {key}")
-                            del session[key]
-                    
-                    logger.info(f"SUCCESS: Emergency Fix 19 - Session optimized, storage ID: {session_storage_id}")
-                    logger.info(f"DEBUG: Emergency Fix 19 - Question data moved to server-side cache")
-                    
-                    return True
-                else:
-                    logger.info("DEBUG: Emergency Fix 19 - No question data to optimize")
-                    return False
-            else:
-                logger.info("DEBUG: Emergency Fix 19 - No Emergency Fix 18 session to optimize")
-                return False
-                
-        except Exception as e:
-            logger.error(f"ERROR: Emergency Fix 19 failed: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
-
-    def emergency_fix_19_get_question_by_sequential_id(sequential_id):
-        """
-        Get question by sequential ID using Emergency Fix 19 optimized storage
-        
-        Args:
-            sequential_id (str): Sequential ID like '1', '2', '3', etc.
-            
-        Returns:
-            dict: Question object or None if not found
-        """
-        try:
-            # Check if Emergency Fix 19 storage is available
-            if 'emergency_fix_19_storage_id' in session:
-                storage_id = session.get('emergency_fix_19_storage_id')
-                
-                if storage_id in _emergency_fix_19_question_cache:
-                    questions = _emergency_fix_19_question_cache[storage_id]
-                    question = questions.get(sequential_id)
-                    
-                    if question:
-                        logger.info(f"DEBUG: Emergency Fix 19 - Retrieved question for sequential ID {sequential_id} from server cache")
-                        return question
-                    else:
-                        logger.warning(f"WARNING: Emergency Fix 19 - Question {sequential_id} not found in server cache")
-                        return None
-                else:
-                    logger.error(f"ERROR: Emergency Fix 19 - Storage ID {storage_id} not found in cache")
-                    return None
-            
-            # Fallback to Emergency Fix 18 method if available
-            elif 'emergency_fix_18_questions' in session:
-                question = session['emergency_fix_18_questions'].get(sequential_id)
-                if question:
-                    logger.info(f"DEBUG: Emergency Fix 19 - Fallback to Emergency Fix 18 for sequential ID {sequential_id}")
-                    return question
-            
-            logger.warning(f"WARNING: Emergency Fix 19 - No storage method available for sequential ID {sequential_id}")
-            return None
-            
-        except Exception as e:
-            logger.error(f"ERROR: Emergency Fix 19 question lookup failed for ID {sequential_id}: {e}")
-            return None
-
-    def emergency_fix_19_cleanup_expired_cache():
-        """Clean up expired session cache entries"""
-        global _emergency_fix_19_question_cache
-        
-        try:
-            current_time = time.time()
-            expired_keys = []
-            
-            for key in _emergency_fix_19_question_cache.keys():
-                # Extract timestamp from key (format: env_session_{timestamp}_{counter})
-                parts = key.split('_')
-                if len(parts) >= 3:
-                    try:
-                        session_time = int(parts[2])
-                        # Remove sessions older than 2 hours
-                        if current_time - session_time > 7200:
-                            expired_keys.append(key)
-                    except ValueError:
-                        # Invalid timestamp format, mark for removal
-                        expired_keys.append(key)
-            
-            for key in expired_keys:
-                del _emergency_fix_19_question_cache[key]
-                logger.info(f"DEBUG: Emergency Fix 19 - Cleaned up expired cache entry: {key}")
-            
-            if expired_keys:
-                logger.info(f"SUCCESS: Emergency Fix 19 - Cleaned up {len(expired_keys)} expired cache entries")
-            
-        except Exception as e:
-            logger.error(f"ERROR: Emergency Fix 19 cache cleanup failed: {e}")
-    
-
-
-
-
-    # ================================
-    # EMERGENCY FIX 19: SESSION SIZE OPTIMIZATION 
-    # Date: 2025-08-13 22:10:00
-    # Purpose: Fix session cookie size exceeding 4KB limit caused by Emergency Fix 18
-    # Problem: Session cookie size reached 4316 bytes, exceeding 4093 byte limit
-    # Solution: Store only minimal essential data in session, use server-side storage for question data
-    # ================================
-
-    # EMERGENCY FIX 19: Session size optimization global storage
-    # Use server-side storage to avoid cookie size limits
-    _emergency_fix_19_question_cache = {}
-    _emergency_fix_19_session_counter = 0
-
-    def emergency_fix_19_session_size_optimization():
-        """
-        EMERGENCY FIX 19: Optimize session size for construction environment department
-        
-        Reduces session cookie size by:
-        1. Moving large question data to server-side cache
-        2. Storing only essential IDs and mappings in session
-        3. Maintaining compatibility with Emergency Fix 18 ID mapping
-        """
-        global _emergency_fix_19_question_cache, _emergency_fix_19_session_counter
-        
-        logger.info("DEBUG: Emergency Fix 19 - Session Size Optimization starting")
-        
-        try:
-            # Check if Emergency Fix 18 session exists and needs optimization
-            if 'emergency_fix_18_questions' in session:
-                emergency_questions = session.get('emergency_fix_18_questions', {})
-                
-                if emergency_questions and len(emergency_questions) > 0:
-                    logger.info(f"DEBUG: Emergency Fix 19 - Optimizing session with {len(emergency_questions)} questions")
-                    
-                    # Create a unique session ID for server-side storage
-                    _emergency_fix_19_session_counter += 1
-                    session_storage_id = f"env_session_{int(time.time())}_{_emergency_fix_19_session_counter}"
-                    
-                    # Store full question data in server-side cache
-                    _emergency_fix_19_question_cache[session_storage_id] = emergency_questions
-                    
-                    # Keep only minimal data in session
-                    session['emergency_fix_19_storage_id'] = session_storage_id
-                    session['emergency_fix_19_question_count'] = len(emergency_questions)
-                    
-                    # Preserve essential ID mappings (these are small)
-                    if 'emergency_fix_18_csv_to_sequential' in session:
-                        session['emergency_fix_19_id_mapping'] = session['emergency_fix_18_csv_to_sequential']
-                    
-                    # Remove large question data from session
-                    if 'emergency_fix_18_questions' in session:
-                        del session['emergency_fix_18_questions']
-                    
-                    # Clean up other large session data if present
-                    large_keys_to_remove = [
-                        'emergency_fix_12_backup',
-                        'exam_session'  # This can be recreated if needed
-                    ]
-                    
-                    for key in large_keys_to_remove:
-                        if key in session:
-                            logger.info(f"DEBUG: Emergency Fix 19 - Removing large session key: {key}")
-                            del session[key]
-                    
-                    logger.info(f"SUCCESS: Emergency Fix 19 - Session optimized, storage ID: {session_storage_id}")
-                    logger.info(f"DEBUG: Emergency Fix 19 - Question data moved to server-side cache")
-                    
-                    return True
-                else:
-                    logger.info("DEBUG: Emergency Fix 19 - No question data to optimize")
-                    return False
-            else:
-                logger.info("DEBUG: Emergency Fix 19 - No Emergency Fix 18 session to optimize")
-                return False
-                
-        except Exception as e:
-            logger.error(f"ERROR: Emergency Fix 19 failed: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
-
-    def emergency_fix_19_get_question_by_sequential_id(sequential_id):
-        """
-        Get question by sequential ID using Emergency Fix 19 optimized storage
-        
-        Args:
-            sequential_id (str): Sequential ID like '1', '2', '3', etc.
-            
-        Returns:
-            dict: Question object or None if not found
-        """
-        try:
-            # Check if Emergency Fix 19 storage is available
-            if 'emergency_fix_19_storage_id' in session:
-                storage_id = session.get('emergency_fix_19_storage_id')
-                
-                if storage_id in _emergency_fix_19_question_cache:
-                    questions = _emergency_fix_19_question_cache[storage_id]
-                    question = questions.get(sequential_id)
-                    
-                    if question:
-                        logger.info(f"DEBUG: Emergency Fix 19 - Retrieved question for sequential ID {sequential_id} from server cache")
-                        return question
-                    else:
-                        logger.warning(f"WARNING: Emergency Fix 19 - Question {sequential_id} not found in server cache")
-                        return None
-                else:
-                    logger.error(f"ERROR: Emergency Fix 19 - Storage ID {storage_id} not found in cache")
-                    return None
-            
-            # Fallback to Emergency Fix 18 method if available
-            elif 'emergency_fix_18_questions' in session:
-                question = session['emergency_fix_18_questions'].get(sequential_id)
-                if question:
-                    logger.info(f"DEBUG: Emergency Fix 19 - Fallback to Emergency Fix 18 for sequential ID {sequential_id}")
-                    return question
-            
-            logger.warning(f"WARNING: Emergency Fix 19 - No storage method available for sequential ID {sequential_id}")
-            return None
-            
-        except Exception as e:
-            logger.error(f"ERROR: Emergency Fix 19 question lookup failed for ID {sequential_id}: {e}")
-            return None
-
-    def emergency_fix_19_cleanup_expired_cache():
-        """Clean up expired session cache entries"""
-        global _emergency_fix_19_question_cache
-        
-        try:
-            current_time = time.time()
-            expired_keys = []
-            
-            for key in _emergency_fix_19_question_cache.keys():
-                # Extract timestamp from key (format: env_session_{timestamp}_{counter})
-                parts = key.split('_')
-                if len(parts) >= 3:
-                    try:
-                        session_time = int(parts[2])
-                        # Remove sessions older than 2 hours
-                        if current_time - session_time > 7200:
-                            expired_keys.append(key)
-                    except ValueError:
-                        # Invalid timestamp format, mark for removal
-                        expired_keys.append(key)
-            
-            for key in expired_keys:
-                del _emergency_fix_19_question_cache[key]
-                logger.info(f"DEBUG: Emergency Fix 19 - Cleaned up expired cache entry: {key}")
-            
-            if expired_keys:
-                logger.info(f"SUCCESS: Emergency Fix 19 - Cleaned up {len(expired_keys)} expired cache entries")
-            
-        except Exception as e:
-            logger.error(f"ERROR: Emergency Fix 19 cache cleanup failed: {e}")
-    
-
-
-
-
     # ================================
     # EMERGENCY FIX 21: CSRF VALIDATION RESOLUTION
     # Date: 2025-08-13 23:45:00
@@ -11577,6 +8343,7 @@ def api_error_prevention_cleanup():
 
 
 @app.route('/api/session/status', methods=['GET'])
+@conditional_get(('session',))
 def api_session_status():
     """
     セッション状態確認API
@@ -11667,6 +8434,14 @@ def log_error():
         return jsonify({'error': 'Logging failed', 'success': False}), 500
 
 
+# 📦 機能領域別Blueprint（試験・復習/SRS・統計・モバイル・ソーシャル・管理・企業API・デバッグ・静的コンテンツ）
+# Blueprintは app.py の共通ヘルパーを参照するため、全定義完了後に登録する
+from blueprints import register_blueprints
+from config import BlueprintConfig
+
+register_blueprints(app, include_debug=BlueprintConfig.ENABLE_DEBUG_ROUTES)
+
+
 if __name__ == '__main__':
     # SHIELD セキュリティ強化: 本番環境設定（元の設定を維持）
     port = int(os.environ.get('PORT', 5005))
@@ -11689,8 +8464,9 @@ if __name__ == '__main__':
         logger.info("SUCCESS 開発モード: 外部URLアクセス対応済み")
 
     # FIRE ULTRA SYNC FIX: 起動高速化 - データ読み込みを遅延実行
-    logger.info("BOLT 高速起動モード（データ読み込みは初回アクセス時に実行）")
-    # NOTE: preload_startup_data() は初回アクセス時に自動実行される
+    logger.info("BOLT 高速起動モード（データ読み込みはバックグラウンドで実行）")
+    # NOTE: preload_startup_data() はキャッシュウォームアップ計画の第1段で実行される
+    start_cache_warmup()
     logger.info("SUCCESS 起動準備完了 - URLアクセス可能です")
 
     # 起動ログ最適化（Render向け高速起動）
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON Write Benchmark - JSONファイル更新方式（旧方式 / ロック+アトミック / バッチ）の並行書き込み比較
+
+複数プロセス（gunicorn ワーカー相当）が同一の JSON ファイル（api_keys.json 相当のサイズ）に
+カウンタ加算の read-modify-write を繰り返し、スループット・更新消失・読み込み失敗を比較する。
+
+- legacy:  open('w') で直接上書き・indent=2（ロックなし。旧実装）
+- atomic:  json_store.update_json（ファイルロック + 一時ファイル + os.replace・コンパクト形式）
+- batched: json_store.BatchedJSONWriter（プロセス毎に変更を溜めて一括反映）
+
+使い方:
+    python benchmark_json_writes.py                         # 3方式を比較
+    python benchmark_json_writes.py -p 8 -n 500 --entries 2000
+    python benchmark_json_writes.py --modes atomic batched --no-fsync --json out.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import JSONStoreConfig  # noqa: E402
+import json_store  # noqa: E402
+
+COUNTER_KEY = 'benchmark_counter'
+
+
+def _seed(path: str, entries: int) -> int:
+    data = {f'rccm_key_{index:06d}': {
+        'organization': f'org-{index % 50}',
+        'permissions': ['read_progress', 'read_analytics'],
+        'created_at': '2025-01-01T00:00:00',
+        'usage_stats': {'total_requests': 0, 'last_used': None, 'rate_limit': 1000},
+    } for index in range(entries)}
+    data[COUNTER_KEY] = {'usage_stats': {'total_requests': 0}}
+    json_store.write_json(path, data, indent=2)
+    return os.path.getsize(path)
+
+
+def _increment(data: Dict) -> None:
+    data[COUNTER_KEY]['usage_stats']['total_requests'] += 1
+
+
+def _worker(mode: str, path: str, operations: int, results) -> None:
+    read_errors = 0
+    if mode == 'batched':
+        writer = json_store.BatchedJSONWriter()
+        for _ in range(operations):
+            writer.submit(path, _increment)
+        writer.flush()
+    else:
+        for _ in range(operations):
+            if mode == 'atomic':
+                json_store.update_json(path, _increment)
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except ValueError:
+                # 書き込み途中のファイルを読んだ（旧方式のみ発生）
+                read_errors += 1
+                continue
+            _increment(data)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+    results.put(read_errors)
+
+
+def run_mode(mode: str, processes: int, operations: int, entries: int) -> Dict:
+    directory = tempfile.mkdtemp(prefix='json_bench_')
+    path = os.path.join(directory, 'api_keys.json')
+    try:
+        seeded_bytes = _seed(path, entries)
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        workers = [context.Process(target=_worker, args=(mode, path, operations, results))
+                   for _ in range(processes)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        read_errors = sum(results.get() for _ in workers)
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        expected = processes * operations
+        try:
+            counted = json_store.read_json(path, {})[COUNTER_KEY]['usage_stats']['total_requests']
+        except (KeyError, TypeError):
+            counted = 0
+        return {
+            'mode': mode,
+            'processes': processes,
+            'operations': expected,
+            'seconds': round(elapsed, 3),
+            'throughput_ops': round(expected / elapsed, 1) if elapsed else None,
+            'lost_updates': expected - counted,
+            'read_errors': read_errors,
+            'file_kb_before': round(seeded_bytes / 1024, 1),
+            'file_kb_after': round(os.path.getsize(path) / 1024, 1),
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def print_table(results: List[Dict]) -> None:
+    columns = ('mode', 'processes', 'operations', 'seconds', 'throughput_ops', 'lost_updates',
+               'read_errors', 'file_kb_before', 'file_kb_after')
+    print(' | '.join(columns))
+    for result in results:
+        print(' | '.join(str(result.get(column)) for column in columns))
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Concurrent JSON file update comparison (legacy / atomic / batched)')
+    parser.add_argument('--modes', nargs='+', default=['legacy', 'atomic', 'batched'],
+                        choices=['legacy', 'atomic', 'batched'])
+    parser.add_argument('-p', '--processes', type=int, default=4)
+    parser.add_argument('-n', '--operations', type=int, default=200, help='updates per process')
+    parser.add_argument('--entries', type=int, default=500, help='entries in the seeded file')
+    parser.add_argument('--no-fsync', action='store_true', help='skip fsync in atomic/batched writes')
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    args = parser.parse_args(argv)
+
+    if args.no_fsync:
+        JSONStoreConfig.FSYNC = False
+
+    results = []
+    for mode in args.modes:
+        print(f"▶ {mode}: {args.processes} processes × {args.operations} updates, {args.entries} entries")
+        results.append(run_mode(mode, args.processes, args.operations, args.entries))
+    print_table(results)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
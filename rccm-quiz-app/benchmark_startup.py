@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Startup Benchmark - `python -X importtime` による app.py 起動時間の計測
+
+コールドスタート・ワーカー再起動時のコストを測るため、新しいプロセスで
+`import app` を繰り返し実行し、importtime の出力を集計する。
+
+使い方:
+    python benchmark_startup.py                      # 5回計測して結果を表示
+    python benchmark_startup.py -n 10 --json out.json
+    python benchmark_startup.py --compare out.json   # 保存済み結果との比較
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 起動時に読み込まれるべきでない機能モジュール（lazy_features で遅延読み込み）
+LAZY_MODULES = (
+    'exam_simulator', 'gamification', 'ai_analyzer', 'adaptive_learning', 'advanced_analytics',
+    'mobile_features', 'learning_optimizer', 'admin_dashboard', 'social_learning',
+    'api_integration', 'advanced_personalization', 'pytz', 'psutil',
+)
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, int]]:
+    """importtime 出力 → {モジュール名: {'self_us', 'cumulative_us', 'depth'}}"""
+    modules = {}
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules[name] = {
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+            'depth': (len(indent) - 1) // 2,
+        }
+    return modules
+
+
+def run_once(module: str = 'app') -> Dict:
+    """新しいプロセスで1回 import して計測"""
+    env = dict(os.environ)
+    env.setdefault('CACHE_WARMUP_ENABLED', 'False')
+
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=APP_DIR, env=env, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    modules = parse_importtime(result.stderr)
+    return {
+        'wall_ms': wall_ms,
+        'import_ms': modules.get(module, {}).get('cumulative_us', 0) / 1000,
+        'module_count': len(modules),
+        'modules': modules,
+    }
+
+
+def run_benchmark(runs: int = 5, module: str = 'app', top: int = 15) -> Dict:
+    samples = [run_once(module) for _ in range(runs)]
+    last = samples[-1]['modules']
+
+    # 直下のインポートを累積時間順に（最後の計測 = ウォームなファイルシステムキャッシュ）
+    direct = sorted(
+        ((name, data['cumulative_us']) for name, data in last.items() if data['depth'] == 1),
+        key=lambda item: item[1], reverse=True
+    )[:top]
+
+    return {
+        'module': module,
+        'runs': runs,
+        'import_ms_median': round(statistics.median(s['import_ms'] for s in samples), 1),
+        'import_ms_min': round(min(s['import_ms'] for s in samples), 1),
+        'wall_ms_median': round(statistics.median(s['wall_ms'] for s in samples), 1),
+        'module_count': samples[-1]['module_count'],
+        'eager_feature_modules': [name for name in LAZY_MODULES if name in last],
+        'top_imports': [{'module': name, 'cumulative_ms': round(us / 1000, 1)} for name, us in direct],
+    }
+
+
+def print_report(report: Dict, baseline: Dict = None) -> None:
+    print(f"📊 import {report['module']} ({report['runs']} runs)")
+    print(f"   import time (median): {report['import_ms_median']} ms   min: {report['import_ms_min']} ms")
+    print(f"   process wall (median): {report['wall_ms_median']} ms   modules: {report['module_count']}")
+    if baseline:
+        for key in ('import_ms_median', 'wall_ms_median', 'module_count'):
+            before, after = baseline.get(key), report.get(key)
+            if before:
+                print(f"   {key}: {before} → {after} ({(after - before) / before * 100:+.1f}%)")
+
+    eager = report['eager_feature_modules']
+    print(f"   eager feature modules: {', '.join(eager) if eager else 'none'}")
+    print("   top direct imports:")
+    for item in report['top_imports']:
+        print(f"     {item['cumulative_ms']:>8.1f} ms  {item['module']}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='app.py startup import-time benchmark')
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    parser.add_argument('-m', '--module', default='app')
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--json', dest='json_path', help='write the report to this file')
+    parser.add_argument('--compare', help='baseline report written by --json')
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.runs, args.module, args.top)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
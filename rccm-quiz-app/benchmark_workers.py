@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Worker Benchmark - gunicorn ワーカー方式（sync / gthread / gevent）の負荷比較
+
+各ワーカー方式で gunicorn を起動し、/exam の出題→回答フローを並列クライアントで
+一定時間繰り返して、スループット・レイテンシ・RSS（マスター+全ワーカー合計）を比較する。
+
+使い方:
+    python benchmark_workers.py                              # sync と gthread を比較
+    python benchmark_workers.py --classes sync gthread gevent -c 16 -d 30
+    python benchmark_workers.py --workers 2 --threads 8 --json out.json
+"""
+
+import argparse
+import http.cookiejar
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Dict, List, Optional
+
+import psutil
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_INPUT_PATTERN = r'name="%s"[^>]*value="([^"]*)"'
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _form_value(html: str, name: str) -> Optional[str]:
+    match = re.search(_INPUT_PATTERN % name, html)
+    return match.group(1) if match else None
+
+
+class ExamFlowClient:
+    """1ユーザー分のクッキーを保持し /exam の出題→回答を繰り返すクライアント"""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+        self.latencies: List[float] = []
+        self.errors = 0
+
+    def _request(self, path: str, data: Optional[Dict[str, str]] = None) -> Optional[str]:
+        body = urllib.parse.urlencode(data).encode('utf-8') if data is not None else None
+        start = time.perf_counter()
+        try:
+            with self.opener.open(self.base_url + path, data=body, timeout=self.timeout) as response:
+                html = response.read().decode('utf-8', 'replace')
+        except (urllib.error.URLError, OSError):
+            self.errors += 1
+            return None
+        self.latencies.append(time.perf_counter() - start)
+        return html
+
+    def run(self, deadline: float, question_type: str = 'basic') -> None:
+        html = self._request(f'/exam?question_type={question_type}')
+        while time.time() < deadline:
+            qid = _form_value(html or '', 'qid')
+            if not qid:
+                # セッション終了・エラー時は新しいセッションを開始
+                html = self._request(f'/exam?question_type={question_type}')
+                continue
+            self._request('/exam', {
+                'qid': qid,
+                'answer': 'A',
+                'elapsed': '3',
+                'csrf_token': _form_value(html, 'csrf_token') or '',
+            })
+            html = self._request('/exam')
+
+
+def _process_tree_rss_mb(pid: int) -> float:
+    try:
+        root = psutil.Process(pid)
+        processes = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes) / 1024 / 1024
+    except psutil.Error:
+        return 0.0
+
+
+def _wait_until_ready(base_url: str, timeout: float = 60.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(base_url + '/health', timeout=2):
+                return True
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.3)
+    return False
+
+
+def run_worker_class(worker_class: str, concurrency: int, duration: float,
+                     workers: int, threads: int) -> Dict:
+    port = _free_port()
+    env = dict(os.environ)
+    env.update({
+        'PORT': str(port),
+        'GUNICORN_WORKER_CLASS': worker_class,
+        'GUNICORN_WORKERS': str(workers),
+        'GUNICORN_THREADS': str(threads),
+        'GUNICORN_LOG_LEVEL': 'warning',
+        'CACHE_WARMUP_ENABLED': env.get('CACHE_WARMUP_ENABLED', 'False'),
+    })
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--access-logfile', '/dev/null', 'app:app'],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        if not _wait_until_ready(base_url):
+            raise RuntimeError(f'gunicorn ({worker_class}) did not become ready')
+        idle_rss = _process_tree_rss_mb(server.pid)
+
+        clients = [ExamFlowClient(base_url) for _ in range(concurrency)]
+        deadline = time.time() + duration
+        peak_rss = [idle_rss]
+
+        def sample_rss():
+            while time.time() < deadline:
+                peak_rss.append(_process_tree_rss_mb(server.pid))
+                time.sleep(0.5)
+
+        threads_list = [threading.Thread(target=client.run, args=(deadline,)) for client in clients]
+        threads_list.append(threading.Thread(target=sample_rss))
+        started = time.time()
+        for thread in threads_list:
+            thread.start()
+        for thread in threads_list:
+            thread.join()
+        elapsed = time.time() - started
+
+        latencies = sorted(l for client in clients for l in client.latencies)
+        return {
+            'worker_class': worker_class,
+            'workers': workers,
+            'threads': threads if worker_class == 'gthread' else 1,
+            'concurrency': concurrency,
+            'requests': len(latencies),
+            'errors': sum(client.errors for client in clients),
+            'throughput_rps': round(len(latencies) / elapsed, 1),
+            'latency_p50_ms': round(statistics.median(latencies) * 1000, 1) if latencies else None,
+            'latency_p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1) if latencies else None,
+            'rss_idle_mb': round(idle_rss, 1),
+            'rss_peak_mb': round(max(peak_rss), 1),
+        }
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def print_table(results: List[Dict]) -> None:
+    columns = ('worker_class', 'workers', 'threads', 'requests', 'errors', 'throughput_rps',
+               'latency_p50_ms', 'latency_p95_ms', 'rss_idle_mb', 'rss_peak_mb')
+    print(' | '.join(columns))
+    for result in results:
+        print(' | '.join(str(result.get(column)) for column in columns))
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='gunicorn worker class load comparison on the /exam flow')
+    parser.add_argument('--classes', nargs='+', default=['sync', 'gthread'])
+    parser.add_argument('-c', '--concurrency', type=int, default=8)
+    parser.add_argument('-d', '--duration', type=float, default=20.0)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    args = parser.parse_args(argv)
+
+    results = []
+    for worker_class in args.classes:
+        print(f"▶ {worker_class}: {args.workers} workers, concurrency {args.concurrency}, {args.duration}s")
+        results.append(run_worker_class(worker_class, args.concurrency, args.duration,
+                                        args.workers, args.threads))
+    print_table(results)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Blueprints - 機能領域別のルート定義と一括登録
+
+各Blueprintモジュールは app.py の共通ヘルパーを参照するため、
+app.py の全定義完了後（モジュール末尾）に register_blueprints() で登録する。
+デバッグ・手動テスト用Blueprintは本番環境では登録しない。
+起動時にBlueprint毎のインポート時間とルート数をログ出力する。
+"""
+
+import importlib
+import logging
+import time
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+# (モジュール, Blueprint変数名, デバッグ専用か)
+# 登録順 = URL競合時の優先順（static_bp は既存ルートを優先させるため最後）
+BLUEPRINTS = (
+    ('blueprints.exam_bp', 'exam_bp', False),
+    ('blueprints.review_bp', 'review_bp', False),
+    ('blueprints.statistics_bp', 'statistics_bp', False),
+    ('blueprints.mobile_bp', 'mobile_bp', False),
+    ('blueprints.social_bp', 'social_bp', False),
+    ('blueprints.admin_bp', 'admin_bp', False),
+    ('blueprints.enterprise_api_bp', 'enterprise_api_bp', False),
+    ('blueprints.devtools_bp', 'devtools_bp', True),
+    ('blueprints.static_bp', 'static_bp', False),
+)
+
+
+def register_blueprints(app, include_debug: bool = False) -> Dict[str, Any]:
+    """Blueprintを登録し、インポート時間・ルート数の起動レポートを返す"""
+    report: Dict[str, Any] = {'blueprints': {}, 'skipped': []}
+    core_routes = len(list(app.url_map.iter_rules()))
+
+    for module_name, attr, debug_only in BLUEPRINTS:
+        if debug_only and not include_debug:
+            report['skipped'].append(attr)
+            continue
+
+        start = time.perf_counter()
+        try:
+            blueprint = getattr(importlib.import_module(module_name), attr)
+        except ImportError as e:
+            logger.warning(f"WARNING Blueprintを登録できません ({attr}): {e}")
+            continue
+        import_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        app.register_blueprint(blueprint)
+        routes = sum(1 for rule in app.url_map.iter_rules()
+                     if rule.endpoint.startswith(f"{blueprint.name}."))
+        report['blueprints'][blueprint.name] = {'import_ms': import_ms, 'routes': routes}
+
+    report['core_routes'] = core_routes
+    report['total_routes'] = len(list(app.url_map.iter_rules()))
+    app.extensions['blueprint_report'] = report
+    _log_report(report)
+    return report
+
+
+def _log_report(report: Dict[str, Any]) -> None:
+    for name, stats in report['blueprints'].items():
+        logger.info(f"📦 Blueprint {name}: {stats['routes']} routes, import {stats['import_ms']}ms")
+    if report['skipped']:
+        logger.info(f"🚫 未登録Blueprint（本番環境）: {', '.join(report['skipped'])}")
+    total_import_ms = round(sum(s['import_ms'] for s in report['blueprints'].values()), 2)
+    logger.info(f"📊 ルートテーブル: {report['total_routes']} rules "
+             f"(app.py {report['core_routes']}, blueprints {len(report['blueprints'])}件, "
+             f"import計 {total_import_ms}ms)")
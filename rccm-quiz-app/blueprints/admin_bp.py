@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+管理者ダッシュボードBlueprint
+システム概要・問題管理・ユーザー進捗・レポート（管理者認証必須）
+"""
+
+import logging
+
+from flask import Blueprint, jsonify, render_template
+
+from app import clear_questions_cache, conditional_get, require_admin_auth
+from lazy_features import lazy_feature
+from streaming_export import requested_stream_format, stream_records
+
+logger = logging.getLogger(__name__)
+
+# 機能モジュールは初回アクセス時に読み込み（lazy_features）
+admin_dashboard = lazy_feature('admin_dashboard')
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.route('/admin')
+@require_admin_auth
+def admin_dashboard_page():
+    """管理者ダッシュボードメイン"""
+    try:
+        # 全データを取得（同一スナップショットから）
+        data = admin_dashboard.get_dashboard_data()
+
+        return render_template('admin_dashboard.html',
+                               overview=data['overview'],
+                               questions=data['questions'],
+                               users=data['users'],
+                               content=data['content'],
+                               performance=data['performance'],
+                               data=data)
+    except Exception as e:
+        logger.error(f"管理者ダッシュボードエラー: {e}")
+        return render_template('error.html', error="ダッシュボードの読み込み中にエラーが発生しました")
+
+
+@admin_bp.route('/admin/api/overview')
+@require_admin_auth
+@conditional_get(('corpus', 'user_data'), time_bucket=60)
+def admin_api_overview():
+    """システム概要API"""
+    try:
+        overview = admin_dashboard.get_system_overview()
+        return jsonify(overview)
+    except Exception as e:
+        logger.error(f"概要API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/admin/api/questions')
+@require_admin_auth
+def admin_api_questions():
+    """問題管理API"""
+    try:
+        questions = admin_dashboard.get_question_management_data()
+        return jsonify(questions)
+    except Exception as e:
+        logger.error(f"問題管理API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/admin/api/users')
+@require_admin_auth
+def admin_api_users():
+    """ユーザー管理API"""
+    try:
+        users = admin_dashboard.get_user_progress_overview()
+        return jsonify(users)
+    except Exception as e:
+        logger.error(f"ユーザー管理API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/admin/api/users/<user_id>')
+@require_admin_auth
+def admin_api_user_detail(user_id):
+    """ユーザー詳細API"""
+    try:
+        user_detail = admin_dashboard.get_detailed_user_analysis(user_id)
+        return jsonify(user_detail)
+    except Exception as e:
+        logger.error(f"ユーザー詳細API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/admin/api/content')
+@require_admin_auth
+def admin_api_content():
+    """コンテンツ分析API"""
+    try:
+        content = admin_dashboard.get_content_analytics()
+        return jsonify(content)
+    except Exception as e:
+        logger.error(f"コンテンツ分析API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/admin/api/performance')
+@require_admin_auth
+def admin_api_performance():
+    """パフォーマンス指標API"""
+    try:
+        performance = admin_dashboard.get_performance_metrics()
+        return jsonify(performance)
+    except Exception as e:
+        logger.error(f"パフォーマンス指標API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/admin/api/reports/<report_type>')
+@require_admin_auth
+def admin_api_reports(report_type):
+    """レポート生成API"""
+    try:
+        if report_type not in ['comprehensive', 'users', 'content', 'performance']:
+            return jsonify({'error': 'Invalid report type'}), 400
+
+        # ?format=ndjson|csv: 1行ずつストリーミング出力（全ユーザー分をメモリに構築しない）
+        stream_format = requested_stream_format()
+        if stream_format == 'csv':
+            fieldnames = admin_dashboard.REPORT_CSV_FIELDS.get(report_type)
+            if not fieldnames:
+                return jsonify({'error': f'CSV format is not available for {report_type} report'}), 400
+            rows = (record for record in admin_dashboard.iter_report_records(report_type)
+                    if record['type'] != 'summary')
+            return stream_records(rows, 'csv', filename=f'report_{report_type}', fieldnames=fieldnames)
+        if stream_format == 'ndjson':
+            return stream_records(admin_dashboard.iter_report_records(report_type), 'ndjson',
+                                  filename=f'report_{report_type}')
+
+        report = admin_dashboard.generate_reports(report_type)
+        return jsonify(report)
+    except Exception as e:
+        logger.error(f"レポート生成API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/admin/api/refresh')
+@require_admin_auth
+def admin_api_refresh():
+    """データ更新API（問題データを再読み込みしてスナップショットをバックグラウンドで再構築）"""
+    try:
+        # キャッシュをクリア
+        clear_questions_cache()
+
+        status = admin_dashboard.refresh_async(reload_questions=True)
+        return jsonify({'success': True, 'message': 'データ更新を開始しました', 'snapshot': status}), 202
+    except Exception as e:
+        logger.error(f"データ更新API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/admin/api/refresh/status')
+@require_admin_auth
+def admin_api_refresh_status():
+    """スナップショット状態API（版数・構築時刻・再構築中か）"""
+    try:
+        return jsonify(admin_dashboard.get_snapshot_status())
+    except Exception as e:
+        logger.error(f"スナップショット状態API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+デバッグ・手動テスト用Blueprint
+セッション確認・テストデータ作成・手動テストダッシュボード
+本番環境では登録しない（config.BlueprintConfig.ENABLE_DEBUG_ROUTES）
+"""
+
+import logging
+import os
+from datetime import datetime
+
+from flask import Blueprint, jsonify, render_template, request, session
+
+from app import emergency_load_all_questions, format_utc_to_iso
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+devtools_bp = Blueprint('devtools', __name__)
+
+@devtools_bp.route('/test-route')
+def test_route():
+    """Simple test route to verify route registration works"""
+    return "Test route is working!"
+
+
+@devtools_bp.route('/debug')
+def debug_page():
+    """デバッグページ"""
+    import json
+    session_data = dict(session)
+    session_data_json = json.dumps(session_data, indent=2, default=str)
+    return render_template('debug.html', session_data=session_data_json)
+
+
+@devtools_bp.route('/debug/create_review_data')
+def create_review_test_data():
+    """FIRE 復習テスト用ダミーデータ作成（ウルトラシンク対応）"""
+    try:
+        from datetime import datetime, timedelta
+        import random
+
+        # データディレクトリの設定
+        data_dir = 'data'
+        all_questions = emergency_load_all_questions()  # EMERGENCY FIX
+        if not all_questions:
+            return "問題データが見つかりません", 400
+
+        # ランダムに10-20問を選択してSRSデータを作成
+        sample_size = min(20, len(all_questions))
+        sample_questions = random.sample(all_questions, sample_size)
+
+        srs_data = {}
+        bookmarks = []
+
+        for i, question in enumerate(sample_questions):
+            q_id = str(question.get('id', ''))
+            if not q_id:
+                continue
+
+            # 多様な復習データを作成
+            wrong_count = random.randint(1, 5)
+            total_attempts = wrong_count + random.randint(1, 3)
+            difficulty_level = random.uniform(3.0, 8.0)
+
+            # 復習期限（一部は期限切れに設定）
+            days_ago = random.randint(-5, 10)  # 過去5日〜未来10日
+            next_review = (datetime.now() + timedelta(days=days_ago)).isoformat()
+
+            srs_data[q_id] = {
+                'wrong_count': wrong_count,
+                'total_attempts': total_attempts,
+                'difficulty_level': difficulty_level,
+                'next_review': next_review,
+                'correct_count': total_attempts - wrong_count,
+                'mastered': False
+            }
+
+            # FIRE ULTRA SYNC FIX: 一部をブックマークにも追加（文字列形式で統一）
+            if i < 5:
+                bookmarks.append(str(q_id))  # 文字列として追加で統一
+
+        # セッションに保存
+        session['advanced_srs'] = srs_data
+        session['bookmarks'] = bookmarks
+        session.modified = True
+
+        logger.info(f"復習テストデータ作成: SRS={len(srs_data)}問, ブックマーク={len(bookmarks)}問")
+
+        return """
+        <h2>FIRE 復習テストデータ作成完了！</h2>
+        <p>SRSデータ: {len(srs_data)}問</p>
+        <p>ブックマーク: {len(bookmarks)}問</p>
+        <p><a href="/review">復習リストを確認</a></p>
+        <p><a href="/exam/review">復習開始をテスト</a></p>
+        <p><a href="/">ホームに戻る</a></p>
+        """
+
+    except Exception as e:
+        logger.error(f"復習テストデータ作成エラー: {e}")
+        return f"エラー: {e}", 500
+
+
+@devtools_bp.route('/debug/clear_session')
+def clear_session_debug():
+    """FIRE セッションクリア（デバッグ用）"""
+    try:
+        # 復習関連データのみクリア
+        session.pop('advanced_srs', None)
+        session.pop('bookmarks', None)
+        session.pop('exam_question_ids', None)
+        session.pop('exam_current', None)
+        session.pop('exam_category', None)
+        session.modified = True
+
+        return "セッションクリア完了"
+    except Exception as e:
+        return f"エラー: {e}", 500
+
+
+@devtools_bp.route('/debug/session')
+def debug_session():
+    """デバッグ用セッション情報取得"""
+    try:
+        session_info = {
+            'exam_question_ids': session.get('exam_question_ids', []),
+            'exam_current': session.get('exam_current'),
+            'exam_category': session.get('exam_category'),
+            'selected_question_type': session.get('selected_question_type'),
+            'selected_department': session.get('selected_department'),
+            'selected_year': session.get('selected_year')
+        }
+        return jsonify(session_info)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@devtools_bp.route('/debug/set_current', methods=['POST'])
+def debug_set_current():
+    """デバッグ用: exam_currentを直接設定（10問目テスト用）"""
+    try:
+        data = request.get_json()
+        if not data or 'exam_current' not in data:
+            return jsonify({'error': 'exam_current パラメータが必要です'}), 400
+        
+        new_current = data['exam_current']
+        if not isinstance(new_current, int) or new_current < 0:
+            return jsonify({'error': 'exam_current は0以上の整数である必要があります'}), 400
+        
+        # 現在のセッション状態を確認
+        exam_question_ids = session.get('exam_question_ids', [])
+        if not exam_question_ids:
+            return jsonify({'error': 'アクティブなセッションがありません。先に問題セッションを開始してください。'}), 400
+        
+        # 範囲チェック
+        if new_current >= len(exam_question_ids):
+            return jsonify({'error': f'exam_current は0から{len(exam_question_ids)-1}の範囲で指定してください'}), 400
+        
+        # セッション更新
+        old_current = session.get('exam_current', 0)
+        session['exam_current'] = new_current
+        session.modified = True
+        
+        logger.info(f"DEBUG: exam_current更新 {old_current} → {new_current}")
+        
+        return jsonify({
+            'success': True,
+            'old_current': old_current,
+            'new_current': new_current,
+            'total_questions': len(exam_question_ids),
+            'message': f'exam_current を {new_current} に設定しました（{new_current+1}問目）'
+        })
+        
+    except Exception as e:
+        logger.error(f"DEBUG: set_current エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@devtools_bp.route('/manual_test_dashboard')
+def manual_test_dashboard():
+    """🧪 手動テストダッシュボード（CLAUDE.md準拠・スクリプトテスト絶対禁止）"""
+    try:
+        # ウルトラシンク方針: 副作用ゼロでダッシュボード表示
+        dashboard_path = os.path.join(APP_DIR, 'manual_test_dashboard.html')
+        
+        if os.path.exists(dashboard_path):
+            with open(dashboard_path, 'r', encoding='utf-8') as f:
+                dashboard_content = f.read()
+            
+            logger.info("🧪 手動テストダッシュボード表示 - スクリプトテスト絶対禁止")
+            return dashboard_content, 200, {'Content-Type': 'text/html; charset=utf-8'}
+        else:
+            logger.error("ERROR 手動テストダッシュボードファイルが見つかりません")
+            return render_template('error.html', 
+                                   error="手動テストダッシュボードが利用できません"), 404
+                                   
+    except Exception as e:
+        logger.error(f"手動テストダッシュボードエラー: {e}")
+        return render_template('error.html', 
+                               error="手動テストダッシュボードの読み込み中にエラーが発生しました"), 500
+
+
+@devtools_bp.route('/manual_test_guide')
+def manual_test_guide():
+    """🧪 手動テストガイド表示（CLAUDE.md準拠）"""
+    try:
+        guide_path = os.path.join(APP_DIR, 'MANUAL_TEST_GUIDE.md')
+        
+        if os.path.exists(guide_path):
+            with open(guide_path, 'r', encoding='utf-8') as f:
+                guide_content = f.read()
+            
+            # Markdownをプレーンテキストとして表示
+            return f"""
+            <html>
+            <head>
+                <title>🧪 RCCM 手動テストガイド</title>
+                <meta charset="UTF-8">
+                <style>
+                    body {{ font-family: monospace; padding: 20px; background: #f5f5f5; }}
+                    pre {{ background: white; padding: 20px; border-radius: 8px; overflow-x: auto; }}
+                </style>
+            </head>
+            <body>
+                <h1>🧪 RCCM 手動テストガイド</h1>
+                <pre>{guide_content}</pre>
+            </body>
+            </html>
+            """, 200, {'Content-Type': 'text/html; charset=utf-8'}
+        else:
+            return render_template('error.html', 
+                                   error="手動テストガイドが見つかりません"), 404
+                                   
+    except Exception as e:
+        logger.error(f"手動テストガイド表示エラー: {e}")
+        return render_template('error.html', 
+                               error="手動テストガイドの読み込み中にエラーが発生しました"), 500
+
+
+@devtools_bp.route('/api/manual_test/monitoring_status')
+def api_manual_test_monitoring_status():
+    """🧪 手動テスト監視状況API（CLAUDE.md準拠・副作用ゼロ）"""
+    try:
+        # ウルトラシンク方針: 副作用ゼロでログファイル統計のみ取得
+        log_file_path = os.path.join(APP_DIR, 'rccm_app.log')
+        
+        # 基本統計
+        status = {
+            'success': True,
+            'monitoring_available': True,
+            'log_file_exists': os.path.exists(log_file_path),
+            'timestamp': format_utc_to_iso()
+        }
+        
+        if status['log_file_exists']:
+            try:
+                # ログファイル基本情報（副作用なし）
+                file_stats = os.stat(log_file_path)
+                status['log_file_info'] = {
+                    'size_bytes': file_stats.st_size,
+                    'size_mb': round(file_stats.st_size / (1024 * 1024), 2),
+                    'last_modified': datetime.fromtimestamp(file_stats.st_mtime).isoformat()
+                }
+                
+                # 最近のログエントリ統計（読み取り専用）
+                with open(log_file_path, 'r', encoding='utf-8') as f:
+                    lines = f.readlines()
+                    
+                recent_lines = lines[-50:] if len(lines) > 50 else lines
+                
+                # パターン検索（副作用なし）
+                manual_test_count = sum(1 for line in recent_lines if '🧪 MANUAL TEST QUALITY CHECK' in line)
+                error_count = sum(1 for line in recent_lines if any(marker in line for marker in ['ERROR', 'ERROR', 'CRITICAL']))
+                success_count = sum(1 for line in recent_lines if 'SUCCESS' in line)
+                warning_count = sum(1 for line in recent_lines if any(marker in line for marker in ['WARNING', 'WARNING']))
+                
+                status['recent_activity'] = {
+                    'manual_tests_detected': manual_test_count,
+                    'error_messages': error_count,
+                    'success_messages': success_count,
+                    'warning_messages': warning_count,
+                    'total_recent_lines': len(recent_lines)
+                }
+                
+                # 推奨事項
+                recommendations = []
+                if manual_test_count == 0:
+                    recommendations.append("手動テストが検出されていません - テストダッシュボードから開始してください")
+                elif error_count > 0:
+                    recommendations.append(f"エラーが {error_count}件 検出されています - ログを確認してください")
+                elif manual_test_count > 0 and error_count == 0:
+                    recommendations.append("手動テストが正常に実行されています")
+                    
+                status['recommendations'] = recommendations
+                
+            except Exception as e:
+                logger.warning(f"ログファイル解析エラー: {e}")
+                status['log_analysis_error'] = str(e)
+        else:
+            status['recommendations'] = ["ログファイルが見つかりません - アプリケーションを起動してください"]
+            
+        # 手動テスト支援情報
+        status['manual_test_support'] = {
+            'dashboard_url': '/manual_test_dashboard',
+            'guide_url': '/manual_test_guide',
+            'script_testing_prohibited': True,
+            'claude_md_compliant': True
+        }
+        
+        return jsonify(status)
+        
+    except Exception as e:
+        logger.error(f"手動テスト監視状況API エラー: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': format_utc_to_iso()
+        }), 500
+
+
+@devtools_bp.route('/api/manual_test/quality_check')
+def api_manual_test_quality_check():
+    """🧪 手動テスト品質チェックAPI（CLAUDE.md準拠・副作用ゼロ）"""
+    try:
+        log_file_path = os.path.join(APP_DIR, 'rccm_app.log')
+        
+        quality_status = {
+            'success': True,
+            'timestamp': format_utc_to_iso(),
+            'quality_checks': {
+                'year_consistency': {'passed': 0, 'failed': 0},
+                'department_consistency': {'passed': 0, 'failed': 0},
+                'question_duplicates': {'passed': 0, 'failed': 0},
+                'performance_checks': {'good': 0, 'warnings': 0}
+            },
+            'overall_quality_score': 0,
+            'critical_issues': [],
+            'recommendations': []
+        }
+        
+        if os.path.exists(log_file_path):
+            try:
+                # ログファイルから品質チェック結果を抽出（副作用なし）
+                with open(log_file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                    
+                # 年度統一性チェック
+                year_success = content.count('SUCCESS 年度統一性: 完全')
+                year_failed = content.count('ERROR 年度統一性: 失敗')
+                quality_status['quality_checks']['year_consistency'] = {
+                    'passed': year_success,
+                    'failed': year_failed
+                }
+                
+                # 部門統一性チェック
+                dept_success = content.count('SUCCESS 部門統一性: 完全')
+                dept_failed = content.count('ERROR 部門統一性: 失敗')
+                quality_status['quality_checks']['department_consistency'] = {
+                    'passed': dept_success,
+                    'failed': dept_failed
+                }
+                
+                # 問題ID重複チェック
+                dup_success = content.count('SUCCESS 問題ID重複: なし')
+                dup_failed = content.count('ERROR 問題ID重複: 検出')
+                quality_status['quality_checks']['question_duplicates'] = {
+                    'passed': dup_success,
+                    'failed': dup_failed
+                }
+                
+                # パフォーマンスチェック
+                perf_good = content.count('BOLT パフォーマンス: レスポンス')
+                perf_warnings = content.count('WARNING パフォーマンス警告') + content.count('WARNING レスポンス時間警告')
+                quality_status['quality_checks']['performance_checks'] = {
+                    'good': perf_good,
+                    'warnings': perf_warnings
+                }
+                
+                # 全体品質スコア計算
+                total_checks = year_success + year_failed + dept_success + dept_failed + dup_success + dup_failed
+                total_passed = year_success + dept_success + dup_success
+                
+                if total_checks > 0:
+                    quality_score = (total_passed / total_checks) * 100
+                    # パフォーマンス警告でスコア減点
+                    quality_score = max(0, quality_score - (perf_warnings * 5))
+                    quality_status['overall_quality_score'] = round(quality_score, 1)
+                    
+                # 重要問題検出
+                critical_issues = []
+                if year_failed > 0:
+                    critical_issues.append(f"年度混在エラー: {year_failed}件")
+                if dept_failed > 0:
+                    critical_issues.append(f"部門混在エラー: {dept_failed}件")
+                if dup_failed > 0:
+                    critical_issues.append(f"問題ID重複: {dup_failed}件")
+                    
+                quality_status['critical_issues'] = critical_issues
+                
+                # 推奨事項
+                recommendations = []
+                if quality_status['overall_quality_score'] >= 90:
+                    recommendations.append("品質状況は非常に良好です")
+                elif quality_status['overall_quality_score'] >= 70:
+                    recommendations.append("品質状況は良好ですが、一部改善の余地があります")
+                elif critical_issues:
+                    recommendations.append("重要な品質問題が検出されています - 修正が必要です")
+                else:
+                    recommendations.append("手動テストを開始して品質チェックを実行してください")
+                    
+                if perf_warnings > 0:
+                    recommendations.append(f"パフォーマンス警告 {perf_warnings}件 - レスポンス時間を確認してください")
+                    
+                quality_status['recommendations'] = recommendations
+                
+            except Exception as e:
+                logger.warning(f"品質チェック解析エラー: {e}")
+                quality_status['analysis_error'] = str(e)
+                
+        return jsonify(quality_status)
+        
+    except Exception as e:
+        logger.error(f"手動テスト品質チェックAPI エラー: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': format_utc_to_iso()
+        }), 500
@@ -0,0 +1,612 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+企業向けAPI Blueprint
+APIキー管理・組織/ユーザー/認定資格API・パーソナライズAPI・企業ダッシュボード
+"""
+
+import logging
+
+from flask import Blueprint, jsonify, render_template, request
+
+from app import (
+    enterprise_data_manager, enterprise_user_manager, format_utc_to_iso, require_admin_auth,
+    require_api_key
+)
+from lazy_features import lazy_feature
+from streaming_export import stream_records
+
+logger = logging.getLogger(__name__)
+
+# 機能モジュールは初回アクセス時に読み込み（lazy_features）
+advanced_personalization = lazy_feature('advanced_personalization')
+api_manager = lazy_feature('api_manager')
+
+enterprise_api_bp = Blueprint('enterprise_api', __name__)
+
+@enterprise_api_bp.route('/api_integration')
+def api_integration_dashboard():
+    """API統合ダッシュボード"""
+    try:
+        # API統合データ取得
+        api_keys = api_manager._load_api_keys()
+        certifications = api_manager._load_certifications()
+        organizations = api_manager._load_organizations()
+
+        # APIキー一覧を整形
+        formatted_api_keys = []
+        for key, info in api_keys.items():
+            formatted_api_keys.append({
+                'api_key': key,
+                'organization': info['organization'],
+                'permissions': info['permissions'],
+                'created_at': info['created_at'],
+                'is_active': info['is_active'],
+                'usage_stats': info['usage_stats']
+            })
+
+        # 認定プログラム一覧を整形
+        formatted_certifications = []
+        for cert_id, cert_info in certifications.items():
+            formatted_certifications.append({
+                'id': cert_id,
+                'name': cert_info['name'],
+                'description': cert_info['description'],
+                'requirements': cert_info['requirements'],
+                'statistics': cert_info['statistics']
+            })
+
+        # 組織一覧を整形
+        formatted_organizations = []
+        for org_id, org_info in organizations.items():
+            formatted_organizations.append({
+                'id': org_id,
+                'name': org_info['name'],
+                'description': org_info['description'],
+                'statistics': org_info['statistics']
+            })
+
+        # 認定サマリー計算
+        certifications_summary = {
+            'total_programs': len(certifications),
+            'total_participants': sum(cert['statistics']['total_participants'] for cert in certifications.values()),
+            'completion_rate': sum(cert['statistics']['completion_rate'] for cert in certifications.values()) / len(certifications) if certifications else 0
+        }
+
+        return render_template('api_integration.html',
+                               api_keys=formatted_api_keys,
+                               certification_programs=formatted_certifications,
+                               certifications_summary=certifications_summary,
+                               organizations=formatted_organizations,
+                               generated_reports=[])  # TODO: 実装
+
+    except Exception as e:
+        logger.error(f"API統合ダッシュボードエラー: {e}")
+        return render_template('error.html', error=str(e))
+
+
+@enterprise_api_bp.route('/api/auth/generate_key', methods=['POST'])
+def generate_api_key():
+    """APIキー生成"""
+    try:
+        data = request.get_json()
+        organization = data.get('organization')
+        permissions = data.get('permissions', [])
+        expires_in_days = data.get('expires_in_days', 365)
+
+        if not organization:
+            return jsonify({'success': False, 'error': '組織名が必要です'}), 400
+
+        result = api_manager.generate_api_key(organization, permissions, expires_in_days)
+
+        return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"APIキー生成エラー: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/auth/validate_key', methods=['POST'])
+def validate_api_key():
+    """APIキー検証"""
+    try:
+        data = request.get_json()
+        api_key = data.get('api_key')
+        required_permission = data.get('required_permission')
+
+        if not api_key:
+            return jsonify({'valid': False, 'error': 'APIキーが必要です'}), 400
+
+        result = api_manager.validate_api_key(api_key, required_permission)
+
+        return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"APIキー検証エラー: {e}")
+        return jsonify({'valid': False, 'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/auth/revoke_key', methods=['DELETE'])
+def revoke_api_key():
+    """APIキー無効化"""
+    try:
+        data = request.get_json()
+        api_key = data.get('api_key')
+
+        if not api_key:
+            return jsonify({'success': False, 'error': 'APIキーが必要です'}), 400
+
+        result = api_manager.revoke_api_key(api_key)
+
+        return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"APIキー無効化エラー: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/users', methods=['GET'])
+def api_users_list():
+    """ユーザー一覧API"""
+    try:
+        # API認証チェック
+        api_key = request.headers.get('X-API-Key')
+        if not api_key:
+            return jsonify({'error': 'API key required'}), 401
+
+        validation = api_manager.validate_api_key(api_key, 'read_users')
+        if not validation['valid']:
+            return jsonify({'error': validation['error']}), 401
+
+        # 全ユーザーデータ取得（簡略化）
+        all_users = api_manager._load_all_user_data()
+
+        users_list = []
+        for user_id, user_data in all_users.items():
+            history = user_data.get('history', [])
+            users_list.append({
+                'user_id': user_id,
+                'total_questions': len(history),
+                'accuracy': sum(1 for h in history if h.get('is_correct', False)) / len(history) if history else 0,
+                'last_activity': max([h.get('date', '') for h in history], default=''),
+                'primary_department': api_manager._get_user_primary_departments(user_data)[0] if history else 'unknown'
+            })
+
+        return jsonify({
+            'users': users_list,
+            'total_count': len(users_list),
+            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
+            'timestamp': format_utc_to_iso()
+        })
+
+    except Exception as e:
+        logger.error(f"ユーザー一覧API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/users/<user_id>/progress', methods=['GET'])
+def api_user_progress(user_id):
+    """ユーザー進捗API"""
+    try:
+        # API認証チェック
+        api_key = request.headers.get('X-API-Key')
+        if not api_key:
+            return jsonify({'error': 'API key required'}), 401
+
+        validation = api_manager.validate_api_key(api_key, 'read_progress')
+        if not validation['valid']:
+            return jsonify({'error': validation['error']}), 401
+
+        # 進捗レポート生成
+        time_period = request.args.get('period', 'month')
+        report_format = request.args.get('format', 'json')
+
+        report = api_manager.generate_progress_report(user_id, None, time_period, report_format)
+
+        return jsonify(report)
+
+    except Exception as e:
+        logger.error(f"ユーザー進捗API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/users/<user_id>/certifications', methods=['GET'])
+def api_user_certifications(user_id):
+    """ユーザー認定情報API"""
+    try:
+        # API認証チェック
+        api_key = request.headers.get('X-API-Key')
+        if not api_key:
+            return jsonify({'error': 'API key required'}), 401
+
+        validation = api_manager.validate_api_key(api_key, 'read_users')
+        if not validation['valid']:
+            return jsonify({'error': validation['error']}), 401
+
+        # 各認定の詳細情報を取得（登録済みの全プログラムを1回で判定）
+        detailed_certifications = api_manager.get_user_certifications(user_id)
+
+        return jsonify({
+            'user_id': user_id,
+            'certifications': detailed_certifications,
+            'total_certifications': len(detailed_certifications),
+            'completed_certifications': len([c for c in detailed_certifications if c.get('enrollment_status') == 'completed'])
+        })
+
+    except Exception as e:
+        logger.error(f"ユーザー認定情報API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/reports/progress', methods=['GET'])
+def api_progress_reports():
+    """進捗レポートAPI"""
+    try:
+        # API認証チェック
+        api_key = request.headers.get('X-API-Key')
+        if not api_key:
+            return jsonify({'error': 'API key required'}), 401
+
+        validation = api_manager.validate_api_key(api_key, 'generate_reports')
+        if not validation['valid']:
+            return jsonify({'error': validation['error']}), 401
+
+        user_id = request.args.get('user_id')
+        organization = request.args.get('organization')
+        time_period = request.args.get('period', 'month')
+        report_format = request.args.get('format', 'json')
+
+        report = api_manager.generate_progress_report(user_id, organization, time_period, report_format)
+
+        return jsonify(report)
+
+    except Exception as e:
+        logger.error(f"進捗レポートAPI エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/reports/organization/<org_id>', methods=['GET'])
+def api_organization_report(org_id):
+    """組織レポートAPI"""
+    try:
+        # API認証チェック
+        api_key = request.headers.get('X-API-Key')
+        if not api_key:
+            return jsonify({'error': 'API key required'}), 401
+
+        validation = api_manager.validate_api_key(api_key, 'generate_reports')
+        if not validation['valid']:
+            return jsonify({'error': validation['error']}), 401
+
+        time_period = request.args.get('period', 'month')
+        report_format = request.args.get('format', 'json')
+
+        report = api_manager._generate_organization_report(org_id, time_period, report_format)
+
+        return jsonify(report)
+
+    except Exception as e:
+        logger.error(f"組織レポートAPI エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/reports/export/<format>', methods=['GET'])
+def api_export_analytics(format):
+    """学習分析エクスポートAPI"""
+    try:
+        # API認証チェック
+        api_key = request.headers.get('X-API-Key')
+        if not api_key:
+            return jsonify({'error': 'API key required'}), 401
+
+        validation = api_manager.validate_api_key(api_key, 'generate_reports')
+        if not validation['valid']:
+            return jsonify({'error': validation['error']}), 401
+
+        include_personal = request.args.get('include_personal_data', 'false').lower() == 'true'
+
+        # csv / ndjson: ユーザー1件ずつストリーミング出力（組織全体でもメモリ使用量一定）
+        if format == 'csv':
+            rows = (record for record in api_manager.iter_learning_analytics(include_personal)
+                    if record['type'] == 'user')
+            return stream_records(rows, 'csv', filename='learning_analytics',
+                                  fieldnames=api_manager.ANALYTICS_CSV_FIELDS)
+        if format == 'ndjson':
+            return stream_records(api_manager.iter_learning_analytics(include_personal), 'ndjson',
+                                  filename='learning_analytics')
+
+        result = api_manager.export_learning_analytics(format, include_personal)
+
+        return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"学習分析エクスポートAPI エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/certifications', methods=['GET', 'POST'])
+def api_certifications():
+    """認定プログラムAPI"""
+    try:
+        if request.method == 'GET':
+            # 認定プログラム一覧取得
+            certifications = api_manager._load_certifications()
+            return jsonify({
+                'certifications': list(certifications.values()),
+                'total_count': len(certifications)
+            })
+
+        elif request.method == 'POST':
+            # API認証チェック
+            api_key = request.headers.get('X-API-Key')
+            if not api_key:
+                return jsonify({'error': 'API key required'}), 401
+
+            validation = api_manager.validate_api_key(api_key, 'manage_certifications')
+            if not validation['valid']:
+                return jsonify({'error': validation['error']}), 401
+
+            # 認定プログラム作成
+            data = request.get_json()
+            name = data.get('name')
+            description = data.get('description')
+            requirements = data.get('requirements', {})
+            organization = data.get('organization')
+
+            result = api_manager.create_certification_program(name, description, requirements, organization)
+
+            return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"認定プログラムAPI エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/certifications/<cert_id>/progress', methods=['GET'])
+def api_certification_progress(cert_id):
+    """認定進捗API"""
+    try:
+        user_id = request.args.get('user_id')
+        if not user_id:
+            return jsonify({'error': 'user_id required'}), 400
+
+        progress = api_manager.check_certification_progress(user_id, cert_id)
+
+        return jsonify(progress)
+
+    except Exception as e:
+        logger.error(f"認定進捗API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/organizations', methods=['GET', 'POST'])
+def api_organizations():
+    """組織管理API"""
+    try:
+        if request.method == 'GET':
+            # 組織一覧取得
+            organizations = api_manager._load_organizations()
+            return jsonify({
+                'organizations': list(organizations.values()),
+                'total_count': len(organizations)
+            })
+
+        elif request.method == 'POST':
+            # API認証チェック
+            api_key = request.headers.get('X-API-Key')
+            if not api_key:
+                return jsonify({'error': 'API key required'}), 401
+
+            validation = api_manager.validate_api_key(api_key, 'manage_organizations')
+            if not validation['valid']:
+                return jsonify({'error': validation['error']}), 401
+
+            # 組織作成
+            data = request.get_json()
+            name = data.get('name')
+            description = data.get('description')
+            settings = data.get('settings', {})
+
+            result = api_manager.create_organization(name, description, settings)
+
+            return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"組織管理API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/organizations/<org_id>/users', methods=['GET'])
+def api_organization_users(org_id):
+    """組織ユーザー一覧API"""
+    try:
+        users_details = api_manager.get_organization_users(org_id)
+
+        if users_details is None:
+            return jsonify({'error': 'Organization not found'}), 404
+
+        return jsonify({
+            'organization_id': org_id,
+            'users': users_details,
+            'total_users': len(users_details)
+        })
+
+    except Exception as e:
+        logger.error(f"組織ユーザー一覧API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/personalization/profile/<user_id>')
+def api_personalization_profile(user_id):
+    """個人化プロファイルAPI"""
+    try:
+        profile = advanced_personalization.analyze_user_profile(user_id)
+
+        return jsonify({
+            'user_id': user_id,
+            'profile': profile,
+            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
+            'timestamp': format_utc_to_iso()
+        })
+
+    except Exception as e:
+        logger.error(f"個人化プロファイルAPI エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/personalization/recommendations/<user_id>')
+def api_personalization_recommendations(user_id):
+    """ML推薦API"""
+    try:
+        context = request.args.to_dict()
+        recommendations = advanced_personalization.get_ml_recommendations(user_id, context)
+
+        return jsonify({
+            'user_id': user_id,
+            'recommendations': recommendations,
+            'context': context,
+            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
+            'timestamp': format_utc_to_iso()
+        })
+
+    except Exception as e:
+        logger.error(f"ML推薦API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/personalization/ui/<user_id>')
+def api_personalization_ui(user_id):
+    """UI個人化API"""
+    try:
+        ui_customizations = advanced_personalization.customize_ui(user_id)
+
+        return jsonify({
+            'user_id': user_id,
+            'ui_customizations': ui_customizations,
+            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
+            'timestamp': format_utc_to_iso()
+        })
+
+    except Exception as e:
+        logger.error(f"UI個人化API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/enterprise/users')
+@require_api_key
+def api_enterprise_users():
+    """全ユーザー一覧API（企業環境用）"""
+    try:
+        users = enterprise_user_manager.get_all_users()
+
+        return jsonify({
+            'success': True,
+            'users': users,
+            'total_users': len(users),
+            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基渖のレポート生成タイムスタンプ
+            'generated_at': format_utc_to_iso()
+        })
+
+    except Exception as e:
+        logger.error(f"企業ユーザー一覧API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/enterprise/user/<user_name>/report')
+@require_api_key
+def api_enterprise_user_report(user_name):
+    """ユーザー詳細進捗レポートAPI（企業環境用）"""
+    try:
+        report = enterprise_user_manager.get_user_progress_report(user_name)
+
+        if 'error' in report:
+            return jsonify({'success': False, 'error': report['error']}), 404
+
+        return jsonify({
+            'success': True,
+            'report': report
+        })
+
+    except Exception as e:
+        logger.error(f"企業ユーザーレポートAPI エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/enterprise/dashboard')
+@require_admin_auth
+def enterprise_dashboard():
+    """企業環境用管理ダッシュボード"""
+    try:
+        # 管理者向けダッシュボード表示
+        users = enterprise_user_manager.get_all_users()
+
+        return render_template('enterprise_dashboard.html', users=users)
+
+    except Exception as e:
+        logger.error(f"企業ダッシュボードエラー: {e}")
+        return render_template('error.html', error_message=str(e)), 500
+
+
+@enterprise_api_bp.route('/api/enterprise/data/integrity')
+@require_api_key
+def api_enterprise_data_integrity():
+    """データ整合性チェックAPI（企業環境用）"""
+    try:
+        if enterprise_data_manager:
+            integrity_report = enterprise_data_manager.get_file_integrity_check()
+        else:
+            integrity_report = {
+                # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
+            'timestamp': format_utc_to_iso(),
+                'status': 'unavailable',
+                'message': 'Enterprise data manager not available'
+            }
+
+        return jsonify({
+            'success': True,
+            'integrity_report': integrity_report
+        })
+
+    except Exception as e:
+        logger.error(f"データ整合性チェックAPI エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/enterprise/cache/stats')
+@require_api_key
+def api_enterprise_cache_stats():
+    """キャッシュ統計API（企業環境用）"""
+    try:
+        from utils import cache_manager_instance
+        cache_stats = cache_manager_instance.get_stats()
+
+        return jsonify({
+            'success': True,
+            'cache_stats': cache_stats,
+            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
+            'timestamp': format_utc_to_iso()
+        })
+
+    except Exception as e:
+        logger.error(f"キャッシュ統計API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@enterprise_api_bp.route('/api/enterprise/cache/clear', methods=['POST'])
+@require_api_key
+def api_enterprise_cache_clear():
+    """キャッシュクリアAPI（企業環境用）"""
+    try:
+        from utils import cache_manager_instance
+        cache_manager_instance.clear_all()
+
+        return jsonify({
+            'success': True,
+            'message': 'キャッシュをクリアしました',
+            # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準のAPIタイムスタンプ
+            'timestamp': format_utc_to_iso()
+        })
+
+    except Exception as e:
+        logger.error(f"キャッシュクリアAPI エラー: {e}")
+        return jsonify({'error': str(e)}), 500
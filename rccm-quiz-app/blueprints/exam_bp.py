@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+試験シミュレーターBlueprint
+本番形式の模擬試験（開始・出題・回答・フラグ・結果）
+"""
+
+import logging
+import uuid
+from datetime import datetime, timezone
+
+from flask import Blueprint, jsonify, redirect, render_template, request, session, url_for
+
+from app import (
+    EXAM_SIMULATOR_AVAILABLE, _memory_leak_monitor, conditional_get, emergency_load_all_questions,
+    load_questions, memory_monitoring_decorator
+)
+from lazy_features import lazy_feature
+
+logger = logging.getLogger(__name__)
+
+# 機能モジュールは初回アクセス時に読み込み（lazy_features）
+exam_simulator = lazy_feature('exam_simulator')
+
+exam_bp = Blueprint('exam_simulator', __name__)
+
+@exam_bp.route('/exam_simulator')
+def exam_simulator_page():
+    """試験シミュレーター画面"""
+    try:
+        return render_template(
+            'exam_simulator.html',
+            exam_configs=exam_simulator.exam_configs
+        )
+
+    except Exception as e:
+        logger.error(f"試験シミュレーター画面エラー: {e}")
+        return render_template('error.html', error="試験シミュレーター画面の表示中にエラーが発生しました。")
+
+
+@exam_bp.route('/start_exam/<exam_type>')
+# FIRE ULTRA SYNC: 統合セッション管理システムで自動処理
+@memory_monitoring_decorator(_memory_leak_monitor)
+def start_exam(exam_type):
+    """試験開始"""
+    try:
+        # FIRE ULTRA SYNC FIX: 詳細エラーログ追加
+        logger.info(f"FIRE EXAM START: 試験開始処理開始 - exam_type: {exam_type}")
+        
+        all_questions = load_questions()
+        logger.info(f"FIRE EXAM START: 問題データ読み込み完了 - {len(all_questions)}問")
+        
+        if not all_questions:
+            logger.error(f"FIRE EXAM START: 問題データが空です")
+            return render_template('error.html', error="問題データが存在しません。")
+
+        # FIRE ULTRA SYNC FIX: 試験セッション生成に詳細ログ追加
+        logger.info(f"FIRE EXAM START: 試験セッション生成開始")
+        
+        if EXAM_SIMULATOR_AVAILABLE and exam_simulator:
+            exam_session = exam_simulator.generate_exam_session(all_questions, exam_type, session)
+            logger.info(f"FIRE EXAM START: 試験セッション生成完了 - ID: {exam_session.get('exam_id', 'UNKNOWN')}")
+        else:
+            logger.warning("FIRE EXAM START: exam_simulator not available, using emergency fallback")
+            
+            # EMERGENCY FIX 12: Proper department filtering for session creation
+            # Parse exam_type to extract department and question type
+            if exam_type.startswith('specialist_'):
+                department = exam_type.replace('specialist_', '')
+                question_type = 'specialist'
+                logger.info(f"EMERGENCY FIX 12: Specialist exam detected - department: {department}")
+                
+                try:
+                    # 🎯 ULTRA SYNC: Use unified data system for consistent IDs
+                    session_count = session.get('quiz_settings', {}).get('questions_per_session', 10)
+                    logger.info(f"🎯 ULTRA SYNC FIX 12: Using unified system, count={session_count}")
+
+                    # Load unified data directly
+                    all_questions = emergency_load_all_questions()  # Inline unified function
+
+                    # Filter for specialist questions with target department
+                    filtered_questions = [q for q in all_questions if q.get('question_type') == 'specialist' and q.get('category') == department]
+
+                    # Shuffle and select
+                    import random
+                    random.shuffle(filtered_questions)
+                    filtered_questions = filtered_questions[:session_count]
+
+                    logger.info(f"🎯 UNIFIED FIX 12: Loaded {len(filtered_questions)} questions for {department}")
+                    
+                    if filtered_questions and len(filtered_questions) > 0:
+                        logger.info(f"EMERGENCY FIX 12: SUCCESS - {len(filtered_questions)} {department} questions loaded")
+                        exam_questions = filtered_questions
+                    else:
+                        logger.error(f"EMERGENCY FIX 12: No questions found for department {department}")
+                        # Fall back to basic questions if department questions not found
+                        basic_questions = [q for q in all_questions if q.get('question_type') == 'basic']
+                        exam_questions = basic_questions[:10] if basic_questions else all_questions[:10]
+                        
+                except Exception as e:
+                    logger.error(f"EMERGENCY FIX 12: Error getting {department} questions: {e}")
+                    # Fall back to basic questions on error
+                    basic_questions = [q for q in all_questions if q.get('question_type') == 'basic']
+                    exam_questions = basic_questions[:10] if basic_questions else all_questions[:10]
+                    
+            elif exam_type == 'basic' or exam_type.startswith('basic'):
+                question_type = 'basic'
+                logger.info(f"EMERGENCY FIX 12: Basic exam detected")
+                basic_questions = [q for q in all_questions if q.get('question_type') == 'basic']
+                exam_questions = basic_questions[:10] if basic_questions else all_questions[:10]
+            else:
+                logger.warning(f"EMERGENCY FIX 12: Unknown exam type {exam_type}, using basic questions")
+                basic_questions = [q for q in all_questions if q.get('question_type') == 'basic']
+                exam_questions = basic_questions[:10] if basic_questions else all_questions[:10]
+            
+            # Create exam session with properly filtered questions
+            exam_session = {
+                'exam_id': str(uuid.uuid4()),
+                'exam_type': exam_type,
+                'questions': exam_questions,
+                'current_question': 0,
+                'start_time': datetime.now(timezone.utc).isoformat()
+            }
+            
+            logger.info(f"EMERGENCY FIX 12: Exam session created with {len(exam_questions)} questions")
+
+        # FIRE ULTRA SYNC FIX: セッション保存の確認強化
+        session['exam_session'] = exam_session
+        session.modified = True
+        
+        # FIRE ULTRA SYNC FIX: セッション保存後の検証
+        saved_session = session.get('exam_session')
+        if saved_session and saved_session.get('status') == 'in_progress':
+            logger.info(f"FIRE EXAM START: セッション保存確認OK - current_question: {saved_session.get('current_question', 'UNKNOWN')}")
+        else:
+            logger.error(f"FIRE EXAM START: セッション保存失敗 - saved_session: {saved_session}")
+
+        logger.info(f"FIRE EXAM START: 試験開始完了 - {exam_type}, ID: {exam_session['exam_id']}")
+
+        return redirect(url_for('exam_simulator.exam_question'))
+
+    except Exception as e:
+        # FIRE ULTRA SYNC FIX: 詳細例外情報の記録
+        import traceback
+        full_error = traceback.format_exc()
+        logger.error(f"FIRE EXAM START ERROR: 試験開始エラー詳細:\n{full_error}")
+        return render_template('error.html', error=f"試験の開始中にエラーが発生しました。詳細: {str(e)}")
+
+
+@exam_bp.route('/exam_question')
+def exam_question():
+    """試験問題表示"""
+    try:
+        # FIRE ULTRA SYNC FIX: 詳細ログ追加
+        logger.info(f"FIRE EXAM QUESTION: 試験問題表示処理開始")
+        
+        exam_session = session.get('exam_session')
+        logger.info(f"FIRE EXAM QUESTION: セッション取得 - exists: {exam_session is not None}")
+        
+        if not exam_session:
+            logger.error(f"FIRE EXAM QUESTION: セッションが存在しません - リダイレクト")
+            return redirect(url_for('exam_simulator.exam_simulator_page'))
+            
+        session_status = exam_session.get('status', 'UNKNOWN')
+        logger.info(f"FIRE EXAM QUESTION: セッション状態 - status: {session_status}")
+        
+        if session_status != 'in_progress':
+            logger.error(f"FIRE EXAM QUESTION: セッション状態が不正 - status: {session_status} - リダイレクト")
+            return redirect(url_for('exam_simulator.exam_simulator_page'))
+
+        current_q_index = exam_session['current_question']
+        questions = exam_session['questions']
+        
+        logger.info(f"FIRE EXAM QUESTION: 問題情報 - current_index: {current_q_index}, total: {len(questions)}")
+
+        if current_q_index >= len(questions):
+            logger.info(f"FIRE EXAM QUESTION: 試験終了 - current_index: {current_q_index} >= total: {len(questions)}")
+            return redirect(url_for('exam_simulator.exam_results'))
+
+        current_question = questions[current_q_index]
+
+        # FIRE ULTRA SYNC FIX: 進捗表示バグ修正のための詳細ログ
+        display_current = current_q_index + 1
+        logger.info(f"FIRE PROGRESS FIX: 進捗表示計算 - current_q_index: {current_q_index}, display_current: {display_current}")
+
+        # 試験情報
+        exam_info = {
+            'current_question_number': display_current,  # FIRE ULTRA SYNC FIX: 明示的に計算結果を使用
+            'total_questions': len(questions),
+            'time_remaining': exam_simulator.get_time_remaining(exam_session),
+            'exam_type': exam_session['exam_type'],
+            'exam_name': exam_session['config']['name'],
+            'flagged_questions': exam_session['flagged_questions'],
+            'answered_questions': list(exam_session['answers'].keys())
+        }
+        
+        # FIRE ULTRA SYNC FIX: exam_info の確認ログ
+        logger.info(f"FIRE PROGRESS FIX: exam_info作成完了 - current_question_number: {exam_info['current_question_number']}, total_questions: {exam_info['total_questions']}")
+
+        # 時間警告チェック
+        time_warning = exam_simulator.should_give_time_warning(exam_session)
+
+        logger.info(f"FIRE EXAM QUESTION: テンプレート描画開始 - 問題{display_current}/{len(questions)}")
+
+        return render_template(
+            'exam_question.html',
+            question=current_question,
+            exam_info=exam_info,
+            time_warning=time_warning
+        )
+
+    except Exception as e:
+        # FIRE ULTRA SYNC FIX: 詳細例外情報の記録
+        import traceback
+        full_error = traceback.format_exc()
+        logger.error(f"FIRE EXAM QUESTION ERROR: 試験問題表示エラー詳細:\n{full_error}")
+        return render_template('error.html', error=f"試験問題の表示中にエラーが発生しました。詳細: {str(e)}")
+
+
+@exam_bp.route('/submit_exam_answer', methods=['POST'])
+# FIRE ULTRA SYNC: 統合セッション管理システムで自動処理
+def submit_exam_answer():
+    """試験回答提出"""
+    try:
+        # FIRE ULTRA SYNC FIX: 詳細ログ追加
+        logger.info(f"FIRE SUBMIT ANSWER: 回答提出処理開始")
+        
+        exam_session = session.get('exam_session')
+        logger.info(f"FIRE SUBMIT ANSWER: セッション取得 - exists: {exam_session is not None}")
+        
+        if not exam_session:
+            logger.error(f"FIRE SUBMIT ANSWER: セッション不存在")
+            return jsonify({'success': False, 'error': '試験セッションが無効です'})
+            
+        session_status = exam_session.get('status', 'UNKNOWN')
+        logger.info(f"FIRE SUBMIT ANSWER: セッション状態 - status: {session_status}")
+        
+        if session_status != 'in_progress':
+            logger.error(f"FIRE SUBMIT ANSWER: セッション状態不正 - status: {session_status}")
+            return jsonify({'success': False, 'error': '試験セッションが無効です'})
+
+        answer = request.form.get('answer')
+        elapsed = float(request.form.get('elapsed', 0))
+        question_index = exam_session['current_question']
+        
+        logger.info(f"FIRE SUBMIT ANSWER: 回答情報 - answer: {answer}, question_index: {question_index}, elapsed: {elapsed}")
+
+        # 自動提出チェック
+        if exam_simulator.auto_submit_check(exam_session):
+            logger.info(f"FIRE SUBMIT ANSWER: 自動提出実行")
+            result = exam_simulator.finish_exam(exam_session)
+            session['exam_session'] = exam_session
+            session.modified = True
+            return jsonify({
+                'success': True,
+                'exam_finished': True,
+                'redirect': url_for('exam_simulator.exam_results')
+            })
+
+        # FIRE ULTRA SYNC FIX: 回答提出前の状態ログ
+        pre_current = exam_session.get('current_question', 'UNKNOWN')
+        logger.info(f"FIRE PROGRESS UPDATE: 回答提出前 - current_question: {pre_current}")
+
+        # 回答提出
+        result = exam_simulator.submit_exam_answer(exam_session, question_index, answer, elapsed)
+        
+        # FIRE ULTRA SYNC FIX: 回答提出後の状態ログ
+        post_current = exam_session.get('current_question', 'UNKNOWN')
+        logger.info(f"FIRE PROGRESS UPDATE: 回答提出後 - current_question: {post_current}, result: {result}")
+
+        # セッション更新
+        session['exam_session'] = exam_session
+        session.modified = True
+        
+        # FIRE ULTRA SYNC FIX: セッション更新後の確認
+        saved_current = session.get('exam_session', {}).get('current_question', 'UNKNOWN')
+        logger.info(f"FIRE PROGRESS UPDATE: セッション保存後 - current_question: {saved_current}")
+
+        if result.get('exam_completed'):
+            logger.info(f"FIRE SUBMIT ANSWER: 試験完了")
+            return jsonify({
+                'success': True,
+                'exam_finished': True,
+                'redirect': url_for('exam_simulator.exam_results')
+            })
+        else:
+            next_question = result.get('next_question', 0)
+            remaining = result.get('remaining_questions', 0)
+            logger.info(f"FIRE SUBMIT ANSWER: 次の問題へ - next_question: {next_question}, remaining: {remaining}")
+            return jsonify({
+                'success': True,
+                'next_question': next_question,
+                'remaining_questions': remaining
+            })
+
+    except Exception as e:
+        logger.error(f"試験回答提出エラー: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+# FIRE ULTRA SYNC FIX: セッション初期化強制処理（デプロイ修正のため一時無効化）
+# @app.before_request
+# def ensure_session_initialized():
+#     """セッション初期化の確実な実行"""
+#     try:
+#         # セッションが空の場合、最低限の初期化を行う
+#         if not session:
+#             session.permanent = True
+#             session['_initialized'] = True
+#             logger.debug("FIRE SESSION INIT: セッション初期化実行")
+#         
+#         # セッション状態のログ出力（デバッグ用）
+#         if request.endpoint in ['start_exam', 'exam_question', 'submit_exam_answer']:
+#             session_exists = bool(session.get('exam_session'))
+#             logger.info(f"FIRE SESSION CHECK: endpoint={request.endpoint}, session_exists={session_exists}")
+            
+    except Exception as e:
+        logger.error(f"FIRE SESSION INIT ERROR: {e}")
+
+
+@exam_bp.route('/flag_exam_question', methods=['POST'])
+def flag_exam_question():
+    """試験問題フラグ設定"""
+    try:
+        exam_session = session.get('exam_session')
+        if not exam_session:
+            return jsonify({'success': False, 'error': '試験セッションが無効です'})
+
+        question_index = int(request.form.get('question_index', 0))
+        action = request.form.get('action', 'flag')  # flag or unflag
+
+        if action == 'flag':
+            success = exam_simulator.flag_question(exam_session, question_index)
+        else:
+            success = exam_simulator.unflag_question(exam_session, question_index)
+
+        session['exam_session'] = exam_session
+        session.modified = True
+
+        return jsonify({'success': success})
+
+    except Exception as e:
+        logger.error(f"問題フラグエラー: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@exam_bp.route('/exam_navigation')
+def exam_navigation():
+    """試験ナビゲーション画面"""
+    try:
+        exam_session = session.get('exam_session')
+        if not exam_session:
+            return redirect(url_for('exam_simulator.exam_simulator_page'))
+
+        summary = exam_simulator.get_exam_summary(exam_session)
+
+        return render_template('exam_navigation.html', summary=summary, exam_session=exam_session)
+
+    except Exception as e:
+        logger.error(f"試験ナビゲーションエラー: {e}")
+        return render_template('error.html', error="試験ナビゲーションの表示中にエラーが発生しました。")
+
+
+@exam_bp.route('/finish_exam', methods=['POST'])
+def finish_exam():
+    """試験終了"""
+    try:
+        exam_session = session.get('exam_session')
+        if not exam_session:
+            return jsonify({'success': False, 'error': '試験セッションが無効です'})
+
+        exam_simulator.finish_exam(exam_session)
+        session['exam_session'] = exam_session
+        session.modified = True
+
+        return jsonify({
+            'success': True,
+            'redirect': url_for('exam_simulator.exam_results')
+        })
+
+    except Exception as e:
+        logger.error(f"試験終了エラー: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@exam_bp.route('/exam_results')
+def exam_results():
+    """試験結果画面"""
+    try:
+        exam_session = session.get('exam_session')
+        if not exam_session or 'results' not in exam_session:
+            return redirect(url_for('exam_simulator.exam_simulator_page'))
+
+        results = exam_session['results']
+
+        # 過去の試験結果を記録
+        if 'exam_history' not in session:
+            session['exam_history'] = []
+
+        session['exam_history'].append({
+            'exam_id': exam_session['exam_id'],
+            'exam_type': exam_session['exam_type'],
+            'score': results['score'],
+            'date': exam_session['start_time'][:10],
+            'passed': results['passed']
+        })
+        session.modified = True
+
+        return render_template('exam_results.html', results=results, exam_session=exam_session)
+
+    except Exception as e:
+        logger.error(f"試験結果表示エラー: {e}")
+        return render_template('error.html', error="試験結果の表示中にエラーが発生しました。")
+
+
+@exam_bp.route('/api/exam_status')
+@conditional_get(('session',), time_bucket=10)  # 残り時間（分）は時刻依存
+def api_exam_status():
+    """試験状態API"""
+    try:
+        exam_session = session.get('exam_session')
+        if not exam_session:
+            return jsonify({'exam_active': False})
+
+        return jsonify({
+            'exam_active': exam_session['status'] == 'in_progress',
+            'time_remaining': exam_simulator.get_time_remaining(exam_session),
+            'current_question': exam_session['current_question'],
+            'total_questions': len(exam_session['questions']),
+            'auto_submit_warning': exam_simulator.get_time_remaining(exam_session) <= 5
+        })
+
+    except Exception as e:
+        logger.error(f"試験状態API エラー: {e}")
+        return jsonify({'error': str(e)}), 500
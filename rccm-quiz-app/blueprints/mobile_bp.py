@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+モバイル・PWA Blueprint
+オフライン同期・音声/タッチ設定・モバイル最適化問題
+"""
+
+import logging
+
+from flask import Blueprint, jsonify, render_template, request, session
+
+from app import _warm_pwa_manifest, cached_response, get_warm_cache, load_questions
+from lazy_features import lazy_feature
+
+logger = logging.getLogger(__name__)
+
+# 機能モジュールは初回アクセス時に読み込み（lazy_features）
+mobile_manager = lazy_feature('mobile_manager')
+
+mobile_bp = Blueprint('mobile', __name__)
+
+@mobile_bp.route('/api/mobile/manifest')
+@cached_response('manifest')
+def mobile_manifest():
+    """PWAマニフェストの動的生成"""
+    try:
+        manifest = get_warm_cache('pwa_manifest') or _warm_pwa_manifest()
+        return jsonify(manifest)
+    except Exception as e:
+        logger.error(f"マニフェスト生成エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@mobile_bp.route('/api/mobile/offline/save', methods=['POST'])
+def save_offline_data():
+    """オフラインデータの保存"""
+    try:
+        data = request.get_json()
+        session_id = session.get('session_id')
+
+        if not session_id:
+            return jsonify({'success': False, 'error': 'セッションIDが見つかりません'}), 400
+
+        success = mobile_manager.save_offline_session(session_id, data)
+
+        if success:
+            return jsonify({'success': True, 'message': 'オフラインデータを保存しました'})
+        else:
+            return jsonify({'success': False, 'error': 'データ保存に失敗しました'}), 500
+
+    except Exception as e:
+        logger.error(f"オフラインデータ保存エラー: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@mobile_bp.route('/api/mobile/offline/sync', methods=['POST'])
+def sync_offline_data():
+    """オフラインデータの同期"""
+    try:
+        sync_result = mobile_manager.sync_offline_data(session)
+        session.modified = True
+
+        mobile_manager.update_last_sync_time()
+
+        return jsonify({
+            'success': sync_result['success'],
+            'synced_sessions': sync_result['synced_sessions'],
+            'failed_sessions': sync_result['failed_sessions'],
+            'errors': sync_result['errors']
+        })
+
+    except Exception as e:
+        logger.error(f"オフライン同期エラー: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@mobile_bp.route('/api/mobile/voice/settings', methods=['GET', 'POST'])
+def voice_settings():
+    """音声設定の取得・更新"""
+    try:
+        if request.method == 'GET':
+            settings = mobile_manager.get_voice_settings()
+            return jsonify(settings)
+        else:
+            data = request.get_json()
+            success = mobile_manager.update_voice_settings(data)
+
+            if success:
+                return jsonify({'success': True, 'message': '音声設定を更新しました'})
+            else:
+                return jsonify({'success': False, 'error': '設定更新に失敗しました'}), 500
+
+    except Exception as e:
+        logger.error(f"音声設定エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@mobile_bp.route('/api/mobile/touch/settings', methods=['GET', 'POST'])
+def touch_settings():
+    """タッチジェスチャー設定の取得・更新"""
+    try:
+        if request.method == 'GET':
+            settings = mobile_manager.get_touch_settings()
+            return jsonify(settings)
+        else:
+            data = request.get_json()
+            success = mobile_manager.update_touch_settings(data)
+
+            if success:
+                return jsonify({'success': True, 'message': 'タッチ設定を更新しました'})
+            else:
+                return jsonify({'success': False, 'error': '設定更新に失敗しました'}), 500
+
+    except Exception as e:
+        logger.error(f"タッチ設定エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@mobile_bp.route('/api/mobile/question/<int:question_id>')
+def mobile_optimized_question(question_id):
+    """モバイル最適化問題データ"""
+    try:
+        questions = load_questions()
+        question = next((q for q in questions if int(q.get('id', 0)) == question_id), None)
+
+        if not question:
+            return jsonify({'error': '問題が見つかりません'}), 404
+
+        mobile_question = mobile_manager.get_mobile_optimized_question(question)
+        return jsonify(mobile_question)
+
+    except Exception as e:
+        logger.error(f"モバイル問題取得エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@mobile_bp.route('/api/mobile/cache/questions')
+def mobile_cache_questions():
+    """モバイル用問題キャッシュデータ"""
+    try:
+        cache_data = get_warm_cache('mobile_essential_questions')
+        if cache_data is None:
+            questions = load_questions()
+            cache_data = mobile_manager.generate_mobile_cache_data(questions)
+        return jsonify(cache_data)
+
+    except Exception as e:
+        logger.error(f"モバイルキャッシュ生成エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@mobile_bp.route('/api/mobile/performance')
+def mobile_performance_metrics():
+    """モバイルパフォーマンス指標"""
+    try:
+        metrics = mobile_manager.get_performance_metrics()
+        return jsonify(metrics)
+
+    except Exception as e:
+        logger.error(f"パフォーマンス指標エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@mobile_bp.route('/mobile_settings')
+def mobile_settings():
+    """モバイル設定画面"""
+    return render_template('mobile_settings.html')
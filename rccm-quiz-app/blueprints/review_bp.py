@@ -0,0 +1,1009 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+復習・SRS（間隔反復学習）Blueprint
+復習リスト・SRS統計・ブックマーク・復習セッション
+"""
+
+import logging
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from flask import Blueprint, jsonify, redirect, render_template, request, session, url_for
+
+from app import (
+    conditional_get, convert_legacy_english_id_to_japanese, emergency_load_all_questions,
+    encode_japanese_category, get_japanese_categories, get_user_session_size, get_utc_now, load_questions
+)
+
+logger = logging.getLogger(__name__)
+
+review_bp = Blueprint('review', __name__)
+
+@review_bp.route('/review')
+def review_list():
+    """復習リスト表示（高度なSRSシステム対応版）"""
+    try:
+        # 新しいSRSシステムからデータを取得（防御的プログラミング）
+        srs_data = session.get('advanced_srs', {})
+        if not isinstance(srs_data, dict):
+            logger.error(f"🚨 CRITICAL: advanced_srs is not a dict: {type(srs_data)}, value: {repr(srs_data)}")
+            srs_data = {}
+            session['advanced_srs'] = {}
+        
+        bookmarks = session.get('bookmarks', [])
+        if not isinstance(bookmarks, list):
+            logger.error(f"🚨 CRITICAL: bookmarks is not a list: {type(bookmarks)}, value: {repr(bookmarks)}")
+            bookmarks = []
+            session['bookmarks'] = []  # 互換性維持
+
+        # すべての復習対象問題を統合
+        all_review_ids = set()
+        all_review_ids.update(srs_data.keys())
+        all_review_ids.update(bookmarks)
+
+        if not all_review_ids:
+            # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
+            japanese_categories = get_japanese_categories()
+            departments = {}
+            for category in japanese_categories:
+                encoded_key = encode_japanese_category(category)
+                departments[encoded_key] = {'name': category}
+            
+            return render_template('review_enhanced.html',
+                                   message="まだ復習問題が登録されていません。問題を解いて間違えることで、科学的な復習システムが自動的に最適な学習計画を作成します。",
+                                   departments=departments,
+                                   srs_stats={
+                                       'total_questions': 0,
+                                       'due_now': 0,
+                                       'mastered': 0,
+                                       'in_progress': 0
+                                   })
+
+        # 問題データを読み込み
+        all_questions = load_questions()
+        questions_dict = {str(q.get('id')): q for q in all_questions}
+
+        # 復習問題の詳細情報を作成（SRSデータ統合）
+        review_questions = []
+        departments = set()
+        
+        # FIRE ULTRA SYNC IMPROVEMENT 3: 部門別復習 - 部門統計計算
+        department_stats = {}
+
+        # FIRE ULTRA SYNC IMPROVEMENT 1: 明確な進捗表示 - 今日復習すべき問題数計算
+        due_today_count = 0
+        for qid in all_review_ids:
+            srs_info = srs_data.get(qid, {})
+            next_review = srs_info.get('next_review', '')
+            if next_review:
+                try:
+                    from datetime import datetime
+                    review_date = datetime.fromisoformat(next_review.replace('Z', '+00:00'))
+                    if review_date <= datetime.now():
+                        due_today_count += 1
+                except (ValueError, TypeError, AttributeError) as e:
+                    # 日時解析エラーの場合は復習対象としてカウント
+                    logger.warning(f"Date parsing error in SRS due count: {e}")
+                    due_today_count += 1  # パースエラーの場合は復習対象としてカウント
+                    due_today_count += 1  # パースエラーの場合は復習対象としてカウント
+            else:
+                due_today_count += 1  # next_reviewが未設定の場合も復習対象
+        
+        # SRS統計計算
+        srs_stats = {
+            'total_questions': len(all_review_ids),
+            'due_now': due_today_count,
+            'mastered': 0,
+            'in_progress': 0,
+            'high_priority': 0
+        }
+
+        from datetime import datetime
+        now = datetime.now()
+
+        for qid in all_review_ids:
+            if qid in questions_dict:
+                question = questions_dict[qid]
+
+                # SRSデータを取得
+                srs_info = srs_data.get(qid, {})
+
+                # FIRE ULTRA SYNC IMPROVEMENT 2: 学習効率の可視化 - 次回復習日計算
+                next_review_str = srs_info.get('next_review', '')
+                days_until_review = 0
+                if next_review_str:
+                    try:
+                        from datetime import datetime
+                        next_review_date = datetime.fromisoformat(next_review_str.replace('Z', '+00:00'))
+                        days_until_review = (next_review_date.date() - now.date()).days
+                    except (ValueError, TypeError, AttributeError) as e:
+                        # 日時解析エラーの場合は今すぐ復習として設定
+                        logger.warning(f"Date parsing error in days until review: {e}")
+                        days_until_review = 0  # パースエラーの場合は今すぐ復習
+                        days_until_review = 0  # パースエラーの場合は今すぐ復習
+                        
+                # 基本情報
+                question_data = {
+                    'id': qid,
+                    'question': question.get('question', ''),
+                    'department': question.get('department', ''),
+                    'question_type': question.get('question_type', ''),
+                    'year': question.get('year', ''),
+                    'category': question.get('category', ''),
+                    # SRS情報
+                    'correct_count': srs_info.get('correct_count', 0),
+                    'wrong_count': srs_info.get('wrong_count', 0),
+                    'total_attempts': srs_info.get('total_attempts', 0),
+                    'difficulty_level': srs_info.get('difficulty_level', 5),
+                    'mastered': srs_info.get('mastered', False),
+                    'first_attempt': srs_info.get('first_attempt', ''),
+                    'last_attempt': srs_info.get('last_attempt', ''),
+                    'next_review': next_review_str,
+                    'days_until_review': days_until_review,  # FIRE IMPROVEMENT 2
+                    'interval_days': srs_info.get('interval_days', 1)
+                }
+
+                # 統計更新
+                if question_data['mastered']:
+                    srs_stats['mastered'] += 1
+                else:
+                    srs_stats['in_progress'] += 1
+
+                    # 復習期限チェック
+                    try:
+                        if question_data['next_review']:
+                            next_review = datetime.fromisoformat(question_data['next_review'])
+                            if next_review <= now:
+                                srs_stats['due_now'] += 1
+                        else:
+                            srs_stats['due_now'] += 1  # 未設定は即座に復習対象
+                    except ValueError:
+                        srs_stats['due_now'] += 1
+
+                    # 高優先度（間違いが多い）問題
+                    if question_data['wrong_count'] >= 2:
+                        srs_stats['high_priority'] += 1
+
+                # 部門情報と統計更新
+                dept_name = question_data.get('category', question_data.get('department', ''))
+                if dept_name:
+                    departments.add(dept_name)
+                    
+                    # FIRE IMPROVEMENT 3: 部門別統計更新
+                    if dept_name not in department_stats:
+                        department_stats[dept_name] = {'weak_count': 0, 'total_count': 0}
+                    
+                    department_stats[dept_name]['total_count'] += 1
+                    if not question_data['mastered'] and question_data['wrong_count'] > 0:
+                        department_stats[dept_name]['weak_count'] += 1
+
+                # 優先度計算（表示順序用）
+                if question_data['mastered']:
+                    priority = -1000  # マスター済みは最後
+                else:
+                    wrong_ratio = question_data['wrong_count'] / max(1, question_data['total_attempts'])
+                    overdue_bonus = 0
+                    try:
+                        if question_data['next_review']:
+                            next_review = datetime.fromisoformat(question_data['next_review'])
+                            days_overdue = max(0, (now - next_review).days)
+                            overdue_bonus = days_overdue * 10
+                    except ValueError:
+                        overdue_bonus = 100  # 日時エラーは高優先度
+
+                    priority = (wrong_ratio * 100) + overdue_bonus + question_data['difficulty_level']
+
+                question_data['priority'] = priority
+                review_questions.append(question_data)
+
+        # 優先度順でソート（マスター済み問題は最後）
+        review_questions.sort(key=lambda x: x['priority'], reverse=True)
+
+        # マスター済み問題とアクティブ問題を分離
+        active_questions = [q for q in review_questions if not q['mastered']]
+        mastered_questions = [q for q in review_questions if q['mastered']]
+
+        logger.info(f"復習リスト表示: 総計{len(review_questions)}問, "
+                    f"アクティブ{len(active_questions)}問, マスター済み{len(mastered_questions)}問")
+
+        return render_template('review_enhanced.html',
+                               questions=active_questions,
+                               mastered_questions=mastered_questions,
+                               total_count=len(active_questions),
+                               mastered_count=len(mastered_questions),
+                               due_today_count=due_today_count,  # FIRE IMPROVEMENT 1: 今日復習すべき問題数
+                               department_stats=department_stats,  # FIRE IMPROVEMENT 3: 部門別統計
+                               # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
+                               departments={encode_japanese_category(category): {'name': category} for category in get_japanese_categories()},
+                               srs_stats=srs_stats,
+                               show_srs_details=True)
+
+    except Exception as e:
+        logger.error(f"復習リスト表示エラー: {e}")
+        return render_template('error.html', error="復習リスト表示中にエラーが発生しました。")
+
+
+@review_bp.route('/api/review/count')
+@conditional_get(('session',), time_bucket=60)  # 復習期限は時刻依存
+def api_review_count():
+    """復習問題数を取得（ウルトラシンク追加・ホーム画面表示用）"""
+    try:
+        # FIRE ULTRA SYNC FIX: 正しいセッションキーを使用
+        srs_data = session.get('advanced_srs', {})
+        bookmarks = session.get('bookmarks', [])
+
+        # 復習対象問題の数をカウント
+        review_count = 0
+        current_time = datetime.now()
+
+        # SRSデータからカウント
+        for question_id, data in srs_data.items():
+            if isinstance(data, dict):
+                # 次回復習日をチェック
+                next_review = data.get('next_review', '')
+                if next_review:
+                    try:
+                        review_date = datetime.fromisoformat(next_review.replace('Z', '+00:00'))
+                        if review_date <= current_time:
+                            review_count += 1
+                    except (ValueError, TypeError, AttributeError):
+                        # 日付パースエラーの場合は復習対象に含める
+                        review_count += 1
+                else:
+                    # next_reviewが設定されていない場合も復習対象
+                    review_count += 1
+                    
+        # ブックマークからもカウント（重複除去）
+        bookmark_ids = set(str(bid) for bid in bookmarks if bid)
+        srs_ids = set(str(sid) for sid in srs_data.keys() if sid)
+        additional_bookmarks = bookmark_ids - srs_ids
+        review_count += len(additional_bookmarks)
+
+        logger.info(f"復習問題数API呼び出し: {review_count}問")
+        return jsonify({'count': review_count, 'success': True})
+
+    except Exception as e:
+        logger.error(f"復習問題数取得エラー: {e}")
+        return jsonify({'count': 0, 'error': str(e), 'success': False})
+
+
+@review_bp.route('/api/review/questions', methods=['POST'])
+def get_review_questions():
+    """復習リストの問題詳細を一括取得"""
+    try:
+        data = request.get_json()
+        question_ids = data.get('question_ids', [])
+
+        if not question_ids:
+            return jsonify({'questions': []})
+
+        questions = load_questions()
+        review_questions = []
+
+        for qid in question_ids:
+            question = next((q for q in questions if int(q.get('id', 0)) == int(qid)), None)
+            if question:
+                review_questions.append({
+                    'id': question.get('id'),
+                    'category': question.get('category'),
+                    'question': question.get('question')[:100] + '...' if len(question.get('question', '')) > 100 else question.get('question'),
+                    'difficulty': question.get('difficulty', '標準')
+                })
+
+        return jsonify({'questions': review_questions})
+
+    except Exception as e:
+        logger.error(f"復習問題取得エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@review_bp.route('/api/review/remove', methods=['POST'])
+def remove_from_review():
+    """復習リストから問題を削除"""
+    try:
+        data = request.get_json()
+        question_id = str(data.get('question_id', ''))
+
+        if not question_id:
+            return jsonify({'success': False, 'error': '問題IDが指定されていません'})
+
+        bookmarks = session.get('bookmarks', [])
+        if question_id in bookmarks:
+            bookmarks.remove(question_id)
+            session['bookmarks'] = bookmarks
+            session.modified = True
+            logger.info(f"復習リストから削除: 問題ID {question_id}")
+            return jsonify({'success': True})
+        else:
+            return jsonify({'success': False, 'error': '復習リストに存在しません'})
+
+    except Exception as e:
+        logger.error(f"復習問題削除エラー: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@review_bp.route('/api/review/bulk_remove', methods=['POST'])
+def bulk_remove_from_review():
+    """復習リストから複数問題を削除"""
+    try:
+        data = request.get_json()
+        question_ids = data.get('question_ids', [])
+
+        if not question_ids:
+            return jsonify({'success': False, 'error': '問題IDが指定されていません'})
+
+        bookmarks = session.get('bookmarks', [])
+        removed_count = 0
+
+        for qid in question_ids:
+            qid_str = str(qid)
+            if qid_str in bookmarks:
+                bookmarks.remove(qid_str)
+                removed_count += 1
+
+        session['bookmarks'] = bookmarks
+        session.modified = True
+
+        logger.info(f"復習リストから一括削除: {removed_count}問")
+        return jsonify({'success': True, 'removed_count': removed_count})
+
+    except Exception as e:
+        logger.error(f"復習問題一括削除エラー: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@review_bp.route('/srs_stats')
+def srs_statistics():
+    """SRS学習統計の表示（エラー処理強化版）"""
+    try:
+        # セッションデータの安全な取得
+        srs_data = session.get('srs_data', {})
+
+        # 基本統計の初期化
+        stats = {
+            'total_learned': 0,
+            'mastered': 0,
+            'review_needed': 0,
+            'learning': 0,
+            'error_data': 0
+        }
+
+        # FIRE ULTRA SYNC TIMEZONE FIX: UTC基準の今日日付取得
+        today = get_utc_now().date()
+        processed_data = {}
+
+        # SRSデータの安全な処理
+        for question_id, data in srs_data.items():
+            try:
+                # データが辞書形式かチェック
+                if not isinstance(data, dict):
+                    logger.warning(f"SRS統計: 無効なデータ形式 ID={question_id}, type={type(data)}")
+                    stats['error_data'] += 1
+                    continue
+
+                # レベルと日時の安全な取得
+                level = int(data.get('level', 0))
+                next_review_str = data.get('next_review')
+
+                if not next_review_str:
+                    # 復習日が設定されていない場合
+                    stats['learning'] += 1
+                    processed_data[question_id] = {
+                        'level': level,
+                        'status': '学習中',
+                        'next_review': '未設定'
+                    }
+                    continue
+
+                # 日時の解析
+                try:
+                    next_review = datetime.fromisoformat(next_review_str).date()
+                except (ValueError, TypeError):
+                    # 日時解析失敗時のフォールバック
+                    stats['learning'] += 1
+                    processed_data[question_id] = {
+                        'level': level,
+                        'status': '学習中',
+                        'next_review': '日時エラー'
+                    }
+                    continue
+
+                # レベルと復習日に基づく分類
+                if level >= 5:
+                    stats['mastered'] += 1
+                    status = 'マスター'
+                elif next_review <= today:
+                    stats['review_needed'] += 1
+                    status = '復習必要'
+                else:
+                    stats['learning'] += 1
+                    status = '学習中'
+
+                processed_data[question_id] = {
+                    'level': level,
+                    'status': status,
+                    'next_review': next_review.isoformat()
+                }
+
+            except Exception as item_error:
+                logger.warning(f"SRS統計処理エラー ID={question_id}: {item_error}")
+                stats['error_data'] += 1
+
+        # 合計学習数の更新
+        stats['total_learned'] = stats['mastered'] + stats['review_needed'] + stats['learning']
+
+        # 学習進捗計算
+        progress_percentage = 0
+        if stats['total_learned'] > 0:
+            progress_percentage = round((stats['mastered'] / stats['total_learned']) * 100, 1)
+
+        stats['progress_percentage'] = progress_percentage
+
+        logger.info(f"SRS統計生成完了: 総計={stats['total_learned']}, マスター={stats['mastered']}, 復習必要={stats['review_needed']}")
+
+        return render_template('srs_stats.html',
+                               stats=stats,
+                               srs_data=processed_data,
+                               last_updated=datetime.now().strftime('%Y-%m-%d %H:%M'))
+
+    except Exception as e:
+        logger.error(f"SRS統計表示エラー: {e}")
+        # エラー時のフォールバック表示
+        fallback_stats = {
+            'total_learned': 0,
+            'mastered': 0,
+            'review_needed': 0,
+            'learning': 0,
+            'progress_percentage': 0,
+            'error_data': 0
+        }
+        return render_template('srs_stats.html',
+                               stats=fallback_stats,
+                               srs_data={},
+                               error_message="学習統計の読み込み中にエラーが発生しました。問題を続けることで統計が蓄積されます。")
+
+
+@review_bp.route('/api/bookmark', methods=['POST'])
+def bookmark_question():
+    """問題のブックマーク機能"""
+    try:
+        data = request.get_json()
+        question_id = data.get('question_id')
+
+        if not question_id:
+            return jsonify({'success': False, 'error': '問題IDが指定されていません'}), 400
+
+        # セッションにブックマークリストがなければ作成
+        if 'bookmarks' not in session:
+            session['bookmarks'] = []
+
+        # 問題IDがリストになければ追加
+        if question_id not in session['bookmarks']:
+            session['bookmarks'].append(question_id)
+            session.modified = True  # セッションの変更を保存するために必要
+            logger.info(f"問題ID {question_id} をブックマークに追加しました")
+
+        return jsonify({'success': True, 'message': '問題をブックマークしました'})
+
+    except Exception as e:
+        logger.error(f"ブックマーク機能でエラー: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@review_bp.route('/api/bookmarks', methods=['GET'])
+def get_bookmarks():
+    """ブックマークされた問題IDのリストを返却"""
+    try:
+        # セッションからブックマークリストを取得。なければ空のリストを返す。
+        bookmarks = session.get('bookmarks', [])
+        return jsonify({'bookmark_ids': bookmarks})
+
+    except Exception as e:
+        logger.error(f"ブックマークリスト取得エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@review_bp.route('/bookmark', methods=['POST'])
+def add_bookmark():
+    """フォーム形式でのブックマーク追加"""
+    try:
+        qid = request.form.get('qid')
+
+        if not qid:
+            logger.warning("ブックマーク追加: 問題IDが指定されていません")
+            return redirect(request.referrer or '/exam')
+
+        # セッションにブックマークリストがなければ作成
+        if 'bookmarks' not in session:
+            session['bookmarks'] = []
+
+        # 問題IDがリストになければ追加
+        if qid not in session['bookmarks']:
+            session['bookmarks'].append(qid)
+            session.modified = True
+            logger.info(f"問題ID {qid} を復習リストに追加しました")
+
+        return redirect(request.referrer or '/exam')
+
+    except Exception as e:
+        logger.error(f"ブックマーク追加エラー: {e}")
+        return redirect(request.referrer or '/exam')
+
+
+@review_bp.route('/bookmarks')
+def bookmarks_page():
+    """復習リストページ（HTMLページ）"""
+    try:
+        # 復習リストから問題IDを取得
+        bookmarks = session.get('bookmarks', [])
+
+        if not bookmarks:
+            return render_template('bookmarks.html',
+                                   questions=[],
+                                   total_count=0,
+                                   message="まだ復習問題が登録されていません。")
+
+        # 問題データを読み込み
+        all_questions = load_questions()
+        questions = []
+
+        # ブックマークされた問題の詳細情報を取得
+        for qid in bookmarks:
+            question = next((q for q in all_questions if str(q.get('id', '')) == str(qid)), None)
+            if question:
+                # 🚨 CLAUDE.md COMPLIANCE: 日本語カテゴリ直接使用（英語ID変換システム完全廃止）
+                dept_key = question.get('department', '')
+                dept_name = ''
+                if dept_key:
+                    dept_name = convert_legacy_english_id_to_japanese(dept_key)
+
+                questions.append({
+                    'id': question.get('id'),
+                    'question': question.get('question', '')[:100] + '...' if len(question.get('question', '')) > 100 else question.get('question', ''),
+                    'category': question.get('category', ''),
+                    'department_name': dept_name,
+                    'year': question.get('year'),
+                    'question_type': question.get('question_type', '')
+                })
+
+        return render_template('bookmarks.html',
+                               questions=questions,
+                               total_count=len(questions))
+
+    except Exception as e:
+        logger.error(f"復習リストページエラー: {e}")
+        return render_template('error.html', error="復習リストの表示中にエラーが発生しました。")
+
+
+@review_bp.route('/api/bookmark', methods=['DELETE'])
+def remove_bookmark():
+    """復習リストから問題を除外"""
+    try:
+        data = request.get_json()
+        question_id = data.get('question_id')
+
+        if not question_id:
+            return jsonify({'success': False, 'error': '問題IDが指定されていません'}), 400
+
+        # セッションから復習リストを取得
+        bookmarks = session.get('bookmarks', [])
+
+        # リストから除外
+        if question_id in bookmarks:
+            bookmarks.remove(question_id)
+            session['bookmarks'] = bookmarks
+            session.modified = True
+            logger.info(f"復習リストから除外: 問題ID {question_id}")
+            return jsonify({'success': True, 'message': '復習リストから除外しました'})
+        else:
+            return jsonify({'success': False, 'error': '指定された問題は復習リストに登録されていません'}), 404
+
+    except Exception as e:
+        logger.error(f"復習除外エラー: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@review_bp.route('/exam/review')
+def review_questions():
+    """FIRE ULTRA堅牢な高度SRSシステム復習問題練習（ウルトラシンク対応）"""
+    try:
+        # FIRE CRITICAL: 包括的エラーハンドリング
+        logger.info("=== 復習開始処理開始 ===")
+
+        # 問題データロード（エラーハンドリング強化）
+        try:
+            # データディレクトリの設定
+            data_dir = 'data'
+            all_questions = emergency_load_all_questions()  # EMERGENCY FIX
+            if not all_questions:
+                logger.error("問題データが空です")
+                return render_template('error.html',
+                                       error="問題データが読み込めませんでした。システム管理者に連絡してください。",
+                                       error_type="data_load_error")
+        except Exception as load_error:
+            logger.error(f"問題データロードエラー: {load_error}")
+            return render_template('error.html',
+                                   error="問題データの読み込み中にエラーが発生しました。",
+                                   error_type="data_load_exception")
+
+        # FIRE ULTRA堅牢: 復習対象問題を統合取得（安全性強化・ウルトラシンク対応）
+        try:
+            srs_data = session.get('advanced_srs', {})
+            bookmarks = session.get('bookmarks', [])
+
+            # データ型チェック（ウルトラシンク対応）
+            if not isinstance(srs_data, dict):
+                logger.warning(f"SRSデータが辞書型ではありません: {type(srs_data)} - 初期化")
+                srs_data = {}
+            if not isinstance(bookmarks, list):
+                logger.warning(f"ブックマークがリスト型ではありません: {type(bookmarks)} - 初期化")
+                bookmarks = []
+
+            # FIRE ULTRA堅牢: SRSデータの詳細検証と修復
+            valid_srs_data = {}
+            for qid, srs_info in srs_data.items():
+                try:
+                    # SRS情報の型チェック
+                    if not isinstance(srs_info, dict):
+                        logger.warning(f"SRS情報が無効な型: 問題ID {qid}, 型: {type(srs_info)}")
+                        continue
+
+                    # 必須フィールドの存在チェック（柔軟性向上）
+                    essential_fields = ['wrong_count', 'correct_count']
+                    if all(field in srs_info for field in essential_fields):
+                        # 数値の妥当性チェックとデフォルト値補完
+                        wrong_count = int(srs_info.get('wrong_count', 0))
+                        correct_count = int(srs_info.get('correct_count', 0))
+                        total_attempts = int(srs_info.get('total_attempts', wrong_count + correct_count))
+                        
+                        if wrong_count >= 0 and correct_count >= 0:
+                            # 不足フィールドを補完
+                            srs_info['total_attempts'] = total_attempts
+                            valid_srs_data[qid] = srs_info
+                    else:
+                        logger.warning(f"SRS情報に必須フィールドが不足: 問題ID {qid}, フィールド: {srs_info.keys()}")
+                except (ValueError, TypeError) as field_error:
+                    logger.warning(f"SRS情報の数値変換エラー: 問題ID {qid}, エラー: {field_error}")
+                    continue
+
+            logger.info(f"SRSデータ検証: 元データ{len(srs_data)}問 → 有効データ{len(valid_srs_data)}問")
+            srs_data = valid_srs_data
+
+            # FIRE ULTRA堅牢: ブックマークデータの詳細検証と修復
+            valid_bookmarks = []
+            for bookmark in bookmarks:
+                try:
+                    # ブックマークの型チェック（文字列または数値）
+                    if isinstance(bookmark, (str, int)):
+                        bookmark_str = str(bookmark).strip()
+                        if bookmark_str and bookmark_str.isdigit():
+                            valid_bookmarks.append(bookmark_str)
+                    else:
+                        logger.warning(f"ブックマークが無効な型: {bookmark}, 型: {type(bookmark)}")
+                except Exception as bookmark_error:
+                    logger.warning(f"ブックマーク処理エラー: {bookmark}, エラー: {bookmark_error}")
+                    continue
+
+            logger.info(f"ブックマーク検証: 元データ{len(bookmarks)}問 → 有効データ{len(valid_bookmarks)}問")
+            bookmarks = valid_bookmarks
+
+            # すべての復習対象問題IDを統合（重複除去）
+            all_review_ids = set()
+
+            # SRSデータから取得（文字列に変換してから統合）
+            for qid in srs_data.keys():
+                if qid and str(qid).strip():  # 空文字や None をスキップ
+                    all_review_ids.add(str(qid))
+
+            # ブックマークから取得（文字列に変換してから統合）
+            for qid in bookmarks:
+                if qid and str(qid).strip():  # 空文字や None をスキップ
+                    all_review_ids.add(str(qid))
+
+            # リストに変換
+            review_question_ids = list(all_review_ids)
+
+            logger.info(f"復習対象問題統合: SRS={len(srs_data)}問, ブックマーク={len(bookmarks)}問, 統合後={len(review_question_ids)}問")
+
+        except Exception as integration_error:
+            logger.error(f"復習データ統合エラー: {integration_error}")
+            return render_template('error.html',
+                                   error="復習データの処理中にエラーが発生しました。",
+                                   error_type="data_integration_error")
+
+        if not review_question_ids:
+            # SRSデータがない場合の案内メッセージ
+            srs_data = session.get('advanced_srs', {})
+            if not srs_data:
+                return render_template('error.html',
+                                       error="復習リストが空です。まず問題を解いて間違えることで、科学的な復習システムが学習を開始します。",
+                                       error_type="no_srs_data")
+            else:
+                return render_template('error.html',
+                                       error="現在復習が必要な問題がありません。素晴らしい！新しい問題に挑戦するか、時間が経ってから復習してください。",
+                                       error_type="all_mastered")
+
+        # FIRE CRITICAL: 問題データマッチングと弱点スコア計算（ウルトラシンク対応）
+        try:
+            # 問題IDから実際の問題データを取得（安全性強化）
+            questions_dict = {}
+            for q in all_questions:
+                try:
+                    q_id = str(q.get('id', ''))
+                    if q_id and q_id.strip():  # 空文字チェック
+                        questions_dict[q_id] = q
+                except Exception as q_parse_error:
+                    logger.warning(f"問題ID変換エラー: {q_parse_error}, question={q}")
+                    continue
+
+            logger.info(f"問題辞書作成完了: {len(questions_dict)}問")
+
+            review_questions_with_score = []
+            successful_matches = 0
+            failed_matches = 0
+
+            for qid in review_question_ids:
+                try:
+                    if qid in questions_dict:
+                        question = questions_dict[qid]
+
+                        # 弱点スコア計算（安全性強化）
+                        try:
+                            srs_info = srs_data.get(qid, {})
+
+                            # 数値データの安全な取得
+                            wrong_count = max(0, int(srs_info.get('wrong_count', 0)))
+                            total_attempts = max(1, int(srs_info.get('total_attempts', 1)))
+                            difficulty_level = max(0, float(srs_info.get('difficulty_level', 5)))
+
+                            # 復習期限チェック（エラーハンドリング強化）
+                            overdue_bonus = 0
+                            next_review = srs_info.get('next_review', '')
+                            if next_review:
+                                try:
+                                    from datetime import datetime
+                                    next_review_date = datetime.fromisoformat(next_review)
+                                    days_overdue = max(0, (datetime.now() - next_review_date).days)
+                                    overdue_bonus = min(50, days_overdue * 2)  # 最大50に制限
+                                except Exception as date_error:
+                                    logger.debug(f"日付解析エラー（問題ID: {qid}）: {date_error}")
+                                    overdue_bonus = 5  # デフォルト値
+
+                            # FIRE ULTRA SYNC PRECISION FIX: 弱点スコア計算の精度保証（オーバーフロー防止）
+                            error_rate_decimal = Decimal(str(wrong_count)) / Decimal(str(total_attempts))
+                            # FIRE ULTRA SYNC FIX: 未使用変数削除済み
+                            
+                            weakness_decimal = (error_rate_decimal * Decimal('100')) + Decimal(str(difficulty_level)) + Decimal(str(overdue_bonus))
+                            weakness_score = float(min(Decimal('1000'), weakness_decimal.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)))
+
+                            review_questions_with_score.append({
+                                'question': question,
+                                'weakness_score': weakness_score,
+                                'wrong_count': wrong_count,
+                                'total_attempts': total_attempts,
+                                'overdue_bonus': overdue_bonus
+                            })
+
+                            successful_matches += 1
+
+                        except Exception as score_error:
+                            logger.warning(f"弱点スコア計算エラー（問題ID: {qid}）: {score_error}")
+                            # エラーが発生した問題もデフォルトスコアで追加
+                            review_questions_with_score.append({
+                                'question': question,
+                                'weakness_score': 50,  # デフォルトスコア
+                                'wrong_count': 1,
+                                'total_attempts': 1,
+                                'overdue_bonus': 0
+                            })
+                            successful_matches += 1
+                    else:
+                        failed_matches += 1
+                        logger.debug(f"問題IDが見つかりません: {qid}")
+
+                except Exception as match_error:
+                    logger.warning(f"問題マッチングエラー（ID: {qid}）: {match_error}")
+                    failed_matches += 1
+                    continue
+
+            logger.info(f"問題マッチング結果: 成功={successful_matches}問, 失敗={failed_matches}問")
+
+        except Exception as processing_error:
+            logger.error(f"弱点スコア処理の重大エラー: {processing_error}")
+            return render_template('error.html',
+                                   error="復習問題の評価中にエラーが発生しました。",
+                                   error_type="score_processing_error")
+
+        if not review_questions_with_score:
+            return render_template('error.html',
+                                   error="復習対象の問題が見つかりません。新しい問題を解いて間違えることで復習リストが作成されます。",
+                                   error_type="no_filtered_questions")
+
+        # FIRE ULTRA CRITICAL: 最終問題選択とセッション設定（ウルトラシンク対応）
+        try:
+            # FIRE ULTRA堅牢: 弱点スコア順でソート（安全なソート・完全エラーハンドリング）
+            try:
+                # 各問題の弱点スコアが数値であることを確認
+                for item in review_questions_with_score:
+                    if not isinstance(item.get('weakness_score'), (int, float)):
+                        item['weakness_score'] = 50.0  # デフォルトスコア
+
+                review_questions_with_score.sort(key=lambda x: float(x.get('weakness_score', 0)), reverse=True)
+                logger.info(f"弱点スコア順ソート完了: {len(review_questions_with_score)}問")
+            except Exception as sort_error:
+                logger.warning(f"ソートエラー（デフォルト順序を使用）: {sort_error}")
+                # ソートに失敗してもそのまま続行
+
+            # FIRE ULTRA CRITICAL: セッション問題数の動的決定（最低保証とユーザー要求バランス）
+            available_questions = len(review_questions_with_score)
+            min_session_size = min(3, available_questions)  # 最低3問、または利用可能問題数
+            target_session_size = get_user_session_size(session)  # ユーザー設定を尊重（10/20/30問）
+            session_size = min(target_session_size, available_questions)  # 利用可能問題数に制限
+
+            if session_size < min_session_size:
+                logger.error(f"復習問題が不足: 利用可能{available_questions}問, 最低必要{min_session_size}問")
+                return render_template('error.html',
+                                       error=f"復習問題が不足しています（{available_questions}問）。もう少し問題を解いてから復習してください。",
+                                       error_type="insufficient_review_questions")
+
+            logger.info(f"復習セッション問題数決定: 理想{target_session_size}問 → 実際{session_size}問（利用可能{available_questions}問）")
+
+            selected_review_items = review_questions_with_score[:session_size]
+            review_questions = []
+
+            # 問題データの安全な抽出
+            for item in selected_review_items:
+                try:
+                    question = item.get('question')
+                    if question and question.get('id'):
+                        review_questions.append(question)
+                except Exception as extract_error:
+                    logger.warning(f"問題抽出エラー: {extract_error}")
+                    continue
+
+            if not review_questions:
+                logger.error("最終的に有効な復習問題が0問になりました")
+                return render_template('error.html',
+                                       error="復習問題の準備中に問題が発生しました。しばらく待ってから再度お試しください。",
+                                       error_type="final_question_preparation_error")
+
+            logger.info(f"復習問題最終選択: 全{len(review_questions_with_score)}問中{len(review_questions)}問を弱点スコア順で選択")
+
+            # 上位問題のスコア情報をログ出力（安全な範囲）
+            for i, item in enumerate(selected_review_items[:min(5, len(selected_review_items))]):
+                try:
+                    q_id = item.get('question', {}).get('id', 'unknown')
+                    score = item.get('weakness_score', 0)
+                    wrong = item.get('wrong_count', 0)
+                    total = item.get('total_attempts', 1)
+                    logger.info(f"  {i+1}位: 問題ID{q_id}, 弱点スコア{score:.1f}, 間違い{wrong}/{total}")
+                except Exception as log_error:
+                    logger.debug(f"ログ出力エラー: {log_error}")
+
+            # セッションに安全に設定
+            try:
+                category_name = f'復習問題（弱点優先{len(review_questions)}問）'
+
+                # 問題IDの安全な変換
+                question_ids = []
+                for q in review_questions:
+                    try:
+                        q_id = int(q.get('id', 0))
+                        if q_id > 0:  # 有効なIDのみ追加
+                            question_ids.append(q_id)
+                    except (ValueError, TypeError) as id_error:
+                        logger.warning(f"問題ID変換エラー: {id_error}, question={q}")
+                        continue
+
+                if not question_ids:
+                    logger.error("有効な問題IDが0個になりました")
+                    return render_template('error.html',
+                                           error="復習問題IDの処理中にエラーが発生しました。",
+                                           error_type="question_id_processing_error")
+
+                # FIRE ULTRA堅牢: セッション変数を安全に設定（ウルトラシンク対応・完全検証）
+                try:
+                    # セッションクリア（競合防止）
+                    session.pop('exam_question_ids', None)
+                    session.pop('exam_current', None)
+                    session.pop('exam_category', None)
+                    session.pop('selected_question_type', None)
+                    session.pop('department', None)
+                    session.pop('selected_department', None)
+
+                    # 新しいセッション設定
+                    session['exam_question_ids'] = question_ids
+                    session['exam_current'] = 0
+                    session['exam_category'] = category_name
+                    session['selected_question_type'] = 'review'  # 復習専用タイプ
+                    session['department'] = ''  # 復習では部門指定なし
+                    session['selected_department'] = ''  # セッション再構築用（復習では部門なし）
+                    session.modified = True
+                    
+                    # FIRE ULTRA SYNC FIX: セッション書き込み確認
+                    logger.info(f"復習セッション設定完了: selected_question_type={session.get('selected_question_type')}, 問題数={len(question_ids)}")
+
+                    # セッション即座保存強制
+                    session.permanent = True
+                    
+                    # FIRE CRITICAL FIX: セッション書き込み即座実行
+                    import time
+                    time.sleep(0.1)  # セッション書き込み待機
+
+                    logger.info(f"復習セッション設定完了: {len(question_ids)}問, モード: {category_name}")
+                    logger.info(f"復習詳細: 弱点スコア順優先, 全部門対象, 問題ID={question_ids[:5] if question_ids else []}")
+
+                except Exception as set_error:
+                    logger.error(f"セッション変数設定エラー: {set_error}")
+                    return render_template('error.html',
+                                           error="復習セッション変数の設定中にエラーが発生しました。",
+                                           error_type="session_variable_error")
+
+                # FIRE ULTRA堅牢: セッション状態の最終確認（複数回検証）
+                verification_attempts = 0
+                max_verification_attempts = 3
+
+                while verification_attempts < max_verification_attempts:
+                    try:
+                        final_ids = session.get('exam_question_ids', [])
+                        final_current = session.get('exam_current', -1)
+                        final_category = session.get('exam_category', '')
+                        final_question_type = session.get('selected_question_type', '')
+
+                        logger.info(
+                            f"セッション設定確認 (試行{verification_attempts + 1}): "
+                            f"exam_question_ids={len(final_ids) if final_ids else 0}問, "
+                            f"exam_current={final_current}, exam_category='{final_category}', "
+                            f"question_type='{final_question_type}'")
+
+                        # 検証条件
+                        if (final_ids and len(final_ids) > 0 and
+                            final_current >= 0 and
+                            final_category and
+                                final_question_type == 'review'):
+                            logger.info(f"SUCCESS セッション設定検証成功 (試行{verification_attempts + 1})")
+                            break
+                        else:
+                            verification_attempts += 1
+                            if verification_attempts < max_verification_attempts:
+                                logger.warning(f"セッション設定検証失敗 (試行{verification_attempts}) - 再設定中...")
+                                # 再設定
+                                session['exam_question_ids'] = question_ids
+                                session['exam_current'] = 0
+                                session['exam_category'] = category_name
+                                session['selected_question_type'] = 'review'
+                                session.modified = True
+                            else:
+                                logger.error(f"セッション設定検証失敗 (最大試行{max_verification_attempts}回)")
+                                return render_template('error.html',
+                                                       error="復習セッションの設定検証に失敗しました。ページを再読み込みして再度お試しください。",
+                                                       error_type="session_verification_error")
+                    except Exception as verify_error:
+                        logger.error(f"セッション検証エラー (試行{verification_attempts + 1}): {verify_error}")
+                        verification_attempts += 1
+
+            except Exception as session_error:
+                logger.error(f"セッション設定エラー: {session_error}")
+                return render_template('error.html',
+                                       error="復習セッションの準備中にエラーが発生しました。",
+                                       error_type="session_preparation_error")
+
+        except Exception as final_error:
+            logger.error(f"最終処理エラー: {final_error}")
+            return render_template('error.html',
+                                   error="復習問題の最終準備中にエラーが発生しました。",
+                                   error_type="final_processing_error")
+
+        logger.info("=== 復習開始処理完了 - examページへリダイレクト ===")
+
+        # 最初の問題にリダイレクト
+        return redirect(url_for('exam'))
+
+    except Exception as e:
+        logger.error(f"FIRE 復習問題開始の重大エラー: {e}")
+        import traceback
+        logger.error(f"詳細エラー情報: {traceback.format_exc()}")
+        return render_template('error.html',
+                               error="復習問題の開始中に予期しないエラーが発生しました。ページを再読み込みして再度お試しください。",
+                               error_type="critical_review_error")
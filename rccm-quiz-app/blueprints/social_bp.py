@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ソーシャル学習Blueprint
+学習グループ・ディスカッション・ピア比較・リーダーボード
+"""
+
+import logging
+
+from flask import Blueprint, jsonify, render_template, request, session
+
+from lazy_features import lazy_feature
+
+logger = logging.getLogger(__name__)
+
+# 機能モジュールは初回アクセス時に読み込み（lazy_features）
+social_learning_manager = lazy_feature('social_learning_manager')
+
+social_bp = Blueprint('social', __name__)
+
+@social_bp.route('/social')
+def social_learning_page():
+    """ソーシャル学習メインページ"""
+    try:
+        user_id = session.get('user_id', 'anonymous')
+
+        # ユーザーの参加グループ取得
+        user_groups = social_learning_manager.get_user_groups(user_id)
+
+        # おすすめグループ取得
+        recommended_groups = social_learning_manager.discover_groups(user_id, limit=6)
+
+        # ディスカッション一覧取得
+        discussions = social_learning_manager.get_discussions(limit=10)
+
+        # ピア比較データ取得（エラーハンドリング強化）
+        try:
+            peer_comparison = social_learning_manager.get_peer_comparison(user_id, 'department')
+            # エラーレスポンスの場合、Noneに設定
+            if isinstance(peer_comparison, dict) and 'error' in peer_comparison:
+                peer_comparison = None
+        except Exception as e:
+            logger.warning(f"ピア比較データ取得エラー: {e}")
+            peer_comparison = None
+
+        # リーダーボード取得
+        leaderboard = social_learning_manager.get_leaderboard(time_period='month')
+
+        return render_template('social_learning.html',
+                               user_groups=user_groups,
+                               recommended_groups=recommended_groups,
+                               discussions=discussions,
+                               peer_comparison=peer_comparison,
+                               leaderboard=leaderboard)
+
+    except Exception as e:
+        logger.error(f"ソーシャル学習ページエラー: {e}")
+        return render_template('error.html', error="ソーシャル学習ページの読み込み中にエラーが発生しました")
+
+
+@social_bp.route('/social/create_group', methods=['POST'])
+def create_study_group():
+    """学習グループ作成"""
+    try:
+        user_id = session.get('user_id', 'anonymous')
+
+        group_name = request.form.get('group_name')
+        description = request.form.get('description', '')
+        department = request.form.get('department')
+        target_exam_date = request.form.get('target_exam_date')
+
+        if not group_name:
+            return jsonify({'success': False, 'error': 'グループ名は必須です'})
+
+        result = social_learning_manager.create_study_group(
+            user_id, group_name, description, department, target_exam_date
+        )
+
+        return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"グループ作成エラー: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@social_bp.route('/social/join_group', methods=['POST'])
+def join_study_group():
+    """学習グループ参加"""
+    try:
+        user_id = session.get('user_id', 'anonymous')
+        group_id = request.form.get('group_id')
+
+        if not group_id:
+            return jsonify({'success': False, 'error': 'グループIDが必要です'})
+
+        result = social_learning_manager.join_group(user_id, group_id)
+        return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"グループ参加エラー: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@social_bp.route('/social/leave_group', methods=['POST'])
+def leave_study_group():
+    """学習グループ退会"""
+    try:
+        user_id = session.get('user_id', 'anonymous')
+        group_id = request.form.get('group_id')
+
+        if not group_id:
+            return jsonify({'success': False, 'error': 'グループIDが必要です'})
+
+        result = social_learning_manager.leave_group(user_id, group_id)
+        return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"グループ退会エラー: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@social_bp.route('/social/create_discussion', methods=['POST'])
+def create_discussion():
+    """ディスカッション作成"""
+    try:
+        user_id = session.get('user_id', 'anonymous')
+
+        title = request.form.get('title')
+        content = request.form.get('content')
+        category = request.form.get('category', 'general')
+        question_id = request.form.get('question_id')
+        group_id = request.form.get('group_id')
+
+        if not title or not content:
+            return jsonify({'success': False, 'error': 'タイトルと内容は必須です'})
+
+        # question_idを整数に変換（存在する場合）
+        if question_id:
+            try:
+                question_id = int(question_id)
+            except ValueError:
+                question_id = None
+
+        result = social_learning_manager.create_discussion(
+            user_id, title, content, question_id, group_id, category
+        )
+
+        return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"ディスカッション作成エラー: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@social_bp.route('/social/discussions')
+def discussions():
+    """ディスカッション一覧API（グループ・分野・問題・タグで絞り込み、cursor で次ページ）"""
+    try:
+        result = social_learning_manager.get_discussions_page(
+            group_id=request.args.get('group_id'),
+            category=request.args.get('category'),
+            question_id=request.args.get('question_id', type=int),
+            tag=request.args.get('tag'),
+            limit=request.args.get('limit', 20, type=int),
+            cursor=request.args.get('cursor'),
+        )
+        return jsonify(result)
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"ディスカッション一覧エラー: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@social_bp.route('/social/discussion/<discussion_id>')
+def discussion_detail(discussion_id):
+    """ディスカッション詳細"""
+    try:
+        user_id = session.get('user_id', 'anonymous')
+        discussion = social_learning_manager.get_discussion_detail(discussion_id, user_id)
+
+        if 'error' in discussion:
+            return render_template('error.html', error=discussion['error'])
+
+        return render_template('discussion_detail.html', discussion=discussion)
+
+    except Exception as e:
+        logger.error(f"ディスカッション詳細エラー: {e}")
+        return render_template('error.html', error="ディスカッション詳細の読み込み中にエラーが発生しました")
+
+
+@social_bp.route('/social/peer_comparison')
+def peer_comparison():
+    """ピア比較API"""
+    try:
+        user_id = session.get('user_id', 'anonymous')
+        comparison_type = request.args.get('type', 'department')
+
+        result = social_learning_manager.get_peer_comparison(user_id, comparison_type)
+
+        # HTMLレスポンスとして返す（AJAX用）
+        return render_template('peer_comparison_partial.html', peer_comparison=result)
+
+    except Exception as e:
+        logger.error(f"ピア比較エラー: {e}")
+        return f'<div class="alert alert-danger">エラー: {str(e)}</div>'
+
+
+@social_bp.route('/social/leaderboard')
+def leaderboard():
+    """リーダーボードAPI"""
+    try:
+        period = request.args.get('period', 'month')
+        department = request.args.get('department')
+
+        result = social_learning_manager.get_leaderboard(department, period)
+
+        # HTMLレスポンスとして返す（AJAX用）
+        return render_template('leaderboard_partial.html', leaderboard=result, period=period)
+
+    except Exception as e:
+        logger.error(f"リーダーボードエラー: {e}")
+        return f'<div class="alert alert-danger">エラー: {str(e)}</div>'
+
+
+@social_bp.route('/social/study_partners')
+def study_partners():
+    """学習パートナー推奨"""
+    try:
+        user_id = session.get('user_id', 'anonymous')
+        partners = social_learning_manager.get_recommended_study_partners(user_id)
+
+        return jsonify(partners)
+
+    except Exception as e:
+        logger.error(f"学習パートナー推奨エラー: {e}")
+        return jsonify({'error': str(e)}), 500
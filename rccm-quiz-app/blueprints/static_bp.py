@@ -6,10 +6,17 @@
 既存システム完全非干渉
 """
 
-from flask import Blueprint, send_from_directory, jsonify
+from flask import Blueprint, send_from_directory, send_file, jsonify, abort, g, request
+import mimetypes
 import os
 import logging
 
+# send_from_directory は存在しないファイルで FileNotFoundError ではなく NotFound を送出する
+from werkzeug.exceptions import NotFound
+
+from static_assets import asset_manifest, IMMUTABLE_CACHE_CONTROL, ASSET_URL_PREFIX
+from compression import find_precompressed, negotiate_encoding, supported_encodings
+
 logger = logging.getLogger(__name__)
 
 # 静的コンテンツ専用Blueprint定義
@@ -28,7 +35,7 @@ def favicon():
             'favicon.ico', 
             mimetype='image/x-icon'
         )
-    except FileNotFoundError:
+    except (FileNotFoundError, NotFound):
         # フォールバック: 404ではなく透明GIF
         return send_from_directory(
             os.path.join(os.path.dirname(__file__), '..', 'static'), 
@@ -45,7 +52,7 @@ def manifest():
             'manifest.json', 
             mimetype='application/json'
         )
-    except FileNotFoundError:
+    except (FileNotFoundError, NotFound):
         # 動的生成フォールバック
         return jsonify({
             "name": "RCCM試験対策アプリ",
@@ -78,7 +85,7 @@ def service_worker():
             'sw.js', 
             mimetype='application/javascript'
         )
-    except FileNotFoundError:
+    except (FileNotFoundError, NotFound):
         # 最小限Service Worker動的生成
         sw_content = """
 // ULTRATHIN区 最小限Service Worker
@@ -120,7 +127,7 @@ def app_icon(size):
             f'icon-{size}.png', 
             mimetype='image/png'
         )
-    except FileNotFoundError:
+    except (FileNotFoundError, NotFound):
         # フォールバック: デフォルトアイコン
         try:
             return send_from_directory(
@@ -128,7 +135,7 @@ def app_icon(size):
                 'favicon.ico', 
                 mimetype='image/x-icon'
             )
-        except FileNotFoundError:
+        except (FileNotFoundError, NotFound):
             # 最後のフォールバック: 1x1透明PNG
             from flask import Response
             import base64
@@ -144,6 +151,43 @@ def app_icon(size):
                 headers={'Cache-Control': 'public, max-age=3600'}
             )
 
+def _send_precompressed(filename):
+    """ビルド時に生成した .br/.gz があり、クライアントが受理する場合はそれを配信"""
+    static_dir = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', 'static'))
+    path = os.path.realpath(os.path.join(static_dir, filename))
+    if not path.startswith(static_dir + os.sep) or not os.path.isfile(path):
+        return None
+
+    available = [enc for enc in supported_encodings() if find_precompressed(path, enc)]
+    encoding = negotiate_encoding(request.accept_encodings, available)
+    if encoding is None:
+        return None
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    response = send_file(find_precompressed(path, encoding), mimetype=mimetype, conditional=True)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+@static_bp.route(f'{ASSET_URL_PREFIX}/<path:filename>')
+def fingerprinted_asset(filename):
+    """フィンガープリント付き静的アセット配信（内容ハッシュ一致時は1年間 immutable）"""
+    original, is_current = asset_manifest.resolve(filename)
+    if original is None:
+        abort(404)
+
+    response = _send_precompressed(original)
+    if response is None:
+        response = send_from_directory(
+            os.path.join(os.path.dirname(__file__), '..', 'static'),
+            original
+        )
+    if is_current:
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        # after_request の no-store 付与を抑止
+        g.response_cache_policy = 'asset'
+    return response
+
 @static_bp.route('/robots.txt')
 def robots():
     """robots.txt配信"""
@@ -153,7 +197,7 @@ def robots():
             'robots.txt', 
             mimetype='text/plain'
         )
-    except FileNotFoundError:
+    except (FileNotFoundError, NotFound):
         # 動的生成フォールバック
         from flask import Response
         robots_content = """User-agent: *
@@ -177,7 +221,7 @@ def sitemap():
             'sitemap.xml', 
             mimetype='application/xml'
         )
-    except FileNotFoundError:
+    except (FileNotFoundError, NotFound):
         # 動的生成フォールバック
         from flask import Response, request
         
@@ -215,6 +259,7 @@ def get_static_blueprint_info():
             {'path': '/manifest.json', 'endpoint': 'manifest', 'methods': ['GET']},
             {'path': '/sw.js', 'endpoint': 'service_worker', 'methods': ['GET']},
             {'path': '/icon-<int:size>.png', 'endpoint': 'app_icon', 'methods': ['GET']},
+            {'path': f'{ASSET_URL_PREFIX}/<path:filename>', 'endpoint': 'fingerprinted_asset', 'methods': ['GET']},
             {'path': '/robots.txt', 'endpoint': 'robots', 'methods': ['GET']},
             {'path': '/sitemap.xml', 'endpoint': 'sitemap', 'methods': ['GET']}
         ],
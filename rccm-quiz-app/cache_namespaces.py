@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache Namespaces - 世代カウンタによるタグベースのキャッシュ無効化
+
+パターン指定の無効化（Redis KEYS/SCAN・全キー走査）を置き換える仕組み:
+- 部門・ユーザー・問題コーパス単位のタグごとに世代番号を保持
+- キャッシュキーに現在の世代番号を埋め込む
+- 無効化は世代番号を1つ進めるだけ（O(1)）
+- 古い世代のエントリは即座に参照不能となり、TTL満了または遅延スイープで回収
+"""
+
+import hashlib
+import logging
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class NamespaceTags:
+    """タグ名の生成（キー衝突防止のため命名を一元化）"""
+
+    CORPUS = "corpus"
+
+    @staticmethod
+    def department(department: str) -> str:
+        return f"dept:{department}"
+
+    @staticmethod
+    def user(user_id: str) -> str:
+        # ユーザーIDはキーに平文で残さない
+        user_hash = hashlib.md5(str(user_id).encode()).hexdigest()[:8]
+        return f"user:{user_hash}"
+
+
+class GenerationRegistry:
+    """
+    タグごとの世代カウンタ
+    Redisクライアントが渡された場合はINCR/MGETで全ワーカー間に共有し、
+    それ以外はプロセス内の辞書で管理する
+    """
+
+    def __init__(self, redis_client=None, key_prefix: str = "rccm:gen", breaker=None):
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix
+        # 遮断中はRedisを呼ばずローカル値を使う（circuit_breaker.CircuitBreaker）
+        self.breaker = breaker
+        self._local_generations: Dict[str, int] = {}
+        # Redis に反映できなかった世代の進め幅（遮断中の bump。復旧後の最初の呼び出しで INCRBY）
+        self._pending_bumps: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _redis_key(self, tag: str) -> str:
+        return f"{self.key_prefix}:{tag}"
+
+    def current(self, tag: str) -> int:
+        """タグの現在の世代番号を取得"""
+        return self.snapshot([tag])[tag]
+
+    def snapshot(self, tags: Iterable[str]) -> Dict[str, int]:
+        """複数タグの世代番号をまとめて取得（Redisは1往復）"""
+        tags = list(tags)
+        if not tags:
+            return {}
+
+        if self._redis_allowed():
+            try:
+                self._replay_pending_bumps()
+                values = self.redis_client.mget([self._redis_key(t) for t in tags])
+                self._record_redis_result()
+                return {tag: int(value or 0) for tag, value in zip(tags, values)}
+            except Exception as e:
+                self._record_redis_result(e)
+                logger.warning(f"⚠️ 世代番号の取得に失敗、ローカル値を使用: {e}")
+
+        with self._lock:
+            return {tag: self._local_generations.get(tag, 0) for tag in tags}
+
+    def bump(self, tag: str) -> int:
+        """タグの世代を進める（= タグ配下の全エントリを無効化）"""
+        if self._redis_allowed():
+            try:
+                self._replay_pending_bumps()
+                generation = int(self.redis_client.incr(self._redis_key(tag)))
+                self._record_redis_result()
+                with self._lock:
+                    self._local_generations[tag] = generation
+                return generation
+            except Exception as e:
+                self._record_redis_result(e)
+                logger.warning(f"⚠️ 世代番号の更新に失敗、ローカル値を更新: {e}")
+
+        with self._lock:
+            generation = self._local_generations.get(tag, 0) + 1
+            self._local_generations[tag] = generation
+            if self.redis_client is not None:
+                self._pending_bumps[tag] = self._pending_bumps.get(tag, 0) + 1
+            return generation
+
+    def _replay_pending_bumps(self) -> None:
+        """
+        遮断中にローカルで進めた世代を Redis に反映
+        （反映しないと復旧後に他ワーカーが旧世代のエントリを参照し続ける）
+        """
+        with self._lock:
+            pending, self._pending_bumps = self._pending_bumps, {}
+        if not pending:
+            return
+        replayed = {}
+        try:
+            for tag, count in pending.items():
+                replayed[tag] = int(self.redis_client.incrby(self._redis_key(tag), count))
+        except Exception:
+            with self._lock:
+                for tag, count in pending.items():
+                    if tag not in replayed:
+                        self._pending_bumps[tag] = self._pending_bumps.get(tag, 0) + count
+            raise
+        finally:
+            with self._lock:
+                for tag, generation in replayed.items():
+                    self._local_generations[tag] = max(self._local_generations.get(tag, 0), generation)
+        logger.info(f"🔄 遮断中の世代更新を Redis に反映: {sorted(pending)}")
+
+    def _redis_allowed(self) -> bool:
+        if self.redis_client is None:
+            return False
+        return self.breaker is None or self.breaker.allow_request()
+
+    def _record_redis_result(self, error: Optional[Exception] = None) -> None:
+        if self.breaker is None:
+            return
+        if error is None:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure(error)
+
+    def is_current(self, generations: Dict[str, int]) -> bool:
+        """保存時の世代スナップショットが現在も有効か判定"""
+        if not generations:
+            return True
+        return self.snapshot(generations.keys()) == generations
+
+    def namespace_token(self, generations: Dict[str, int]) -> str:
+        """キーに埋め込む世代トークンを生成（タグ順は固定）"""
+        return ":".join(f"{tag}@g{generations[tag]}" for tag in sorted(generations))
+
+    def get_stats(self) -> Dict[str, int]:
+        """ローカルで把握している世代番号一覧"""
+        with self._lock:
+            return dict(self._local_generations)
+
+
+class TagIndex:
+    """
+    インメモリキャッシュ用のタグ→キー索引
+    無効化されたタグのキー集合を切り離して保持し、後続の書き込み時に
+    少量ずつ回収する（無効化自体はO(1)のまま）
+    """
+
+    def __init__(self):
+        self._entry_generations: Dict[str, Dict[str, int]] = {}
+        self._tag_keys: Dict[str, Set[str]] = {}
+        self._detached: deque = deque()
+
+    def add(self, key: str, generations: Dict[str, int]) -> None:
+        """エントリとそのタグ世代を登録"""
+        if not generations:
+            return
+        self._entry_generations[key] = generations
+        for tag in generations:
+            self._tag_keys.setdefault(tag, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        """エントリを索引から除去"""
+        for tag in self._entry_generations.pop(key, {}):
+            tagged_keys = self._tag_keys.get(tag)
+            if tagged_keys is not None:
+                tagged_keys.discard(key)
+                if not tagged_keys:
+                    del self._tag_keys[tag]
+
+    def detach(self, tag: str) -> None:
+        """無効化されたタグのキー集合を回収待ちに移す"""
+        stale_keys = self._tag_keys.pop(tag, None)
+        if stale_keys:
+            self._detached.append(stale_keys)
+
+    def drain(self, budget: int) -> List[str]:
+        """回収待ちのキーを最大budget件取り出す"""
+        keys = []
+        while self._detached and len(keys) < budget:
+            stale_keys = self._detached[0]
+            if not stale_keys:
+                self._detached.popleft()
+                continue
+            keys.append(stale_keys.pop())
+        return keys
+
+    def clear(self) -> None:
+        self._entry_generations.clear()
+        self._tag_keys.clear()
+        self._detached.clear()
+
+    def prune(self, is_live) -> int:
+        """外部要因（LRU追い出し等）で消えたエントリを索引から除去"""
+        dead_keys = [key for key in self._entry_generations if not is_live(key)]
+        for key in dead_keys:
+            self.remove(key)
+        return len(dead_keys)
+
+    @property
+    def tracked(self) -> int:
+        """索引に登録されているエントリ数"""
+        return len(self._entry_generations)
+
+    @property
+    def pending(self) -> int:
+        """回収待ちのキー集合数"""
+        return len(self._detached)
+
+
+def build_tags(department: Optional[str] = None, user_id: Optional[str] = None,
+               include_corpus: bool = True) -> List[str]:
+    """キャッシュエントリに付与するタグ一覧を生成"""
+    tags = []
+    if include_corpus:
+        tags.append(NamespaceTags.CORPUS)
+    if department:
+        tags.append(NamespaceTags.department(department))
+    if user_id:
+        tags.append(NamespaceTags.user(user_id))
+    return tags
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache Warmer - ワーカー起動直後のキャッシュウォームアップ
+
+宣言的なウォームアップ計画（ステップ一覧）をバックグラウンドのスレッドプールで実行:
+- ステップはステージ番号順に実行し、同一ステージ内は並列実行
+- 前段ステージ（問題コーパス読み込み等）が完了してから後段を開始
+- 各ステップの結果をプロセス内に保持し、ルートからは get() で参照
+- 進捗・所要時間は get_status() でヘルスチェックに公開
+- 未完了・失敗したステップは None を返すため、呼び出し側は従来の計算にフォールバック
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = 'pending'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+STATUS_SKIPPED = 'skipped'
+
+
+class WarmupStep:
+    """ウォームアップ計画の1ステップ"""
+
+    def __init__(self, name: str, func: Callable[[], Any], stage: int = 1,
+                 description: str = '', store_result: bool = True):
+        self.name = name
+        self.func = func
+        self.stage = stage
+        self.description = description
+        self.store_result = store_result
+
+        self.status = STATUS_PENDING
+        self.duration_ms: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'stage': self.stage,
+            'status': self.status,
+            'duration_ms': self.duration_ms,
+            'error': self.error,
+            'description': self.description,
+        }
+
+
+class CacheWarmer:
+    """
+    宣言的ウォームアップ計画の実行器
+    start() は非ブロッキング（フォーク後のワーカーで呼び出す）、run() はブロッキング
+    """
+
+    def __init__(self, max_workers: int = 4, enabled: bool = True):
+        self.max_workers = max(1, max_workers)
+        self.enabled = enabled
+
+        self._steps: Dict[str, WarmupStep] = {}
+        self._results: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._owner_pid: Optional[int] = None
+
+        self.state = STATUS_PENDING
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.elapsed_ms: Optional[float] = None
+
+    def add_step(self, name: str, func: Callable[[], Any], stage: int = 1,
+                 description: str = '', store_result: bool = True) -> 'CacheWarmer':
+        """ステップを計画に追加（同名は上書き）"""
+        with self._lock:
+            self._steps[name] = WarmupStep(name, func, stage, description, store_result)
+        return self
+
+    def step(self, name: str, stage: int = 1, description: str = '', store_result: bool = True):
+        """ステップ登録用デコレータ"""
+        def decorator(func):
+            self.add_step(name, func, stage, description, store_result)
+            return func
+        return decorator
+
+    def start(self) -> bool:
+        """
+        バックグラウンドでウォームアップを開始
+        preload_app でフォーク前に生成されたスレッドは子プロセスに引き継がれないため、
+        プロセスIDが変わっていれば状態を初期化して再実行する
+        """
+        import os
+
+        if not self.enabled:
+            self.state = STATUS_SKIPPED
+            return False
+
+        with self._lock:
+            pid = os.getpid()
+            if self._owner_pid == pid and self._thread is not None:
+                return False
+            if self._owner_pid is not None and self._owner_pid != pid:
+                self._reset_locked()
+            self._owner_pid = pid
+            self._thread = threading.Thread(target=self.run, name='cache-warmer', daemon=True)
+            self._thread.start()
+        return True
+
+    def run(self) -> Dict[str, Any]:
+        """計画をステージ順に実行（ブロッキング）"""
+        with self._lock:
+            self.state = STATUS_RUNNING
+            self.started_at = datetime.now(timezone.utc).isoformat()
+            stages: Dict[int, List[WarmupStep]] = {}
+            for step in self._steps.values():
+                step.status = STATUS_PENDING
+                step.error = None
+                stages.setdefault(step.stage, []).append(step)
+
+        logger.info(f"🔥 キャッシュウォームアップ開始: {len(self._steps)}ステップ / {len(stages)}ステージ")
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='cache-warmer') as executor:
+            for stage in sorted(stages):
+                # 同一ステージ内は並列、ステージ間は順次
+                list(executor.map(self._run_step, stages[stage]))
+
+        with self._lock:
+            self.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            self.finished_at = datetime.now(timezone.utc).isoformat()
+            failed = [s.name for s in self._steps.values() if s.status == STATUS_FAILED]
+            self.state = STATUS_FAILED if failed else STATUS_DONE
+
+        if failed:
+            logger.warning(f"⚠️ キャッシュウォームアップ一部失敗 ({self.elapsed_ms}ms): {failed}")
+        else:
+            logger.info(f"✅ キャッシュウォームアップ完了: {self.elapsed_ms}ms")
+        return self.get_status()
+
+    def _run_step(self, step: WarmupStep) -> None:
+        step.status = STATUS_RUNNING
+        started = time.perf_counter()
+        try:
+            result = step.func()
+            if step.store_result:
+                with self._lock:
+                    self._results[step.name] = result
+            step.status = STATUS_DONE
+        except Exception as e:
+            step.status = STATUS_FAILED
+            step.error = str(e)
+            logger.warning(f"⚠️ ウォームアップステップ失敗 ({step.name}): {e}")
+        finally:
+            step.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def _reset_locked(self) -> None:
+        self._results.clear()
+        self._thread = None
+        self.state = STATUS_PENDING
+        self.started_at = self.finished_at = None
+        self.elapsed_ms = None
+        for step in self._steps.values():
+            step.status = STATUS_PENDING
+            step.duration_ms = None
+            step.error = None
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """ウォームアップ済みの結果を取得（未完了なら default）"""
+        with self._lock:
+            return self._results.get(name, default)
+
+    def is_ready(self, name: str) -> bool:
+        step = self._steps.get(name)
+        return step is not None and step.status == STATUS_DONE
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """保持結果の破棄（name省略時は全件）"""
+        with self._lock:
+            if name is None:
+                self._results.clear()
+            else:
+                self._results.pop(name, None)
+
+    def get_status(self) -> Dict[str, Any]:
+        """進捗・所要時間（ヘルスチェック用）"""
+        with self._lock:
+            steps = {name: step.to_dict() for name, step in self._steps.items()}
+            finished = sum(1 for s in steps.values()
+                           if s['status'] in (STATUS_DONE, STATUS_FAILED))
+            total = len(steps)
+            return {
+                'enabled': self.enabled,
+                'state': self.state,
+                'progress': {
+                    'completed': finished,
+                    'total': total,
+                    'percent': round(finished / total * 100, 1) if total else 100.0,
+                },
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'elapsed_ms': self.elapsed_ms,
+                'steps': steps,
+            }
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Certification Plans - 認定プログラムの要件判定プランとユーザー単位の結果キャッシュ
+
+- 要件（accuracy / question_count / department_coverage）を判定ステップの列（プラン）に変換し、
+  要件の内容が同じ間は使い回す
+- ユーザーの学習履歴は (部門, 日) 単位のロールアップから 回答数・正答数・回答部門 の集計値（UserFacts）に
+  1回だけまとめ、全プログラムのプランをその集計値に適用する（要件毎の履歴走査をしない）
+- 集計値・登録情報・判定結果はユーザーの版数（UserRepository.user_revision）毎にキャッシュし、
+  版数が変わるまで再利用（ユーザーデータの読み込み自体を省略）
+- 夜間一括更新（refresh_certification_progress.py）は全ユーザー×プログラムを複数プロセスで判定し、
+  スナップショット（api_data/certification_progress.json）に保存。各ワーカーは版数が一致する結果をそのまま使う
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import CertificationConfig
+from json_store import read_json, write_json
+from user_store import UserRepository, rollup_activity
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# 判定ステップの種類
+_ACCURACY, _QUESTION_COUNT, _DEPARTMENT_COVERAGE = 'accuracy', 'question_count', 'department_coverage'
+
+
+def plan_key(requirements: Dict[str, Any]) -> str:
+    """要件の内容から決まるプランの識別子"""
+    encoded = json.dumps(requirements, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+class UserFacts:
+    """判定に使うユーザーの集計値"""
+
+    __slots__ = ('total', 'correct', 'departments')
+
+    def __init__(self, total: int = 0, correct: int = 0, departments: Iterable[Optional[str]] = ()):
+        self.total = total
+        self.correct = correct
+        self.departments = frozenset(departments)
+
+    @classmethod
+    def from_rollups(cls, rollups: Iterable[Tuple]) -> 'UserFacts':
+        """activity_rollups / rollup_activity の行 (user_id, 部門, 日, 回答数, 正答数, ...) から"""
+        total = correct = 0
+        departments = set()
+        for _, department, _, count, count_correct, *_ in rollups:
+            total += count
+            correct += count_correct
+            departments.add(department)
+        return cls(total, correct, departments)
+
+    @property
+    def accuracy(self) -> float:
+        return self.correct / self.total if self.total > 0 else 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'total': self.total, 'correct': self.correct, 'departments': list(self.departments)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'UserFacts':
+        return cls(data['total'], data['correct'], data['departments'])
+
+
+class CertificationPlan:
+    """認定要件の判定プラン（要件の不正は変換時に従来と同じ例外）"""
+
+    __slots__ = ('key', 'total_requirements', 'steps')
+
+    def __init__(self, requirements: Dict[str, Any]):
+        self.key = plan_key(requirements)
+        self.total_requirements = len(requirements)
+        self.steps: List[Tuple[str, str, Any, Any]] = []  # (要件名, 種類, 目標値, 必要部門)
+        for name, config in requirements.items():
+            kind = config['type']
+            if kind == _ACCURACY:
+                self.steps.append((name, kind, config['target'], None))
+            elif kind == _QUESTION_COUNT:
+                self.steps.append((name, kind, config['target'], None))
+            elif kind == _DEPARTMENT_COVERAGE:
+                # 網羅率の分母は指定された部門リストの長さ（従来の計算と同じ）
+                departments = config['departments']
+                self.steps.append((name, kind, config['coverage_threshold'], (set(departments), len(departments))))
+            # 未知の種類は判定なし（total_requirements には数える）
+
+    def progress(self, facts: UserFacts) -> Dict[str, Any]:
+        """_calculate_certification_progress と同じ形式の進捗"""
+        requirements_met = {}
+        for name, kind, target, departments in self.steps:
+            if kind == _ACCURACY:
+                requirements_met[name] = facts.accuracy >= target
+            elif kind == _QUESTION_COUNT:
+                requirements_met[name] = facts.total >= target
+            else:
+                required, count = departments
+                requirements_met[name] = len(facts.departments.intersection(required)) / count >= target
+        met = sum(1 for value in requirements_met.values() if value)
+        return {
+            'completion_percentage': (met / self.total_requirements) * 100,
+            'requirements_met': requirements_met,
+            'total_requirements': self.total_requirements,
+            'met_requirements': met,
+        }
+
+    def requirements_status(self, facts: UserFacts) -> Dict[str, Any]:
+        """_check_requirements_status と同じ形式（正答率要件のみ）"""
+        status = {}
+        for name, kind, target, _ in self.steps:
+            if kind == _ACCURACY:
+                current = facts.accuracy
+                status[name] = {
+                    'current': current,
+                    'target': target,
+                    'met': current >= target,
+                    'progress_percentage': (current / target) * 100,
+                }
+        return status
+
+
+def evaluate(plan: CertificationPlan, facts: UserFacts) -> Dict[str, Any]:
+    """判定結果（判定できない要件は {'error': ...}）"""
+    try:
+        return {'plan': plan.key, 'progress': plan.progress(facts),
+                'requirements_status': plan.requirements_status(facts)}
+    except Exception as e:
+        return {'plan': plan.key, 'error': str(e)}
+
+
+class _UserEntry:
+    """ユーザー1人分のキャッシュ（版数・登録情報・集計値・プログラム毎の判定結果）"""
+
+    __slots__ = ('revision', 'enrollments', 'facts', 'results')
+
+    def __init__(self, revision: Optional[str], enrollments: Dict[str, Any], facts: UserFacts,
+                 results: Dict[str, Dict[str, Any]] = None):
+        self.revision = revision
+        self.enrollments = enrollments
+        self.facts = facts
+        self.results = results or {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'revision': self.revision, 'enrollments': self.enrollments, 'facts': self.facts.to_dict(),
+                'results': self.results}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> '_UserEntry':
+        return cls(data['revision'], data['enrollments'], UserFacts.from_dict(data['facts']), data['results'])
+
+
+def load_user_entry(repository: UserRepository, user_id: str) -> _UserEntry:
+    """版数を先に読む（読み込み中に保存されても、古い内容が新しい版数で残らない）"""
+    revision = repository.user_revision(user_id)
+    user_data = repository.get_user(user_id)
+    enrollments = user_data.get('certifications')
+    return _UserEntry(revision, dict(enrollments) if isinstance(enrollments, dict) else {},
+                      UserFacts.from_rollups(rollup_activity(user_id, user_data.get('history', []))))
+
+
+class CertificationEvaluator:
+    """認定進捗の判定（APIManager から利用）"""
+
+    def __init__(self, repository: UserRepository, snapshot_file: str = None, max_cached_users: int = None):
+        self.repository = repository
+        self.snapshot_file = snapshot_file
+        self.max_cached_users = max_cached_users or CertificationConfig.MAX_CACHED_USERS
+        self._lock = threading.Lock()
+        self._plans: Dict[str, CertificationPlan] = {}
+        self._users: 'OrderedDict[str, _UserEntry]' = OrderedDict()
+        self._snapshot_signature: Optional[Tuple[int, int, int]] = None
+        self._stats = {'hits': 0, 'misses': 0, 'evaluations': 0, 'snapshot_loads': 0}
+
+    def plan(self, requirements: Dict[str, Any]) -> CertificationPlan:
+        key = plan_key(requirements)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = CertificationPlan(requirements)
+        return plan
+
+    def user_certifications(self, user_id: str, certifications: Dict[str, Any],
+                            cert_ids: Iterable[str] = None) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """
+        (登録情報, {cert_id: 判定結果}) を返す
+        cert_ids 省略時は登録済みの全プログラム。登録されていない・プログラムが存在しないものは結果に含めない
+        """
+        entry = self._entry(user_id)
+        results = {}
+        for cert_id in (entry.enrollments if cert_ids is None else cert_ids):
+            if cert_id not in entry.enrollments or cert_id not in certifications:
+                continue
+            try:
+                plan = self.plan(certifications[cert_id]['requirements'])
+            except Exception as e:
+                results[cert_id] = {'error': str(e)}
+                continue
+            with self._lock:
+                result = entry.results.get(cert_id)
+                if result is None or result['plan'] != plan.key:
+                    result = entry.results[cert_id] = evaluate(plan, entry.facts)
+                    self._stats['evaluations'] += 1
+            results[cert_id] = result
+        return entry.enrollments, results
+
+    def invalidate(self, user_id: str = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(user_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, cached_users=len(self._users), plans=len(self._plans))
+
+    def _entry(self, user_id: str) -> _UserEntry:
+        self._sync_snapshot()
+        revision = self.repository.user_revision(user_id)
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None and revision is not None and entry.revision == revision:
+                self._users.move_to_end(user_id)
+                self._stats['hits'] += 1
+                return entry
+        entry = load_user_entry(self.repository, user_id)
+        with self._lock:
+            self._stats['misses'] += 1
+            if entry.revision is not None:
+                self._put(user_id, entry)
+        return entry
+
+    def _put(self, user_id: str, entry: _UserEntry) -> None:
+        self._users[user_id] = entry
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_cached_users:
+            self._users.popitem(last=False)
+
+    def _sync_snapshot(self) -> None:
+        """一括更新のスナップショットが更新されていれば取り込む（版数の確認は参照時）"""
+        if not self.snapshot_file:
+            return
+        try:
+            stat = os.stat(self.snapshot_file)
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = (0, 0, 0)
+        if signature == self._snapshot_signature:
+            return
+        snapshot = read_json(self.snapshot_file, None) if signature != (0, 0, 0) else None
+        with self._lock:
+            self._snapshot_signature = signature
+            if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+                return
+            for user_id, data in (snapshot.get('users') or {}).items():
+                current = self._users.get(user_id)
+                if current is None or current.revision != data.get('revision'):
+                    try:
+                        self._put(user_id, _UserEntry.from_dict(data))
+                    except (KeyError, TypeError):
+                        continue
+            self._stats['snapshot_loads'] += 1
+
+
+# --- 一括判定（夜間更新用） ---
+
+def evaluate_users(repository: UserRepository, user_ids: Iterable[str],
+                   certifications: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """ユーザー毎に登録済み全プログラムを判定し、スナップショット形式の dict を返す"""
+    plans: Dict[str, CertificationPlan] = {}
+    users = {}
+    for user_id in user_ids:
+        entry = load_user_entry(repository, user_id)
+        if entry.revision is None:
+            continue
+        for cert_id in entry.enrollments:
+            certification = certifications.get(cert_id)
+            if certification is None:
+                continue
+            try:
+                requirements = certification['requirements']
+                key = plan_key(requirements)
+                plan = plans.get(key) or plans.setdefault(key, CertificationPlan(requirements))
+            except Exception as e:
+                logger.warning(f"⚠️ 認定要件の変換失敗 {cert_id}: {e}")
+                continue
+            entry.results[cert_id] = evaluate(plan, entry.facts)
+        users[user_id] = entry.to_dict()
+    return users
+
+
+def write_snapshot(path: str, users: Dict[str, Dict[str, Any]], generated_at: str) -> None:
+    write_json(path, {'version': SNAPSHOT_VERSION, 'generated_at': generated_at, 'users': users})
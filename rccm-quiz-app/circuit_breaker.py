@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Circuit Breaker - 外部バックエンド（Redis等）障害時の遮断と指数バックオフ
+
+- closed: 通常動作。連続失敗が閾値に達すると open へ
+- open: バックエンドを呼ばずに即フォールバック（1リクエストあたりのコストはゼロ）
+- half_open: バックオフ満了後、1件だけ試行を許可。成功で closed、失敗で再び open
+- open になるたびにバックオフを倍増（上限あり）、成功でリセット
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """スレッドセーフなサーキットブレーカー"""
+
+    def __init__(self, name: str, failure_threshold: int = 3, base_backoff: float = 1.0,
+                 max_backoff: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._consecutive_failures = 0
+        self._trips = 0
+        self._retry_at = 0.0
+        self._probe_in_flight = False
+        self._last_error: Optional[str] = None
+
+        self.short_circuited = 0
+        self.total_failures = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """遮断中か（バックオフ満了前の open）"""
+        with self._lock:
+            return self._state == STATE_OPEN and self._clock() < self._retry_at
+
+    def allow_request(self) -> bool:
+        """バックエンドを呼んでよいか判定（open中はFalse、half_open では1件のみTrue）"""
+        with self._lock:
+            if self._state == STATE_CLOSED:
+                return True
+
+            if self._state == STATE_OPEN and self._clock() >= self._retry_at:
+                self._state = STATE_HALF_OPEN
+                self._probe_in_flight = False
+
+            if self._state == STATE_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            self.short_circuited += 1
+            return False
+
+    def record_success(self) -> None:
+        """呼び出し成功（遮断解除・バックオフリセット）"""
+        with self._lock:
+            if self._state != STATE_CLOSED:
+                logger.info(f"✅ {self.name}: バックエンド復旧を確認、遮断解除")
+            self._state = STATE_CLOSED
+            self._consecutive_failures = 0
+            self._trips = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, error: Optional[Exception] = None) -> None:
+        """呼び出し失敗（閾値到達または half_open 試行失敗で遮断）"""
+        with self._lock:
+            self._consecutive_failures += 1
+            self.total_failures += 1
+            self._last_error = str(error) if error else None
+
+            if self._state == STATE_HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._trip_locked()
+
+    def trip(self, error: Optional[Exception] = None) -> None:
+        """閾値に関係なく即時遮断（起動時の接続失敗など）"""
+        with self._lock:
+            self.total_failures += 1
+            self._last_error = str(error) if error else None
+            self._trip_locked()
+
+    def _trip_locked(self) -> None:
+        self._trips += 1
+        backoff = min(self.base_backoff * (2 ** (self._trips - 1)), self.max_backoff)
+        self._retry_at = self._clock() + backoff
+        self._state = STATE_OPEN
+        self._probe_in_flight = False
+        logger.warning(f"⚡ {self.name}: 遮断 {backoff:.1f}秒（{self._trips}回目、直近エラー: {self._last_error}）")
+
+    def seconds_until_retry(self) -> float:
+        """次の試行までの残り秒数（closed/half_open は0）"""
+        with self._lock:
+            if self._state != STATE_OPEN:
+                return 0.0
+            return max(0.0, self._retry_at - self._clock())
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = max(0.0, self._retry_at - self._clock()) if self._state == STATE_OPEN else 0.0
+            return {
+                'name': self.name,
+                'state': self._state,
+                'consecutive_failures': self._consecutive_failures,
+                'trips': self._trips,
+                'retry_in_seconds': round(retry_in, 1),
+                'short_circuited': self.short_circuited,
+                'total_failures': self.total_failures,
+                'last_error': self._last_error,
+            }
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compression - 静的ファイルの事前圧縮と動的レスポンスの圧縮
+
+- ビルド時: static/ 配下のテキスト系ファイルに .gz（brotli導入時は .br も）を生成
+- 配信時: Accept-Encoding に応じて事前圧縮ファイルを選択（static_bp）
+- 動的レスポンス: 閾値以上の HTML/JSON 等を gzip/br で圧縮、ストリーミング応答は逐次圧縮
+"""
+
+import gzip
+import logging
+import os
+import zlib
+from typing import Iterable, Iterator, List, Optional
+
+# brotli は任意依存（未導入時は gzip のみ）
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 事前圧縮対象の拡張子
+PRECOMPRESS_EXTENSIONS = {'.js', '.css', '.svg', '.json', '.html', '.txt', '.map', '.xml'}
+
+# 動的圧縮対象のMIMEタイプ
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/xml', 'text/javascript',
+    'application/json', 'application/javascript', 'application/xml',
+    'application/manifest+json', 'application/x-ndjson',
+}
+
+ENCODING_EXTENSIONS = {'br': '.br', 'gzip': '.gz'}
+
+
+def supported_encodings() -> List[str]:
+    """サーバー側で対応可能なエンコーディング（優先順）"""
+    return ['br', 'gzip'] if BROTLI_AVAILABLE else ['gzip']
+
+
+def negotiate_encoding(accept_encodings, candidates: Optional[Iterable[str]] = None) -> Optional[str]:
+    """
+    Accept-Encoding（werkzeug の request.accept_encodings）から使用するエンコーディングを決定
+    品質値が最も高いものを選び、同値なら candidates の順を優先
+    """
+    best, best_quality = None, 0
+    for encoding in candidates if candidates is not None else supported_encodings():
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+# === ビルド時の事前圧縮 ===
+
+def precompress_file(path: str, min_size: int = 1024) -> List[str]:
+    """1ファイルの .gz/.br を生成（圧縮で小さくならない場合は生成しない）"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < min_size:
+        return []
+
+    outputs = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if BROTLI_AVAILABLE:
+        outputs['br'] = brotli.compress(data, quality=11)
+
+    written = []
+    for encoding, compressed in outputs.items():
+        target = path + ENCODING_EXTENSIONS[encoding]
+        if len(compressed) >= len(data):
+            continue
+        tmp_path = f"{target}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, target)
+        written.append(target)
+    return written
+
+
+def precompress_directory(directory: str, min_size: int = 1024) -> List[str]:
+    """ディレクトリ配下のテキスト系ファイルを一括で事前圧縮"""
+    written = []
+    for root, _dirs, files in os.walk(directory):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in PRECOMPRESS_EXTENSIONS:
+                written.extend(precompress_file(os.path.join(root, name), min_size))
+    return written
+
+
+def find_precompressed(path: str, encoding: str) -> Optional[str]:
+    """事前圧縮ファイルのパス（元ファイルより古い場合は使用しない）"""
+    candidate = path + ENCODING_EXTENSIONS[encoding]
+    try:
+        if os.path.getmtime(candidate) >= os.path.getmtime(path):
+            return candidate
+    except OSError:
+        pass
+    return None
+
+
+# === 動的レスポンスの圧縮 ===
+
+def _compressor(encoding: str, level: int):
+    if encoding == 'br':
+        return brotli.Compressor(quality=min(level, 11))
+    return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzipヘッダ付き
+
+
+def compress_bytes(data: bytes, encoding: str, level: int = 6) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level)
+
+
+def compress_stream(chunks: Iterable, encoding: str, level: int = 6) -> Iterator[bytes]:
+    """ストリーミング応答を逐次圧縮（チャンク毎にフラッシュして即時送出）"""
+    compressor = _compressor(encoding, level)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        if not chunk:
+            continue
+        if encoding == 'br':
+            data = compressor.process(chunk) + compressor.flush()
+        else:
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.finish() if encoding == 'br' else compressor.flush()
+
+
+class ResponseCompressor:
+    """閾値以上の動的レスポンスを Accept-Encoding に応じて圧縮する after_request フック"""
+
+    def __init__(self, app=None, min_size: int = 2048, level: int = 6, enabled: bool = True):
+        self.min_size = min_size
+        self.level = level
+        self.enabled = enabled
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        # after_request は登録の逆順に実行されるため、早期に登録して最後に圧縮する
+        app.after_request(self.after_request)
+        app.extensions['response_compressor'] = self
+
+    def after_request(self, response):
+        from flask import request
+
+        if not self.enabled or not self._is_compressible(response):
+            return response
+
+        encoding = negotiate_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding, self.level)
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < self.min_size:
+                return response
+            response.set_data(compress_bytes(body, encoding, self.level))
+
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        # 表現が変わるため強いETagは弱いETagに変換（If-None-Match は弱い比較で一致）
+        etag, is_weak = response.get_etag()
+        if etag and not is_weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    @staticmethod
+    def _is_compressible(response) -> bool:
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return False
+        if response.direct_passthrough or 'Content-Encoding' in response.headers:
+            return False
+        return response.mimetype in COMPRESSIBLE_MIMETYPES
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Conditional API - ポーリングされるJSON APIのETag/条件付きGET
+
+- ETagはレスポンス本文ではなく安価な状態リビジョンから算出
+  （ユーザー状態版数・問題コーパス版数・ユーザーデータ版数・時間バケット + URL引数）
+- If-None-Match が一致すればハンドラ本体を実行せず 304 を返す
+- ユーザー状態版数: セッションを変更したリクエストの終了時にセッション内トークンを更新
+  （カウンタではなくランダム値のため、セッション再作成後も古いETagと一致しない）
+- 時刻に依存する値（復習期限・試験残り時間など）は time_bucket 秒単位でETagを更新
+"""
+
+import hashlib
+import logging
+import time
+import uuid
+from functools import wraps
+from typing import Callable, Dict, Iterable, Optional
+
+from flask import g, make_response, request, session
+
+logger = logging.getLogger(__name__)
+
+STATE_REVISION_KEY = '_state_rev'
+CONDITIONAL_METHODS = ('GET', 'HEAD')
+
+
+def session_state_revision() -> str:
+    """ユーザー状態版数（セッション変更毎に更新されるトークン）"""
+    return session.get(STATE_REVISION_KEY, '')
+
+
+class ConditionalAPI:
+    """状態リビジョンベースのETag検証（304応答ではビュー関数を実行しない）"""
+
+    def __init__(self, sources: Optional[Dict[str, Callable[[], str]]] = None,
+                 policy: str = 'api', enabled: bool = True):
+        self.sources: Dict[str, Callable[[], str]] = {'session': session_state_revision}
+        self.sources.update(sources or {})
+        self.policy = policy
+        self.enabled = enabled
+        self.not_modified_count = 0
+        self.full_response_count = 0
+
+    def register_source(self, name: str, func: Callable[[], str]) -> None:
+        self.sources[name] = func
+
+    def init_app(self, app) -> None:
+        """
+        状態版数の更新・ETag付与を行う after_request フックを登録
+        Cache-Control を設定する after_request より後に登録すること（フックは登録の逆順に実行）
+        """
+        app.after_request(self._after_request)
+        app.extensions['conditional_api'] = self
+
+    def conditional(self, sources: Iterable[str] = ('session',), time_bucket: Optional[int] = None):
+        """
+        条件付きGETデコレータ（認証デコレータより内側に付けること）
+
+        Args:
+            sources: ETagに含める状態リビジョン名（session / corpus / user_data など）
+            time_bucket: 時刻依存の値を含むAPIで、この秒数毎にETagを更新
+        """
+        sources = tuple(sources)
+        unknown = [name for name in sources if name not in self.sources]
+        if unknown:
+            raise ValueError(f"Unknown revision source: {', '.join(unknown)}")
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or request.method not in CONDITIONAL_METHODS:
+                    return view(*args, **kwargs)
+
+                etag = self._compute_etag(sources, time_bucket)
+                if request.if_none_match and request.if_none_match.contains_weak(etag):
+                    self.not_modified_count += 1
+                    response = make_response('', 304)
+                    response.set_etag(etag, weak=True)
+                    response.headers['X-Conditional-API'] = 'NOT_MODIFIED'
+                    g.response_cache_policy = self.policy
+                    return response
+
+                self.full_response_count += 1
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200:
+                    # ETagはハンドラによるセッション変更（状態版数の更新）後に確定
+                    g.conditional_api_spec = (sources, time_bucket)
+                return response
+
+            return wrapper
+        return decorator
+
+    def _compute_etag(self, sources, time_bucket) -> str:
+        parts = [
+            request.endpoint or request.path,
+            repr(sorted(request.args.items(multi=True))),
+        ]
+        parts.extend(f"{name}={self.sources[name]()}" for name in sources)
+        if time_bucket:
+            parts.append(f"t={int(time.time() // time_bucket)}")
+        return hashlib.sha1("|".join(parts).encode('utf-8')).hexdigest()[:20]
+
+    def _after_request(self, response):
+        # セッションを変更したリクエストはユーザー状態版数を更新
+        if session.modified:
+            session[STATE_REVISION_KEY] = uuid.uuid4().hex[:12]
+
+        spec = g.pop('conditional_api_spec', None)
+        if spec and response.status_code == 200:
+            response.set_etag(self._compute_etag(*spec), weak=True)
+            response.headers['X-Conditional-API'] = 'MODIFIED'
+            g.response_cache_policy = self.policy
+        return response
+
+    def get_stats(self) -> Dict:
+        total = self.not_modified_count + self.full_response_count
+        return {
+            'enabled': self.enabled,
+            'not_modified': self.not_modified_count,
+            'full_responses': self.full_response_count,
+            'not_modified_rate': round(self.not_modified_count / total, 3) if total else 0,
+            'sources': sorted(self.sources),
+        }
@@ -86,6 +86,127 @@ class DataConfig:
     
     # キャッシュ設定
     CACHE_TIMEOUT = int(os.environ.get('CACHE_TIMEOUT', 3600))  # 1時間
+    # 問題コーパス版数（data/*.csv の stat）の再計算間隔（秒）
+    CORPUS_VERSION_TTL = float(os.environ.get('CORPUS_VERSION_TTL', 5))
+
+class UserStoreConfig:
+    """ユーザーデータ保存先（json: user_data/*.json、sqlite: WALモードのSQLite + JSONミラー）"""
+    BACKEND = os.environ.get('USER_STORE_BACKEND', 'json').lower()
+    DB_PATH = os.environ.get('USER_STORE_DB_PATH', '')  # 空の場合は user_data/rccm_user_store.db
+    JSON_MIRROR = os.environ.get('USER_STORE_JSON_MIRROR', 'True').lower() == 'true'
+    AUTO_MIGRATE = os.environ.get('USER_STORE_AUTO_MIGRATE', 'True').lower() == 'true'
+
+class JSONStoreConfig:
+    """JSONファイル保存（アトミック置換・ファイルロック・バッチ書き込み）"""
+    INDENT = int(os.environ.get('JSON_STORE_INDENT', 0))  # 0 = コンパクト形式
+    FSYNC = os.environ.get('JSON_STORE_FSYNC', 'True').lower() == 'true'
+    FLUSH_INTERVAL = float(os.environ.get('JSON_STORE_FLUSH_INTERVAL', 1.0))  # バッチ書き込みの反映間隔（秒）
+    MAX_PENDING = int(os.environ.get('JSON_STORE_MAX_PENDING', 100))  # ファイル毎の未反映件数上限
+
+class AutoSaveConfig:
+    """セッションデータ自動保存（ライトビハインド）"""
+    WRITE_BEHIND = os.environ.get('AUTO_SAVE_WRITE_BEHIND', 'True').lower() == 'true'  # False = リクエスト内で同期保存
+    COALESCE_WINDOW = float(os.environ.get('AUTO_SAVE_COALESCE_WINDOW', 2.0))  # 同一ユーザーの保存をまとめる時間（秒）
+    MAX_PENDING_USERS = int(os.environ.get('AUTO_SAVE_MAX_PENDING_USERS', 500))  # 超えたら即時に書き出し
+
+class LeaderboardConfig:
+    """リーダーボード（部門×期間のマテリアライズドビューを回答保存時に差分更新）"""
+    MATERIALIZED = os.environ.get('LEADERBOARD_MATERIALIZED', 'True').lower() == 'true'
+    # json バックエンドでユーザー毎の版数を比較し直す間隔（秒。ディレクトリ更新時刻に現れない上書きの検出用）
+    REFRESH_INTERVAL = int(os.environ.get('LEADERBOARD_REFRESH_INTERVAL', 300))
+
+class StudyPartnerConfig:
+    """学習パートナー推奨（ユーザー特徴ベクトルのコサイン類似度。numpy があれば行列演算で一括計算）"""
+    VECTORIZED = os.environ.get('STUDY_PARTNER_VECTORIZED', 'True').lower() == 'true'
+    MIN_SIMILARITY = float(os.environ.get('STUDY_PARTNER_MIN_SIMILARITY', 0.3))
+    REFRESH_INTERVAL = int(os.environ.get('STUDY_PARTNER_REFRESH_INTERVAL', 300))
+
+class SocialIndexConfig:
+    """学習グループ・ディスカッション一覧（グループ・分野・問題・タグの転置索引とカーソル方式のページング）"""
+    INDEXED = os.environ.get('SOCIAL_INDEXED', 'True').lower() == 'true'
+    MAX_PAGE_SIZE = int(os.environ.get('SOCIAL_MAX_PAGE_SIZE', 100))
+
+class APIKeyIndexConfig:
+    """APIキー検証（キーのHMACダイジェスト索引・権限ビット集合。api_keys.json の変更で再読み込み）"""
+    ENABLED = os.environ.get('API_KEY_INDEX_ENABLED', 'True').lower() == 'true'
+    RELOAD_CHECK_INTERVAL = float(os.environ.get('API_KEY_INDEX_RELOAD_CHECK_INTERVAL', 0))  # ファイル変更確認の間隔（秒。0 = 毎回）
+    SECRET = os.environ.get('API_KEY_INDEX_SECRET', '')  # 空の場合はプロセス毎に生成
+
+class OrganizationReportConfig:
+    """組織レポート（組織別のメンバー・部門別正答率・週次活動の集計テーブルを回答保存時に差分更新）"""
+    PRECOMPUTED = os.environ.get('ORG_REPORT_PRECOMPUTED', 'True').lower() == 'true'
+    # json バックエンドでユーザー毎の版数を比較し直す間隔（秒。ディレクトリ更新時刻に現れない上書きの検出用）
+    REFRESH_INTERVAL = int(os.environ.get('ORG_REPORT_REFRESH_INTERVAL', 300))
+
+class CertificationConfig:
+    """認定進捗（要件を判定プランに変換し、ユーザーのロールアップに1回で適用。結果はユーザーの版数毎にキャッシュ）"""
+    PLANNED = os.environ.get('CERTIFICATION_PLANNED', 'True').lower() == 'true'
+    MAX_CACHED_USERS = int(os.environ.get('CERTIFICATION_MAX_CACHED_USERS', 10000))
+
+class AdminDashboardConfig:
+    """管理者ダッシュボード（全データセットを1パス集計したスナップショットをデータ版数が変わるまで再利用）"""
+    # データ変更後もこの秒数以内は前回のスナップショットを返し、バックグラウンドで再構築（0 = 常に同期再構築）
+    SNAPSHOT_STALE_SECONDS = int(os.environ.get('ADMIN_SNAPSHOT_STALE_SECONDS', 0))
+
+class DiskCacheConfig:
+    """永続ディスクキャッシュ設定（cache_data/*.cache）"""
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+    ENABLED = os.environ.get('DISK_CACHE_ENABLED', 'True').lower() == 'true'
+    CACHE_DIR = os.environ.get('DISK_CACHE_DIR', os.path.join(BASE_DIR, 'cache_data'))
+    MAX_SIZE_MB = int(os.environ.get('DISK_CACHE_MAX_SIZE_MB', 200))
+    DEFAULT_TTL = int(os.environ.get('DISK_CACHE_TTL', 7 * 24 * 3600))  # 1週間
+    COMPACTION_TARGET_RATIO = 0.8  # コンパクション後の目標使用率
+
+class CacheWarmupConfig:
+    """キャッシュウォームアップ設定（ワーカー起動直後のバックグラウンド事前計算）"""
+    ENABLED = os.environ.get('CACHE_WARMUP_ENABLED', 'True').lower() == 'true'
+    MAX_WORKERS = int(os.environ.get('CACHE_WARMUP_WORKERS', 4))
+
+class BlueprintConfig:
+    """Blueprint登録設定（デバッグ・手動テスト用ルートは本番環境では登録しない）"""
+    ENABLE_DEBUG_ROUTES = os.environ.get(
+        'ENABLE_DEBUG_ROUTES', str(os.environ.get('FLASK_ENV') != 'production')
+    ).lower() == 'true'
+
+class RequestMemoConfig:
+    """リクエスト単位メモ化設定（X-Request-Memo デバッグヘッダーは本番環境では既定で無効）"""
+    DEBUG_HEADER = os.environ.get(
+        'REQUEST_MEMO_DEBUG_HEADER', str(os.environ.get('FLASK_ENV') != 'production')
+    ).lower() == 'true'
+
+class ResponseCacheConfig:
+    """ルート単位レスポンスキャッシュ設定（ユーザー非依存ページ）"""
+    ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'True').lower() == 'true'
+    MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 256))
+    TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 3600))
+    # Cache-Controlポリシー（page: 毎回ETagで再検証し304、manifest: 一定期間ブラウザキャッシュ）
+    POLICIES = {
+        'page': os.environ.get('RESPONSE_CACHE_POLICY_PAGE', 'private, no-cache'),
+        'manifest': os.environ.get('RESPONSE_CACHE_POLICY_MANIFEST', 'private, max-age=86400'),
+        # フィンガープリント付き静的アセット（内容が変わればURLも変わる）
+        'asset': 'public, max-age=31536000, immutable',
+        # ポーリングされるJSON API（状態リビジョンETagで毎回再検証）
+        'api': os.environ.get('RESPONSE_CACHE_POLICY_API', 'private, no-cache'),
+    }
+
+class ConditionalAPIConfig:
+    """JSON APIの条件付きGET設定（状態リビジョンETag・If-None-Match で304）"""
+    ENABLED = os.environ.get('CONDITIONAL_API_ENABLED', 'True').lower() == 'true'
+
+class TemplateCacheConfig:
+    """Jinjaテンプレートキャッシュ設定（バイトコード共有・フラグメントキャッシュ）"""
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+    BYTECODE_CACHE_ENABLED = os.environ.get('TEMPLATE_BYTECODE_CACHE_ENABLED', 'True').lower() == 'true'
+    BYTECODE_CACHE_DIR = os.environ.get('TEMPLATE_BYTECODE_CACHE_DIR',
+                                        os.path.join(BASE_DIR, 'cache_data', 'jinja_bytecode'))
+    FRAGMENT_CACHE_MAX_ENTRIES = int(os.environ.get('TEMPLATE_FRAGMENT_CACHE_MAX_ENTRIES', 128))
+    FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('TEMPLATE_FRAGMENT_CACHE_TIMEOUT', 3600))
+
+class CompressionConfig:
+    """レスポンス圧縮設定（静的ファイルはビルド時に事前圧縮、動的レスポンスは閾値以上を圧縮）"""
+    ENABLED = os.environ.get('COMPRESSION_ENABLED', 'True').lower() == 'true'
+    MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 2048))  # バイト
+    LEVEL = int(os.environ.get('COMPRESSION_LEVEL', 6))
 
 class RCCMConfig:
     """RCCM専門部門設定"""
@@ -226,10 +347,22 @@ class RCCMConfig:
     DEFAULT_QUESTION_TYPE = 'basic'  # 基礎問題をデフォルトに
 
 class LogConfig:
-    """ログ設定"""
+    """ログ設定（production プロファイル: JSON・非同期キュー・リクエスト中の INFO 以下をサンプリング）"""
+    PROFILE = os.environ.get(
+        'LOG_PROFILE',
+        'production' if os.environ.get('FLASK_ENV') == 'production' or os.environ.get('RENDER') else 'development'
+    )
+    _PRODUCTION = PROFILE == 'production'
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
     LOG_FILE = os.environ.get('LOG_FILE', 'rccm_app.log')
+    LOG_TO_FILE = os.environ.get('LOG_TO_FILE', 'False').lower() == 'true'
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    # text: 従来形式 / json: 1行1レコードの構造化ログ
+    OUTPUT_FORMAT = os.environ.get('LOG_OUTPUT_FORMAT', 'json' if _PRODUCTION else 'text')
+    QUEUE_ENABLED = os.environ.get('LOG_QUEUE_ENABLED', str(_PRODUCTION)).lower() == 'true'
+    QUEUE_MAX_SIZE = int(os.environ.get('LOG_QUEUE_MAX_SIZE', 10000))
+    # ロガー名=出力割合（WARNING 以上・リクエスト外のログは常に出力）
+    SAMPLING = os.environ.get('LOG_SAMPLING', '__main__=0.1,app=0.1,blueprints=0.1' if _PRODUCTION else '')
 
 # 環境別設定
 class DevelopmentConfig(Config):
@@ -3,24 +3,31 @@ RCCM学習アプリ - データ永続化管理
 セッションデータの永続化とバックアップ
 """
 
-import json
 import os
+import atexit
 import hashlib
+import threading
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional, Tuple
 import logging
 
+from config import AutoSaveConfig
+from json_store import write_json
+from user_store import get_user_repository
+
 logger = logging.getLogger(__name__)
 
 class DataManager:
     """
     学習データの永続化管理
-    セッション + ファイル保存のハイブリッド方式
+    セッション + ファイル保存のハイブリッド方式（保存先は user_store のリポジトリ）
     """
     
     def __init__(self, data_dir: str = 'user_data'):
         self.data_dir = data_dir
         self.ensure_data_directory()
+        self.user_repository = get_user_repository(data_dir)
     
     def ensure_data_directory(self):
         """データディレクトリの作成"""
@@ -47,25 +54,14 @@ class DataManager:
         """
         try:
             user_id = self.get_user_id(session_id, user_name)
-            file_path = os.path.join(self.data_dir, f"{user_id}.json")
-            
-            # 既存データがあれば読み込み
-            existing_data = {}
-            if os.path.exists(file_path):
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        existing_data = json.load(f)
-                except (json.JSONDecodeError, IOError) as e:
-                    logger.warning(f"既存データ読み込みエラー: {e}")
             
-            # データ更新
-            existing_data.update(data)
-            existing_data['last_updated'] = datetime.now().isoformat()
-            existing_data['user_id'] = user_id
+            def merge(existing_data: Dict[str, Any]) -> None:
+                # 既存データを更新（読み込み〜保存は他の書き込みと排他）
+                existing_data.update(data)
+                existing_data['last_updated'] = datetime.now().isoformat()
+                existing_data['user_id'] = user_id
             
-            # 保存
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(existing_data, f, ensure_ascii=False, indent=2)
+            self.user_repository.update_user(user_id, merge)
             
             logger.info(f"ユーザーデータ保存完了: {user_id}")
             return True
@@ -80,15 +76,10 @@ class DataManager:
         """
         try:
             user_id = self.get_user_id(session_id, user_name)
-            file_path = os.path.join(self.data_dir, f"{user_id}.json")
-            
-            if not os.path.exists(file_path):
-                return {}
+            data = self.user_repository.get_user(user_id)
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            logger.info(f"ユーザーデータ読み込み完了: {user_id}")
+            if data:
+                logger.info(f"ユーザーデータ読み込み完了: {user_id}")
             return data
             
         except Exception as e:
@@ -101,9 +92,9 @@ class DataManager:
         """
         try:
             user_id = self.get_user_id(session_id)
-            source_path = os.path.join(self.data_dir, f"{user_id}.json")
+            data = self.user_repository.get_user(user_id)
             
-            if not os.path.exists(source_path):
+            if not data:
                 return True  # データがない場合は成功とみなす
             
             # バックアップディレクトリ
@@ -115,9 +106,8 @@ class DataManager:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             backup_path = os.path.join(backup_dir, f"{user_id}_{timestamp}.json")
             
-            # バックアップ実行
-            import shutil
-            shutil.copy2(source_path, backup_path)
+            # バックアップ実行（保存先のバックエンドに関わらずJSONで書き出し）
+            write_json(backup_path, data)
             
             logger.info(f"ユーザーデータバックアップ完了: {backup_path}")
             return True
@@ -152,37 +142,187 @@ class DataManager:
         except Exception as e:
             logger.error(f"データエクスポートエラー: {e}")
             return None
+    
+    # ストリーミングCSV（/api/data/export?format=csv）の列: 学習履歴1件 = 1行
+    EXPORT_HISTORY_FIELDS = ('date', 'id', 'category', 'department', 'question_type', 'user_answer',
+                             'correct_answer', 'is_correct', 'elapsed', 'srs_level', 'is_review', 'difficulty')
+    
+    def iter_data_export(self, session_id: str, history_only: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        データエクスポートを1レコードずつ生成（NDJSON/CSVストリーミング用）
+        meta → history（1件毎） → srs → category_stats → bookmark の順。
+        history_only=True の場合は学習履歴行のみ（CSV用）
+        """
+        data = self.load_user_data(session_id)
+        if not data:
+            return
+        
+        history = data.get('history', [])
+        if not history_only:
+            yield {
+                'type': 'meta',
+                'export_date': datetime.now().isoformat(),
+                'user_id': self.get_user_id(session_id),
+                'total_questions': len(history),
+                'study_days': len(set(h.get('date', '')[:10] for h in history if h.get('date')))
+            }
+        
+        for entry in history:
+            yield entry if history_only else dict(entry, type='history')
+        
+        if history_only:
+            return
+        for question_id, srs in data.get('srs_data', {}).items():
+            yield dict(srs if isinstance(srs, dict) else {'value': srs}, type='srs', question_id=question_id)
+        for category, stats in data.get('category_stats', {}).items():
+            yield dict(stats if isinstance(stats, dict) else {'value': stats}, type='category_stats', category=category)
+        for bookmark in data.get('bookmarks', []):
+            yield {'type': 'bookmark', 'question_id': bookmark}
+
+class SaveQueue:
+    """
+    ユーザーデータ保存のライトビハインドキュー
+    同一ユーザーの保存は coalesce_window 秒の間に最新の1件へまとめ、バックグラウンドスレッドで書き出す
+    （リクエストはキュー投入のみで戻る）。プロセス終了時・flush() 呼び出し時に未保存分を書き出す
+    """
+    
+    def __init__(self, data_manager: DataManager, coalesce_window: float = None, max_pending: int = None):
+        self.data_manager = data_manager
+        self.coalesce_window = AutoSaveConfig.COALESCE_WINDOW if coalesce_window is None else coalesce_window
+        self.max_pending = AutoSaveConfig.MAX_PENDING_USERS if max_pending is None else max_pending
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # user_id → (期限, session_id, 保存データ, user_name)
+        self._pending: Dict[str, Tuple[float, str, Dict[str, Any], Optional[str]]] = {}
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stats = {'queued': 0, 'coalesced': 0, 'written': 0, 'failed': 0, 'max_delay_ms': 0.0}
+        atexit.register(self.flush)
+    
+    def submit(self, session_id: str, data: Dict[str, Any], user_name: str = None) -> bool:
+        """保存をキューに投入（同一ユーザーの未保存分は置き換え。期限は最初の投入から）"""
+        user_id = self.data_manager.get_user_id(session_id, user_name)
+        with self._lock:
+            previous = self._pending.get(user_id)
+            deadline = previous[0] if previous else time.monotonic() + self.coalesce_window
+            self._pending[user_id] = (deadline, session_id, data, user_name)
+            self._stats['queued'] += 1
+            if previous:
+                self._stats['coalesced'] += 1
+            overflow = len(self._pending) > self.max_pending
+        if overflow or not previous:
+            # 書き出しスレッドに次の期限（または即時書き出し）を再計算させる
+            self._wakeup.set()
+        self._ensure_thread()
+        return True
+    
+    def is_pending(self, session_id: str, user_name: str = None) -> bool:
+        with self._lock:
+            return self.data_manager.get_user_id(session_id, user_name) in self._pending
+    
+    def flush(self, session_id: str = None, user_name: str = None) -> int:
+        """未保存分を書き出し（session_id 指定時はそのユーザーのみ）。書き出した件数を返す"""
+        if session_id is None:
+            return self._write(due_only=False)
+        user_id = self.data_manager.get_user_id(session_id, user_name)
+        return self._write(due_only=False, user_ids=(user_id,))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, pending=len(self._pending), coalesce_window=self.coalesce_window)
+    
+    def _write(self, due_only: bool, user_ids=None) -> int:
+        # 書き出し中の同一ユーザーの再投入で古いデータが後から書かれないよう、書き出しは直列化
+        with self._write_lock:
+            now = time.monotonic()
+            with self._lock:
+                if user_ids is not None:
+                    targets = [user_id for user_id in user_ids if user_id in self._pending]
+                elif due_only and len(self._pending) <= self.max_pending:
+                    targets = [user_id for user_id, entry in self._pending.items() if entry[0] <= now]
+                else:
+                    targets = list(self._pending)
+                batch = [(user_id, self._pending.pop(user_id)) for user_id in targets]
+            
+            written = 0
+            for user_id, (deadline, session_id, data, user_name) in batch:
+                if self.data_manager.save_user_data(session_id, data, user_name):
+                    written += 1
+                else:
+                    self._stats['failed'] += 1
+                delay_ms = (time.monotonic() - deadline + self.coalesce_window) * 1000
+                self._stats['max_delay_ms'] = round(max(self._stats['max_delay_ms'], delay_ms), 1)
+            self._stats['written'] += written
+            return written
+    
+    def _ensure_thread(self) -> None:
+        # フォーク後の子プロセス（gunicornワーカー）では親のスレッドが存在しないため pid 毎に起動
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='session-save-queue', daemon=True)
+            self._thread.start()
+    
+    def _run(self) -> None:
+        while True:
+            # 最も早い期限まで待機（投入が無ければ coalesce_window 毎に確認）
+            with self._lock:
+                deadlines = [entry[0] for entry in self._pending.values()]
+            timeout = min(deadlines) - time.monotonic() if deadlines else self.coalesce_window
+            self._wakeup.wait(max(timeout, 0.01))
+            self._wakeup.clear()
+            try:
+                self._write(due_only=True)
+            except Exception as e:
+                logger.error(f"❌ 自動保存キュー書き出しエラー: {e}")
 
 # Flask拡張: セッション + ファイル保存の統合
 class SessionDataManager:
     """
     セッションとファイル保存を統合したデータ管理
+    保存は既定でライトビハインド（SaveQueue）。AUTO_SAVE_WRITE_BEHIND=false でリクエスト内の同期保存
     """
     
-    def __init__(self, data_manager: DataManager):
+    def __init__(self, data_manager: DataManager, write_behind: bool = None):
         self.data_manager = data_manager
+        if write_behind is None:
+            write_behind = AutoSaveConfig.WRITE_BEHIND
+        self.save_queue = SaveQueue(data_manager) if write_behind else None
     
     def save_session_data(self, session, session_id: str, user_name: str = None):
         """
         セッションデータをファイルに保存（企業環境対応）
         """
-        # 保存対象データの選択
+        # 保存対象データの選択（キュー投入後のセッション変更の影響を受けないようコンテナをコピー）
         save_data = {
             'user_name': user_name or session.get('user_name', ''),
-            'history': session.get('history', []),
-            'srs_data': session.get('srs_data', {}),
-            'category_stats': session.get('category_stats', {}),
-            'bookmarks': session.get('bookmarks', []),
+            'history': list(session.get('history', [])),
+            'srs_data': dict(session.get('srs_data', {})),
+            'category_stats': dict(session.get('category_stats', {})),
+            'bookmarks': list(session.get('bookmarks', [])),
             'last_updated': datetime.now().isoformat()
         }
         
         # LocalStorageデータは含めない（クライアント側で管理）
+        if self.save_queue is not None:
+            return self.save_queue.submit(session_id, save_data, user_name)
         return self.data_manager.save_user_data(session_id, save_data, user_name)
     
+    def flush(self) -> int:
+        """未保存のセッションデータを全て書き出し（ワーカー終了時など）"""
+        return self.save_queue.flush() if self.save_queue is not None else 0
+    
     def load_session_data(self, session, session_id: str, user_name: str = None):
         """
         ファイルからセッションデータを復元（企業環境対応）
         """
+        # キューに未保存分があれば先に書き出し（保存直後の復元で古いデータを読まない）
+        if self.save_queue is not None:
+            self.save_queue.flush(session_id, user_name)
         data = self.data_manager.load_user_data(session_id, user_name)
         
         if data:
@@ -222,57 +362,10 @@ class EnterpriseUserManager:
     
     def get_all_users(self) -> Dict[str, Dict[str, Any]]:
         """
-        全ユーザーの一覧と基本統計を取得
+        全ユーザーの一覧と基本統計を取得（sqlite バックエンドでは1回の集約クエリ）
         """
         try:
-            users = {}
-            data_dir = self.data_manager.data_dir
-            
-            if not os.path.exists(data_dir):
-                return users
-            
-            # 全てのユーザーデータファイルを確認
-            for filename in os.listdir(data_dir):
-                if filename.endswith('.json') and not filename.startswith('backup'):
-                    file_path = os.path.join(data_dir, filename)
-                    
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                        
-                        user_id = filename[:-5]  # .json を除去
-                        user_name = data.get('user_name', f'ユーザー_{user_id[:8]}')
-                        
-                        # 基本統計計算
-                        history = data.get('history', [])
-                        total_questions = len(history)
-                        correct_answers = sum(1 for h in history if h.get('is_correct', False))
-                        accuracy = (correct_answers / total_questions * 100) if total_questions > 0 else 0
-                        
-                        # 学習日数計算
-                        study_dates = set()
-                        for h in history:
-                            if h.get('timestamp'):
-                                date_str = h['timestamp'][:10]
-                                study_dates.add(date_str)
-                        
-                        users[user_id] = {
-                            'user_name': user_name,
-                            'total_questions': total_questions,
-                            'correct_answers': correct_answers,
-                            'accuracy': round(accuracy, 1),
-                            'study_days': len(study_dates),
-                            'last_study': data.get('last_updated', '未記録'),
-                            'srs_questions': len(data.get('srs_data', {})),
-                            'bookmarks': len(data.get('bookmarks', []))
-                        }
-                        
-                    except Exception as e:
-                        logger.error(f"ユーザーファイル読み込みエラー {filename}: {e}")
-                        continue
-            
-            return users
-            
+            return self.data_manager.user_repository.user_summaries()
         except Exception as e:
             logger.error(f"全ユーザー取得エラー: {e}")
             return {}
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent Disk Cache - cache_data/*.cache の永続キャッシュ管理
+
+再起動やワーカー再生成をまたいで計算済みデータ（解析済み問題コーパス・
+集計結果・描画済みフラグメント）を保持し、コールドワーカーを再計算ではなく
+ディスクから温める。
+
+- アトミック書き込み（同一ディレクトリの一時ファイル + fsync + os.replace）
+- SHA-256チェックサムによる整合性検証（破損エントリは自動削除）
+- 容量上限とLRUコンパクション（最終アクセス = ファイルmtime）
+- インデックスファイル（index.json）でファイルを開かずに一覧・期限判定
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config import DiskCacheConfig
+from json_store import file_lock
+
+logger = logging.getLogger(__name__)
+
+# エントリファイル形式: MAGIC + sha256(hex) + 改行 + pickleペイロード
+_MAGIC = b"RCCMCACHE1\n"
+_CHECKSUM_LENGTH = 64
+_HEADER_LENGTH = len(_MAGIC) + _CHECKSUM_LENGTH + 1
+
+
+class PersistentDiskCache:
+    """チェックサム・容量上限付きのディスクキャッシュ"""
+
+    INDEX_FILENAME = 'index.json'
+    ENTRY_SUFFIX = '.cache'
+
+    def __init__(self, cache_dir: str = None, max_size_mb: int = None,
+                 default_ttl: int = None):
+        self.cache_dir = cache_dir or DiskCacheConfig.CACHE_DIR
+        self.max_size_bytes = int((max_size_mb or DiskCacheConfig.MAX_SIZE_MB) * 1024 * 1024)
+        self.default_ttl = default_ttl if default_ttl is not None else DiskCacheConfig.DEFAULT_TTL
+        self._lock = threading.RLock()
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'corrupted': 0, 'compactions': 0}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    # === パス・インデックス ===
+
+    @staticmethod
+    def _entry_id(key: str) -> str:
+        return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, entry_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{entry_id}{self.ENTRY_SUFFIX}")
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.cache_dir, self.INDEX_FILENAME)
+
+    def _read_index_entries(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """index.json のエントリ（欠損は {}、破損・形式不正は None）"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ ディスクキャッシュindex読み込み失敗: {e}")
+            return None
+        if isinstance(index, dict) and isinstance(index.get('entries'), dict):
+            return index['entries']
+        logger.warning("⚠️ ディスクキャッシュindex形式不正")
+        return None
+
+    def _load_index(self) -> None:
+        """インデックス読み込み（欠損・破損時はディレクトリ走査で再構築）"""
+        entries = self._read_index_entries() if os.path.exists(self.index_path) else None
+        if entries is not None:
+            self._index = entries
+            return
+        self.rebuild_index()
+
+    def _save_index(self) -> None:
+        """
+        インデックスをアトミックに保存
+        他ワーカーが保存したエントリを上書きで失わないよう、ファイルロック下でディスク上の
+        インデックスとマージする（エントリファイルが残っているもののみ。削除済みは取り込まない）
+        """
+        with file_lock(self.index_path):
+            for entry_id, meta in (self._read_index_entries() or {}).items():
+                current = self._index.get(entry_id)
+                if current is not None and current.get('created_at', 0) >= meta.get('created_at', 0):
+                    continue
+                if isinstance(meta, dict) and os.path.exists(self._entry_path(entry_id)):
+                    self._index[entry_id] = meta
+            payload = json.dumps({'version': 1, 'updated_at': time.time(), 'entries': self._index},
+                                 ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            self._atomic_write(self.index_path, payload)
+
+    def _atomic_write(self, path: str, payload: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.tmp_', suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def rebuild_index(self) -> int:
+        """エントリファイルのヘッダーとペイロードを検証してインデックスを再構築"""
+        with self._lock:
+            self._index = {}
+            for filename in os.listdir(self.cache_dir):
+                if not filename.endswith(self.ENTRY_SUFFIX):
+                    continue
+                entry_id = filename[:-len(self.ENTRY_SUFFIX)]
+                record = self._read_record(entry_id)
+                if record is None:
+                    continue
+                self._index[entry_id] = self._meta_from_record(record, self._entry_path(entry_id))
+            self._save_index()
+            logger.info(f"💾 ディスクキャッシュindex再構築: {len(self._index)}件")
+            return len(self._index)
+
+    # === エントリ読み書き ===
+
+    @staticmethod
+    def _meta_from_record(record: Dict[str, Any], path: str) -> Dict[str, Any]:
+        return {
+            'key': record['key'],
+            'size': os.path.getsize(path),
+            'created_at': record['created_at'],
+            'expires_at': record['expires_at'],
+        }
+
+    def _read_record(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        """エントリを読み込み検証（不正なファイルは削除してNone）"""
+        path = self._entry_path(entry_id)
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"⚠️ ディスクキャッシュ読み込み失敗: {path} - {e}")
+            return None
+
+        header, payload = raw[:_HEADER_LENGTH], raw[_HEADER_LENGTH:]
+        checksum = header[len(_MAGIC):len(_MAGIC) + _CHECKSUM_LENGTH].decode('ascii', 'replace')
+        if not header.startswith(_MAGIC) or hashlib.sha256(payload).hexdigest() != checksum:
+            self._discard(entry_id, reason='checksum mismatch')
+            return None
+
+        try:
+            record = pickle.loads(payload)
+        except Exception as e:
+            self._discard(entry_id, reason=f'unpickle failed: {e}')
+            return None
+        if not isinstance(record, dict) or 'data' not in record:
+            self._discard(entry_id, reason='invalid record')
+            return None
+        return record
+
+    def _discard(self, entry_id: str, reason: str = '') -> None:
+        try:
+            os.unlink(self._entry_path(entry_id))
+        except OSError:
+            pass
+        self._index.pop(entry_id, None)
+        if reason == 'expired':
+            logger.debug(f"🗑️ ディスクキャッシュ期限切れ: {entry_id}")
+        else:
+            self.stats['corrupted'] += 1
+            logger.warning(f"🗑️ ディスクキャッシュエントリ破棄: {entry_id} ({reason})")
+
+    def get(self, key: str) -> Optional[Any]:
+        """キャッシュ取得（期限切れ・破損はミス扱い）"""
+        entry_id = self._entry_id(key)
+        with self._lock:
+            meta = self._index.get(entry_id)
+            if meta is not None and meta.get('expires_at') and meta['expires_at'] < time.time():
+                self._discard(entry_id, reason='expired')
+                self.stats['misses'] += 1
+                return None
+
+            record = self._read_record(entry_id)
+            if record is None or record.get('key') != key:
+                self.stats['misses'] += 1
+                return None
+            if record.get('expires_at') and record['expires_at'] < time.time():
+                self._discard(entry_id, reason='expired')
+                self.stats['misses'] += 1
+                return None
+
+            # LRU: 最終アクセスをmtimeに記録
+            try:
+                os.utime(self._entry_path(entry_id))
+            except OSError:
+                pass
+            self.stats['hits'] += 1
+            return record['data']
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """キャッシュ保存（容量超過時はLRUコンパクション）"""
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.time()
+        record = {
+            'key': key,
+            'data': value,
+            'created_at': now,
+            'expires_at': now + ttl if ttl else None,
+        }
+        try:
+            payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"⚠️ ディスクキャッシュ直列化失敗: {key} - {e}")
+            return False
+
+        entry_id = self._entry_id(key)
+        checksum = hashlib.sha256(payload).hexdigest().encode('ascii')
+        try:
+            with self._lock:
+                self._atomic_write(self._entry_path(entry_id), _MAGIC + checksum + b"\n" + payload)
+                self._index[entry_id] = {
+                    'key': key,
+                    'size': _HEADER_LENGTH + len(payload),
+                    'created_at': record['created_at'],
+                    'expires_at': record['expires_at'],
+                }
+                self.stats['writes'] += 1
+                if self.total_size() > self.max_size_bytes:
+                    self.compact(keep=entry_id)
+                else:
+                    self._save_index()
+            logger.debug(f"💾 ディスクキャッシュ保存: {key} ({len(payload)} bytes)")
+            return True
+        except OSError as e:
+            logger.error(f"❌ ディスクキャッシュ書き込み失敗: {key} - {e}")
+            return False
+
+    def delete(self, key: str) -> bool:
+        entry_id = self._entry_id(key)
+        with self._lock:
+            existed = entry_id in self._index
+            try:
+                os.unlink(self._entry_path(entry_id))
+                existed = True
+            except OSError:
+                pass
+            self._index.pop(entry_id, None)
+            self._save_index()
+            return existed
+
+    def get_or_compute(self, key: str, compute_func: Callable[[], Any],
+                       ttl: Optional[int] = None) -> Any:
+        """ディスクにあれば読み込み、なければ計算して保存"""
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = compute_func()
+        if value:
+            self.set(key, value, ttl)
+        return value
+
+    # === 保守 ===
+
+    def total_size(self) -> int:
+        return sum(meta.get('size', 0) for meta in self._index.values())
+
+    def compact(self, target_ratio: float = None, keep: Optional[str] = None) -> int:
+        """
+        期限切れ・孤立ファイルを削除し、容量が上限のtarget_ratio以下になるまで
+        最終アクセスの古い順に削除する（keep のエントリIDは削除しない: set() 直後の書き込み分）
+        """
+        target_ratio = target_ratio or DiskCacheConfig.COMPACTION_TARGET_RATIO
+        removed = 0
+        now = time.time()
+        with self._lock:
+            entries = []
+            for filename in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, filename)
+                if filename.startswith('.tmp_'):
+                    # 中断された書き込みの残骸
+                    if now - os.path.getmtime(path) > 60:
+                        os.unlink(path)
+                    continue
+                if not filename.endswith(self.ENTRY_SUFFIX):
+                    continue
+                entry_id = filename[:-len(self.ENTRY_SUFFIX)]
+                meta = self._index.get(entry_id)
+                if meta is None:
+                    # 他ワーカーが書き込んだエントリはインデックスに取り込む
+                    record = self._read_record(entry_id)
+                    if record is None:
+                        continue
+                    meta = self._index[entry_id] = self._meta_from_record(record, path)
+                if meta.get('expires_at') and meta['expires_at'] < now:
+                    os.unlink(path)
+                    self._index.pop(entry_id, None)
+                    removed += 1
+                    continue
+                entries.append((os.path.getmtime(path), entry_id))
+
+            # インデックスのみに残っているエントリを除去
+            live_ids = {entry_id for _, entry_id in entries}
+            for entry_id in [e for e in self._index if e not in live_ids]:
+                del self._index[entry_id]
+
+            target_size = self.max_size_bytes * target_ratio
+            for _, entry_id in sorted(entries):
+                if self.total_size() <= target_size:
+                    break
+                if entry_id == keep:
+                    continue
+                try:
+                    os.unlink(self._entry_path(entry_id))
+                except OSError:
+                    pass
+                self._index.pop(entry_id, None)
+                removed += 1
+
+            self.stats['compactions'] += 1
+            self._save_index()
+
+        if removed:
+            logger.info(f"🧹 ディスクキャッシュコンパクション: {removed}件削除 "
+                        f"(残り{len(self._index)}件 / {self.total_size()} bytes)")
+        return removed
+
+    def verify(self) -> Dict[str, int]:
+        """全エントリのチェックサム検証（破損ファイルは削除）"""
+        with self._lock:
+            checked = 0
+            corrupted_before = self.stats['corrupted']
+            for entry_id in list(self._index):
+                checked += 1
+                self._read_record(entry_id)
+            self._save_index()
+            return {'checked': checked, 'corrupted': self.stats['corrupted'] - corrupted_before}
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return [meta['key'] for meta in self._index.values()]
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry_id in list(self._index):
+                try:
+                    os.unlink(self._entry_path(entry_id))
+                except OSError:
+                    pass
+            self._index = {}
+            self._save_index()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self._index),
+                'size_bytes': self.total_size(),
+                'max_size_bytes': self.max_size_bytes,
+                'hit_rate': self.stats['hits'] / total if total else 0.0,
+                'cache_dir': self.cache_dir,
+            }
+
+
+def files_fingerprint(paths: Iterable[str]) -> str:
+    """ファイル群の名前・サイズ・更新時刻から版数キーを生成"""
+    digest = hashlib.md5()
+    for path in sorted(paths):
+        try:
+            stat = os.stat(path)
+            digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode('utf-8'))
+        except OSError:
+            digest.update(f"{os.path.basename(path)}:missing;".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+# グローバルディスクキャッシュ
+_disk_cache = None
+_disk_cache_lock = threading.Lock()
+
+
+def get_disk_cache() -> Optional[PersistentDiskCache]:
+    """グローバルディスクキャッシュ取得（無効化時・初期化失敗時はNone）"""
+    global _disk_cache
+    if not DiskCacheConfig.ENABLED:
+        return None
+    if _disk_cache is None:
+        with _disk_cache_lock:
+            if _disk_cache is None:
+                try:
+                    _disk_cache = PersistentDiskCache()
+                except OSError as e:
+                    logger.warning(f"⚠️ ディスクキャッシュ初期化失敗 - 無効化して継続: {e}")
+                    return None
+    return _disk_cache
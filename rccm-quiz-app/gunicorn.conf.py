@@ -12,9 +12,23 @@ bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
 backlog = 2048
 
 # 🔧 Worker processes
-workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
-worker_class = "sync"
-worker_connections = 1000
+# GUNICORN_WORKER_CLASS: sync（既定） / gthread（スレッド並行） / gevent（協調型非同期・要gevent）
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync').lower()
+if worker_class == 'gevent':
+    try:
+        from gevent import monkey
+        monkey.patch_all()
+    except ImportError:
+        # geventが未導入の環境ではgthreadで代替
+        worker_class = 'gthread'
+
+# gthread: ワーカー毎のスレッド数（syncでは1固定）
+threads = int(os.environ.get('GUNICORN_THREADS', 4 if worker_class == 'gthread' else 1))
+
+# スレッド/非同期ワーカーは1プロセスで並行処理するためプロセス数を抑えてメモリを節約
+_default_workers = multiprocessing.cpu_count() * 2 + 1 if worker_class == 'sync' else multiprocessing.cpu_count() + 1
+workers = int(os.environ.get('GUNICORN_WORKERS', _default_workers))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
 timeout = 30
 keepalive = 60
 
@@ -49,7 +63,8 @@ secure_scheme_headers = {
 
 def when_ready(server):
     """Called just after the server is started."""
-    server.log.info("🚀 RCCM Quiz Application server is ready. Workers: %s", workers)
+    server.log.info("🚀 RCCM Quiz Application server is ready. Workers: %s (%s, threads=%s)",
+                    workers, worker_class, threads)
 
 def worker_int(worker):
     """Called when a worker receives the SIGINT or QUIT signal."""
@@ -66,6 +81,24 @@ def post_fork(server, worker):
 def post_worker_init(worker):
     """Called just after a worker has initialized the application."""
     worker.log.info("Worker initialized")
+    # 🔥 キャッシュウォームアップ開始（スレッドはフォークを跨げないため各ワーカーで起動）
+    try:
+        from app import start_cache_warmup
+        if start_cache_warmup():
+            worker.log.info("Cache warm-up started (pid: %s)", worker.pid)
+    except Exception as e:
+        worker.log.warning("Cache warm-up could not be started: %s", e)
+
+def worker_exit(server, worker):
+    """Called just after a worker has been exited, in the worker process."""
+    # 💾 ライトビハインド保存・バッチ書き込みの未反映分をディスクへ
+    try:
+        from app import flush_pending_writes
+        flushed = flush_pending_writes()
+        if flushed:
+            worker.log.info("Flushed %s pending writes (pid: %s)", flushed, worker.pid)
+    except Exception as e:
+        worker.log.warning("Pending writes could not be flushed: %s", e)
 
 def worker_abort(worker):
     """Called when a worker receives the SIGABRT signal."""
@@ -79,7 +112,7 @@ if os.environ.get('FLASK_ENV') == 'development':
     loglevel = 'debug'
 elif os.environ.get('RENDER'):
     # Render.com specific settings
-    workers = 2  # Render has memory limits
+    workers = int(os.environ.get('GUNICORN_WORKERS', 2))  # Render has memory limits
     timeout = 120
     keepalive = 30
     max_requests = 500
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON Store - ファイル保存（user_data / social_data / api_data）の安全な読み書き
+
+- write_json: 同一ディレクトリの一時ファイル → fsync → os.replace（読み手は常に完全なファイルを見る）
+- file_lock: <dir>/.locks/<file>.lock への fcntl.flock（プロセス間）+ スレッドロック（プロセス内）
+  同一スレッドでは再入可。fcntl の無い環境ではプロセス内ロックのみ
+- update_json: ロック内で 読み込み → 変更 → 書き込み（並行する read-modify-write の更新消失を防止）
+- 既定はコンパクト形式（インデントなし）。JSON_STORE_INDENT で整形出力に戻せる
+- BatchedJSONWriter: 同一ファイルへの更新（変更関数）を溜め、一定間隔・件数毎に
+  1回のロック・1回の読み書きにまとめて反映（APIキー使用統計など高頻度の小さな更新用）
+"""
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from config import JSONStoreConfig
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+LOCK_DIRNAME = '.locks'
+
+_stats = {'writes': 0, 'bytes_written': 0, 'lock_waits': 0, 'batched_updates': 0, 'batch_flushes': 0}
+
+
+# === ロック ===
+
+class _PathLock:
+    """1ファイル分のロック（スレッドロック + flock。depth はスレッドロック保持中のみ変更）"""
+
+    __slots__ = ('thread_lock', 'fd', 'depth')
+
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.fd: Optional[int] = None
+        self.depth = 0
+
+
+_path_locks: Dict[str, _PathLock] = {}
+_path_locks_lock = threading.Lock()
+
+
+def _lock_path(path: str) -> str:
+    directory, name = os.path.split(path)
+    return os.path.join(directory, LOCK_DIRNAME, name + '.lock')
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """ファイル単位の排他ロック（アドバイザリ。ロックファイルは削除しない）"""
+    path = os.path.abspath(path)
+    with _path_locks_lock:
+        lock = _path_locks.get(path)
+        if lock is None:
+            lock = _path_locks[path] = _PathLock()
+
+    if not lock.thread_lock.acquire(blocking=False):
+        _stats['lock_waits'] += 1
+        lock.thread_lock.acquire()
+    try:
+        lock.depth += 1
+        if lock.depth == 1 and fcntl is not None:
+            lock_path = _lock_path(path)
+            os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                _stats['lock_waits'] += 1
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except OSError:
+                os.close(fd)
+                raise
+            lock.fd = fd
+        yield
+    finally:
+        lock.depth -= 1
+        if lock.depth == 0 and lock.fd is not None:
+            fd, lock.fd = lock.fd, None
+            try:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+        lock.thread_lock.release()
+
+
+# === 読み書き ===
+
+def dumps(data: Any, indent: Optional[int] = None) -> str:
+    """保存形式（既定はコンパクト。indent 指定時は整形）"""
+    if indent is None:
+        indent = JSONStoreConfig.INDENT
+    if indent:
+        return json.dumps(data, ensure_ascii=False, indent=indent)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def write_json(path: str, data: Any, indent: Optional[int] = None) -> None:
+    """アトミック書き込み（一時ファイル + fsync + os.replace。既存ファイルの権限を維持）"""
+    payload = dumps(data, indent).encode('utf-8')
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    try:
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            if JSONStoreConfig.FSYNC:
+                f.flush()
+                os.fsync(f.fileno())
+        # mkstemp は 0600 で作成する（os.fchmod は Windows に無いためパスで指定）
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _stats['writes'] += 1
+    _stats['bytes_written'] += len(payload)
+
+
+def read_json(path: str, default: Any) -> Any:
+    """JSON読み込み（無い・壊れている場合は default。置換は原子的なので読み取りにロック不要）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError) as e:
+        logger.warning(f"JSONファイル読み込みエラー {path}: {type(e).__name__}: {e}")
+        return default
+
+
+def update_json(path: str, mutator: Callable[[Any], Any], default_factory: Callable[[], Any] = dict) -> Any:
+    """ロック内で読み込み → mutator(data) → 書き込み。mutator の戻り値を返す"""
+    with file_lock(path):
+        data = read_json(path, None)
+        if data is None:
+            data = default_factory()
+        result = mutator(data)
+        write_json(path, data)
+        return result
+
+
+# === バッチ書き込み ===
+
+class BatchedJSONWriter:
+    """
+    ファイル毎に変更関数を溜めて一括反映
+
+    submit() は即座に戻り、flush_interval 秒毎（またはファイル毎に max_pending 件溜まった時点）に
+    ロック1回・読み書き1回で全ての変更を適用する。プロセス終了時にも未反映分を書き出す。
+    """
+
+    def __init__(self, flush_interval: float = None, max_pending: int = None):
+        self.flush_interval = JSONStoreConfig.FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.max_pending = JSONStoreConfig.MAX_PENDING if max_pending is None else max_pending
+        self._lock = threading.Lock()
+        # path → [(変更関数, 反映失敗時のコールバック)]
+        self._pending: Dict[str, List[Tuple[Callable[[Any], Any], Optional[Callable[[Exception], None]]]]] = {}
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        atexit.register(self.flush)
+
+    def submit(self, path: str, mutator: Callable[[Any], Any],
+               on_error: Optional[Callable[[Exception], None]] = None) -> None:
+        """
+        変更関数を登録。反映（ロック取得・読み書き・変更関数）が失敗したバッチは破棄され、
+        on_error(例外) が呼ばれる（呼び出し側で未反映分の再登録等を行う）
+        """
+        with self._lock:
+            pending = self._pending.setdefault(path, [])
+            pending.append((mutator, on_error))
+            full = len(pending) >= self.max_pending
+        _stats['batched_updates'] += 1
+        if full or self.flush_interval <= 0:
+            self.flush(path)
+        else:
+            self._ensure_thread()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(len(mutators) for mutators in self._pending.values())
+
+    def flush(self, path: Optional[str] = None) -> int:
+        """未反映の変更を書き出し（path 指定時はそのファイルのみ）。反映した変更数を返す"""
+        with self._lock:
+            if path is None:
+                batches, self._pending = self._pending, {}
+            else:
+                batches = {path: self._pending.pop(path)} if path in self._pending else {}
+        applied = 0
+        for target, mutators in batches.items():
+            try:
+                update_json(target, lambda data: [mutator(data) for mutator, _ in mutators])
+                applied += len(mutators)
+                _stats['batch_flushes'] += 1
+            except Exception as e:
+                logger.error(f"❌ バッチ書き込みエラー {target} ({len(mutators)}件): {e}")
+                for _, on_error in mutators:
+                    if on_error is None:
+                        continue
+                    try:
+                        on_error(e)
+                    except Exception as callback_error:
+                        logger.error(f"❌ バッチ書き込み失敗通知エラー {target}: {callback_error}")
+        return applied
+
+    def _ensure_thread(self) -> None:
+        # フォーク後の子プロセスでは親のスレッドが存在しないため pid 毎に起動
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='json-store-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+_batched_writer: Optional[BatchedJSONWriter] = None
+_batched_writer_lock = threading.Lock()
+
+
+def get_batched_writer() -> BatchedJSONWriter:
+    """プロセス共有のバッチライター"""
+    global _batched_writer
+    if _batched_writer is None:
+        with _batched_writer_lock:
+            if _batched_writer is None:
+                _batched_writer = BatchedJSONWriter()
+    return _batched_writer
+
+
+def get_json_store_stats() -> Dict[str, Any]:
+    stats = dict(_stats, fcntl=fcntl is not None)
+    if _batched_writer is not None:
+        stats['pending_updates'] = _batched_writer.pending_count()
+    return stats
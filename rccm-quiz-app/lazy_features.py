@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lazy Features - 機能モジュールの遅延読み込み（URLプレフィックス単位）
+
+- 起動時は機能モジュール（AI分析・ソーシャル・管理画面・企業API等）をインポートしない
+- 登録したURLプレフィックスへの最初のリクエスト時に該当モジュールのみ読み込む
+- 読み込み済みオブジェクトは on_load コールバックで呼び出し側のグローバル変数等に束縛
+- 読み込み時間・失敗は get_stats() で確認可能
+- Blueprint からは lazy_feature('名前') の代理オブジェクト経由で参照（初回属性アクセス時に解決）
+"""
+
+import importlib
+import importlib.util
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def path_matches_prefix(path: str, prefix: str) -> bool:
+    """'/social' は '/social' と '/social/...' に一致（'/social_learning' には一致しない）"""
+    prefix = prefix.rstrip('/')
+    return path == prefix or path.startswith(prefix + '/')
+
+
+class LazyFeature:
+    """遅延読み込みされる機能モジュール1件"""
+
+    def __init__(self, name: str, module: str, attr: Optional[str] = None,
+                 url_prefixes: Iterable[str] = (), on_load: Optional[Callable[[str, Any], None]] = None):
+        self.name = name
+        self.module = module
+        self.attr = attr
+        self.url_prefixes = tuple(url_prefixes)
+        self.on_load = on_load
+        self.value = None
+        self.loaded = False
+        self.load_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self.trigger: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        """モジュールが存在するか（インポートせずに判定）"""
+        try:
+            return importlib.util.find_spec(self.module) is not None
+        except (ImportError, ValueError):
+            return False
+
+    def load(self, trigger: Optional[str] = None) -> Any:
+        if self.loaded:
+            return self.value
+        with self._lock:
+            if self.loaded:  # Double-check
+                return self.value
+            start = time.perf_counter()
+            try:
+                module = importlib.import_module(self.module)
+                value = getattr(module, self.attr) if self.attr else module
+            except Exception as e:
+                self.error = str(e)
+                logger.error(f"❌ 機能モジュール読み込み失敗 ({self.name}): {e}")
+                raise
+            self.load_ms = round((time.perf_counter() - start) * 1000, 2)
+            self.trigger = trigger
+            self.value = value
+            self.error = None
+            if self.on_load:
+                self.on_load(self.name, value)
+            self.loaded = True
+            logger.info(f"🔄 機能モジュール遅延読み込み: {self.name} ({self.load_ms}ms, trigger={trigger or 'direct'})")
+            return value
+
+    def replace(self, value: Any) -> None:
+        """読み込み済みオブジェクトを差し替え（管理画面のデータ更新など）"""
+        with self._lock:
+            self.value = value
+            if self.on_load:
+                self.on_load(self.name, value)
+            self.loaded = True
+
+    def matches(self, path: str) -> bool:
+        return any(path_matches_prefix(path, prefix) for prefix in self.url_prefixes)
+
+
+class LazyFeatureRegistry:
+    """URLプレフィックス → 機能モジュールの遅延読み込み表"""
+
+    def __init__(self):
+        self._features: Dict[str, LazyFeature] = {}
+
+    def register(self, name: str, module: str, attr: Optional[str] = None,
+                 url_prefixes: Iterable[str] = (),
+                 on_load: Optional[Callable[[str, Any], None]] = None) -> LazyFeature:
+        feature = LazyFeature(name, module, attr, url_prefixes, on_load)
+        self._features[name] = feature
+        return feature
+
+    def get(self, name: str) -> Any:
+        """機能オブジェクトを取得（未読み込みならここで読み込み）"""
+        return self._features[name].load()
+
+    def load(self, name: str, trigger: Optional[str] = None) -> Any:
+        return self._features[name].load(trigger)
+
+    def replace(self, name: str, value: Any) -> None:
+        self._features[name].replace(value)
+
+    def load_all(self) -> Dict[str, Any]:
+        """全機能を読み込み（失敗した機能は除外してログのみ）"""
+        loaded = {}
+        for name, feature in self._features.items():
+            try:
+                loaded[name] = feature.load(trigger='load_all')
+            except Exception:
+                continue
+        return loaded
+
+    def load_for_path(self, path: str) -> List[str]:
+        """パスに対応する未読み込みの機能を読み込み、読み込んだ機能名を返す"""
+        newly_loaded = []
+        for name, feature in self._features.items():
+            if feature.loaded or not feature.matches(path):
+                continue
+            try:
+                feature.load(trigger=path)
+                newly_loaded.append(name)
+            except Exception:
+                # ビュー側の可用性チェック・エラーハンドリングに委ねる
+                continue
+        return newly_loaded
+
+    def is_loaded(self, name: str) -> bool:
+        feature = self._features.get(name)
+        return bool(feature and feature.loaded)
+
+    def is_available(self, name: str) -> bool:
+        feature = self._features.get(name)
+        return bool(feature and feature.is_available())
+
+    def init_app(self, app) -> None:
+        """最初のリクエスト時に対応機能を読み込む before_request フックを登録"""
+        app.before_request(self._before_request)
+        app.extensions['lazy_features'] = self
+
+    def _before_request(self):
+        from flask import request
+
+        self.load_for_path(request.path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        features = {
+            name: {
+                'module': feature.module,
+                'loaded': feature.loaded,
+                'load_ms': feature.load_ms,
+                'trigger': feature.trigger,
+                'error': feature.error,
+                'url_prefixes': list(feature.url_prefixes),
+            }
+            for name, feature in self._features.items()
+        }
+        return {
+            'registered': len(features),
+            'loaded': sum(1 for f in features.values() if f['loaded']),
+            'total_load_ms': round(sum(f['load_ms'] or 0 for f in features.values()), 2),
+            'features': features,
+        }
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._features
+
+    def __len__(self) -> int:
+        return len(self._features)
+
+
+class LazyFeatureProxy:
+    """current_app の遅延読み込み表から機能オブジェクトを解決する代理オブジェクト"""
+
+    __slots__ = ('_feature_name',)
+
+    def __init__(self, name: str):
+        object.__setattr__(self, '_feature_name', name)
+
+    def _resolve(self) -> Any:
+        from flask import current_app
+
+        return current_app.extensions['lazy_features'].get(self._feature_name)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._resolve(), attr)
+
+    def __repr__(self) -> str:
+        return f"<LazyFeatureProxy {self._feature_name}>"
+
+
+def lazy_feature(name: str) -> LazyFeatureProxy:
+    """Blueprint モジュール用: インポート時には読み込まず、リクエスト処理中に解決"""
+    return LazyFeatureProxy(name)
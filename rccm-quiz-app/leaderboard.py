@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Materialized Leaderboard - 部門×期間のリーダーボードを常時ソート済みで保持
+
+- ユーザー毎に (部門, 日) 単位の回答数・正答数（ロールアップ）をメモリに保持
+- リーダーボード（部門×期間）は初回参照時にロールアップから構築し、
+  以降は回答保存（UserRepository.save_user の通知）毎に該当ユーザーの行だけを再計算して
+  ソート済みリストへ二分探索で差し替える
+- 他プロセス（gunicornワーカー）の更新はリポジトリの版数で検出し、
+  sqlite では更新ユーザーのみ、json では一定間隔で全件を再読込
+- 期間の区切りは日単位（「過去30日」は30日前の0時以降）。日付が変わるとビューを作り直す
+"""
+
+import logging
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import LeaderboardConfig
+from user_store import RepositoryView, UserRepository, rollup_history
+
+logger = logging.getLogger(__name__)
+
+# 期間 → 日数（それ以外は全期間）
+PERIOD_DAYS = {'week': 7, 'month': 30, 'year': 365}
+
+Rollup = Tuple[Optional[str], Optional[str], int, int, int]  # (部門, 日, 回答数, 正答数, 最初の履歴番号)
+
+
+class _LeaderboardView:
+    """部門×期間1件分のリーダーボード（ユーザー毎の行 + スコア降順のキー）"""
+
+    __slots__ = ('department', 'cutoff_day', 'rows', 'order')
+
+    def __init__(self, department: Optional[str], cutoff_day: Optional[str]):
+        self.department = department
+        self.cutoff_day = cutoff_day
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self.order: List[Tuple[float, str]] = []  # (-score, user_id) 昇順 = スコア降順・同点はユーザーID順
+
+    def remove(self, user_id: str) -> None:
+        row = self.rows.pop(user_id, None)
+        if row is not None:
+            key = (-row['score'], user_id)
+            index = bisect_left(self.order, key)
+            if index < len(self.order) and self.order[index] == key:
+                del self.order[index]
+
+    def put(self, user_id: str, row: Optional[Dict[str, Any]]) -> None:
+        self.remove(user_id)
+        if row is not None:
+            self.rows[user_id] = row
+            insort(self.order, (-row['score'], user_id))
+
+
+class MaterializedLeaderboard(RepositoryView):
+    """リーダーボードのマテリアライズドビュー（SocialLearningManager から利用）"""
+
+    def __init__(self, repository: UserRepository, score_func: Callable[[int, int, int], float],
+                 refresh_interval: int = None):
+        super().__init__(repository, LeaderboardConfig.REFRESH_INTERVAL if refresh_interval is None else refresh_interval)
+        self.score_func = score_func
+        self._rollups: Dict[str, List[Rollup]] = {}
+        self._views: Dict[Tuple[Optional[str], Optional[int]], _LeaderboardView] = {}
+        self._view_day: Optional[str] = None
+
+    # --- 参照 ---
+
+    def top(self, department: str = None, time_period: str = 'month', limit: int = 50) -> List[Dict[str, Any]]:
+        """スコア上位 limit 件（rank 付き）"""
+        with self._lock:
+            today = datetime.now().strftime('%Y-%m-%d')
+            if today != self._view_day:
+                self._views.clear()
+                self._view_day = today
+            self._sync()
+            view = self._view(department or None, PERIOD_DAYS.get(time_period))
+            self._stats['reads'] += 1
+            results = []
+            for rank, (_, user_id) in enumerate(view.order[:limit], 1):
+                row = dict(view.rows[user_id])
+                row['rank'] = rank
+                results.append(row)
+            return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(super().get_stats(), users=len(self._rollups), views=len(self._views))
+
+    # --- 差分更新（RepositoryView） ---
+
+    def _load_all(self) -> None:
+        rollups: Dict[str, List[Rollup]] = {}
+        for user_id, *rollup in self.repository.answer_rollups():
+            rollups.setdefault(user_id, []).append(tuple(rollup))
+        self._rollups = rollups
+        self._views.clear()
+
+    def _reload_user(self, user_id: str) -> None:
+        self._set_user(user_id, [row[1:] for row in self.repository.answer_rollups(user_id)])
+
+    def _apply_user(self, user_id: str, history: List[Any]) -> None:
+        self._set_user(user_id, [row[1:] for row in rollup_history(user_id, history)])
+
+    def _set_user(self, user_id: str, rollups: List[Rollup]) -> None:
+        if rollups:
+            self._rollups[user_id] = rollups
+        else:
+            self._rollups.pop(user_id, None)
+        for view in self._views.values():
+            view.put(user_id, self._row(user_id, rollups, view))
+
+    # --- ビュー ---
+
+    def _view(self, department: Optional[str], period_days: Optional[int]) -> _LeaderboardView:
+        key = (department, period_days)
+        view = self._views.get(key)
+        if view is None:
+            cutoff_day = None
+            if period_days:
+                cutoff_day = (datetime.strptime(self._view_day, '%Y-%m-%d') - timedelta(days=period_days)).strftime('%Y-%m-%d')
+            view = _LeaderboardView(department, cutoff_day)
+            for user_id, rollups in self._rollups.items():
+                view.put(user_id, self._row(user_id, rollups, view))
+            self._views[key] = view
+        return view
+
+    def _row(self, user_id: str, rollups: List[Rollup], view: _LeaderboardView) -> Optional[Dict[str, Any]]:
+        """ビューの条件で集計した1ユーザー分の行（対象回答なしは None）"""
+        total = correct = 0
+        days = set()
+        departments: Dict[str, List[int]] = {}
+        for department, day, count, count_correct, first_seq in rollups:
+            if view.cutoff_day and (not day or day < view.cutoff_day):
+                continue
+            if view.department and department != view.department:
+                continue
+            total += count
+            correct += count_correct
+            if day:
+                days.add(day)
+            usage = departments.setdefault(department or 'unknown', [0, first_seq])
+            usage[0] += count
+            usage[1] = min(usage[1], first_seq)
+        if not total:
+            return None
+
+        # 主要部門: 回答数最多（同数なら先に回答した部門）
+        primary = max(departments.items(), key=lambda item: (item[1][0], -item[1][1]))[0]
+        return {
+            'user_id': user_id,
+            'score': self.score_func(total, correct, len(days)),
+            'accuracy': correct / total,
+            'total_questions': total,
+            'study_streak': len(days),
+            'department_focus': primary,
+        }
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+🔄 JSON to SQLite User Store Migration Tool
+user_data/*.json・social_data/*.json を SQLite ユーザーストア（WALモード）へ移行
+
+使い方:
+    python migrate_json_to_sqlite.py                 # 取り込み + 検証
+    python migrate_json_to_sqlite.py --dry-run       # 件数確認のみ
+    USER_STORE_BACKEND=sqlite で起動すると移行後のストアを使用
+"""
+
+import os
+import sys
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Any
+
+# Add application directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from user_store import JSONUserRepository, SQLiteUserRepository
+from config import UserStoreConfig
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _normalized(data: Dict[str, Any]) -> Dict[str, Any]:
+    """比較用（SQLite側は history / srs_data を常に持つ）"""
+    normalized = dict(data)
+    normalized['history'] = data.get('history') or []
+    normalized['srs_data'] = data.get('srs_data') or {}
+    return json.loads(json.dumps(normalized, ensure_ascii=False, default=str))
+
+
+def verify(source: JSONUserRepository, target: SQLiteUserRepository) -> Dict[str, Any]:
+    """移行元JSONと移行先SQLiteの内容を突き合わせ"""
+    mismatched = []
+    checked = 0
+    for user_id, data in source.iter_users():
+        checked += 1
+        if _normalized(data) != _normalized(target.get_user(user_id)):
+            mismatched.append(user_id)
+
+    groups_ok = source.load_groups() == target.load_groups()
+    discussions_ok = source.load_discussions() == target.load_discussions()
+    return {
+        'users_checked': checked,
+        'users_mismatched': mismatched,
+        'groups_match': groups_ok,
+        'discussions_match': discussions_ok,
+        'success': not mismatched and groups_ok and discussions_ok,
+    }
+
+
+def main():
+    """Main migration execution"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='RCCM Quiz JSON to SQLite User Store Migration Tool')
+    parser.add_argument('--user-data-dir', default='user_data', help='Source user data directory')
+    parser.add_argument('--social-data-dir', default='social_data', help='Source social data directory')
+    parser.add_argument('--db', help='Target SQLite database (default: USER_STORE_DB_PATH or <user-data-dir>/rccm_user_store.db)')
+    parser.add_argument('--dry-run', action='store_true', help='Count source records only, do not import')
+    parser.add_argument('--no-verify', action='store_true', help='Skip post-migration verification')
+    parser.add_argument('--report-file', '-r', help='Save report to file')
+
+    args = parser.parse_args()
+
+    source = JSONUserRepository(args.user_data_dir, args.social_data_dir)
+
+    if args.dry_run:
+        logger.info("🧪 Running migration validation (dry run)...")
+        users = answers = 0
+        for _, data in source.iter_users():
+            users += 1
+            answers += len(data.get('history') or [])
+        logger.info(f"📊 Users: {users}, answers: {answers}, groups: {len(source.load_groups())}, "
+                    f"discussions: {len(source.load_discussions())}")
+        logger.info("✅ Dry run completed.")
+        return
+
+    db_path = args.db or UserStoreConfig.DB_PATH or os.path.join(args.user_data_dir, 'rccm_user_store.db')
+    try:
+        target = SQLiteUserRepository(db_path, args.user_data_dir, args.social_data_dir,
+                                      json_mirror=False, auto_migrate=False)
+        report = {'db_path': db_path, 'imported': target.import_json()}
+
+        if not args.no_verify:
+            report['verification'] = verify(source, target)
+            if not report['verification']['success']:
+                logger.error(f"❌ Verification failed: {report['verification']}")
+                sys.exit(1)
+            logger.info(f"✅ Verification passed: {report['verification']['users_checked']} users")
+
+        if args.report_file:
+            with open(args.report_file, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            logger.info(f"📄 Report saved to: {args.report_file}")
+
+        logger.info(f"🎉 Migration completed successfully! ({db_path})")
+        logger.info("💡 Set USER_STORE_BACKEND=sqlite to serve from the migrated store")
+
+    except KeyboardInterrupt:
+        logger.info("⚠️ Migration interrupted by user")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"❌ Unexpected migration error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
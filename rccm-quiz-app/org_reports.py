@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Organization Aggregates - 組織レポート用の組織別集計テーブル
+
+- ユーザー毎に (部門, 日) 単位の回答数・正答数・回答時間・最終回答日時（ロールアップ）をメモリに保持
+- 組織毎に メンバー / 部門×日 の正答率 / ISO週毎の活動量 のテーブルを保持し、
+  回答保存（UserRepository.save_user の通知）毎に該当ユーザーの寄与を差し引き・加算して差分更新
+- 組織のメンバー構成は organizations.json の inode・更新時刻・サイズが変わったら読み直し、組織テーブルを再構築
+- 過去データの一括集計は rebuild_org_aggregates.py（複数プロセスで並列集計）でスナップショット
+  （api_data/org_aggregates.json）に保存し、ユーザーデータの内容版数（content_revision）が同じ間は
+  各ワーカーの初回構築でそれを読み込む（ワーカー自身は書き出さない）
+- 期間の区切りは日単位（「過去30日」は30日前の0時以降）
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import OrganizationReportConfig
+from json_store import read_json, write_json
+from user_store import RepositoryView, UserRepository, rollup_activity
+
+logger = logging.getLogger(__name__)
+
+# 期間 → 日数（それ以外は全期間。APIManager._get_time_cutoff と同じ区分）
+PERIOD_DAYS = {'week': 7, 'month': 30, 'quarter': 90, 'year': 365}
+
+Rollup = Tuple[Optional[str], Optional[str], int, int, float, Optional[str]]  # (部門, 日, 回答数, 正答数, 回答時間, 最終回答日時)
+
+SNAPSHOT_VERSION = 1
+
+
+@lru_cache(maxsize=4096)
+def week_of(day: Optional[str]) -> Optional[str]:
+    """'YYYY-MM-DD' → ISO週 'YYYY-Www'（日付なし・不正は None）"""
+    if not day:
+        return None
+    try:
+        year, week, _ = datetime.strptime(day, '%Y-%m-%d').isocalendar()
+    except ValueError:
+        return None
+    return f"{year}-W{week:02d}"
+
+
+def cutoff_day(time_period: str, today: datetime = None) -> Optional[str]:
+    period_days = PERIOD_DAYS.get(time_period)
+    if not period_days:
+        return None
+    return ((today or datetime.now()) - timedelta(days=period_days)).strftime('%Y-%m-%d')
+
+
+def number(value: float) -> Any:
+    """整数値の float は int に（JSON 出力を従来の合計値と揃える）"""
+    return int(value) if isinstance(value, float) and value.is_integer() else value
+
+
+def summarize(rollups: Iterable[Rollup], since: Optional[str] = None) -> Tuple[int, int, float, Optional[str]]:
+    """ロールアップを (回答数, 正答数, 回答時間, 最終回答日時) に合算（since 指定時はその日以降のみ）"""
+    total = correct = 0
+    elapsed = 0.0
+    last_answered_at = None
+    for _, day, count, count_correct, count_elapsed, answered_at in rollups:
+        if since and (not day or day < since):
+            continue
+        total += count
+        correct += count_correct
+        elapsed += count_elapsed
+        if answered_at and (last_answered_at is None or answered_at > last_answered_at):
+            last_answered_at = answered_at
+    return total, correct, elapsed, last_answered_at
+
+
+def read_snapshot(path: str, revision: str) -> Optional[Dict[str, List[Rollup]]]:
+    """版数が一致するスナップショットのロールアップ（なし・不一致は None）"""
+    snapshot = read_json(path, None)
+    if (not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION
+            or snapshot.get('revision') != revision):
+        return None
+    return {user_id: [tuple(rollup) for rollup in rollups]
+            for user_id, rollups in (snapshot.get('users') or {}).items()}
+
+
+def write_snapshot(path: str, revision: str, rollups: Dict[str, List[Rollup]]) -> None:
+    write_json(path, {
+        'version': SNAPSHOT_VERSION,
+        'revision': revision,
+        'built_at': datetime.now().isoformat(),
+        'users': rollups,
+    })
+
+
+class _OrganizationTable:
+    """組織1件分の集計テーブル（メンバー・部門×日・週）"""
+
+    __slots__ = ('members', 'departments', 'weeks')
+
+    def __init__(self, members: List[str]):
+        self.members = members  # organizations.json の並び（重複もそのまま）
+        self.departments: Dict[Tuple[Optional[str], Optional[str]], List[Any]] = {}  # (部門, 日) → [回答数, 正答数, 回答時間]
+        self.weeks: Dict[str, List[Any]] = {}  # 週 → [回答数, 正答数, {user_id: 行数}]
+
+    def apply(self, user_id: str, rollups: List[Rollup], sign: int) -> None:
+        """ユーザーの寄与を加算（sign=1）・差し引き（sign=-1）"""
+        for department, day, total, correct, elapsed, _ in rollups:
+            cell = self.departments.setdefault((department, day), [0, 0, 0.0])
+            cell[0] += sign * total
+            cell[1] += sign * correct
+            cell[2] += sign * elapsed
+            if cell[0] <= 0:
+                del self.departments[(department, day)]
+
+            week = week_of(day)
+            if week is None:
+                continue
+            activity = self.weeks.setdefault(week, [0, 0, {}])
+            activity[0] += sign * total
+            activity[1] += sign * correct
+            active = activity[2]
+            active[user_id] = active.get(user_id, 0) + sign
+            if active[user_id] <= 0:
+                del active[user_id]
+            if activity[0] <= 0:
+                del self.weeks[week]
+
+    def department_breakdown(self, since: Optional[str]) -> Dict[str, Dict[str, Any]]:
+        breakdown: Dict[str, List[Any]] = {}
+        for (department, day), (total, correct, elapsed) in self.departments.items():
+            if since and (not day or day < since):
+                continue
+            usage = breakdown.setdefault(department or 'unknown', [0, 0, 0.0])
+            usage[0] += total
+            usage[1] += correct
+            usage[2] += elapsed
+        return {
+            department: {
+                'questions_attempted': total,
+                'correct_answers': correct,
+                'accuracy_rate': correct / total if total else 0,
+                'time_spent': number(elapsed),
+            }
+            for department, (total, correct, elapsed) in sorted(breakdown.items(), key=lambda item: -item[1][0])
+        }
+
+    def weekly_activity(self, since: Optional[str]) -> List[Dict[str, Any]]:
+        since_week = week_of(since) if since else None
+        return [
+            {
+                'week': week,
+                'questions_attempted': total,
+                'correct_answers': correct,
+                'accuracy_rate': correct / total if total else 0,
+                'active_users': len(active),
+            }
+            for week, (total, correct, active) in sorted(self.weeks.items())
+            if not since_week or week >= since_week
+        ]
+
+
+class OrganizationAggregates(RepositoryView):
+    """組織別集計テーブルのマテリアライズドビュー（APIManager から利用）"""
+
+    def __init__(self, repository: UserRepository, organization_data_file: str, snapshot_file: str = None,
+                 refresh_interval: int = None):
+        super().__init__(repository, OrganizationReportConfig.REFRESH_INTERVAL if refresh_interval is None else refresh_interval)
+        self.organization_data_file = organization_data_file
+        self.snapshot_file = snapshot_file
+        self._rollups: Dict[str, List[Rollup]] = {}
+        self._tables: Dict[str, _OrganizationTable] = {}
+        self._memberships: Dict[str, List[str]] = {}  # user_id → 所属組織ID
+        self._organizations_signature: Optional[Tuple[int, int, int]] = None
+        self._stats.update(snapshot_loads=0, organization_reloads=0)
+
+    # --- 参照 ---
+
+    def organization_report(self, org_id: str, time_period: str = 'month') -> Optional[Dict[str, Any]]:
+        """組織レポートの集計部分（組織がなければ None）"""
+        with self._lock:
+            table = self._table(org_id)
+            if table is None:
+                return None
+            since = cutoff_day(time_period)
+            user_performance = []
+            for user_id in table.members:
+                total, correct, elapsed, _ = summarize(self._rollups.get(user_id, ()), since)
+                user_performance.append({
+                    'user_id': user_id,
+                    'questions_attempted': total,
+                    'correct_answers': correct,
+                    'accuracy_rate': correct / total if total else 0,
+                    'time_spent': number(elapsed),
+                })
+            return {
+                'members': list(table.members),
+                'user_performance': user_performance,
+                'department_breakdown': table.department_breakdown(since),
+                'weekly_activity': table.weekly_activity(since),
+            }
+
+    def organization_users(self, org_id: str) -> Optional[List[Dict[str, Any]]]:
+        """組織メンバー毎の全期間の回答数・正答率・最終回答日時（組織がなければ None）"""
+        with self._lock:
+            table = self._table(org_id)
+            if table is None:
+                return None
+            users = []
+            for user_id in table.members:
+                total, correct, _, last_answered_at = summarize(self._rollups.get(user_id, ()))
+                users.append({
+                    'user_id': user_id,
+                    'total_questions': total,
+                    'accuracy': correct / total if total else 0,
+                    'last_activity': last_answered_at or '',
+                })
+            return users
+
+    def refresh(self) -> None:
+        """集計・組織メンバー構成を最新化（未読み込みならスナップショット読み込み・全件構築）"""
+        with self._lock:
+            self._sync()
+            self._sync_organizations()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(super().get_stats(), users=len(self._rollups), organizations=len(self._tables))
+
+    def _table(self, org_id: str) -> Optional[_OrganizationTable]:
+        self._sync()
+        self._sync_organizations()
+        self._stats['reads'] += 1
+        return self._tables.get(org_id)
+
+    # --- 組織メンバー構成 ---
+
+    def _organizations_file_signature(self) -> Tuple[int, int, int]:
+        try:
+            stat = os.stat(self.organization_data_file)
+        except OSError:
+            return 0, 0, 0  # ファイルなし = 組織なし
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _sync_organizations(self) -> None:
+        signature = self._organizations_file_signature()
+        if signature == self._organizations_signature:
+            return
+        organizations = read_json(self.organization_data_file, {}) if signature != (0, 0, 0) else {}
+        memberships: Dict[str, List[str]] = {}
+        tables = {}
+        for org_id, organization in organizations.items():
+            if not isinstance(organization, dict):
+                continue
+            members = list(organization.get('users') or [])
+            table = tables[org_id] = _OrganizationTable(members)
+            for user_id in dict.fromkeys(members):
+                memberships.setdefault(user_id, []).append(org_id)
+                table.apply(user_id, self._rollups.get(user_id, ()), 1)
+        self._tables = tables
+        self._memberships = memberships
+        self._organizations_signature = signature
+        self._stats['organization_reloads'] += 1
+
+    # --- 差分更新（RepositoryView） ---
+
+    def _load_all(self) -> None:
+        # スナップショットは rebuild_org_aggregates.py が作成する（参照時の構築では書き出さない）
+        rollups = None
+        if self.snapshot_file and os.path.exists(self.snapshot_file):
+            rollups = read_snapshot(self.snapshot_file, self.repository.content_revision())
+        if rollups is not None:
+            self._stats['snapshot_loads'] += 1
+        else:
+            rollups = {}
+            for user_id, *rollup in self.repository.activity_rollups():
+                rollups.setdefault(user_id, []).append(tuple(rollup))
+        self._rollups = rollups
+        self._organizations_signature = None  # 組織テーブルは次回参照時にロールアップから作り直す
+
+    def _reload_user(self, user_id: str) -> None:
+        self._set_user(user_id, [row[1:] for row in self.repository.activity_rollups(user_id)])
+
+    def _apply_user(self, user_id: str, history: List[Any]) -> None:
+        self._set_user(user_id, [row[1:] for row in rollup_activity(user_id, history)])
+
+    def _set_user(self, user_id: str, rollups: List[Rollup]) -> None:
+        previous = self._rollups.get(user_id, ())
+        if rollups:
+            self._rollups[user_id] = rollups
+        else:
+            self._rollups.pop(user_id, None)
+        for org_id in self._memberships.get(user_id, ()):
+            table = self._tables[org_id]
+            table.apply(user_id, previous, -1)
+            table.apply(user_id, rollups, 1)
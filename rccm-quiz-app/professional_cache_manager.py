@@ -19,6 +19,8 @@ from datetime import datetime, timedelta
 from typing import Any, Optional, Dict, List
 import json
 
+from cache_namespaces import GenerationRegistry, NamespaceTags, TagIndex, build_tags
+
 # Professional logging setup
 logger = logging.getLogger(__name__)
 
@@ -41,6 +43,9 @@ class CacheConfig:
     # Cache versioning (for cache busting)
     CACHE_VERSION = "v2.1"
 
+    # Lazy reclamation of entries orphaned by tag invalidation (per SET)
+    RECLAIM_BATCH_SIZE = 64
+
     # Performance thresholds
     MAX_CACHE_SIZE_MB = 50    # 50MB max cache size
     TARGET_HIT_RATE = 0.90    # 90% hit rate target
@@ -57,6 +62,7 @@ class ProfessionalCacheManager:
     - Cache versioning and TTL
     - Performance monitoring
     - Automatic cache invalidation
+    - O(1) tag invalidation via generation counters (department / user / corpus)
     """
 
     def __init__(self, environment="development"):
@@ -66,10 +72,16 @@ class ProfessionalCacheManager:
         self.miss_count = 0
         self.start_time = time.time()
 
+        # Generation counters per tag (shared through Redis once connected)
+        self.generations = GenerationRegistry(key_prefix=f"rccm:gen:{CacheConfig.CACHE_VERSION}")
+
         # In-memory fallback for development
         self._memory_cache = {}
         self._cache_timestamps = {}
 
+        # Tag index for lazy reclamation of invalidated memory entries
+        self._tag_index = TagIndex()
+
         self._initialize_cache_backend()
 
     def _initialize_cache_backend(self):
@@ -100,6 +112,9 @@ class ProfessionalCacheManager:
             # Test Redis connection
             self.redis_client.ping()
             self.cache_backend = "redis"
+            self.generations = GenerationRegistry(
+                self.redis_client, key_prefix=f"rccm:gen:{CacheConfig.CACHE_VERSION}"
+            )
 
             logger.info("✅ Redis cache backend initialized successfully")
 
@@ -113,23 +128,27 @@ class ProfessionalCacheManager:
         self.cache_backend = "memory"
         logger.info("✅ Memory cache backend initialized for development")
 
+    def _namespace_generations(self, user_id: str = None,
+                               department: str = None) -> Dict[str, int]:
+        """Current generations of the tags an entry belongs to"""
+        return self.generations.snapshot(build_tags(department=department, user_id=user_id))
+
     def _generate_cache_key(self, base_key: str, user_id: str = None,
-                           department: str = None, **kwargs) -> str:
+                           department: str = None, generations: Dict[str, int] = None,
+                           **kwargs) -> str:
         """
         Generate secure, versioned cache key
         Prevents cache collisions and data leakage between users
+
+        The department / user / corpus components carry their current
+        generation, so bumping a tag makes every older key unreachable.
         """
         key_parts = [CacheConfig.CACHE_VERSION, base_key]
 
-        # Add user-specific component (critical for multi-user safety)
-        if user_id:
-            # Hash user ID for security
-            user_hash = hashlib.md5(str(user_id).encode()).hexdigest()[:8]
-            key_parts.append(f"user:{user_hash}")
-
-        # Add department-specific component
-        if department:
-            key_parts.append(f"dept:{department}")
+        # Add tag generations (user ID is hashed inside NamespaceTags.user)
+        if generations is None:
+            generations = self._namespace_generations(user_id, department)
+        key_parts.append(self.generations.namespace_token(generations))
 
         # Add any additional parameters
         for k, v in sorted(kwargs.items()):
@@ -171,14 +190,15 @@ class ProfessionalCacheManager:
         Set cached data with TTL and versioning
         Implements automatic size management
         """
-        cache_key = self._generate_cache_key(key, user_id, **kwargs)
+        generations = self._namespace_generations(user_id, kwargs.get('department'))
+        cache_key = self._generate_cache_key(key, user_id, generations=generations, **kwargs)
         ttl = ttl or CacheConfig.QUESTION_DATA_TTL
 
         try:
             if self.cache_backend == "redis":
                 success = self._redis_set(cache_key, value, ttl)
             else:
-                success = self._memory_set(cache_key, value, ttl)
+                success = self._memory_set(cache_key, value, ttl, generations)
 
             if success:
                 logger.debug(f"✅ Cache SET: {cache_key} (TTL: {ttl}s)")
@@ -210,10 +230,40 @@ class ProfessionalCacheManager:
             logger.error(f"🚨 Cache DELETE error for {cache_key}: {e}")
             return False
 
+    def invalidate_tag(self, tag: str) -> int:
+        """
+        Invalidate every entry carrying the tag in O(1)
+        Bumps the tag generation; stale entries expire via TTL (Redis)
+        or are reclaimed lazily on later SETs (memory).
+        """
+        try:
+            generation = self.generations.bump(tag)
+            if self.cache_backend != "redis":
+                self._tag_index.detach(tag)
+
+            logger.info(f"🔄 Cache tag invalidated: '{tag}' -> generation {generation}")
+            return generation
+
+        except Exception as e:
+            logger.error(f"🚨 Cache tag invalidation error for '{tag}': {e}")
+            return 0
+
+    def invalidate_department(self, department: str) -> int:
+        """Invalidate all entries for a department (e.g. 道路)"""
+        return self.invalidate_tag(NamespaceTags.department(department))
+
+    def invalidate_user(self, user_id: str) -> int:
+        """Invalidate all entries for a user"""
+        return self.invalidate_tag(NamespaceTags.user(user_id))
+
+    def bump_corpus_version(self) -> int:
+        """Invalidate everything derived from the question corpus"""
+        return self.invalidate_tag(NamespaceTags.CORPUS)
+
     def invalidate_pattern(self, pattern: str) -> int:
         """
         Invalidate cache entries matching pattern
-        Critical for cache busting when data changes
+        Legacy key-scan invalidation; prefer invalidate_tag() and friends
         """
         try:
             if self.cache_backend == "redis":
@@ -266,6 +316,8 @@ class ProfessionalCacheManager:
             "hit_rate": hit_rate,
             "hit_rate_percentage": f"{hit_rate:.1%}",
             "uptime_seconds": uptime,
+            "tag_generations": self.generations.get_stats(),
+            "pending_reclaim_sets": self._tag_index.pending,
             "performance_status": "excellent" if hit_rate >= CacheConfig.TARGET_HIT_RATE else "needs_optimization",
             "recommendations": self._get_performance_recommendations(hit_rate)
         }
@@ -329,36 +381,47 @@ class ProfessionalCacheManager:
                 return self._memory_cache[key]
             else:
                 # Expired entry
-                del self._memory_cache[key]
-                del self._cache_timestamps[key]
+                self._memory_remove(key)
         return None
 
-    def _memory_set(self, key: str, value: Any, ttl: int) -> bool:
+    def _memory_set(self, key: str, value: Any, ttl: int,
+                    generations: Dict[str, int] = None) -> bool:
         """Memory SET with timestamp tracking"""
+        self._reclaim_stale_entries()
         self._memory_cache[key] = value
         self._cache_timestamps[key] = time.time()
+        self._tag_index.add(key, generations)
         return True
 
+    def _memory_remove(self, key: str) -> bool:
+        """Remove a memory entry together with its tag index references"""
+        if key not in self._memory_cache:
+            return False
+        del self._memory_cache[key]
+        self._cache_timestamps.pop(key, None)
+        self._tag_index.remove(key)
+        return True
+
+    def _reclaim_stale_entries(self, budget: int = CacheConfig.RECLAIM_BATCH_SIZE) -> int:
+        """Drop up to `budget` entries orphaned by earlier tag invalidations"""
+        return sum(1 for key in self._tag_index.drain(budget) if self._memory_remove(key))
+
     def _memory_delete(self, key: str) -> bool:
         """Memory DELETE"""
-        if key in self._memory_cache:
-            del self._memory_cache[key]
-            del self._cache_timestamps[key]
-            return True
-        return False
+        return self._memory_remove(key)
 
     def _memory_invalidate_pattern(self, pattern: str) -> int:
         """Memory pattern-based invalidation"""
         keys_to_delete = [k for k in self._memory_cache.keys() if pattern in k]
         for key in keys_to_delete:
-            del self._memory_cache[key]
-            del self._cache_timestamps[key]
+            self._memory_remove(key)
         return len(keys_to_delete)
 
     def _memory_clear_all(self) -> bool:
         """Memory clear all"""
         self._memory_cache.clear()
         self._cache_timestamps.clear()
+        self._tag_index.clear()
         return True
 
 
@@ -395,13 +458,16 @@ def get_cached_questions(department: str = None, question_type: str = None,
     key = f"{CacheConfig.QUESTION_PREFIX}:data"
     return cm.get(key, user_id=user_id, department=department, question_type=question_type)
 
-def invalidate_question_cache(department: str = None):
-    """Invalidate question cache when data changes"""
+def invalidate_question_cache(department: str = None) -> int:
+    """
+    Invalidate question cache when data changes
+    Department-only changes bump the department tag; otherwise the corpus
+    version is bumped. Returns the new generation.
+    """
     cm = get_cache_manager()
-    pattern = CacheConfig.QUESTION_PREFIX
     if department:
-        pattern += f":dept:{department}"
-    return cm.invalidate_pattern(pattern)
+        return cm.invalidate_department(department)
+    return cm.bump_corpus_version()
 
 def cache_user_session(user_id: str, session_data: Dict) -> bool:
     """Cache user session data"""
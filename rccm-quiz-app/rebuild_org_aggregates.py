@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Organization Aggregates Rebuild - 組織レポート用ロールアップの一括再構築（過去データの取り込み用）
+
+ユーザーを分割して複数プロセスで (部門, 日) 単位のロールアップを集計し、
+api_data/org_aggregates.json のスナップショットとして保存する。
+スナップショットの版数が現在のユーザーデータと一致する間、各ワーカーは全件走査せずにこれを読み込む。
+
+使い方:
+    python rebuild_org_aggregates.py                       # CPU数のプロセスで再構築
+    python rebuild_org_aggregates.py -j 8 --chunk-size 200
+    python rebuild_org_aggregates.py --backend sqlite --report-file rebuild.json
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from org_reports import OrganizationAggregates, Rollup, write_snapshot  # noqa: E402
+from user_store import get_user_repository  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _rollup_chunk(args: Tuple[str, str, str, List[str]]) -> Dict[str, List[Rollup]]:
+    """ワーカープロセス: ユーザーIDの一部を集計"""
+    user_data_dir, social_data_dir, backend, user_ids = args
+    repository = get_user_repository(user_data_dir, social_data_dir, backend)
+    rollups: Dict[str, List[Rollup]] = {}
+    for user_id in user_ids:
+        rows = [tuple(row[1:]) for row in repository.activity_rollups(user_id)]
+        if rows:
+            rollups[user_id] = rows
+    return rollups
+
+
+def rebuild(user_data_dir: str, social_data_dir: str, api_data_dir: str, backend: str = None,
+            jobs: int = None, chunk_size: int = 100) -> Dict[str, Any]:
+    repository = get_user_repository(user_data_dir, social_data_dir, backend)
+    # 走査前の版数を記録（走査中の更新があればスナップショットは使われず、各ワーカーが再集計する）
+    revision = repository.content_revision()
+    user_ids = repository.user_ids()
+    chunks = [user_ids[start:start + chunk_size] for start in range(0, len(user_ids), chunk_size)]
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(chunks) or 1))
+
+    started = time.perf_counter()
+    rollups: Dict[str, List[Rollup]] = {}
+    tasks = [(user_data_dir, social_data_dir, repository.backend, chunk) for chunk in chunks]
+    if jobs == 1:
+        for task in tasks:
+            rollups.update(_rollup_chunk(task))
+    else:
+        with multiprocessing.get_context('spawn').Pool(jobs) as pool:
+            for chunk_rollups in pool.imap_unordered(_rollup_chunk, tasks):
+                rollups.update(chunk_rollups)
+    elapsed = time.perf_counter() - started
+
+    snapshot_file = os.path.join(api_data_dir, 'org_aggregates.json')
+    write_snapshot(snapshot_file, revision, rollups)
+
+    # 保存したスナップショットで組織テーブルを構築できることを確認
+    aggregates = OrganizationAggregates(repository, os.path.join(api_data_dir, 'organizations.json'),
+                                        snapshot_file=snapshot_file)
+    aggregates.refresh()
+    stats = aggregates.get_stats()
+    return {
+        'snapshot_file': snapshot_file,
+        'revision': revision,
+        'backend': repository.backend,
+        'users': len(user_ids),
+        'users_with_answers': len(rollups),
+        'rollup_rows': sum(len(rows) for rows in rollups.values()),
+        'organizations': stats['organizations'],
+        'snapshot_loaded': stats['snapshot_loads'] == 1,
+        'jobs': jobs,
+        'seconds': round(elapsed, 3),
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Rebuild per-organization report aggregates in parallel')
+    parser.add_argument('--user-data-dir', default='user_data', help='User data directory')
+    parser.add_argument('--social-data-dir', default='social_data', help='Social data directory')
+    parser.add_argument('--api-data-dir', default='api_data', help='API data directory (organizations.json)')
+    parser.add_argument('--backend', choices=['json', 'sqlite'], help='User store backend (default: USER_STORE_BACKEND)')
+    parser.add_argument('-j', '--jobs', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=100, help='Users per task')
+    parser.add_argument('--report-file', '-r', help='Save report to file')
+    args = parser.parse_args(argv)
+
+    try:
+        report = rebuild(args.user_data_dir, args.social_data_dir, args.api_data_dir, args.backend,
+                         args.jobs, max(1, args.chunk_size))
+    except KeyboardInterrupt:
+        logger.info("⚠️ Rebuild interrupted by user")
+        return 1
+
+    logger.info(f"✅ {report['users_with_answers']}/{report['users']} users, {report['rollup_rows']} rollup rows, "
+                f"{report['organizations']} organizations ({report['jobs']} jobs, {report['seconds']}s)")
+    if not report['snapshot_loaded']:
+        logger.warning("⚠️ User data changed during the rebuild; workers will rebuild on first access")
+
+    if args.report_file:
+        with open(args.report_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"📄 Report saved to: {args.report_file}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,6 +6,7 @@
 
 import os
 import json
+import time
 import hashlib
 import logging
 from typing import Dict, List, Optional, Any, Union
@@ -22,8 +23,23 @@ except ImportError:
     redis = None
     Cache = None
 
+from cache_namespaces import GenerationRegistry, NamespaceTags, TagIndex, build_tags
+from circuit_breaker import CircuitBreaker
+
 logger = logging.getLogger(__name__)
 
+# 無効化済みエントリの遅延回収件数（書き込み1回あたり）
+RECLAIM_BATCH_SIZE = 64
+
+
+def _create_lru_cache(maxsize: int, ttl: int):
+    """
+    L1（utils.LRUCache）と同じ追い出し方式のキャッシュを生成
+    utils は本モジュールをトップレベルで import するため、循環importを避けて遅延import
+    """
+    from utils import LRUCache
+    return LRUCache(maxsize=maxsize, ttl=ttl)
+
 class RedisCacheManager:
     """High-performance Redis cache manager for RCCM Quiz data"""
     
@@ -43,9 +59,32 @@ class RedisCacheManager:
             'CACHE_REDIS_PASSWORD': os.environ.get('REDIS_PASSWORD'),
             'CACHE_REDIS_SOCKET_TIMEOUT': 30,
             'CACHE_REDIS_CONNECTION_TIMEOUT': 10,
-            'CACHE_REDIS_MAX_CONNECTIONS': 50
+            'CACHE_REDIS_MAX_CONNECTIONS': 50,
+            # Redis障害時の遮断（指数バックオフ）・ネガティブキャッシュ・有界フォールバック
+            'CACHE_BREAKER_FAILURE_THRESHOLD': 3,
+            'CACHE_BREAKER_BASE_BACKOFF': 1.0,
+            'CACHE_BREAKER_MAX_BACKOFF': 300.0,
+            'CACHE_NEGATIVE_TTL': 30,
+            'CACHE_NEGATIVE_MAX_ENTRIES': 1024,
+            'CACHE_FALLBACK_MAX_ENTRIES': 512,
+            'CACHE_FALLBACK_MAX_TTL': 3600
         }
         
+        self.breaker = CircuitBreaker(
+            'redis_cache',
+            failure_threshold=self._setting('CACHE_BREAKER_FAILURE_THRESHOLD'),
+            base_backoff=self._setting('CACHE_BREAKER_BASE_BACKOFF'),
+            max_backoff=self._setting('CACHE_BREAKER_MAX_BACKOFF')
+        )
+        # 部門・ユーザー・コーパス単位の世代カウンタ（O(1)無効化）
+        self.generations = GenerationRegistry(key_prefix='rccm_quiz_gen')
+        self._tag_index = TagIndex()
+        # 直近のRedisミスを記録し、同一キーの往復を抑止
+        self._negative_cache = _create_lru_cache(self._setting('CACHE_NEGATIVE_MAX_ENTRIES'),
+                                                 self._setting('CACHE_NEGATIVE_TTL'))
+        self.negative_hits = 0
+        self._setup_memory_fallback()
+        
         if app:
             self.init_app(app)
     
@@ -72,26 +111,93 @@ class RedisCacheManager:
                 max_connections=cache_config['CACHE_REDIS_MAX_CONNECTIONS'],
                 decode_responses=True
             )
+            self.generations = GenerationRegistry(self.redis_client, key_prefix='rccm_quiz_gen',
+                                                  breaker=self.breaker)
             
+        except Exception as e:
+            logger.error(f"❌ Redis initialization failed: {e}")
+            self.cache = None
+            self.redis_client = None
+            self._setup_memory_fallback()
+            return
+        
+        try:
             # Test connection
             self.redis_client.ping()
+            self.breaker.record_success()
             logger.info("✅ Redis cache initialized successfully")
             logger.info(f"🔗 Redis URL: {cache_config['CACHE_REDIS_URL'].split('@')[0]}@***")
-            
         except Exception as e:
-            logger.error(f"❌ Redis initialization failed: {e}")
-            self._setup_memory_fallback()
+            # 接続不可でもクライアントは保持し、バックオフ後に自動復帰を試みる
+            logger.error(f"❌ Redis connection failed, serving from in-memory fallback: {e}")
+            self.breaker.trip(e)
+    
+    def _setting(self, name: str) -> Any:
+        return self.config.get(name, self.default_config[name])
     
     def _setup_memory_fallback(self):
-        """Setup in-memory cache as fallback"""
-        self._memory_cache = {}
-        self._cache_timestamps = {}
+        """Setup bounded in-memory cache as fallback (same LRU policy as the L1 cache)"""
+        self._memory_cache = _create_lru_cache(self._setting('CACHE_FALLBACK_MAX_ENTRIES'),
+                                               self._setting('CACHE_FALLBACK_MAX_TTL'))
+        self._tag_index.clear()
         logger.info("🔄 Using in-memory cache fallback")
     
-    def get_cache_key(self, key_type: str, identifier: str, **kwargs) -> str:
-        """Generate consistent cache keys"""
+    def _use_redis(self) -> bool:
+        """Redisを呼んでよいか（未初期化・遮断中はFalse）"""
+        return self.cache is not None and self.breaker.allow_request()
+    
+    def _cache_get(self, cache_key: str) -> Optional[Any]:
+        """
+        Read through Redis guarded by the circuit breaker and the negative cache
+        遮断中・未接続時は有界メモリフォールバックのみを参照する
+        """
+        if self.cache is None or self.breaker.is_open:
+            return self._get_from_memory_cache(cache_key)
+        
+        if self._negative_cache.get(cache_key) is not None:
+            self.negative_hits += 1
+            return None
+        
+        if not self.breaker.allow_request():
+            return self._get_from_memory_cache(cache_key)
+        
+        try:
+            cached_data = self.cache.get(cache_key)
+        except Exception as e:
+            self.breaker.record_failure(e)
+            logger.warning(f"⚠️ Redis get failed, using in-memory fallback: {e}")
+            return self._get_from_memory_cache(cache_key)
+        
+        self.breaker.record_success()
+        if cached_data is None:
+            self._negative_cache.put(cache_key, True)
+        return cached_data
+    
+    def _cache_set(self, cache_key: str, data: Any, timeout: int,
+                   tags: Optional[List[str]] = None) -> bool:
+        """Write through Redis guarded by the circuit breaker (falls back to memory)"""
+        self._negative_cache.delete(cache_key)
+        
+        if not self._use_redis():
+            return self._set_to_memory_cache(cache_key, data, timeout, tags=tags)
+        
+        try:
+            success = self.cache.set(cache_key, data, timeout=timeout)
+        except Exception as e:
+            self.breaker.record_failure(e)
+            logger.warning(f"⚠️ Redis set failed, using in-memory fallback: {e}")
+            return self._set_to_memory_cache(cache_key, data, timeout, tags=tags)
+        
+        self.breaker.record_success()
+        return success
+    
+    def get_cache_key(self, key_type: str, identifier: str, tags: Optional[List[str]] = None, **kwargs) -> str:
+        """Generate consistent cache keys (tags add their current generation)"""
         base_key = f"{self.default_config['CACHE_KEY_PREFIX']}{key_type}:{identifier}"
         
+        if tags:
+            base_key += f":{self.generations.namespace_token(self.generations.snapshot(tags))}"
+        
         if kwargs:
             # Add parameters to key for uniqueness
             params = "_".join(f"{k}:{v}" for k, v in sorted(kwargs.items()))
@@ -101,20 +207,14 @@ class RedisCacheManager:
     
     def get_questions_by_department(self, department: str, question_count: Optional[int] = None) -> List[Dict]:
         """Get cached questions by department with high performance"""
-        cache_key = self.get_cache_key('dept_questions', department, count=question_count)
+        cache_key = self.get_cache_key('dept_questions', department,
+                                       tags=build_tags(department=department), count=question_count)
         
         try:
-            if self.cache:
-                # Use Flask-Caching for primary cache
-                cached_data = self.cache.get(cache_key)
-                if cached_data is not None:
-                    logger.debug(f"🎯 Cache HIT: {department} ({len(cached_data)} questions)")
-                    return cached_data
-            else:
-                # Use memory fallback
-                cached_data = self._get_from_memory_cache(cache_key)
-                if cached_data is not None:
-                    return cached_data
+            cached_data = self._cache_get(cache_key)
+            if cached_data is not None:
+                logger.debug(f"🎯 Cache HIT: {department} ({len(cached_data)} questions)")
+                return cached_data
             
             logger.debug(f"💾 Cache MISS: {department}")
             return []
@@ -130,7 +230,8 @@ class RedisCacheManager:
             logger.warning(f"⚠️ Attempting to cache empty questions for {department}")
             return False
         
-        cache_key = self.get_cache_key('dept_questions', department, count=question_count)
+        tags = build_tags(department=department)
+        cache_key = self.get_cache_key('dept_questions', department, tags=tags, count=question_count)
         
         try:
             # Validate question data before caching
@@ -138,15 +239,10 @@ class RedisCacheManager:
                 logger.error(f"❌ Invalid question data for {department}")
                 return False
             
-            if self.cache:
-                # Use Flask-Caching
-                success = self.cache.set(cache_key, questions, timeout=timeout)
-                if success:
-                    logger.info(f"💾 Cached {len(questions)} questions for {department} (TTL: {timeout}s)")
-                return success
-            else:
-                # Use memory fallback
-                return self._set_to_memory_cache(cache_key, questions, timeout)
+            success = self._cache_set(cache_key, questions, timeout, tags=tags)
+            if success:
+                logger.info(f"💾 Cached {len(questions)} questions for {department} (TTL: {timeout}s)")
+            return success
                 
         except Exception as e:
             logger.error(f"❌ Cache set error for {department}: {e}")
@@ -154,68 +250,69 @@ class RedisCacheManager:
     
     def get_user_session_data(self, user_id: str, session_key: str) -> Optional[Dict]:
         """Get cached user session data"""
-        cache_key = self.get_cache_key('user_session', f"{user_id}:{session_key}")
+        cache_key = self.get_cache_key('user_session', f"{user_id}:{session_key}",
+                                       tags=build_tags(user_id=user_id, include_corpus=False))
         
         try:
-            if self.cache:
-                return self.cache.get(cache_key)
-            else:
-                return self._get_from_memory_cache(cache_key)
+            return self._cache_get(cache_key)
         except Exception as e:
             logger.error(f"❌ Session cache get error: {e}")
             return None
     
     def set_user_session_data(self, user_id: str, session_key: str, data: Dict, timeout: int = 3600) -> bool:
         """Cache user session data"""
-        cache_key = self.get_cache_key('user_session', f"{user_id}:{session_key}")
+        tags = build_tags(user_id=user_id, include_corpus=False)
+        cache_key = self.get_cache_key('user_session', f"{user_id}:{session_key}", tags=tags)
         
         try:
-            if self.cache:
-                return self.cache.set(cache_key, data, timeout=timeout)
-            else:
-                return self._set_to_memory_cache(cache_key, data, timeout)
+            return self._cache_set(cache_key, data, timeout, tags=tags)
         except Exception as e:
             logger.error(f"❌ Session cache set error: {e}")
             return False
     
-    def invalidate_department_cache(self, department: str) -> bool:
-        """Invalidate all cached data for a specific department"""
+    def invalidate_tag(self, tag: str) -> bool:
+        """
+        Invalidate every entry carrying the tag in O(1)
+        世代番号を進めるだけでKEYS/SCANは行わない。旧世代のキーは参照不能になり、
+        RedisではTTL満了、メモリフォールバックでは後続の書き込み時に回収される
+        """
         try:
-            if self.redis_client:
-                # Use Redis pattern matching to delete related keys
-                pattern = f"{self.default_config['CACHE_KEY_PREFIX']}dept_questions:{department}*"
-                keys = self.redis_client.keys(pattern)
-                if keys:
-                    deleted = self.redis_client.delete(*keys)
-                    logger.info(f"🗑️ Invalidated {deleted} cache entries for {department}")
-                    return True
-            else:
-                # Memory fallback - remove matching keys
-                keys_to_remove = [k for k in self._memory_cache.keys() 
-                                if f"dept_questions:{department}" in k]
-                for key in keys_to_remove:
-                    del self._memory_cache[key]
-                    if key in self._cache_timestamps:
-                        del self._cache_timestamps[key]
-                logger.info(f"🗑️ Invalidated {len(keys_to_remove)} memory cache entries")
-                return True
-                
+            generation = self.generations.bump(tag)
+            self._tag_index.detach(tag)
+            logger.info(f"🗑️ Invalidated cache tag {tag} (generation {generation})")
+            return True
         except Exception as e:
-            logger.error(f"❌ Cache invalidation error for {department}: {e}")
+            logger.error(f"❌ Cache invalidation error for {tag}: {e}")
             return False
     
+    def invalidate_department_cache(self, department: str) -> bool:
+        """Invalidate all cached data for a specific department"""
+        return self.invalidate_tag(NamespaceTags.department(department))
+    
+    def invalidate_user_cache(self, user_id: str) -> bool:
+        """Invalidate all cached data for a specific user"""
+        return self.invalidate_tag(NamespaceTags.user(user_id))
+    
+    def bump_corpus_version(self) -> bool:
+        """Invalidate everything derived from the question corpus"""
+        return self.invalidate_tag(NamespaceTags.CORPUS)
+    
     def clear_all_cache(self) -> bool:
         """Clear all cached data"""
         try:
-            if self.cache:
-                self.cache.clear()
-                logger.info("🗑️ All cache cleared via Flask-Caching")
-                return True
-            else:
-                self._memory_cache.clear()
-                self._cache_timestamps.clear()
-                logger.info("🗑️ All memory cache cleared")
-                return True
+            self._memory_cache.clear()
+            self._negative_cache.clear()
+            self._tag_index.clear()
+            if self._use_redis():
+                try:
+                    self.cache.clear()
+                    self.breaker.record_success()
+                    logger.info("🗑️ All cache cleared via Flask-Caching")
+                except Exception as e:
+                    self.breaker.record_failure(e)
+                    raise
+            logger.info("🗑️ All memory cache cleared")
+            return True
         except Exception as e:
             logger.error(f"❌ Cache clear error: {e}")
             return False
@@ -223,8 +320,15 @@ class RedisCacheManager:
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get comprehensive cache statistics"""
         try:
-            if self.redis_client:
-                info = self.redis_client.info()
+            info = None
+            if self.redis_client is not None and self.breaker.allow_request():
+                try:
+                    info = self.redis_client.info()
+                    self.breaker.record_success()
+                except Exception as e:
+                    self.breaker.record_failure(e)
+            
+            if info is not None:
                 return {
                     'cache_type': 'redis',
                     'status': 'connected',
@@ -236,14 +340,21 @@ class RedisCacheManager:
                     'hit_rate': self._calculate_hit_rate(
                         info.get('keyspace_hits', 0), 
                         info.get('keyspace_misses', 0)
-                    )
+                    ),
+                    'circuit_breaker': self.breaker.get_stats(),
+                    'negative_cache': {**self._negative_cache.stats(), 'short_circuited_gets': self.negative_hits}
                 }
             else:
+                memory_stats = self._memory_cache.stats()
                 return {
                     'cache_type': 'memory_fallback',
-                    'status': 'active',
-                    'cached_keys': len(self._memory_cache),
-                    'memory_usage': f"{len(str(self._memory_cache))} bytes (estimated)"
+                    'status': 'active' if self.cache is None else 'redis_unavailable',
+                    'cached_keys': memory_stats['size'],
+                    'max_keys': memory_stats['maxsize'],
+                    'hit_rate': round(memory_stats['hit_rate'] * 100, 2),
+                    'tag_generations': self.generations.get_stats(),
+                    'pending_reclaim_sets': self._tag_index.pending,
+                    'circuit_breaker': self.breaker.get_stats()
                 }
         except Exception as e:
             return {
@@ -269,28 +380,41 @@ class RedisCacheManager:
         return True
     
     def _get_from_memory_cache(self, key: str) -> Optional[Any]:
-        """Get data from memory cache with TTL check"""
-        if key in self._memory_cache:
-            timestamp = self._cache_timestamps.get(key)
-            if timestamp and datetime.now() < timestamp:
-                return self._memory_cache[key]
-            else:
-                # Expired
-                del self._memory_cache[key]
-                if key in self._cache_timestamps:
-                    del self._cache_timestamps[key]
+        """Get data from memory cache with per-entry TTL check"""
+        entry = self._memory_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if time.time() < expires_at:
+            return data
+        # Expired
+        self._remove_from_memory_cache(key)
         return None
     
-    def _set_to_memory_cache(self, key: str, data: Any, timeout: int) -> bool:
+    def _set_to_memory_cache(self, key: str, data: Any, timeout: int,
+                             tags: Optional[List[str]] = None) -> bool:
         """Set data to memory cache with TTL"""
         try:
-            self._memory_cache[key] = data
-            self._cache_timestamps[key] = datetime.now() + timedelta(seconds=timeout)
+            # 無効化済みタグのエントリを少量ずつ回収
+            for stale_key in self._tag_index.drain(RECLAIM_BATCH_SIZE):
+                self._remove_from_memory_cache(stale_key)
+            
+            self._memory_cache.put(key, (time.time() + timeout, data))
+            if tags:
+                self._tag_index.add(key, self.generations.snapshot(tags))
+                # LRU追い出しで消えたエントリの索引を定期的に整理（索引の肥大化防止）
+                if self._tag_index.tracked > 2 * self._memory_cache.maxsize:
+                    self._tag_index.prune(self._memory_cache.__contains__)
             return True
         except Exception as e:
             logger.error(f"❌ Memory cache set error: {e}")
             return False
     
+    def _remove_from_memory_cache(self, key: str) -> None:
+        """Remove a memory entry together with its tag index references"""
+        self._memory_cache.delete(key)
+        self._tag_index.remove(key)
+    
     def _calculate_hit_rate(self, hits: int, misses: int) -> float:
         """Calculate cache hit rate percentage"""
         total = hits + misses
@@ -331,25 +455,17 @@ def cached_questions(timeout=300, key_suffix=""):
             cache_key = f"{cache_manager.default_config['CACHE_KEY_PREFIX']}func:{cache_key}"
             
             try:
-                if cache_manager.cache:
-                    cached_result = cache_manager.cache.get(cache_key)
-                    if cached_result is not None:
-                        logger.debug(f"🎯 Function cache HIT: {func_name}")
-                        return cached_result
-                else:
-                    cached_result = cache_manager._get_from_memory_cache(cache_key)
-                    if cached_result is not None:
-                        return cached_result
+                cached_result = cache_manager._cache_get(cache_key)
+                if cached_result is not None:
+                    logger.debug(f"🎯 Function cache HIT: {func_name}")
+                    return cached_result
                 
                 # Cache miss - execute function
                 logger.debug(f"💾 Function cache MISS: {func_name}")
                 result = func(*args, **kwargs)
                 
                 # Cache the result
-                if cache_manager.cache:
-                    cache_manager.cache.set(cache_key, result, timeout=timeout)
-                else:
-                    cache_manager._set_to_memory_cache(cache_key, result, timeout)
+                cache_manager._cache_set(cache_key, result, timeout)
                 
                 return result
                 
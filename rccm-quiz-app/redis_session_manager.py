@@ -26,6 +26,8 @@ from flask import Flask, session as flask_session
 from flask_session import Session
 import traceback
 
+from circuit_breaker import CircuitBreaker
+
 logger = logging.getLogger(__name__)
 
 class RedisSessionManager:
@@ -39,6 +41,9 @@ class RedisSessionManager:
         self.health_check_interval = 30  # 30秒間隔
         self.health_check_thread = None
         self.is_healthy = False
+        # Redis障害時は遮断し、指数バックオフで再試行（リクエスト毎の接続試行を防止）
+        self.circuit_breaker = CircuitBreaker('redis_session', failure_threshold=3,
+                                              base_backoff=1.0, max_backoff=300.0)
         
         # Redis設定
         self.redis_config = {
@@ -130,6 +135,7 @@ class RedisSessionManager:
             self.redis_client.ping()
             self.is_healthy = True
             self.health_stats['redis_available'] = True
+            self.circuit_breaker.record_success()
             
             logger.info(f"✅ Redis connected: {self.redis_config['host']}:{self.redis_config['port']}")
             
@@ -137,6 +143,7 @@ class RedisSessionManager:
             logger.error(f"❌ Redis connection failed: {e}")
             self.is_healthy = False
             self.health_stats['redis_available'] = False
+            self.circuit_breaker.trip(e)
             
             if not self.fallback_enabled:
                 raise
@@ -176,13 +183,30 @@ class RedisSessionManager:
         while True:
             try:
                 self._perform_health_check()
-                time.sleep(self.health_check_interval)
             except Exception as e:
                 logger.error(f"Health check loop error: {e}")
-                time.sleep(self.health_check_interval)
+            time.sleep(self._next_health_check_delay())
+    
+    def _next_health_check_delay(self) -> float:
+        """次回ヘルスチェックまでの待機秒数（遮断中はバックオフに従い間隔を延長）"""
+        return max(self.health_check_interval, self.circuit_breaker.seconds_until_retry())
+    
+    def _redis_available(self) -> bool:
+        """Redisを呼んでよいか（遮断中はフォールバックへ直行）"""
+        return self.is_healthy and self.redis_client is not None and not self.circuit_breaker.is_open
+    
+    def _record_redis_failure(self, error: Exception):
+        """リクエスト処理中のRedis障害を記録（閾値到達で遮断）"""
+        self.circuit_breaker.record_failure(error)
+        if self.circuit_breaker.state != 'closed':
+            self.is_healthy = False
+            self.health_stats['redis_available'] = False
     
     def _perform_health_check(self):
         """🩺 ヘルスチェック実行"""
+        if self.redis_client is None or not self.circuit_breaker.allow_request():
+            return
+        
         try:
             start_time = time.time()
             
@@ -194,6 +218,7 @@ class RedisSessionManager:
                 self.is_healthy = True
                 self.health_stats['redis_available'] = True
                 self.health_stats['consecutive_failures'] = 0
+                self.circuit_breaker.record_success()
                 
                 # レスポンス時間のログ記録
                 if response_time > 100:  # 100ms以上は警告
@@ -218,6 +243,7 @@ class RedisSessionManager:
         self.is_healthy = False
         self.health_stats['redis_available'] = False
         self.health_stats['consecutive_failures'] += 1
+        self.circuit_breaker.record_failure(Exception(error_message))
         
         logger.error(f"Health check failure: {error_message}")
         
@@ -229,7 +255,7 @@ class RedisSessionManager:
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """📖 セッション取得"""
         try:
-            if self.is_healthy and self.redis_client:
+            if self._redis_available():
                 # Redisからセッション取得
                 key = f"{self.session_config['prefix']}{session_id}"
                 data = self.redis_client.get(key)
@@ -247,12 +273,13 @@ class RedisSessionManager:
         except Exception as e:
             logger.error(f"Session get error: {e}")
             self.session_stats['errors'] += 1
+            self._record_redis_failure(e)
             return self._fallback_get_session(session_id)
     
     def set_session(self, session_id: str, data: Dict[str, Any], expire: Optional[int] = None) -> bool:
         """💾 セッション保存"""
         try:
-            if self.is_healthy and self.redis_client:
+            if self._redis_available():
                 # Redisにセッション保存
                 key = f"{self.session_config['prefix']}{session_id}"
                 serialized_data = self._serialize_session_data(data)
@@ -272,12 +299,13 @@ class RedisSessionManager:
         except Exception as e:
             logger.error(f"Session set error: {e}")
             self.session_stats['errors'] += 1
+            self._record_redis_failure(e)
             return self._fallback_set_session(session_id, data, expire)
     
     def delete_session(self, session_id: str) -> bool:
         """🗑️ セッション削除"""
         try:
-            if self.is_healthy and self.redis_client:
+            if self._redis_available():
                 key = f"{self.session_config['prefix']}{session_id}"
                 result = self.redis_client.delete(key)
                 return bool(result)
@@ -287,6 +315,7 @@ class RedisSessionManager:
         except Exception as e:
             logger.error(f"Session delete error: {e}")
             self.session_stats['errors'] += 1
+            self._record_redis_failure(e)
             return self._fallback_delete_session(session_id)
     
     def _serialize_session_data(self, data: Dict[str, Any]) -> bytes:
@@ -382,7 +411,7 @@ class RedisSessionManager:
     def get_session_list(self) -> List[str]:
         """📋 セッション一覧取得"""
         try:
-            if self.is_healthy and self.redis_client:
+            if self._redis_available():
                 pattern = f"{self.session_config['prefix']}*"
                 keys = self.redis_client.keys(pattern)
                 return [key.decode('utf-8').replace(self.session_config['prefix'], '') for key in keys]
@@ -400,7 +429,7 @@ class RedisSessionManager:
         """🧹 期限切れセッション削除"""
         cleaned_count = 0
         try:
-            if self.is_healthy and self.redis_client:
+            if self._redis_available():
                 # Redisは自動期限切れ削除のため、手動削除不要
                 # カウント取得のためのダミー処理
                 pass
@@ -434,7 +463,7 @@ class RedisSessionManager:
             
             # Redis情報取得
             redis_info = {}
-            if self.is_healthy and self.redis_client:
+            if self._redis_available():
                 try:
                     redis_info = self.redis_client.info()
                 except:
@@ -447,6 +476,7 @@ class RedisSessionManager:
                 },
                 'health_stats': {
                     **self.health_stats,
+                    'circuit_breaker': self.circuit_breaker.get_stats(),
                     'last_updated': current_time.isoformat()
                 },
                 'redis_info': {
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Certification Progress Refresh - 全ユーザー×認定プログラムの進捗一括判定（夜間更新用）
+
+ユーザーを分割して複数プロセスで判定し、結果をユーザーの版数とともに
+api_data/certification_progress.json に保存する（各ワーカーは版数が一致する間これを再利用）。
+要件を満たしたが未完了のままの登録は、APIManager.check_certification_progress で完了を記録する。
+
+使い方:
+    python refresh_certification_progress.py                     # CPU数のプロセスで判定 + 完了記録
+    python refresh_certification_progress.py -j 8 --chunk-size 200
+    python refresh_certification_progress.py --no-complete --report-file refresh.json
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from certification_plans import evaluate_users, write_snapshot  # noqa: E402
+from json_store import read_json  # noqa: E402
+from user_store import get_user_repository  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _evaluate_chunk(args: Tuple[str, str, str, List[str], Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """ワーカープロセス: ユーザーIDの一部を判定"""
+    user_data_dir, social_data_dir, backend, user_ids, certifications = args
+    repository = get_user_repository(user_data_dir, social_data_dir, backend)
+    return evaluate_users(repository, user_ids, certifications)
+
+
+def refresh(user_data_dir: str, social_data_dir: str, api_data_dir: str, backend: str = None,
+            jobs: int = None, chunk_size: int = 100, complete: bool = True) -> Dict[str, Any]:
+    repository = get_user_repository(user_data_dir, social_data_dir, backend)
+    certifications = read_json(os.path.join(api_data_dir, 'certifications.json'), {})
+    user_ids = repository.user_ids()
+    chunks = [user_ids[start:start + chunk_size] for start in range(0, len(user_ids), chunk_size)]
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(chunks) or 1))
+
+    generated_at = datetime.now().isoformat()
+    started = time.perf_counter()
+    users: Dict[str, Dict[str, Any]] = {}
+    tasks = [(user_data_dir, social_data_dir, repository.backend, chunk, certifications) for chunk in chunks]
+    if jobs == 1:
+        for task in tasks:
+            users.update(_evaluate_chunk(task))
+    else:
+        with multiprocessing.get_context('spawn').Pool(jobs) as pool:
+            for chunk_users in pool.imap_unordered(_evaluate_chunk, tasks):
+                users.update(chunk_users)
+    elapsed = time.perf_counter() - started
+
+    snapshot_file = os.path.join(api_data_dir, 'certification_progress.json')
+    write_snapshot(snapshot_file, users, generated_at)
+
+    evaluations = errors = 0
+    pending: List[Tuple[str, str]] = []  # 要件を満たしたが未完了の (user_id, cert_id)
+    for user_id, entry in users.items():
+        for cert_id, result in entry['results'].items():
+            evaluations += 1
+            if 'error' in result:
+                errors += 1
+            elif (result['progress']['completion_percentage'] >= 100
+                  and entry['enrollments'][cert_id].get('status') != 'completed'):
+                pending.append((user_id, cert_id))
+
+    completed = 0
+    if complete and pending:
+        from api_integration import APIManager
+        api_manager = APIManager(user_data_dir, api_data_dir)
+        for user_id, cert_id in pending:
+            if api_manager.check_certification_progress(user_id, cert_id).get('enrollment_status') == 'completed':
+                completed += 1
+
+    return {
+        'snapshot_file': snapshot_file,
+        'backend': repository.backend,
+        'users': len(user_ids),
+        'users_evaluated': len(users),
+        'programs': len(certifications),
+        'evaluations': evaluations,
+        'errors': errors,
+        'newly_eligible': len(pending),
+        'completed': completed,
+        'jobs': jobs,
+        'seconds': round(elapsed, 3),
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Evaluate certification progress for all users in parallel')
+    parser.add_argument('--user-data-dir', default='user_data', help='User data directory')
+    parser.add_argument('--social-data-dir', default='social_data', help='Social data directory')
+    parser.add_argument('--api-data-dir', default='api_data', help='API data directory (certifications.json)')
+    parser.add_argument('--backend', choices=['json', 'sqlite'], help='User store backend (default: USER_STORE_BACKEND)')
+    parser.add_argument('-j', '--jobs', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=100, help='Users per task')
+    parser.add_argument('--no-complete', action='store_true', help='Do not record newly completed certifications')
+    parser.add_argument('--report-file', '-r', help='Save report to file')
+    args = parser.parse_args(argv)
+
+    try:
+        report = refresh(args.user_data_dir, args.social_data_dir, args.api_data_dir, args.backend,
+                         args.jobs, max(1, args.chunk_size), complete=not args.no_complete)
+    except KeyboardInterrupt:
+        logger.info("⚠️ Refresh interrupted by user")
+        return 1
+
+    logger.info(f"✅ {report['evaluations']} evaluations for {report['users_evaluated']} users "
+                f"({report['jobs']} jobs, {report['seconds']}s), {report['errors']} errors, "
+                f"{report['completed']}/{report['newly_eligible']} newly completed")
+
+    if args.report_file:
+        with open(args.report_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"📄 Report saved to: {args.report_file}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Request Memo - リクエスト単位のメモ化（flask.g）
+
+- @request_memo を付けた関数は、同一リクエスト内で同じ引数なら1回だけ実行
+- 結果はリクエスト終了とともに破棄（プロセス全体のキャッシュではない）
+- リクエスト外（起動処理・CLI・バックグラウンドスレッド）では通常どおり毎回実行
+- 例外は記憶しない（次の呼び出しで再実行）
+- 対象はリクエスト中に結果が変わらない関数のみ（戻り値のオブジェクトは呼び出し元で共有される）
+- X-Request-Memo ヘッダーで重複排除した呼び出し数を確認可能（デバッグ用）
+"""
+
+import logging
+from collections import Counter
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+from flask import g, has_request_context
+
+logger = logging.getLogger(__name__)
+
+_MEMO_ATTR = '_request_memo'
+
+
+class _RequestMemoStore:
+    """1リクエスト分のメモ（g に格納）"""
+
+    __slots__ = ('values', 'hits', 'misses')
+
+    def __init__(self):
+        self.values: Dict[Any, Any] = {}
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+
+def _current_store() -> _RequestMemoStore:
+    store = g.get(_MEMO_ATTR)
+    if store is None:
+        store = _RequestMemoStore()
+        setattr(g, _MEMO_ATTR, store)
+    return store
+
+
+def request_memo(func: Optional[Callable] = None, *, key: Optional[Callable[..., Any]] = None):
+    """
+    リクエスト単位メモ化デコレータ
+
+    Args:
+        key: 引数からメモキーを作る関数（セッション等ハッシュ不可な引数を取る関数用）
+             省略時は (args, kwargs) をそのままキーにする
+    """
+    def decorator(f):
+        name = f.__name__
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if not has_request_context():
+                return f(*args, **kwargs)
+
+            try:
+                memo_key = (name, key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items()))))
+                hash(memo_key)
+            except TypeError:
+                # ハッシュ不可な引数はメモ化しない
+                return f(*args, **kwargs)
+
+            store = _current_store()
+            if memo_key in store.values:
+                store.hits[name] += 1
+                return store.values[memo_key]
+
+            result = f(*args, **kwargs)
+            store.values[memo_key] = result
+            store.misses[name] += 1
+            return result
+
+        wrapper.uncached = f
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def get_request_memo_stats() -> Dict[str, Any]:
+    """現在のリクエストのメモ統計（重複排除数・関数別内訳）"""
+    store = g.get(_MEMO_ATTR) if has_request_context() else None
+    if store is None:
+        return {'deduplicated': 0, 'computed': 0, 'functions': {}}
+    return {
+        'deduplicated': sum(store.hits.values()),
+        'computed': sum(store.misses.values()),
+        'functions': {name: {'computed': store.misses[name], 'deduplicated': store.hits[name]}
+                      for name in set(store.misses) | set(store.hits)},
+    }
+
+
+def init_app(app, debug_header: bool = False) -> None:
+    """X-Request-Memo デバッグヘッダーを付与する after_request フックを登録"""
+    if not debug_header:
+        return
+
+    @app.after_request
+    def _request_memo_header(response):
+        store = g.get(_MEMO_ATTR)
+        if store is not None:
+            deduplicated = sum(store.hits.values())
+            detail = ', '.join(f"{name}={count}" for name, count in store.hits.most_common())
+            response.headers['X-Request-Memo'] = f"deduplicated={deduplicated}" + (f"; {detail}" if detail else '')
+        return response
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Response Cache - ユーザー非依存ページのルート単位レスポンスキャッシュ
+
+- キー: エンドポイント + URL引数 + クエリ文字列 + 問題コーパス版数 (+ 指定セッション値)
+- ヒット時はビュー関数・Jinjaレンダリングを完全にスキップ
+- 個人データ（学習履歴等）がセッションにある場合・フラッシュメッセージ表示時はバイパス
+- 200 以外・skip_response_cache() を呼んだレスポンス（エラー画面等）は保存しない
+- 弱いETag付与と If-None-Match による 304 応答
+- Cache-Control はポリシー名で指定（config.ResponseCacheConfig.POLICIES）
+"""
+
+import hashlib
+import logging
+from functools import wraps
+from typing import Callable, Dict, Iterable, Optional
+
+from flask import g, make_response, request, session
+
+from utils import LRUCache
+
+logger = logging.getLogger(__name__)
+
+CACHEABLE_METHODS = ('GET', 'HEAD')
+
+
+def skip_response_cache() -> None:
+    """このリクエストのレスポンスをキャッシュしない（ビューのエラー時フォールバック等、一時的な結果用）"""
+    g.response_cache_skip = True
+
+
+class ResponseCache:
+    """ルート単位のレスポンスキャッシュ（プロセス内LRU）"""
+
+    def __init__(self, version_func: Optional[Callable[[], str]] = None, max_entries: int = 256,
+                 ttl: int = 3600, policies: Optional[Dict[str, str]] = None, enabled: bool = True):
+        self.version_func = version_func
+        self.policies = policies or {}
+        self.enabled = enabled
+        self._cache = LRUCache(maxsize=max_entries, ttl=ttl)
+        self.bypass_count = 0
+
+    def cached(self, policy: str = 'page', vary_session: Iterable[str] = (),
+               personal_session: Iterable[str] = ()):
+        """
+        レスポンスキャッシュデコレータ
+
+        Args:
+            policy: Cache-Control ポリシー名
+            vary_session: キーに含めるセッション値（取り得る値が少ない設定値のみ）
+            personal_session: 値があればキャッシュしないセッションキー（学習履歴など）
+        """
+        vary_session = tuple(vary_session)
+        personal_session = tuple(personal_session)
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self._is_cacheable_request(personal_session):
+                    self.bypass_count += 1
+                    return view(*args, **kwargs)
+
+                cache_key = self._make_key(vary_session)
+                entry = self._cache.get(cache_key)
+                if entry is None:
+                    response = make_response(view(*args, **kwargs))
+                    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                            or g.pop('response_cache_skip', False)):
+                        return response
+                    body = response.get_data()
+                    entry = {
+                        'body': body,
+                        'content_type': response.headers.get('Content-Type'),
+                        'etag': hashlib.sha1(body).hexdigest(),
+                    }
+                    self._cache.put(cache_key, entry)
+                    cache_status = 'MISS'
+                else:
+                    cache_status = 'HIT'
+
+                response = make_response(entry['body'], 200)
+                response.headers['Content-Type'] = entry['content_type']
+                # 非圧縮の本文から算出するため弱いETag（圧縮後の200と304で同じ形式になる）
+                response.set_etag(entry['etag'], weak=True)
+                response.headers['X-Response-Cache'] = cache_status
+                g.response_cache_policy = policy
+                return response.make_conditional(request)
+
+            return wrapper
+        return decorator
+
+    def _is_cacheable_request(self, personal_session) -> bool:
+        if not self.enabled or request.method not in CACHEABLE_METHODS:
+            return False
+        # フラッシュメッセージは表示時に消費されるためキャッシュ不可
+        if session.get('_flashes'):
+            return False
+        return not any(session.get(key) for key in personal_session)
+
+    def _make_key(self, vary_session) -> str:
+        corpus_version = self.version_func() if self.version_func else ''
+        parts = [
+            request.endpoint or request.path,
+            repr(sorted((request.view_args or {}).items())),
+            repr(sorted(request.args.items(multi=True))),
+            corpus_version,
+        ]
+        if vary_session:
+            parts.append(repr([session.get(key) for key in vary_session]))
+        return hashlib.sha1("|".join(parts).encode('utf-8')).hexdigest()
+
+    def apply_policy(self, response) -> bool:
+        """
+        キャッシュ対象ルートのCache-Controlを設定（after_requestから呼び出し）
+        対象外のレスポンスでは何もせず False を返す
+        """
+        policy = g.get('response_cache_policy')
+        if not policy or response.status_code not in (200, 304):
+            return False
+        cache_control = self.policies.get(policy)
+        if not cache_control:
+            return False
+        response.headers['Cache-Control'] = cache_control
+        response.headers.pop('Pragma', None)
+        response.headers.pop('Expires', None)
+        return True
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def get_stats(self) -> Dict:
+        stats = self._cache.stats()
+        stats['bypass_count'] = self.bypass_count
+        stats['enabled'] = self.enabled
+        return stats
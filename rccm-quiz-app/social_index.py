@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Social Index - 学習グループ・ディスカッションのメモリ上の索引
+
+- ディスカッション: 一覧用の要約行と、並び順（ピン留め → 更新日時の降順）のキーの
+  ソート済みリストを 全件 / グループ / 分野 / 問題 / タグ 毎に保持（転置索引）。
+  一覧はキーの範囲を先頭から必要件数だけ辿るため、全件の読み込み・ソートが不要
+- カーソル方式のページング（前ページ最後のキーを不透明な文字列で受け渡し）
+- 学習グループ: 作成順の並びを 部門 / メンバー 毎に保持
+- このプロセスでの更新は editing() の中で変更した文書のみを差し替え（返信数なども差分で更新）。
+  他プロセスの更新はリポジトリの social_revision() の変化で検出し、そのコレクションのみ再構築
+"""
+
+import base64
+import binascii
+import json
+import logging
+import threading
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from user_store import UserRepository
+
+logger = logging.getLogger(__name__)
+
+SortKey = Tuple[int, str, str]  # (ピン留め, 更新日時, ディスカッションID) の昇順 = 表示順の逆
+
+# 一覧（get_discussions）で返す要約の項目
+SUMMARY_FIELDS = ('title', 'author_id', 'category', 'created_at', 'updated_at', 'is_solved', 'is_pinned',
+                  'view_count', 'tags')
+
+
+def encode_cursor(key: SortKey) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key), ensure_ascii=False).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[SortKey]:
+    """不正なカーソルは ValueError"""
+    if not cursor:
+        return None
+    try:
+        pinned, updated_at, discussion_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return int(pinned), str(updated_at), str(discussion_id)
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as e:
+        raise ValueError(f'invalid cursor: {cursor}') from e
+
+
+def _facet_key(value: Any) -> Any:
+    """索引のキー（リスト等のハッシュ不可な値は JSON 文字列に）"""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+class _DiscussionIndex:
+    """ディスカッションの要約行と転置索引"""
+
+    def __init__(self):
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self.keys: Dict[str, SortKey] = {}
+        self.facets: Dict[str, List[Tuple[str, Any]]] = {}
+        self.postings: Dict[Tuple[str, Any], List[SortKey]] = {('all', None): []}
+
+    @staticmethod
+    def _facets(discussion: Dict[str, Any]) -> List[Tuple[str, Any]]:
+        facets = [('all', None)]
+        if discussion.get('group_id'):
+            facets.append(('group', _facet_key(discussion['group_id'])))
+        if discussion.get('category'):
+            facets.append(('category', _facet_key(discussion['category'])))
+        if discussion.get('question_id'):
+            facets.append(('question', _facet_key(discussion['question_id'])))
+        for tag in dict.fromkeys(discussion.get('tags') or []):
+            facets.append(('tag', _facet_key(tag)))
+        return facets
+
+    def remove(self, discussion_id: str) -> None:
+        key = self.keys.pop(discussion_id, None)
+        self.rows.pop(discussion_id, None)
+        for facet in self.facets.pop(discussion_id, ()):
+            posting = self.postings.get(facet)
+            if posting is None:
+                continue
+            index = bisect_left(posting, key)
+            if index < len(posting) and posting[index] == key:
+                del posting[index]
+            if not posting and facet[0] != 'all':
+                del self.postings[facet]
+
+    def put(self, discussion_id: str, discussion: Optional[Dict[str, Any]]) -> None:
+        self.remove(discussion_id)
+        if discussion is None:
+            return
+        row = {'id': discussion_id}
+        for field in SUMMARY_FIELDS:
+            row[field] = discussion.get(field)
+        votes = discussion.get('votes') or {}
+        row['reply_count'] = len(discussion.get('replies') or [])
+        row['vote_score'] = votes.get('up', 0) - votes.get('down', 0)
+        row['group_id'] = discussion.get('group_id')
+        row['question_id'] = discussion.get('question_id')
+
+        key = (1 if discussion.get('is_pinned') else 0, str(discussion.get('updated_at') or ''), discussion_id)
+        facets = self._facets(discussion)
+        self.rows[discussion_id] = row
+        self.keys[discussion_id] = key
+        self.facets[discussion_id] = facets
+        for facet in facets:
+            insort(self.postings.setdefault(facet, []), key)
+
+    def page(self, filters: List[Tuple[str, Any]], limit: int,
+             after: Optional[SortKey]) -> Tuple[List[Dict[str, Any]], Optional[SortKey]]:
+        """表示順で after の次から limit 件。最も短い転置リストを辿り、残りの条件は行で確認"""
+        postings = [self.postings.get(facet, []) for facet in filters] or [self.postings[('all', None)]]
+        posting = min(postings, key=len)
+        others = [facet for facet in filters if self.postings.get(facet) is not posting]
+
+        end = len(posting) if after is None else bisect_left(posting, after)
+        results = []
+        last_key = None
+        for index in range(end - 1, -1, -1):
+            key = posting[index]
+            discussion_id = key[2]
+            if others:
+                facets = self.facets[discussion_id]
+                if any(facet not in facets for facet in others):
+                    continue
+            if len(results) == limit:
+                return results, last_key
+            results.append(self.rows[discussion_id])
+            last_key = key
+        return results, None
+
+
+class _GroupIndex:
+    """学習グループの文書と作成順の 部門 / メンバー 索引"""
+
+    def __init__(self):
+        self.groups: Dict[str, Dict[str, Any]] = {}  # 挿入順 = 作成順
+        self.sequence: Dict[str, int] = {}
+        self.next_sequence = 0
+        self.by_department: Dict[Any, Dict[str, None]] = {}
+        self.by_member: Dict[str, Dict[str, None]] = {}
+
+    def put(self, group_id: str, group: Optional[Dict[str, Any]]) -> None:
+        """更新時は変わった索引のみ差し替え（部門が同じなら部門内の順序は不変）"""
+        previous = self.groups.get(group_id)
+        old_department = _facet_key(previous.get('department')) if previous else None
+        old_members = set(previous.get('members') or []) if previous else set()
+        new_department = _facet_key(group.get('department')) if group else None
+        new_members = set(group.get('members') or []) if group else set()
+
+        if previous is not None and (group is None or old_department != new_department):
+            self._unlink(self.by_department, old_department, group_id)
+        if group is not None and (previous is None or old_department != new_department):
+            self.by_department.setdefault(new_department, {})[group_id] = None
+        for member in old_members - new_members:
+            self._unlink(self.by_member, member, group_id)
+        for member in new_members - old_members:
+            self.by_member.setdefault(member, {})[group_id] = None
+
+        if group is None:
+            self.groups.pop(group_id, None)
+            self.sequence.pop(group_id, None)
+        else:
+            if previous is None:
+                self.sequence[group_id] = self.next_sequence
+                self.next_sequence += 1
+            self.groups[group_id] = group
+
+    @staticmethod
+    def _unlink(index: Dict[Any, Dict[str, None]], key: Any, group_id: str) -> None:
+        group_ids = index.get(key)
+        if group_ids is not None:
+            group_ids.pop(group_id, None)
+            if not group_ids:
+                del index[key]
+
+
+class SocialIndex:
+    """学習グループ・ディスカッションの索引（SocialLearningManager から利用）"""
+
+    def __init__(self, repository: UserRepository):
+        self.repository = repository
+        self._lock = threading.RLock()
+        self._discussions = _DiscussionIndex()
+        self._groups = _GroupIndex()
+        self._revisions: Dict[str, Optional[str]] = {'groups': None, 'discussions': None}
+        self._stats = {'rebuilds': 0, 'updates': 0, 'reads': 0}
+
+    # --- 参照 ---
+
+    def discussions_page(self, group_id: str = None, category: str = None, question_id: Any = None,
+                         tag: str = None, limit: int = 20,
+                         cursor: str = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """ディスカッション一覧（ピン留め → 更新日時の降順）と次ページのカーソル"""
+        after = decode_cursor(cursor)
+        filters = []
+        if group_id:
+            filters.append(('group', _facet_key(group_id)))
+        if category:
+            filters.append(('category', _facet_key(category)))
+        if question_id:
+            filters.append(('question', _facet_key(question_id)))
+        if tag:
+            filters.append(('tag', _facet_key(tag)))
+        with self._lock:
+            self._sync('discussions')
+            self._stats['reads'] += 1
+            rows, last_key = self._discussions.page(filters, max(limit, 0), after)
+            summaries = []
+            for row in rows:
+                summary = dict(row)
+                del summary['group_id'], summary['question_id']
+                summary['tags'] = list(summary['tags'] or [])
+                summaries.append(summary)
+            return summaries, encode_cursor(last_key) if last_key else None
+
+    def user_groups(self, user_id: str) -> List[Dict[str, Any]]:
+        """ユーザーの参加グループ（作成順）"""
+        with self._lock:
+            self._sync('groups')
+            self._stats['reads'] += 1
+            index = self._groups
+            member_of = sorted(index.by_member.get(user_id, {}), key=index.sequence.__getitem__)
+            return [index.groups[group_id] for group_id in member_of]
+
+    def joinable_groups(self, user_id: str, department: str = None,
+                        preferred_department: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        参加可能な公開グループ（未参加・定員未満）を順に返す
+        department 指定時はその部門のみ、それ以外は preferred_department の部門 → その他の作成順
+        """
+        with self._lock:
+            self._sync('groups')
+            self._stats['reads'] += 1
+            index = self._groups
+            if department:
+                candidates = list(index.by_department.get(_facet_key(department), {}))
+            else:
+                preferred = index.by_department.get(_facet_key(preferred_department), {})
+                candidates = list(preferred) + [group_id for group_id in index.groups if group_id not in preferred]
+            groups = index.groups
+        for group_id in candidates:
+            group = groups.get(group_id)
+            if group is None or user_id in group['members'] or not group.get('is_public', True):
+                continue
+            if len(group['members']) >= group['settings']['max_members']:
+                continue
+            yield group
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, revisions=dict(self._revisions), groups=len(self._groups.groups),
+                        discussions=len(self._discussions.rows), facets=len(self._discussions.postings))
+
+    # --- 更新 ---
+
+    @contextmanager
+    def editing(self, name: str) -> Iterator[Dict[str, Optional[Dict[str, Any]]]]:
+        """
+        コレクションの読み込み〜保存を囲むロック（repository.social_lock）
+        ブロック内で保存した文書を changes[id] = 文書（削除は None）に記録すると索引へ差分反映。
+        ブロック開始時点で索引が最新でなかった場合は反映せず、次回参照時に再構築
+        """
+        with self.repository.social_lock(name):
+            before = self.repository.social_revision(name)
+            changes: Dict[str, Optional[Dict[str, Any]]] = {}
+            yield changes
+            if not changes:
+                return
+            after = self.repository.social_revision(name)
+            with self._lock:
+                if self._revisions[name] != before or after == before:
+                    return
+                collection = self._groups if name == 'groups' else self._discussions
+                for document_id, document in changes.items():
+                    collection.put(document_id, document)
+                self._revisions[name] = after
+                self._stats['updates'] += len(changes)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._revisions = {'groups': None, 'discussions': None}
+
+    def _sync(self, name: str) -> None:
+        revision = self.repository.social_revision(name)
+        if revision == self._revisions[name]:
+            return
+        if name == 'groups':
+            index = _GroupIndex()
+            for group_id, group in self.repository.load_groups().items():
+                index.put(group_id, group)
+            self._groups = index
+        else:
+            index = _DiscussionIndex()
+            for discussion_id, discussion in self.repository.load_discussions().items():
+                index.put(discussion_id, discussion)
+            self._discussions = index
+        self._revisions[name] = revision
+        self._stats['rebuilds'] += 1
+        logger.debug("🔄 SocialIndex %s 再構築 (%s)", name, revision)
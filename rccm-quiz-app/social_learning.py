@@ -11,9 +11,20 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict, Counter
 import random
+from contextlib import contextmanager
+
+from config import LeaderboardConfig, SocialIndexConfig, StudyPartnerConfig
+from json_store import update_json, write_json
+from leaderboard import MaterializedLeaderboard
+from social_index import SocialIndex
+from user_similarity import UserSimilarityIndex
+from user_store import get_user_repository
 
 logger = logging.getLogger(__name__)
 
+# ディスカッション本文から抽出するタグ
+TAG_KEYWORDS = ('基礎', '専門', '難しい', '計算', '法規', '設計', '施工')
+
 class SocialLearningManager:
     """ソーシャル学習機能管理"""
     
@@ -26,6 +37,23 @@ class SocialLearningManager:
         
         # ディレクトリ作成
         os.makedirs(social_data_dir, exist_ok=True)
+        self.user_repository = get_user_repository(user_data_dir, social_data_dir)
+        
+        # リーダーボード（回答保存時に差分更新）
+        self.leaderboard = None
+        if LeaderboardConfig.MATERIALIZED:
+            self.leaderboard = MaterializedLeaderboard(self.user_repository, self._leaderboard_score)
+            self.user_repository.add_listener(self.leaderboard.on_user_saved)
+        
+        # 学習パートナー推奨（ユーザー特徴ベクトルの類似度索引）
+        self.similarity_index = None
+        if StudyPartnerConfig.VECTORIZED:
+            self.similarity_index = UserSimilarityIndex(self.user_repository, self._study_level_for_count,
+                                                        self._activity_level_for_count)
+            self.user_repository.add_listener(self.similarity_index.on_user_saved)
+        
+        # 学習グループ・ディスカッションの索引（一覧・検索・ページング）
+        self.social_index = SocialIndex(self.user_repository) if SocialIndexConfig.INDEXED else None
         
         logger.info("ソーシャル学習機能初期化完了")
     
@@ -35,47 +63,49 @@ class SocialLearningManager:
                           department: str = None, target_exam_date: str = None) -> Dict[str, Any]:
         """学習グループ作成"""
         try:
-            groups = self._load_groups()
-            
-            group_id = hashlib.md5(f"{group_name}{creator_id}{datetime.now()}".encode()).hexdigest()[:12]
-            
-            new_group = {
-                'id': group_id,
-                'name': group_name,
-                'description': description,
-                'creator_id': creator_id,
-                'department': department,
-                'target_exam_date': target_exam_date,
-                'created_at': datetime.now().isoformat(),
-                'members': [creator_id],
-                'moderators': [creator_id],
-                'is_public': True,
-                'settings': {
-                    'allow_join_requests': True,
-                    'require_approval': False,
-                    'max_members': 50,
-                    'study_schedule': [],
-                    'shared_goals': []
-                },
-                'statistics': {
-                    'total_members': 1,
-                    'active_members': 1,
-                    'discussions_count': 0,
-                    'shared_questions': 0,
-                    'group_sessions': 0
+            with self._editing('groups') as changed:
+                groups = self._load_groups()
+                
+                group_id = hashlib.md5(f"{group_name}{creator_id}{datetime.now()}".encode()).hexdigest()[:12]
+                
+                new_group = {
+                    'id': group_id,
+                    'name': group_name,
+                    'description': description,
+                    'creator_id': creator_id,
+                    'department': department,
+                    'target_exam_date': target_exam_date,
+                    'created_at': datetime.now().isoformat(),
+                    'members': [creator_id],
+                    'moderators': [creator_id],
+                    'is_public': True,
+                    'settings': {
+                        'allow_join_requests': True,
+                        'require_approval': False,
+                        'max_members': 50,
+                        'study_schedule': [],
+                        'shared_goals': []
+                    },
+                    'statistics': {
+                        'total_members': 1,
+                        'active_members': 1,
+                        'discussions_count': 0,
+                        'shared_questions': 0,
+                        'group_sessions': 0
+                    }
                 }
-            }
-            
-            groups[group_id] = new_group
-            self._save_groups(groups)
-            
-            logger.info(f"学習グループ作成: {group_name} (ID: {group_id})")
-            return {
-                'success': True,
-                'group_id': group_id,
-                'group': new_group
-            }
-            
+                
+                groups[group_id] = new_group
+                self._save_groups(groups)
+                changed[group_id] = new_group
+                
+                logger.info(f"学習グループ作成: {group_name} (ID: {group_id})")
+                return {
+                    'success': True,
+                    'group_id': group_id,
+                    'group': new_group
+                }
+                
         except Exception as e:
             logger.error(f"グループ作成エラー: {e}")
             return {'success': False, 'error': str(e)}
@@ -83,47 +113,49 @@ class SocialLearningManager:
     def join_group(self, user_id: str, group_id: str, request_message: str = '') -> Dict[str, Any]:
         """グループ参加"""
         try:
-            groups = self._load_groups()
-            
-            if group_id not in groups:
-                return {'success': False, 'error': 'グループが見つかりません'}
-            
-            group = groups[group_id]
-            
-            # 既に参加済みチェック
-            if user_id in group['members']:
-                return {'success': False, 'error': '既にグループに参加しています'}
-            
-            # 参加人数制限チェック
-            if len(group['members']) >= group['settings']['max_members']:
-                return {'success': False, 'error': 'グループの参加人数が上限に達しています'}
-            
-            # 承認が必要な場合
-            if group['settings']['require_approval']:
-                # 参加リクエストとして処理（簡略化）
-                group['members'].append(user_id)
-                message = f"{user_id}さんがグループに参加しました"
-            else:
-                # 直接参加
-                group['members'].append(user_id)
-                message = f"{user_id}さんがグループに参加しました"
-            
-            # 統計更新
-            group['statistics']['total_members'] = len(group['members'])
-            
-            groups[group_id] = group
-            self._save_groups(groups)
-            
-            # グループ活動記録
-            self._record_group_activity(group_id, 'member_joined', user_id, message)
-            
-            logger.info(f"グループ参加: ユーザー{user_id} → グループ{group_id}")
-            return {
-                'success': True,
-                'message': message,
-                'group': group
-            }
-            
+            with self._editing('groups') as changed:
+                groups = self._load_groups()
+                
+                if group_id not in groups:
+                    return {'success': False, 'error': 'グループが見つかりません'}
+                
+                group = groups[group_id]
+                
+                # 既に参加済みチェック
+                if user_id in group['members']:
+                    return {'success': False, 'error': '既にグループに参加しています'}
+                
+                # 参加人数制限チェック
+                if len(group['members']) >= group['settings']['max_members']:
+                    return {'success': False, 'error': 'グループの参加人数が上限に達しています'}
+                
+                # 承認が必要な場合
+                if group['settings']['require_approval']:
+                    # 参加リクエストとして処理（簡略化）
+                    group['members'].append(user_id)
+                    message = f"{user_id}さんがグループに参加しました"
+                else:
+                    # 直接参加
+                    group['members'].append(user_id)
+                    message = f"{user_id}さんがグループに参加しました"
+                
+                # 統計更新
+                group['statistics']['total_members'] = len(group['members'])
+                
+                groups[group_id] = group
+                self._save_groups(groups)
+                changed[group_id] = group
+                
+                # グループ活動記録
+                self._record_group_activity(group_id, 'member_joined', user_id, message)
+                
+                logger.info(f"グループ参加: ユーザー{user_id} → グループ{group_id}")
+                return {
+                    'success': True,
+                    'message': message,
+                    'group': group
+                }
+                
         except Exception as e:
             logger.error(f"グループ参加エラー: {e}")
             return {'success': False, 'error': str(e)}
@@ -131,47 +163,50 @@ class SocialLearningManager:
     def leave_group(self, user_id: str, group_id: str) -> Dict[str, Any]:
         """グループ退会"""
         try:
-            groups = self._load_groups()
-            
-            if group_id not in groups:
-                return {'success': False, 'error': 'グループが見つかりません'}
-            
-            group = groups[group_id]
-            
-            if user_id not in group['members']:
-                return {'success': False, 'error': 'グループに参加していません'}
-            
-            # メンバーから削除
-            group['members'].remove(user_id)
-            
-            # モデレーターからも削除
-            if user_id in group['moderators']:
-                group['moderators'].remove(user_id)
+            with self._editing('groups') as changed:
+                groups = self._load_groups()
                 
-                # 作成者が退会する場合、他のモデレーターに権限移譲
-                if user_id == group['creator_id'] and group['members']:
-                    new_creator = group['members'][0]
-                    group['creator_id'] = new_creator
-                    if new_creator not in group['moderators']:
-                        group['moderators'].append(new_creator)
-            
-            # グループが空になった場合は削除
-            if not group['members']:
-                del groups[group_id]
+                if group_id not in groups:
+                    return {'success': False, 'error': 'グループが見つかりません'}
+                
+                group = groups[group_id]
+                
+                if user_id not in group['members']:
+                    return {'success': False, 'error': 'グループに参加していません'}
+                
+                # メンバーから削除
+                group['members'].remove(user_id)
+                
+                # モデレーターからも削除
+                if user_id in group['moderators']:
+                    group['moderators'].remove(user_id)
+                    
+                    # 作成者が退会する場合、他のモデレーターに権限移譲
+                    if user_id == group['creator_id'] and group['members']:
+                        new_creator = group['members'][0]
+                        group['creator_id'] = new_creator
+                        if new_creator not in group['moderators']:
+                            group['moderators'].append(new_creator)
+                
+                # グループが空になった場合は削除
+                if not group['members']:
+                    del groups[group_id]
+                    self._save_groups(groups)
+                    changed[group_id] = None
+                    return {'success': True, 'message': 'グループが削除されました'}
+                
+                # 統計更新
+                group['statistics']['total_members'] = len(group['members'])
+                
+                groups[group_id] = group
                 self._save_groups(groups)
-                return {'success': True, 'message': 'グループが削除されました'}
-            
-            # 統計更新
-            group['statistics']['total_members'] = len(group['members'])
-            
-            groups[group_id] = group
-            self._save_groups(groups)
-            
-            self._record_group_activity(group_id, 'member_left', user_id, f"{user_id}さんがグループを退会しました")
-            
-            logger.info(f"グループ退会: ユーザー{user_id} ← グループ{group_id}")
-            return {'success': True, 'message': 'グループを退会しました'}
-            
+                changed[group_id] = group
+                
+                self._record_group_activity(group_id, 'member_left', user_id, f"{user_id}さんがグループを退会しました")
+                
+                logger.info(f"グループ退会: ユーザー{user_id} ← グループ{group_id}")
+                return {'success': True, 'message': 'グループを退会しました'}
+                
         except Exception as e:
             logger.error(f"グループ退会エラー: {e}")
             return {'success': False, 'error': str(e)}
@@ -179,7 +214,10 @@ class SocialLearningManager:
     def get_user_groups(self, user_id: str) -> List[Dict[str, Any]]:
         """ユーザーの参加グループ取得"""
         try:
-            groups = self._load_groups()
+            if self.social_index is not None:
+                groups = {group['id']: group for group in self.social_index.user_groups(user_id)}
+            else:
+                groups = self._load_groups()
             user_groups = []
             
             for group_id, group in groups.items():
@@ -207,9 +245,21 @@ class SocialLearningManager:
                        limit: int = 20) -> List[Dict[str, Any]]:
         """グループ発見"""
         try:
-            groups = self._load_groups()
             user_data = self._load_user_data(user_id)
             
+            if self.social_index is not None:
+                # 推奨スコアはグループ側では部門一致のみで変わるため、
+                # 主要部門のグループ → その他の順（各作成順）に参加可能なものを limit 件だけ辿る
+                primary_department = self._get_primary_department(user_data.get('history', []))
+                recommendations = []
+                for group in self.social_index.joinable_groups(user_id, department, primary_department):
+                    recommendations.append(self._group_recommendation(user_data, group['id'], group))
+                    if len(recommendations) >= limit:
+                        break
+                recommendations.sort(key=lambda x: x['match_score'], reverse=True)
+                return recommendations
+            
+            groups = self._load_groups()
             recommendations = []
             
             for group_id, group in groups.items():
@@ -229,22 +279,7 @@ class SocialLearningManager:
                 if len(group['members']) >= group['settings']['max_members']:
                     continue
                 
-                # 推奨スコア計算
-                score = self._calculate_group_match_score(user_data, group)
-                
-                recommendations.append({
-                    'group': {
-                        'id': group_id,
-                        'name': group['name'],
-                        'description': group['description'],
-                        'department': group['department'],
-                        'member_count': len(group['members']),
-                        'created_at': group['created_at'],
-                        'target_exam_date': group.get('target_exam_date')
-                    },
-                    'match_score': score,
-                    'reasons': self._get_match_reasons(user_data, group)
-                })
+                recommendations.append(self._group_recommendation(user_data, group_id, group))
             
             # スコア順でソート
             recommendations.sort(key=lambda x: x['match_score'], reverse=True)
@@ -255,6 +290,22 @@ class SocialLearningManager:
             logger.error(f"グループ発見エラー: {e}")
             return []
     
+    def _group_recommendation(self, user_data: Dict, group_id: str, group: Dict) -> Dict[str, Any]:
+        """おすすめグループ1件分（推奨スコア・理由付き）"""
+        return {
+            'group': {
+                'id': group_id,
+                'name': group['name'],
+                'description': group['description'],
+                'department': group['department'],
+                'member_count': len(group['members']),
+                'created_at': group['created_at'],
+                'target_exam_date': group.get('target_exam_date')
+            },
+            'match_score': self._calculate_group_match_score(user_data, group),
+            'reasons': self._get_match_reasons(user_data, group)
+        }
+    
     # === ピア比較機能 ===
     
     def get_peer_comparison(self, user_id: str, comparison_type: str = 'department') -> Dict[str, Any]:
@@ -264,10 +315,8 @@ class SocialLearningManager:
             if not user_data:
                 return {'error': 'ユーザーデータが見つかりません'}
             
-            all_users = self._load_all_user_data()
-            
             # 比較対象ユーザーを選択
-            peers = self._select_peers(user_id, user_data, all_users, comparison_type)
+            peers = self._select_peers(user_id, user_data, comparison_type)
             
             if not peers:
                 return {'message': '比較対象のユーザーが見つかりませんでした'}
@@ -289,48 +338,24 @@ class SocialLearningManager:
             return {'error': str(e)}
     
     def get_leaderboard(self, department: str = None, time_period: str = 'month') -> List[Dict[str, Any]]:
-        """リーダーボード取得"""
+        """リーダーボード取得（期間・部門で絞り込んだユーザー毎の回答集計から算出）"""
         try:
-            all_users = self._load_all_user_data()
+            if self.leaderboard is not None:
+                return self.leaderboard.top(department, time_period, limit=50)
             
             # 時間期間フィルタ
             cutoff_date = self._get_time_cutoff(time_period)
             
             user_scores = []
-            for user_id, user_data in all_users.items():
-                history = user_data.get('history', [])
-                
-                # 期間フィルタ
-                if cutoff_date:
-                    filtered_history = []
-                    for h in history:
-                        try:
-                            date_str = h.get('date', '')
-                            if date_str:
-                                date_obj = datetime.fromisoformat(date_str)
-                                if date_obj >= cutoff_date:
-                                    filtered_history.append(h)
-                        except (ValueError, TypeError):
-                            continue
-                    history = filtered_history
-                
-                # 部門フィルタ
-                if department:
-                    history = [h for h in history if h.get('department') == department]
-                
-                if not history:
-                    continue
-                
+            for aggregate in self.user_repository.answer_aggregates(department=department, since=cutoff_date):
                 # スコア計算
-                score = self._calculate_leaderboard_score(history)
-                
                 user_scores.append({
-                    'user_id': user_id,
-                    'score': score,
-                    'accuracy': sum(1 for h in history if h.get('is_correct', False)) / len(history),
-                    'total_questions': len(history),
-                    'study_streak': self._calculate_study_streak(history),
-                    'department_focus': self._get_primary_department(history)
+                    'user_id': aggregate['user_id'],
+                    'score': self._leaderboard_score(aggregate['total'], aggregate['correct'], aggregate['study_days']),
+                    'accuracy': aggregate['correct'] / aggregate['total'],
+                    'total_questions': aggregate['total'],
+                    'study_streak': aggregate['study_days'],
+                    'department_focus': aggregate['primary_department']
                 })
             
             # スコア順でソート
@@ -353,42 +378,44 @@ class SocialLearningManager:
                          category: str = 'general') -> Dict[str, Any]:
         """ディスカッション作成"""
         try:
-            discussions = self._load_discussions()
-            
-            discussion_id = hashlib.md5(f"{title}{user_id}{datetime.now()}".encode()).hexdigest()[:12]
-            
-            new_discussion = {
-                'id': discussion_id,
-                'title': title,
-                'content': content,
-                'author_id': user_id,
-                'question_id': question_id,
-                'group_id': group_id,
-                'category': category,
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat(),
-                'replies': [],
-                'votes': {'up': 0, 'down': 0, 'voters': []},
-                'tags': self._extract_tags(content),
-                'is_solved': False,
-                'is_pinned': False,
-                'view_count': 0
-            }
-            
-            discussions[discussion_id] = new_discussion
-            self._save_discussions(discussions)
-            
-            # グループディスカッションの場合、グループ統計更新
-            if group_id:
-                self._update_group_discussion_count(group_id)
-            
-            logger.info(f"ディスカッション作成: {title} (ID: {discussion_id})")
-            return {
-                'success': True,
-                'discussion_id': discussion_id,
-                'discussion': new_discussion
-            }
-            
+            with self._editing('discussions') as changed:
+                discussions = self._load_discussions()
+                
+                discussion_id = hashlib.md5(f"{title}{user_id}{datetime.now()}".encode()).hexdigest()[:12]
+                
+                new_discussion = {
+                    'id': discussion_id,
+                    'title': title,
+                    'content': content,
+                    'author_id': user_id,
+                    'question_id': question_id,
+                    'group_id': group_id,
+                    'category': category,
+                    'created_at': datetime.now().isoformat(),
+                    'updated_at': datetime.now().isoformat(),
+                    'replies': [],
+                    'votes': {'up': 0, 'down': 0, 'voters': []},
+                    'tags': self._extract_tags(content),
+                    'is_solved': False,
+                    'is_pinned': False,
+                    'view_count': 0
+                }
+                
+                discussions[discussion_id] = new_discussion
+                self._save_discussions(discussions)
+                changed[discussion_id] = new_discussion
+                
+                # グループディスカッションの場合、グループ統計更新
+                if group_id:
+                    self._update_group_discussion_count(group_id)
+                
+                logger.info(f"ディスカッション作成: {title} (ID: {discussion_id})")
+                return {
+                    'success': True,
+                    'discussion_id': discussion_id,
+                    'discussion': new_discussion
+                }
+                
         except Exception as e:
             logger.error(f"ディスカッション作成エラー: {e}")
             return {'success': False, 'error': str(e)}
@@ -397,35 +424,37 @@ class SocialLearningManager:
                            parent_reply_id: str = None) -> Dict[str, Any]:
         """ディスカッション返信"""
         try:
-            discussions = self._load_discussions()
-            
-            if discussion_id not in discussions:
-                return {'success': False, 'error': 'ディスカッションが見つかりません'}
-            
-            reply_id = hashlib.md5(f"{content}{user_id}{datetime.now()}".encode()).hexdigest()[:8]
-            
-            reply = {
-                'id': reply_id,
-                'content': content,
-                'author_id': user_id,
-                'created_at': datetime.now().isoformat(),
-                'parent_reply_id': parent_reply_id,
-                'votes': {'up': 0, 'down': 0, 'voters': []},
-                'is_solution': False
-            }
-            
-            discussions[discussion_id]['replies'].append(reply)
-            discussions[discussion_id]['updated_at'] = datetime.now().isoformat()
-            
-            self._save_discussions(discussions)
-            
-            logger.info(f"ディスカッション返信: ユーザー{user_id} → ディスカッション{discussion_id}")
-            return {
-                'success': True,
-                'reply_id': reply_id,
-                'reply': reply
-            }
-            
+            with self._editing('discussions') as changed:
+                discussions = self._load_discussions()
+                
+                if discussion_id not in discussions:
+                    return {'success': False, 'error': 'ディスカッションが見つかりません'}
+                
+                reply_id = hashlib.md5(f"{content}{user_id}{datetime.now()}".encode()).hexdigest()[:8]
+                
+                reply = {
+                    'id': reply_id,
+                    'content': content,
+                    'author_id': user_id,
+                    'created_at': datetime.now().isoformat(),
+                    'parent_reply_id': parent_reply_id,
+                    'votes': {'up': 0, 'down': 0, 'voters': []},
+                    'is_solution': False
+                }
+                
+                discussions[discussion_id]['replies'].append(reply)
+                discussions[discussion_id]['updated_at'] = datetime.now().isoformat()
+                
+                self._save_discussions(discussions)
+                changed[discussion_id] = discussions[discussion_id]
+                
+                logger.info(f"ディスカッション返信: ユーザー{user_id} → ディスカッション{discussion_id}")
+                return {
+                    'success': True,
+                    'reply_id': reply_id,
+                    'reply': reply
+                }
+                
         except Exception as e:
             logger.error(f"ディスカッション返信エラー: {e}")
             return {'success': False, 'error': str(e)}
@@ -433,6 +462,30 @@ class SocialLearningManager:
     def get_discussions(self, group_id: str = None, category: str = None, 
                        question_id: int = None, limit: int = 20) -> List[Dict[str, Any]]:
         """ディスカッション一覧取得"""
+        try:
+            return self.get_discussions_page(group_id, category, question_id, limit=limit)['discussions']
+        except Exception as e:
+            logger.error(f"ディスカッション一覧取得エラー: {e}")
+            return []
+    
+    def get_discussions_page(self, group_id: str = None, category: str = None, question_id: int = None,
+                             tag: str = None, limit: int = 20, cursor: str = None) -> Dict[str, Any]:
+        """
+        ディスカッション一覧（カーソル方式のページング）
+        {'discussions': [...], 'next_cursor': 次ページのカーソル or None}。不正なカーソルは ValueError
+        """
+        limit = max(0, min(limit, SocialIndexConfig.MAX_PAGE_SIZE))
+        if self.social_index is not None:
+            discussions, next_cursor = self.social_index.discussions_page(
+                group_id, category, question_id, tag, limit, cursor)
+            return {'discussions': discussions, 'next_cursor': next_cursor}
+        if cursor:
+            raise ValueError('cursor pagination requires SOCIAL_INDEXED')
+        return {'discussions': self._scan_discussions(group_id, category, question_id, tag, limit), 'next_cursor': None}
+    
+    def _scan_discussions(self, group_id: str, category: str, question_id: int, tag: str,
+                          limit: int) -> List[Dict[str, Any]]:
+        """ディスカッション一覧（索引なし: 全件読み込み → 絞り込み → ソート）"""
         try:
             discussions = self._load_discussions()
             
@@ -446,6 +499,8 @@ class SocialLearningManager:
                     continue
                 if question_id and discussion.get('question_id') != question_id:
                     continue
+                if tag and tag not in (discussion.get('tags') or []):
+                    continue
                 
                 # 簡略化された情報を返す
                 filtered_discussions.append({
@@ -463,9 +518,9 @@ class SocialLearningManager:
                     'tags': discussion['tags']
                 })
             
-            # ソート（ピン留め → 更新日時順）
+            # ソート（ピン留め → 更新日時の新しい順）
             filtered_discussions.sort(
-                key=lambda x: (not x['is_pinned'], x['updated_at']), 
+                key=lambda x: (bool(x['is_pinned']), x['updated_at'], x['id']), 
                 reverse=True
             )
             
@@ -485,11 +540,15 @@ class SocialLearningManager:
             
             discussion = discussions[discussion_id].copy()
             
-            # 閲覧数増加
+            # 閲覧数増加（最新の内容に対して加算）
             if viewer_id:
-                discussion['view_count'] += 1
-                discussions[discussion_id]['view_count'] = discussion['view_count']
-                self._save_discussions(discussions)
+                with self._editing('discussions') as changed:
+                    discussions = self._load_discussions()
+                    if discussion_id in discussions:
+                        discussions[discussion_id]['view_count'] += 1
+                        discussion['view_count'] = discussions[discussion_id]['view_count']
+                        self._save_discussions(discussions)
+                        changed[discussion_id] = discussions[discussion_id]
             
             return discussion
             
@@ -526,9 +585,7 @@ class SocialLearningManager:
             
             # セッションファイルに保存
             sessions_file = os.path.join(self.social_data_dir, 'study_sessions.json')
-            sessions = self._load_json_file(sessions_file, {})
-            sessions[session_id] = session
-            self._save_json_file(sessions_file, sessions)
+            update_json(sessions_file, lambda sessions: sessions.update({session_id: session}))
             
             logger.info(f"学習セッション作成: {session_name} (ID: {session_id})")
             return {
@@ -544,6 +601,19 @@ class SocialLearningManager:
     def get_recommended_study_partners(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         """学習パートナー推奨"""
         try:
+            if self.similarity_index is not None:
+                recommendations = []
+                for other_id, similarity_score in self.similarity_index.similar_users(user_id, limit):
+                    total_questions = self.similarity_index.answer_count(other_id)
+                    recommendations.append({
+                        'user_id': other_id,
+                        'similarity_score': similarity_score,
+                        'common_interests': self.similarity_index.common_interests(user_id, other_id),
+                        'study_level': self._study_level_for_count(total_questions),
+                        'activity_level': self._activity_level_for_count(total_questions)
+                    })
+                return recommendations
+            
             user_data = self._load_user_data(user_id)
             all_users = self._load_all_user_data()
             
@@ -581,19 +651,35 @@ class SocialLearningManager:
     
     def _load_groups(self) -> Dict[str, Any]:
         """グループデータ読み込み"""
-        return self._load_json_file(self.groups_file, {})
+        return self.user_repository.load_groups()
     
     def _save_groups(self, groups: Dict[str, Any]):
         """グループデータ保存"""
-        self._save_json_file(self.groups_file, groups)
+        try:
+            self.user_repository.save_groups(groups)
+        except Exception as e:
+            logger.error(f"グループデータ保存エラー: {e}")
     
     def _load_discussions(self) -> Dict[str, Any]:
         """ディスカッションデータ読み込み"""
-        return self._load_json_file(self.discussions_file, {})
+        return self.user_repository.load_discussions()
     
     def _save_discussions(self, discussions: Dict[str, Any]):
         """ディスカッションデータ保存"""
-        self._save_json_file(self.discussions_file, discussions)
+        try:
+            self.user_repository.save_discussions(discussions)
+        except Exception as e:
+            logger.error(f"ディスカッションデータ保存エラー: {e}")
+    
+    @contextmanager
+    def _editing(self, name: str):
+        """グループ・ディスカッションの読み込み〜保存のロック。changes[id] = 保存した文書 で索引へ反映"""
+        if self.social_index is not None:
+            with self.social_index.editing(name) as changes:
+                yield changes
+        else:
+            with self.user_repository.social_lock(name):
+                yield {}
     
     def _load_json_file(self, filepath: str, default: Any) -> Any:
         """JSONファイル読み込み"""
@@ -607,31 +693,19 @@ class SocialLearningManager:
             return default
     
     def _save_json_file(self, filepath: str, data: Any):
-        """JSONファイル保存"""
+        """JSONファイル保存（アトミック置換）"""
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            write_json(filepath, data)
         except Exception as e:
             logger.error(f"JSONファイル保存エラー {filepath}: {e}")
     
     def _load_user_data(self, user_id: str) -> Dict[str, Any]:
         """ユーザーデータ読み込み"""
-        filepath = os.path.join(self.user_data_dir, f"{user_id}.json")
-        return self._load_json_file(filepath, {})
+        return self.user_repository.get_user(user_id)
     
     def _load_all_user_data(self) -> Dict[str, Dict[str, Any]]:
         """全ユーザーデータ読み込み"""
-        all_users = {}
-        
-        if not os.path.exists(self.user_data_dir):
-            return all_users
-        
-        for filename in os.listdir(self.user_data_dir):
-            if filename.endswith('.json'):
-                user_id = filename[:-5]
-                all_users[user_id] = self._load_user_data(user_id)
-        
-        return all_users
+        return dict(self.user_repository.iter_users())
     
     def _calculate_group_match_score(self, user_data: Dict, group: Dict) -> float:
         """グループマッチスコア計算"""
@@ -677,26 +751,29 @@ class SocialLearningManager:
         # 簡略化実装
         return []
     
-    def _select_peers(self, user_id: str, user_data: Dict, all_users: Dict, comparison_type: str) -> List[Dict]:
-        """ピア選択"""
-        peers = []
+    def _select_peers(self, user_id: str, user_data: Dict, comparison_type: str) -> List[Dict]:
+        """ピア選択（回答集計で候補を絞り込み、対象の最大20人分のみ読み込む）"""
+        aggregates = {row['user_id']: row for row in self.user_repository.answer_aggregates()}
         user_dept = self._get_primary_department(user_data.get('history', []))
+        user_level = self._assess_study_level(user_data)
         
-        for other_id, other_data in all_users.items():
+        peer_ids = []
+        for other_id in self.user_repository.user_ids():
             if other_id == user_id:
                 continue
             
+            aggregate = aggregates.get(other_id, {})
             if comparison_type == 'department':
-                other_dept = self._get_primary_department(other_data.get('history', []))
-                if user_dept == other_dept:
-                    peers.append(other_data)
+                if aggregate.get('primary_department', 'unknown') == user_dept:
+                    peer_ids.append(other_id)
             elif comparison_type == 'level':
-                user_level = self._assess_study_level(user_data)
-                other_level = self._assess_study_level(other_data)
-                if user_level == other_level:
-                    peers.append(other_data)
+                if self._study_level_for_count(aggregate.get('total', 0)) == user_level:
+                    peer_ids.append(other_id)
+            
+            if len(peer_ids) >= 20:  # 最大20人
+                break
         
-        return peers[:20]  # 最大20人
+        return [self._load_user_data(peer_id) for peer_id in peer_ids]
     
     def _calculate_user_stats(self, user_data: Dict) -> Dict[str, Any]:
         """ユーザー統計計算"""
@@ -788,11 +865,17 @@ class SocialLearningManager:
         if not history:
             return 0
         
-        # 正答率 × 問題数 × 継続性ボーナス
         correct_count = sum(1 for h in history if h.get('is_correct', False))
-        accuracy = correct_count / len(history)
-        volume_bonus = min(len(history) / 100, 2.0)  # 最大2倍
-        streak_bonus = self._calculate_study_streak(history) / 10  # 連続日数ボーナス
+        return self._leaderboard_score(len(history), correct_count, self._calculate_study_streak(history))
+    
+    @staticmethod
+    def _leaderboard_score(total: int, correct: int, study_days: int) -> float:
+        """正答率 × 問題数 × 継続性ボーナス"""
+        if not total:
+            return 0
+        accuracy = correct / total
+        volume_bonus = min(total / 100, 2.0)  # 最大2倍
+        streak_bonus = study_days / 10  # 連続日数ボーナス
         
         return accuracy * volume_bonus * (1 + streak_bonus)
     
@@ -824,45 +907,44 @@ class SocialLearningManager:
     
     def _assess_study_level(self, user_data: Dict) -> str:
         """学習レベル評価"""
-        history = user_data.get('history', [])
-        
-        if len(history) < 10:
+        return self._study_level_for_count(len(user_data.get('history', [])))
+    
+    @staticmethod
+    def _study_level_for_count(total_questions: int) -> str:
+        if total_questions < 10:
             return 'beginner'
-        elif len(history) < 50:
+        elif total_questions < 50:
             return 'intermediate'
         else:
             return 'advanced'
     
     def _assess_activity_level(self, user_data: Dict) -> str:
         """アクティビティレベル評価"""
-        history = user_data.get('history', [])
-        
-        if len(history) >= 100:
+        return self._activity_level_for_count(len(user_data.get('history', [])))
+    
+    @staticmethod
+    def _activity_level_for_count(total_questions: int) -> str:
+        if total_questions >= 100:
             return 'high'
-        elif len(history) >= 30:
+        elif total_questions >= 30:
             return 'medium'
         else:
             return 'low'
     
     def _extract_tags(self, content: str) -> List[str]:
         """コンテンツからタグ抽出"""
-        # 簡略化実装
-        keywords = ['基礎', '専門', '難しい', '計算', '法規', '設計', '施工']
-        tags = []
-        
-        for keyword in keywords:
-            if keyword in content:
-                tags.append(keyword)
-        
-        return tags[:5]  # 最大5つ
+        # 簡略化実装（作成時に1度だけ抽出し、以降は保存済みのタグを索引で参照）
+        return [keyword for keyword in TAG_KEYWORDS if keyword in content][:5]  # 最大5つ
     
     def _update_group_discussion_count(self, group_id: str):
         """グループディスカッション数更新"""
         try:
-            groups = self._load_groups()
-            if group_id in groups:
-                groups[group_id]['statistics']['discussions_count'] += 1
-                self._save_groups(groups)
+            with self._editing('groups') as changed:
+                groups = self._load_groups()
+                if group_id in groups:
+                    groups[group_id]['statistics']['discussions_count'] += 1
+                    self._save_groups(groups)
+                    changed[group_id] = groups[group_id]
         except Exception as e:
             logger.error(f"グループディスカッション数更新エラー: {e}")
     
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Static Assets - 静的ファイルのフィンガープリント（内容ハッシュ付きURL）
+
+- static/ 配下のファイル内容をハッシュ化し `js/main.<hash>.js` 形式のURLを生成
+- ハッシュ付きURLは内容が変われば変わるため、1年間の immutable キャッシュが可能
+- ビルド時に `python static_assets.py build` で assets-manifest.json を生成
+  （未生成、または対応表より新しい・対応表に無いファイルがある場合はアプリ起動時にメモリ上で構築）
+- テンプレートからは asset_url('js/main.js') で参照
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+from flask import url_for as flask_url_for
+from werkzeug.routing import BuildError
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+MANIFEST_FILENAME = 'assets-manifest.json'
+ASSET_URL_PREFIX = '/assets'
+ASSET_ENDPOINT = 'static_content.fingerprinted_asset'
+HASH_LENGTH = 12
+
+# フィンガープリント対象の拡張子（sw.js 等スコープ固定のファイルは対象外）
+FINGERPRINT_EXTENSIONS = {
+    '.js', '.css', '.png', '.ico', '.svg', '.gif', '.jpg', '.jpeg', '.webp',
+    '.woff', '.woff2', '.ttf', '.eot'
+}
+EXCLUDED_FILES = {'sw.js', MANIFEST_FILENAME}
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+_FINGERPRINT_PATTERN = re.compile(r'^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[^./]+)$' % HASH_LENGTH)
+
+
+def fingerprint_name(filename: str, digest: str) -> str:
+    """'js/main.js' → 'js/main.<hash>.js'"""
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def split_fingerprint(fingerprinted: str) -> Tuple[str, Optional[str]]:
+    """'js/main.<hash>.js' → ('js/main.js', '<hash>')、ハッシュなしは (そのまま, None)"""
+    match = _FINGERPRINT_PATTERN.match(fingerprinted)
+    if not match:
+        return fingerprinted, None
+    return f"{match.group('stem')}{match.group('ext')}", match.group('hash')
+
+
+class AssetManifest:
+    """元ファイル名 ⇔ フィンガープリント付きファイル名の対応表"""
+
+    def __init__(self, static_dir: str = STATIC_DIR, url_prefix: str = ASSET_URL_PREFIX):
+        self.static_dir = static_dir
+        self.url_prefix = url_prefix.rstrip('/')
+        self.manifest_path = os.path.join(static_dir, MANIFEST_FILENAME)
+        self._assets: Dict[str, str] = {}
+        self._reverse: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _iter_files(self) -> Iterator[Tuple[str, str]]:
+        """フィンガープリント対象ファイルの (相対パス, 絶対パス)"""
+        for root, _dirs, files in os.walk(self.static_dir):
+            for name in files:
+                if name in EXCLUDED_FILES or os.path.splitext(name)[1].lower() not in FINGERPRINT_EXTENSIONS:
+                    continue
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, self.static_dir).replace(os.sep, '/'), path
+
+    def build(self) -> Dict[str, str]:
+        """static/ 配下を走査して内容ハッシュを計算"""
+        assets = {}
+        for relative, path in self._iter_files():
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            assets[relative] = fingerprint_name(relative, digest)
+        self._set_assets(assets)
+        return assets
+
+    def write(self) -> str:
+        """対応表を assets-manifest.json に書き出し（ビルド時）"""
+        with self._lock:
+            assets = dict(self._assets)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(assets, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+        return self.manifest_path
+
+    def load(self) -> bool:
+        """ビルド済みの assets-manifest.json を読み込み"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                assets = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(assets, dict):
+            return False
+        self._set_assets(assets)
+        return True
+
+    def is_stale(self) -> bool:
+        """
+        ビルド済み対応表が static/ の内容より古いか
+        （対応表より新しいファイル・対応表に無いファイル・消えたファイルがあれば True）
+        古い対応表のまま配信すると、変更後の内容が旧ハッシュのURLで immutable 配信される
+        """
+        try:
+            manifest_mtime = os.path.getmtime(self.manifest_path)
+            found = 0
+            for relative, path in self._iter_files():
+                if relative not in self._assets or os.path.getmtime(path) > manifest_mtime:
+                    return True
+                found += 1
+        except OSError:
+            return True
+        return found != len(self._assets)
+
+    def register(self) -> int:
+        """起動時登録: ビルド済み対応表が最新なら使用、なければ（古ければ）構築"""
+        loaded = self.load()
+        if loaded and not self.is_stale():
+            logger.info(f"📦 静的アセット対応表を読み込み: {len(self._assets)}件")
+        else:
+            if loaded:
+                logger.warning(f"⚠️ 静的アセット対応表が static/ より古いため再構築: {self.manifest_path}")
+            self.build()
+            logger.info(f"📦 静的アセット対応表を構築: {len(self._assets)}件")
+        return len(self._assets)
+
+    def _set_assets(self, assets: Dict[str, str]) -> None:
+        with self._lock:
+            self._assets = dict(assets)
+            self._reverse = {hashed: original for original, hashed in assets.items()}
+
+    def url_for(self, filename: str) -> str:
+        """テンプレート用: フィンガープリント付きURL（未登録ファイルは通常の /static/ URL）"""
+        filename = filename.lstrip('/')
+        hashed = self._assets.get(filename)
+        # SCRIPT_NAME 配下へのマウントや static_url_path の変更に追従するため Flask の url_for で生成
+        try:
+            if hashed is None:
+                return flask_url_for('static', filename=filename)
+            return flask_url_for(ASSET_ENDPOINT, filename=hashed)
+        except (BuildError, RuntimeError):
+            # アプリコンテキスト外、または静的コンテンツBlueprint未登録
+            if hashed is None:
+                return f"/static/{filename}"
+            return f"{self.url_prefix}/{hashed}"
+
+    def resolve(self, fingerprinted: str) -> Tuple[Optional[str], bool]:
+        """
+        フィンガープリント付きファイル名を元ファイル名に解決
+        Returns: (元ファイル名, 現行ハッシュと一致するか)
+        旧デプロイのハッシュは元ファイル名のみ返す（immutable キャッシュ不可）
+        """
+        original = self._reverse.get(fingerprinted)
+        if original is not None:
+            return original, True
+        original, digest = split_fingerprint(fingerprinted)
+        if digest is None:
+            return None, False
+        return original, False
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+
+asset_manifest = AssetManifest()
+
+
+def init_app(app, manifest: AssetManifest = asset_manifest) -> AssetManifest:
+    """対応表を登録し、Jinjaに asset_url() を公開"""
+    manifest.register()
+    app.jinja_env.globals['asset_url'] = manifest.url_for
+    app.extensions['asset_manifest'] = manifest
+    return manifest
+
+
+if __name__ == '__main__':
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else 'build'
+    if command == 'build':
+        manifest = AssetManifest()
+        assets = manifest.build()
+        print(f"📦 {len(assets)} assets fingerprinted → {manifest.write()}")
+        # 事前圧縮（.gz / brotli導入時は .br）
+        from compression import precompress_directory
+        print(f"🗜️ {len(precompress_directory(STATIC_DIR))} precompressed files written")
+    else:
+        print("usage: python static_assets.py build")
+        sys.exit(1)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming Export - エクスポート・レポートのNDJSON/CSV逐次出力
+
+- レコードのイテレータを1行ずつシリアライズして送信（全件をメモリに構築しない）
+- 行はチャンク単位（既定8KB）にまとめて送信しシステムコール回数を抑える
+- Response(stream_with_context(...)) でリクエストコンテキストを保ったまま生成
+- CSVはExcelで文字化けしないようBOM付きUTF-8
+- 送信開始後の例外はステータスを変更できないため、NDJSONでは末尾にエラー行を出力
+"""
+
+import csv
+import io
+import json
+import logging
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
+
+from flask import Response, request, stream_with_context
+
+logger = logging.getLogger(__name__)
+
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+DEFAULT_CHUNK_SIZE = 8192
+
+
+def requested_stream_format(default: Optional[str] = None) -> Optional[str]:
+    """?format= または Accept ヘッダーからストリーミング形式を判定（対象外なら default）"""
+    fmt = (request.args.get('format') or '').lower()
+    if fmt in STREAM_FORMATS:
+        return fmt
+    if fmt:
+        return default
+    best = request.accept_mimetypes.best_match(
+        list(STREAM_FORMATS.values()) + ['application/json'], default='application/json'
+    )
+    for name, mimetype in STREAM_FORMATS.items():
+        if best == mimetype and request.accept_mimetypes[mimetype] > 0:
+            return name
+    return default
+
+
+def _csv_value(value: Any) -> Any:
+    """ネストした値をCSVセル向けに平坦化"""
+    if isinstance(value, (list, tuple, set)):
+        return ';'.join(str(v) for v in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+def iter_ndjson(records: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False, default=str) + '\n'
+
+
+def iter_csv(rows: Iterable[Dict[str, Any]], fieldnames: Sequence[str], bom: bool = True) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(fieldnames), extrasaction='ignore')
+    writer.writeheader()
+    header = buffer.getvalue()
+    yield ('\ufeff' + header) if bom else header
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow({key: _csv_value(value) for key, value in row.items()})
+        yield buffer.getvalue()
+
+
+def _chunked(lines: Iterable[str], chunk_size: int) -> Iterator[str]:
+    parts, size = [], 0
+    for line in lines:
+        parts.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield ''.join(parts)
+            parts, size = [], 0
+    if parts:
+        yield ''.join(parts)
+
+
+def stream_records(records: Iterable[Dict[str, Any]], fmt: str, filename: Optional[str] = None,
+                   fieldnames: Optional[Sequence[str]] = None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Response:
+    """レコードのイテレータをNDJSON/CSVのストリーミングレスポンスに変換
+
+    Args:
+        records: dict を1件ずつ返すイテレータ（ジェネレータ推奨）
+        fmt: 'ndjson' または 'csv'
+        filename: 指定時は Content-Disposition: attachment を付与（拡張子は自動付与）
+        fieldnames: CSVの列（CSV時は必須）
+    """
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"Unsupported stream format: {fmt}")
+    if fmt == 'csv' and not fieldnames:
+        raise ValueError("fieldnames is required for CSV streams")
+
+    def generate():
+        lines = iter_csv(records, fieldnames) if fmt == 'csv' else iter_ndjson(records)
+        try:
+            yield from _chunked(lines, chunk_size)
+        except Exception as e:
+            logger.error(f"❌ ストリーミング出力中断 ({filename or fmt}): {e}")
+            if fmt == 'ndjson':
+                yield json.dumps({'type': 'error', 'error': str(e)}, ensure_ascii=False) + '\n'
+
+    response = Response(stream_with_context(generate()),
+                        content_type=f"{STREAM_FORMATS[fmt]}; charset=utf-8")
+    if filename:
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    # プロキシ（nginx等）のバッファリングを無効化して逐次送信
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
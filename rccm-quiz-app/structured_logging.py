@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Structured Logging - 構造化・サンプリング・非同期キューによるログ出力
+
+- configure_logging(): ルートロガーのハンドラを構成（プロファイル: development / production）
+- 非同期キュー: リクエストスレッドではメッセージ確定とキュー投入のみ行い、
+  整形（JSON/テキスト）と stdout・ファイルへの書き込みはリスナースレッドで実行
+  キュー満杯時はブロックせず破棄（件数は get_logging_stats() で確認）
+  リスナーはプロセス毎に初回ログ時に起動（gunicorn のフォーク後も自動で再起動）
+- サンプリング: リクエスト処理中の WARNING 未満のレコードをロガー名（前方一致）毎の割合で間引く
+  起動処理・バックグラウンド処理のログと WARNING 以上は常に出力
+- log_event(): イベント名 + フィールドの構造化ログ（レベル無効時はフィールド整形も行わない）
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def log_event(logger: logging.Logger, event: str, level: int = logging.INFO, **fields: Any) -> None:
+    """構造化イベントログ（JSON形式ではフィールドがキーとして出力される）"""
+    if not logger.isEnabledFor(level):
+        return
+    logger.log(level, event, extra={'fields': fields}, stacklevel=2)
+
+
+def _request_fields() -> Dict[str, Any]:
+    try:
+        from flask import has_request_context, request
+    except ImportError:
+        return {}
+    if not has_request_context():
+        return {}
+    return {'method': request.method, 'path': request.path, 'endpoint': request.endpoint}
+
+
+class RequestContextFilter(logging.Filter):
+    """リクエスト情報（メソッド・パス・エンドポイント）をレコードに付与"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, 'request'):
+            record.request = _request_fields()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """リクエスト処理中の高頻度ログ（WARNING未満）をロガー毎の割合で間引く"""
+
+    def __init__(self, rates: Dict[str, float], min_level: int = logging.WARNING):
+        super().__init__()
+        # 前方一致はより長い（具体的な）ロガー名を優先
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+        self.min_level = min_level
+        self.sampled_out = 0
+
+    def rate_for(self, name: str) -> float:
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + '.'):
+                return rate
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.min_level or not self.rates:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1.0:
+            return True
+        # 起動処理・バックグラウンドスレッドのログは間引かない
+        request_info = getattr(record, 'request', None)
+        if request_info is None:
+            request_info = _request_fields()
+        if not request_info:
+            return True
+        if random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class StructuredFormatter(logging.Formatter):
+    """1レコード = 1行のJSON（fields・extra属性・リクエスト情報を含む）"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'pid': record.process,
+        }
+        request_info = getattr(record, 'request', None)
+        if request_info:
+            payload['request'] = request_info
+        fields = getattr(record, 'fields', None)
+        if fields:
+            payload.update(fields)
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and key not in ('fields', 'request') and key not in payload:
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exc'] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """従来形式のテキストログ（log_event のフィールドは key=value で末尾に付与）"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            text += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        return text
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    リクエストスレッドでは最小限の処理（メッセージ確定・キュー投入）のみ行うハンドラ
+    整形とI/Oはプロセス毎に起動するリスナースレッドが担当
+    """
+
+    def __init__(self, target_handlers, max_size: int = 10000):
+        super().__init__(queue.Queue(maxsize=max_size))
+        self.target_handlers = list(target_handlers)
+        self.dropped = 0
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._listener_pid: Optional[int] = None
+        self._listener_lock = threading.Lock()
+
+    def _ensure_listener(self) -> None:
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        with self._listener_lock:
+            if self._listener_pid == pid:
+                return
+            # フォーク後は親プロセスのリスナースレッドが存在しないため新しいキューで起動し直す
+            if self._listener_pid is not None:
+                self.queue = queue.Queue(maxsize=self.queue.maxsize)
+            self._listener = logging.handlers.QueueListener(
+                self.queue, *self.target_handlers, respect_handler_level=True
+            )
+            self._listener.start()
+            self._listener_pid = pid
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 引数はリクエスト中に変更されうるためメッセージのみ確定（整形はリスナー側）
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self) -> None:
+        """未出力のレコードを書き出してリスナーを停止"""
+        if self._listener is not None and self._listener_pid == os.getpid():
+            self._listener.stop()
+            self._listener_pid = None
+
+
+_state: Dict[str, Any] = {}
+
+
+def configure_logging(profile: str = 'development', level: str = 'INFO', fmt: str = 'text',
+                      queue_enabled: bool = False, queue_max_size: int = 10000,
+                      sampling: Optional[Dict[str, float]] = None,
+                      log_file: Optional[str] = None) -> Dict[str, Any]:
+    """
+    ルートロガーのハンドラを構成（既存ハンドラは置き換え）
+
+    Args:
+        profile: 表示用のプロファイル名
+        level: ルートロガーのレベル
+        fmt: 'text'（従来形式） または 'json'（1行1レコード）
+        queue_enabled: 非同期キュー経由で出力するか
+        sampling: {ロガー名: 出力割合(0-1)} リクエスト処理中の WARNING 未満に適用
+        log_file: 指定時はローテーション付きファイルにも出力
+    """
+    formatter = StructuredFormatter() if fmt == 'json' else TextFormatter(TEXT_FORMAT)
+
+    outputs = [logging.StreamHandler(sys.stdout if fmt == 'json' else sys.stderr)]
+    if log_file:
+        os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+        outputs.append(logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=10 * 1024 * 1024, backupCount=5, encoding='utf-8'
+        ))
+    for handler in outputs:
+        handler.setFormatter(formatter)
+
+    sampling_filter = SamplingFilter(sampling or {})
+    if queue_enabled:
+        front = NonBlockingQueueHandler(outputs, max_size=queue_max_size)
+        atexit.register(front.stop)
+        front_handlers = [front]
+    else:
+        front_handlers = outputs
+    for handler in front_handlers:
+        # リクエスト情報の付与とサンプリングはリクエストスレッド側（キュー投入前）で実施
+        handler.addFilter(RequestContextFilter())
+        handler.addFilter(sampling_filter)
+
+    root = logging.getLogger()
+    previous = _state.get('queue_handler')
+    if previous is not None:
+        previous.stop()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in front_handlers:
+        root.addHandler(handler)
+    root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+
+    _state.update({
+        'profile': profile,
+        'level': logging.getLevelName(root.level),
+        'format': fmt,
+        'queue_handler': front_handlers[0] if queue_enabled else None,
+        'sampling_filter': sampling_filter,
+        'log_file': log_file,
+    })
+    return get_logging_stats()
+
+
+def get_logging_stats() -> Dict[str, Any]:
+    queue_handler = _state.get('queue_handler')
+    sampling_filter = _state.get('sampling_filter')
+    return {
+        'profile': _state.get('profile'),
+        'level': _state.get('level'),
+        'format': _state.get('format'),
+        'queue_enabled': queue_handler is not None,
+        'queue_size': queue_handler.queue.qsize() if queue_handler else 0,
+        'dropped': queue_handler.dropped if queue_handler else 0,
+        'sampling': dict(sampling_filter.rates) if sampling_filter else {},
+        'sampled_out': sampling_filter.sampled_out if sampling_filter else 0,
+    }
+
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    """'app=0.1,blueprints=0.2' 形式のサンプリング設定を解析"""
+    rates = {}
+    for item in (spec or '').split(','):
+        if '=' not in item:
+            continue
+        name, _, rate = item.partition('=')
+        try:
+            rates[name.strip()] = max(0.0, min(1.0, float(rate)))
+        except ValueError:
+            continue
+    return rates
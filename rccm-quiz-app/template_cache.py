@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Template Cache - Jinjaテンプレートのバイトコードキャッシュとフラグメントキャッシュ
+
+- FileSystemBytecodeCache: コンパイル済みテンプレートを全ワーカーで共有
+  （max_requests によるワーカー再起動のたびに全テンプレートを再コンパイルしない）
+- デプロイ時に `python template_cache.py build` で全テンプレートを事前コンパイル
+- {% cache "key" [, timeout] %}...{% endcache %}: 静的で重いセクションのレンダリング結果を保持
+"""
+
+import logging
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+
+logger = logging.getLogger(__name__)
+
+
+class FragmentStore:
+    """フラグメントキャッシュの保存先（プロセス内LRU・フラグメント毎のTTL）"""
+
+    def __init__(self, max_entries: int = 128, default_timeout: int = 3600):
+        from utils import LRUCache
+
+        self.default_timeout = default_timeout
+        # LRUCache の全体TTLは上限として使い、個別TTLはエントリ側で判定
+        self._cache = LRUCache(maxsize=max_entries, ttl=max(default_timeout, 24 * 3600))
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.time() >= expires_at:
+            self._cache.delete(key)
+            return None
+        return value
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None) -> None:
+        self._cache.put(key, (time.time() + (timeout or self.default_timeout), value))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+class FragmentCacheExtension(Extension):
+    """
+    {% cache "key" %}...{% endcache %} / {% cache "key", 600 %}...{% endcache %}
+
+    キャッシュキーにはテンプレート名とコンパイル毎のトークンを含めるため、
+    テンプレートが更新（再コンパイル）されると古いフラグメントは参照されない。
+    リクエスト毎に変わる値（セッション・CSRFトークン・フラッシュメッセージ）を含む部分には使用しないこと。
+    """
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        # 保存先は init_app() で設定（未設定時はキャッシュせずにレンダリング）
+        environment.extend(fragment_cache=None, fragment_cache_enabled=True)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        compile_token = f"{parser.name}:{uuid.uuid4().hex[:8]}"
+
+        args = [nodes.Const(compile_token), parser.parse_expression()]
+        if parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        else:
+            args.append(nodes.Const(None))
+
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(self.call_method('_cache_support', args), [], [], body).set_lineno(lineno)
+
+    def _cache_support(self, compile_token, name, timeout, caller):
+        store = self.environment.fragment_cache
+        if store is None or not self.environment.fragment_cache_enabled:
+            return caller()
+
+        key = f"{compile_token}:{name}"
+        rendered = store.get(key)
+        if rendered is None:
+            rendered = caller()
+            store.set(key, rendered, timeout)
+        return rendered
+
+
+def init_app(app, bytecode_cache_dir: Optional[str] = None, bytecode_cache_enabled: bool = True,
+             fragment_max_entries: int = 128, fragment_timeout: int = 3600) -> None:
+    """app.jinja_env にバイトコードキャッシュとフラグメントキャッシュ拡張を設定"""
+    env = app.jinja_env
+
+    if bytecode_cache_enabled and bytecode_cache_dir:
+        try:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            env.bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+            logger.info(f"📦 Jinjaバイトコードキャッシュ: {bytecode_cache_dir}")
+        except OSError as e:
+            logger.warning(f"⚠️ Jinjaバイトコードキャッシュを利用できません: {e}")
+
+    env.add_extension(FragmentCacheExtension)
+    env.fragment_cache = FragmentStore(fragment_max_entries, fragment_timeout)
+
+
+def precompile_templates(app) -> List[str]:
+    """全テンプレートをコンパイルしてバイトコードキャッシュに格納（デプロイ時）"""
+    env = app.jinja_env
+    compiled, failed = [], []
+    for name in env.list_templates(extensions=['html', 'htm', 'xml', 'txt', 'j2']):
+        try:
+            env.get_template(name)
+            compiled.append(name)
+        except Exception as e:
+            failed.append(name)
+            logger.warning(f"⚠️ テンプレートのコンパイルに失敗 ({name}): {e}")
+    if failed:
+        logger.warning(f"⚠️ コンパイル失敗テンプレート: {failed}")
+    return compiled
+
+
+if __name__ == '__main__':
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else 'build'
+    if command == 'build':
+        os.environ.setdefault('CACHE_WARMUP_ENABLED', 'False')
+        from app import app as flask_app
+
+        if flask_app.jinja_env.bytecode_cache is None:
+            print("❌ Bytecode cache is disabled (TEMPLATE_BYTECODE_CACHE_ENABLED)")
+            sys.exit(1)
+        templates = precompile_templates(flask_app)
+        print(f"📦 {len(templates)} templates precompiled → {flask_app.jinja_env.bytecode_cache.directory}")
+    else:
+        print("usage: python template_cache.py build")
+        sys.exit(1)
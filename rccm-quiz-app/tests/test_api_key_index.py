@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+APIキー索引 使用統計のバッチ反映 テスト
+"""
+
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import api_key_index
+import json_store
+from api_key_index import APIKeyIndex
+from json_store import BatchedJSONWriter
+
+
+def _make_index(tmp_path, monkeypatch):
+    api_keys_file = tmp_path / 'api_keys.json'
+    api_keys_file.write_text(json.dumps({
+        'key-1': {'organization': 'org', 'permissions': [], 'is_active': True,
+                  'usage_stats': {'total_requests': 0}},
+    }), encoding='utf-8')
+    writer = BatchedJSONWriter(flush_interval=60)
+    monkeypatch.setattr(api_key_index, 'get_batched_writer', lambda: writer)
+    return APIKeyIndex(str(api_keys_file), reload_check_interval=0), writer, api_keys_file
+
+
+def test_usage_is_kept_and_rescheduled_after_failed_flush(tmp_path, monkeypatch):
+    """反映失敗後も使用統計を保持し、次回の record_use で再登録・合算して保存する"""
+    index, writer, api_keys_file = _make_index(tmp_path, monkeypatch)
+    entry = index.lookup('key-1')
+
+    index.record_use(entry)
+    index.record_use(entry)
+
+    original_update_json = json_store.update_json
+
+    def failing_update_json(path, mutator, default_factory=dict):
+        raise OSError('disk unavailable')
+
+    monkeypatch.setattr(json_store, 'update_json', failing_update_json)
+    assert writer.flush() == 0
+    stats = index.get_stats()
+    assert stats['usage_flush_errors'] == 1
+    assert stats['pending_usage'] == 2
+    assert index._usage_scheduled is False
+
+    monkeypatch.setattr(json_store, 'update_json', original_update_json)
+    index.record_use(entry)
+    assert writer.pending_count() == 1
+    assert writer.flush() == 1
+
+    saved = json.loads(api_keys_file.read_text(encoding='utf-8'))
+    assert saved['key-1']['usage_stats']['total_requests'] == 3
+    assert index.get_stats()['pending_usage'] == 0
+
+
+def test_usage_is_restored_when_write_fails_after_mutator(tmp_path, monkeypatch):
+    """変更関数の実行後に書き込みが失敗した場合も、取り出した使用統計を戻す"""
+    index, writer, api_keys_file = _make_index(tmp_path, monkeypatch)
+    entry = index.lookup('key-1')
+    index.record_use(entry)
+
+    def failing_write_json(path, data, indent=None):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(json_store, 'write_json', failing_write_json)
+    assert writer.flush() == 0
+    assert index.get_stats()['pending_usage'] == 1
+    assert index._usage_scheduled is False
+
+    saved = json.loads(api_keys_file.read_text(encoding='utf-8'))
+    assert saved['key-1']['usage_stats']['total_requests'] == 0
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ルート単位レスポンスキャッシュ テスト
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from flask import Flask
+
+from response_cache import ResponseCache, skip_response_cache
+
+
+def _make_app(view_state):
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    cache = ResponseCache(version_func=lambda: 'v1', ttl=3600)
+
+    @app.route('/page')
+    @cache.cached('page')
+    def page():
+        if view_state['fail']:
+            # 装飾されたビューのエラー時フォールバック（暗黙の200）
+            skip_response_cache()
+            return 'error page'
+        view_state['renders'] += 1
+        return f"content {view_state['renders']}"
+
+    return app
+
+
+def test_error_fallback_is_not_cached_and_recovery_returns_fresh_content():
+    """一時的なエラー画面は保存されず、復旧後は新しい内容を返す"""
+    state = {'fail': True, 'renders': 0}
+    client = _make_app(state).test_client()
+
+    response = client.get('/page')
+    assert response.status_code == 200
+    assert response.get_data(as_text=True) == 'error page'
+    assert 'X-Response-Cache' not in response.headers
+
+    state['fail'] = False
+    response = client.get('/page')
+    assert response.get_data(as_text=True) == 'content 1'
+    assert response.headers['X-Response-Cache'] == 'MISS'
+
+    response = client.get('/page')
+    assert response.get_data(as_text=True) == 'content 1'
+    assert response.headers['X-Response-Cache'] == 'HIT'
+
+
+def test_departments_error_then_recovery(monkeypatch):
+    """/departments: カテゴリ取得の一時的な失敗後、復旧すれば部門選択画面を返す"""
+    import app as app_module
+
+    app_module.response_cache._cache.clear()
+    original = app_module.get_japanese_categories
+    calls = {'count': 0}
+
+    def flaky_categories():
+        calls['count'] += 1
+        if calls['count'] == 1:
+            raise RuntimeError('transient failure')
+        return original()
+
+    monkeypatch.setattr(app_module, 'get_japanese_categories', flaky_categories)
+    client = app_module.app.test_client()
+
+    failed = client.get('/departments').get_data(as_text=True)
+    assert '部門選択画面の表示中にエラーが発生しました。' in failed
+
+    recovered = client.get('/departments')
+    assert '部門選択画面の表示中にエラーが発生しました。' not in recovered.get_data(as_text=True)
+    assert recovered.headers.get('X-Response-Cache') == 'MISS'
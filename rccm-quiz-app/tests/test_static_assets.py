@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+静的アセット フィンガープリント対応表 テスト
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from static_assets import AssetManifest
+
+
+def _write(path, content, mtime):
+    path.write_text(content, encoding='utf-8')
+    os.utime(path, (mtime, mtime))
+
+
+def _build_manifest(static_dir):
+    (static_dir / 'js').mkdir()
+    _write(static_dir / 'js' / 'main.js', 'console.log(1);', 1000)
+    manifest = AssetManifest(static_dir=str(static_dir))
+    manifest.build()
+    manifest.write()
+    os.utime(manifest.manifest_path, (2000, 2000))
+    return manifest.url_for('js/main.js')
+
+
+def test_register_uses_up_to_date_manifest(tmp_path):
+    """対応表が static/ より新しければそのまま読み込む"""
+    built_url = _build_manifest(tmp_path)
+    manifest = AssetManifest(static_dir=str(tmp_path))
+    manifest.register()
+    assert not manifest.is_stale()
+    assert manifest.url_for('js/main.js') == built_url
+
+
+def test_register_rebuilds_when_asset_is_newer_than_manifest(tmp_path):
+    """ビルド後に編集されたファイルは旧ハッシュのURLで配信しない"""
+    built_url = _build_manifest(tmp_path)
+    _write(tmp_path / 'js' / 'main.js', 'console.log(2);', 3000)
+
+    manifest = AssetManifest(static_dir=str(tmp_path))
+    manifest.register()
+    url = manifest.url_for('js/main.js')
+    assert url != built_url
+    assert manifest.resolve(url[len('/assets/'):]) == ('js/main.js', True)
+
+
+def test_register_rebuilds_when_asset_is_added(tmp_path):
+    """対応表に無いファイルが追加されていれば再構築する"""
+    _build_manifest(tmp_path)
+    _write(tmp_path / 'js' / 'extra.js', 'console.log(3);', 1000)
+
+    manifest = AssetManifest(static_dir=str(tmp_path))
+    manifest.register()
+    assert manifest.url_for('js/extra.js').startswith('/assets/js/extra.')
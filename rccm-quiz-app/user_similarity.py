@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+User Similarity Index - 学習パートナー推奨用のユーザー特徴ベクトル索引
+
+- ユーザー毎の特徴ベクトル（部門構成・分野別正答率・学習レベル・アクティビティ）を
+  1つの行列に保持し、対象ユーザーとの類似度（コサイン）を行列×ベクトル1回で全ユーザー分計算
+- 各ブロックを単位ベクトルに正規化して重み（合計1）の平方根を掛けるため、
+  類似度 = Σ 重み × ブロック毎のコサイン類似度（0〜1）
+- 回答保存時は該当ユーザーの行のみ更新（RepositoryView による差分同期）
+- numpy が無い環境では疎ベクトル（dict）の内積で同じ値を計算
+"""
+
+import logging
+import math
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import StudyPartnerConfig
+from user_store import RepositoryView, UserRepository, rollup_categories
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 特徴ブロック毎の重み（旧実装の 部門一致0.4 / レベル一致0.3 / アクティビティ一致0.3 を分野別正答率込みで再配分）
+FEATURE_WEIGHTS = {'department': 0.35, 'category': 0.35, 'level': 0.15, 'activity': 0.15}
+
+CategoryRollup = Tuple[Optional[str], Optional[str], int, int]  # (分野, 部門, 回答数, 正答数)
+FeatureKey = Tuple[str, str]
+
+
+def user_features(rollups: List[CategoryRollup], level_func: Callable[[int], str],
+                  activity_func: Callable[[int], str]) -> Dict[FeatureKey, float]:
+    """(分野, 部門) 毎の回答集計から特徴ベクトル（疎・ブロック正規化済み）を作成"""
+    total = sum(row[2] for row in rollups)
+    if not total:
+        return {}
+
+    departments = Counter()
+    categories: Dict[str, List[int]] = {}
+    for category, department, count, correct in rollups:
+        departments[department or 'unknown'] += count
+        if category:
+            counts = categories.setdefault(category, [0, 0])
+            counts[0] += count
+            counts[1] += correct
+
+    blocks = {
+        'department': {name: count / total for name, count in departments.items()},
+        # ラプラス平滑化した正答率（全問不正解の分野も「回答済み」として残す）
+        'category': {name: (correct + 1) / (count + 2) for name, (count, correct) in categories.items()},
+        'level': {level_func(total): 1.0},
+        'activity': {activity_func(total): 1.0},
+    }
+    features = {}
+    for block, values in blocks.items():
+        norm = math.sqrt(sum(value * value for value in values.values()))
+        if not norm:
+            continue
+        scale = math.sqrt(FEATURE_WEIGHTS[block]) / norm
+        for name, value in values.items():
+            features[(block, name)] = value * scale
+    return features
+
+
+class UserSimilarityIndex(RepositoryView):
+    """ユーザー特徴ベクトルの行列と類似ユーザー上位K件の検索"""
+
+    def __init__(self, repository: UserRepository, level_func: Callable[[int], str],
+                 activity_func: Callable[[int], str], refresh_interval: int = None,
+                 use_numpy: bool = NUMPY_AVAILABLE):
+        super().__init__(repository, StudyPartnerConfig.REFRESH_INTERVAL if refresh_interval is None else refresh_interval)
+        self.level_func = level_func
+        self.activity_func = activity_func
+        self.use_numpy = use_numpy and NUMPY_AVAILABLE
+        self._profiles: Dict[str, List[CategoryRollup]] = {}
+        self._columns: Dict[FeatureKey, int] = {}
+        # numpy: 行列（行 = ユーザー）。未使用行は0ベクトル
+        self._matrix = None
+        self._row_of: Dict[str, int] = {}
+        self._user_at: List[Optional[str]] = []
+        self._free_rows: List[int] = []
+        # numpy なし: ユーザー毎の疎ベクトル
+        self._vectors: Dict[str, Dict[int, float]] = {}
+
+    # --- 参照 ---
+
+    def similar_users(self, user_id: str, limit: int = 10,
+                      min_similarity: float = None) -> List[Tuple[str, float]]:
+        """類似度が min_similarity を超えるユーザー上位 limit 件 [(user_id, 類似度)]"""
+        if min_similarity is None:
+            min_similarity = StudyPartnerConfig.MIN_SIMILARITY
+        with self._lock:
+            self._sync()
+            self._stats['reads'] += 1
+            if self.use_numpy:
+                candidates = self._similar_numpy(user_id, limit, min_similarity)
+            else:
+                candidates = self._similar_python(user_id, min_similarity)
+            ranked = sorted(((other_id, round(score, 3)) for other_id, score in candidates),
+                            key=lambda item: (-item[1], item[0]))
+            return ranked[:limit]
+
+    def answer_count(self, user_id: str) -> int:
+        with self._lock:
+            return sum(row[2] for row in self._profiles.get(user_id, ()))
+
+    def common_interests(self, user_id: str, other_id: str, limit: int = 5) -> List[str]:
+        """両者が回答した分野（合計回答数の多い順）"""
+        with self._lock:
+            mine, theirs = Counter(), Counter()
+            for category, _, count, _ in self._profiles.get(user_id, ()):
+                if category:
+                    mine[category] += count
+            for category, _, count, _ in self._profiles.get(other_id, ()):
+                if category:
+                    theirs[category] += count
+            common = {name: mine[name] + theirs[name] for name in mine.keys() & theirs.keys()}
+            return sorted(common, key=lambda name: (-common[name], name))[:limit]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(super().get_stats(), users=len(self._profiles), features=len(self._columns),
+                        numpy=self.use_numpy)
+
+    def _similar_numpy(self, user_id: str, limit: int, min_similarity: float) -> List[Tuple[str, float]]:
+        row = self._row_of.get(user_id)
+        if row is None:
+            return []
+        scores = self._matrix[:len(self._user_at)] @ self._matrix[row]
+        scores[row] = 0.0
+        candidates = np.flatnonzero(scores > min_similarity)
+        if candidates.size > limit:
+            candidates = candidates[np.argpartition(scores[candidates], -limit)[-limit:]]
+        return [(self._user_at[index], float(scores[index])) for index in candidates
+                if self._user_at[index] is not None]
+
+    def _similar_python(self, user_id: str, min_similarity: float) -> List[Tuple[str, float]]:
+        vector = self._vectors.get(user_id)
+        if not vector:
+            return []
+        candidates = []
+        for other_id, other in self._vectors.items():
+            if other_id == user_id:
+                continue
+            small, large = (vector, other) if len(vector) <= len(other) else (other, vector)
+            score = sum(value * large.get(column, 0.0) for column, value in small.items())
+            if score > min_similarity:
+                candidates.append((other_id, score))
+        return candidates
+
+    # --- 差分更新（RepositoryView） ---
+
+    def _load_all(self) -> None:
+        profiles: Dict[str, List[CategoryRollup]] = {}
+        for user_id, *rollup in self.repository.category_rollups():
+            profiles.setdefault(user_id, []).append(tuple(rollup))
+        self._profiles = profiles
+        self._columns = {}
+        self._row_of, self._user_at, self._free_rows, self._vectors = {}, [], [], {}
+
+        encoded = {user_id: self._encode(self._features(rollups)) for user_id, rollups in profiles.items()}
+        encoded = {user_id: vector for user_id, vector in encoded.items() if vector}
+        if not self.use_numpy:
+            self._vectors = encoded
+            return
+
+        # 行列は一括で作成（行・列・値の配列から1回の代入）
+        self._user_at = list(encoded)
+        self._row_of = {user_id: row for row, user_id in enumerate(self._user_at)}
+        self._matrix = np.zeros((max(len(self._user_at), 1), max(len(self._columns), 1)), dtype=np.float32)
+        rows, columns, values = [], [], []
+        for row, user_id in enumerate(self._user_at):
+            for column, value in encoded[user_id].items():
+                rows.append(row)
+                columns.append(column)
+                values.append(value)
+        if rows:
+            self._matrix[np.array(rows), np.array(columns)] = np.array(values, dtype=np.float32)
+
+    def _reload_user(self, user_id: str) -> None:
+        self._set_user(user_id, [tuple(row[1:]) for row in self.repository.category_rollups(user_id)])
+
+    def _apply_user(self, user_id: str, history: List[Any]) -> None:
+        self._set_user(user_id, [(category, department, count, correct)
+                                 for (category, department), (count, correct) in rollup_categories(history).items()])
+
+    def _set_user(self, user_id: str, rollups: List[CategoryRollup]) -> None:
+        if rollups:
+            self._profiles[user_id] = rollups
+        else:
+            self._profiles.pop(user_id, None)
+        vector = self._encode(self._features(rollups))
+
+        if not self.use_numpy:
+            if vector:
+                self._vectors[user_id] = vector
+            else:
+                self._vectors.pop(user_id, None)
+            return
+
+        row = self._row_of.get(user_id)
+        if not vector:
+            if row is not None:
+                self._matrix[row] = 0.0
+                self._user_at[row] = None
+                self._free_rows.append(row)
+                del self._row_of[user_id]
+            return
+        if row is None:
+            if self._free_rows:
+                row = self._free_rows.pop()
+                self._user_at[row] = user_id
+            else:
+                row = len(self._user_at)
+                self._user_at.append(user_id)
+            self._row_of[user_id] = row
+        self._ensure_shape(row + 1, len(self._columns))
+        self._matrix[row] = 0.0
+        self._matrix[row, list(vector)] = list(vector.values())
+
+    # --- 特徴量 ---
+
+    def _features(self, rollups: List[CategoryRollup]) -> Dict[FeatureKey, float]:
+        return user_features(rollups, self.level_func, self.activity_func)
+
+    def _encode(self, features: Dict[FeatureKey, float]) -> Dict[int, float]:
+        """特徴キーを列番号へ（新しい分野・部門は列を追加）"""
+        vector = {}
+        for key, value in features.items():
+            column = self._columns.get(key)
+            if column is None:
+                column = self._columns[key] = len(self._columns)
+            vector[column] = value
+        return vector
+
+    def _ensure_shape(self, rows: int, columns: int) -> None:
+        """行列の行・列が足りなければ倍々で拡張（既存行の値は不変）"""
+        current_rows, current_columns = self._matrix.shape if self._matrix is not None else (0, 0)
+        if rows <= current_rows and columns <= current_columns:
+            return
+        matrix = np.zeros((max(rows, current_rows * 2 if rows > current_rows else current_rows, 1),
+                           max(columns, current_columns * 2 if columns > current_columns else current_columns, 1)),
+                          dtype=np.float32)
+        if self._matrix is not None:
+            matrix[:current_rows, :current_columns] = self._matrix
+        self._matrix = matrix
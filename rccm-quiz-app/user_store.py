@@ -0,0 +1,937 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+User Store - ユーザーデータ・学習グループ・ディスカッションの保存先（リポジトリAPI）
+
+- DataManager / EnterpriseUserManager / SocialLearningManager / APIManager /
+  AdminDashboard / AdvancedPersonalizationEngine が共通で使うリポジトリ
+- json バックエンド: 従来どおり user_data/*.json・social_data/*.json を読み書き（既定）
+- sqlite バックエンド: WALモードのSQLite（users / answer_events / srs_state /
+  study_groups / group_members / discussions の正規化テーブル）
+  ユーザー・部門・日時のインデックスにより、全ユーザー集計を
+  O(ユーザー数 × 履歴数) のPythonループではなくSQLの集約で実行
+- sqlite でも既定で JSON ファイルを書き出す（ミラー）ため、json への切り戻しが可能
+- 初回起動時に既存 JSON を自動取り込み（migrate_json_to_sqlite.py で手動移行も可能）
+"""
+
+import abc
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from config import UserStoreConfig
+from json_store import file_lock, write_json
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 2
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    user_name TEXT,
+    last_updated TEXT,
+    bookmark_count INTEGER NOT NULL DEFAULT 0,
+    document TEXT NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS answer_events (
+    user_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    question_id TEXT,
+    category TEXT,
+    department TEXT,
+    question_type TEXT,
+    is_correct INTEGER NOT NULL DEFAULT 0,
+    elapsed REAL,
+    answered_at TEXT,
+    answered_day TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (user_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_answer_events_department ON answer_events (department, answered_at);
+CREATE INDEX IF NOT EXISTS idx_answer_events_answered_at ON answer_events (answered_at, user_id);
+CREATE INDEX IF NOT EXISTS idx_answer_events_question ON answer_events (question_id);
+CREATE TABLE IF NOT EXISTS srs_state (
+    user_id TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    difficulty_level INTEGER,
+    mastered INTEGER NOT NULL DEFAULT 0,
+    next_review TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (user_id, question_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_srs_state_next_review ON srs_state (next_review);
+CREATE TABLE IF NOT EXISTS study_groups (
+    group_id TEXT PRIMARY KEY,
+    name TEXT,
+    department TEXT,
+    creator_id TEXT,
+    is_public INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT,
+    document TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_study_groups_department ON study_groups (department);
+CREATE TABLE IF NOT EXISTS group_members (
+    group_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    is_moderator INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (group_id, user_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_group_members_user ON group_members (user_id);
+CREATE TABLE IF NOT EXISTS discussions (
+    discussion_id TEXT PRIMARY KEY,
+    group_id TEXT,
+    author_id TEXT,
+    category TEXT,
+    question_id TEXT,
+    is_pinned INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT,
+    updated_at TEXT,
+    document TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_discussions_group ON discussions (group_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_discussions_category ON discussions (category, updated_at);
+CREATE INDEX IF NOT EXISTS idx_discussions_author ON discussions (author_id);
+"""
+
+
+# === 履歴1件の正規化（SQLの列・JSON側の集計で共通） ===
+
+def _normalize_timestamp(value: Any) -> Optional[str]:
+    """履歴の日時（'date' / 'timestamp'）を比較可能な形式に正規化（解析不能なら None）"""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value).strftime(TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+def answer_fields(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """学習履歴1件から集計用の列を取り出す"""
+    answered_at = _normalize_timestamp(entry.get('date') or entry.get('timestamp'))
+    question_id = entry.get('id', entry.get('question_id'))
+    elapsed = entry.get('elapsed')
+    try:
+        elapsed = float(elapsed) if elapsed is not None else None
+    except (TypeError, ValueError):
+        elapsed = None
+    return {
+        'question_id': str(question_id) if question_id is not None else None,
+        'category': entry.get('category'),
+        'department': entry.get('department'),
+        'question_type': entry.get('question_type'),
+        'is_correct': 1 if entry.get('is_correct', False) else 0,
+        'elapsed': elapsed,
+        'answered_at': answered_at,
+        'answered_day': answered_at[:10] if answered_at else None,
+    }
+
+
+def _scalar_text(value: Any) -> Optional[str]:
+    """インデックス列用の文字列化（リスト等の不正値はJSON文字列）"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float, bool)):
+        return str(value)
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+def rollup_history(user_id: str, history: List[Any]) -> Iterator[Tuple[str, Optional[str], Optional[str], int, int, int]]:
+    """学習履歴を (user_id, department, answered_day, 回答数, 正答数, 最初の履歴番号) に集約"""
+    rollup: Dict[Tuple[Optional[str], Optional[str]], List[int]] = {}
+    for seq, entry in enumerate(history):
+        if not isinstance(entry, dict):
+            continue
+        fields = answer_fields(entry)
+        counts = rollup.setdefault((fields['department'], fields['answered_day']), [0, 0, seq])
+        counts[0] += 1
+        counts[1] += fields['is_correct']
+    for (department, day), (total, correct, first_seq) in rollup.items():
+        yield user_id, department, day, total, correct, first_seq
+
+
+def rollup_activity(user_id: str, history: List[Any]) -> Iterator[Tuple[str, Optional[str], Optional[str], int, int, float, Optional[str]]]:
+    """学習履歴を (user_id, department, answered_day, 回答数, 正答数, 回答時間合計, 最終回答日時) に集約"""
+    rollup: Dict[Tuple[Optional[str], Optional[str]], List[Any]] = {}
+    for entry in history:
+        if not isinstance(entry, dict):
+            continue
+        fields = answer_fields(entry)
+        counts = rollup.setdefault((fields['department'], fields['answered_day']), [0, 0, 0.0, None])
+        counts[0] += 1
+        counts[1] += fields['is_correct']
+        counts[2] += fields['elapsed'] or 0.0
+        if fields['answered_at'] and (counts[3] is None or fields['answered_at'] > counts[3]):
+            counts[3] = fields['answered_at']
+    for (department, day), (total, correct, elapsed, last_answered_at) in rollup.items():
+        yield user_id, department, day, total, correct, elapsed, last_answered_at
+
+
+def rollup_categories(history: List[Any]) -> Dict[Tuple[Optional[str], Optional[str]], List[int]]:
+    """学習履歴を (category, department) 毎の [回答数, 正答数] に集約"""
+    rollup: Dict[Tuple[Optional[str], Optional[str]], List[int]] = {}
+    for entry in history:
+        if not isinstance(entry, dict):
+            continue
+        fields = answer_fields(entry)
+        counts = rollup.setdefault((fields['category'], fields['department']), [0, 0])
+        counts[0] += 1
+        counts[1] += fields['is_correct']
+    return rollup
+
+
+def _format_since(since: Optional[datetime]) -> Optional[str]:
+    return since.strftime(TIMESTAMP_FORMAT) if since else None
+
+
+class _AnswerAggregate:
+    """ユーザー毎の回答集計（JSONバックエンド用。SQLバックエンドの GROUP BY と同じ定義）"""
+
+    __slots__ = ('total', 'correct', 'days', 'departments')
+
+    def __init__(self):
+        self.total = 0
+        self.correct = 0
+        self.days = set()
+        self.departments = Counter()
+
+    def add(self, fields: Dict[str, Any]) -> None:
+        self.total += 1
+        self.correct += fields['is_correct']
+        if fields['answered_day']:
+            self.days.add(fields['answered_day'])
+        self.departments[fields['department'] or 'unknown'] += 1
+
+    def to_dict(self, user_id: str) -> Dict[str, Any]:
+        return {
+            'user_id': user_id,
+            'total': self.total,
+            'correct': self.correct,
+            'study_days': len(self.days),
+            'primary_department': self.departments.most_common(1)[0][0] if self.departments else 'unknown',
+        }
+
+
+class UserRepository:
+    """
+    リポジトリAPI（共通インターフェース）
+
+    ユーザー:
+        get_user / save_user / iter_users / user_ids / count_users
+        update_user(user_id, updater)  読み込み → updater(data) → 保存 を他の書き込みと排他して実行
+        user_summaries()  全ユーザーの基本統計（ユーザー一覧・管理画面用）
+        answer_aggregates(department, since)  ユーザー毎の回答数・正答数・学習日数・主要部門
+    学習グループ・ディスカッション:
+        load_groups / save_groups / load_discussions / save_discussions
+        social_lock('groups' | 'discussions')  読み込み〜保存を囲むプロセス間ロック
+        social_revision('groups' | 'discussions')  そのコレクションの保存毎に変わる版数（索引の同期用）
+    集計の差分更新（マテリアライズドビュー用）:
+        answer_rollups(user_id)  (ユーザー, 部門, 日) 毎の回答数・正答数
+        activity_rollups(user_id)  (ユーザー, 部門, 日) 毎の回答数・正答数・回答時間・最終回答日時
+        category_rollups(user_id)  (ユーザー, 分野, 部門) 毎の回答数・正答数
+        add_listener(callback)  このプロセスでの save_user 後に callback(user_id, data) を呼ぶ
+        changed_users_since(revision)  他プロセスを含め指定版数以降に更新されたユーザー（未対応なら None）
+    その他:
+        revision()  データ更新毎に変わる版数（条件付きGETのETag用。json は新規作成のみ検出する軽量版）
+        content_revision()  既存ユーザーの上書きも含め内容が変われば必ず変わる版数（集計キャッシュ用）
+        user_revision(user_id)  そのユーザーの保存毎に変わる版数（ユーザー単位の結果キャッシュ用。未保存は None）
+    """
+
+    backend = 'base'
+
+    def __init__(self, user_data_dir: str = 'user_data', social_data_dir: str = 'social_data'):
+        self.user_data_dir = user_data_dir
+        self.social_data_dir = social_data_dir
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+
+    # --- 変更通知 ---
+
+    def add_listener(self, callback: Callable[[str, Dict[str, Any]], None]) -> None:
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def _notify_user_saved(self, user_id: str, data: Dict[str, Any]) -> None:
+        for callback in self._listeners:
+            try:
+                callback(user_id, data)
+            except Exception as e:
+                logger.error(f"ユーザー更新通知エラー ({getattr(callback, '__qualname__', callback)}): {e}")
+
+    def changed_users_since(self, revision: str) -> Optional[List[str]]:
+        return None
+
+    def content_revision(self) -> str:
+        return self.revision()
+
+    def user_revision(self, user_id: str) -> Optional[str]:
+        return None
+
+    def social_lock(self, name: str):
+        """学習グループ・ディスカッションの read-modify-write 用ロック（バックエンド共通でファイルロック）"""
+        return file_lock(self._social_file(name))
+
+    def social_revision(self, name: str) -> str:
+        """ファイルの inode・更新時刻・サイズ（保存は os.replace のため毎回 inode が変わる）"""
+        try:
+            stat = os.stat(self._social_file(name))
+        except OSError:
+            return '0'
+        return f"{stat.st_ino}-{stat.st_mtime_ns}-{stat.st_size}"
+
+    # --- JSONファイル（jsonバックエンド本体・sqliteバックエンドのミラー） ---
+
+    def _user_file(self, user_id: str) -> str:
+        return os.path.join(self.user_data_dir, f"{user_id}.json")
+
+    def _social_file(self, name: str) -> str:
+        return os.path.join(self.social_data_dir, f"{name}.json")
+
+    def _read_json(self, filepath: str, default: Any) -> Any:
+        try:
+            if not os.path.exists(filepath):
+                return default
+            with open(filepath, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, PermissionError, IOError, OSError) as e:
+            logger.warning(f"ファイルアクセスエラー {filepath}: {type(e).__name__}: {e}")
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.warning(f"データ読み込みエラー {filepath}: {type(e).__name__}: {e}")
+        return default
+
+    def _write_json(self, filepath: str, data: Any) -> None:
+        write_json(filepath, data)
+
+    def _iter_user_files(self) -> Iterator[Tuple[str, str]]:
+        if not os.path.exists(self.user_data_dir):
+            return
+        try:
+            entries = os.scandir(self.user_data_dir)
+        except (OSError, PermissionError) as e:
+            logger.error(f"ディレクトリアクセスエラー {self.user_data_dir}: {e}")
+            return
+        with entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and not entry.name.startswith('backup') and entry.is_file():
+                    yield entry.name[:-5], entry.path
+
+    # --- 集計（既定実装は iter_users を1回走査） ---
+
+    def user_summaries(self) -> Dict[str, Dict[str, Any]]:
+        summaries = {}
+        for user_id, data in self.iter_users():
+            aggregate = _AnswerAggregate()
+            for entry in data.get('history', []):
+                if isinstance(entry, dict):
+                    aggregate.add(answer_fields(entry))
+            summaries[user_id] = self._summary_row(
+                user_id, data.get('user_name'), data.get('last_updated'),
+                aggregate.total, aggregate.correct, len(aggregate.days),
+                len(data.get('srs_data', {})), len(data.get('bookmarks', []))
+            )
+        return summaries
+
+    @staticmethod
+    def _summary_row(user_id, user_name, last_updated, total, correct, study_days, srs_count, bookmarks):
+        return {
+            'user_name': user_name or f'ユーザー_{user_id[:8]}',
+            'total_questions': total,
+            'correct_answers': correct,
+            'accuracy': round(correct / total * 100, 1) if total else 0,
+            'study_days': study_days,
+            'last_study': last_updated or '未記録',
+            'srs_questions': srs_count,
+            'bookmarks': bookmarks,
+        }
+
+    def answer_aggregates(self, department: Optional[str] = None,
+                          since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        since_text = _format_since(since)
+        results = []
+        for user_id, data in self.iter_users():
+            aggregate = _AnswerAggregate()
+            for entry in data.get('history', []):
+                if not isinstance(entry, dict):
+                    continue
+                fields = answer_fields(entry)
+                if since_text and (not fields['answered_at'] or fields['answered_at'] < since_text):
+                    continue
+                if department and fields['department'] != department:
+                    continue
+                aggregate.add(fields)
+            if aggregate.total:
+                results.append(aggregate.to_dict(user_id))
+        return results
+
+    def answer_rollups(self, user_id: Optional[str] = None) -> Iterator[Tuple[str, Optional[str], Optional[str], int, int, int]]:
+        """(user_id, department, answered_day, 回答数, 正答数, 最初の履歴番号) を返す（日付不明の回答は answered_day=None）"""
+        users = [(user_id, self.get_user(user_id))] if user_id else self.iter_users()
+        for uid, data in users:
+            yield from rollup_history(uid, data.get('history', []))
+
+    def activity_rollups(self, user_id: Optional[str] = None) -> Iterator[Tuple[str, Optional[str], Optional[str], int, int, float, Optional[str]]]:
+        """(user_id, department, answered_day, 回答数, 正答数, 回答時間合計（秒）, 最終回答日時) を返す"""
+        users = [(user_id, self.get_user(user_id))] if user_id else self.iter_users()
+        for uid, data in users:
+            yield from rollup_activity(uid, data.get('history', []))
+
+    def category_rollups(self, user_id: Optional[str] = None) -> Iterator[Tuple[str, Optional[str], Optional[str], int, int]]:
+        """(user_id, category, department, 回答数, 正答数) を返す"""
+        users = [(user_id, self.get_user(user_id))] if user_id else self.iter_users()
+        for uid, data in users:
+            for (category, department), (total, correct) in rollup_categories(data.get('history', [])).items():
+                yield uid, category, department, total, correct
+
+    def count_users(self) -> int:
+        return len(self.user_ids())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'backend': self.backend, 'users': self.count_users(), 'revision': self.revision()}
+
+
+class JSONUserRepository(UserRepository):
+    """user_data/*.json・social_data/*.json を直接読み書きする従来方式"""
+
+    backend = 'json'
+
+    def get_user(self, user_id: str) -> Dict[str, Any]:
+        return self._read_json(self._user_file(user_id), {})
+
+    def save_user(self, user_id: str, data: Dict[str, Any]) -> None:
+        with file_lock(self._user_file(user_id)):
+            self._write_json(self._user_file(user_id), data)
+        self._notify_user_saved(user_id, data)
+
+    def update_user(self, user_id: str, updater: Callable[[Dict[str, Any]], Any]) -> Dict[str, Any]:
+        with file_lock(self._user_file(user_id)):
+            data = self.get_user(user_id)
+            updater(data)
+            self._write_json(self._user_file(user_id), data)
+        self._notify_user_saved(user_id, data)
+        return data
+
+    def iter_users(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for user_id, path in self._iter_user_files():
+            data = self._read_json(path, None)
+            if isinstance(data, dict):
+                yield user_id, data
+
+    def user_ids(self) -> List[str]:
+        return [user_id for user_id, _ in self._iter_user_files()]
+
+    def load_groups(self) -> Dict[str, Any]:
+        return self._read_json(self._social_file('groups'), {})
+
+    def save_groups(self, groups: Dict[str, Any]) -> None:
+        self._write_json(self._social_file('groups'), groups)
+
+    def load_discussions(self) -> Dict[str, Any]:
+        return self._read_json(self._social_file('discussions'), {})
+
+    def save_discussions(self, discussions: Dict[str, Any]) -> None:
+        self._write_json(self._social_file('discussions'), discussions)
+
+    def revision(self) -> str:
+        try:
+            return str(os.stat(self.user_data_dir).st_mtime_ns)
+        except OSError:
+            return '0'
+
+    def content_revision(self) -> str:
+        """ファイル数・最終更新時刻・合計サイズ（ファイルの上書きはディレクトリの更新時刻を変えないため）"""
+        count = latest = size = 0
+        for _, path in self._iter_user_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            count += 1
+            latest = max(latest, stat.st_mtime_ns)
+            size += stat.st_size
+        return f"{count}-{latest}-{size}"
+
+    def user_revision(self, user_id: str) -> Optional[str]:
+        """ファイルの inode・更新時刻・サイズ（保存は os.replace のため毎回 inode が変わる）"""
+        try:
+            stat = os.stat(self._user_file(user_id))
+        except OSError:
+            return None
+        return f"{stat.st_ino}-{stat.st_mtime_ns}-{stat.st_size}"
+
+
+class SQLiteUserRepository(UserRepository):
+    """
+    WALモードのSQLiteによるリポジトリ
+    接続はスレッド毎（フォーク後は子プロセスで再接続）、書き込みは BEGIN IMMEDIATE のトランザクション
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, db_path: str, user_data_dir: str = 'user_data', social_data_dir: str = 'social_data',
+                 json_mirror: bool = True, auto_migrate: bool = True, busy_timeout: float = 5.0):
+        super().__init__(user_data_dir, social_data_dir)
+        self.db_path = db_path
+        self.json_mirror = json_mirror
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._create_schema()
+        if auto_migrate and self._get_meta('json_imported') is None:
+            self.import_json()
+
+    # --- 接続・トランザクション ---
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout * 1000)}')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _create_schema(self) -> None:
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        with self._transaction() as conn:
+            # v1 → v2: ユーザー毎の更新版数（他プロセスの更新を差分で検出）
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(users)')}
+            if 'revision' not in columns:
+                conn.execute('ALTER TABLE users ADD COLUMN revision INTEGER NOT NULL DEFAULT 0')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_users_revision ON users (revision)')
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('revision', '0')")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._connection().execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _bump_revision(conn: sqlite3.Connection) -> int:
+        conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'revision'")
+        return int(conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0])
+
+    # --- ユーザー ---
+
+    @staticmethod
+    def _write_user(conn: sqlite3.Connection, user_id: str, data: Dict[str, Any], revision: int) -> Tuple[int, int]:
+        history = data.get('history') or []
+        srs_data = data.get('srs_data') or {}
+        document = {key: value for key, value in data.items() if key not in ('history', 'srs_data')}
+
+        conn.execute(
+            """INSERT INTO users (user_id, user_name, last_updated, bookmark_count, document, revision)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT (user_id) DO UPDATE SET user_name = excluded.user_name,
+                   last_updated = excluded.last_updated, bookmark_count = excluded.bookmark_count,
+                   document = excluded.document, revision = excluded.revision""",
+            (user_id, data.get('user_name'), data.get('last_updated'),
+             len(data.get('bookmarks') or []), json.dumps(document, ensure_ascii=False), revision)
+        )
+
+        # 保存済みの行と内容を比較し、追加・変更された行のみ書き込む（回答毎の保存で全履歴を書き直さない）
+        stored_events = dict(conn.execute('SELECT seq, data FROM answer_events WHERE user_id = ?', (user_id,)))
+        rows = []
+        for seq, entry in enumerate(history):
+            encoded = json.dumps(entry, ensure_ascii=False)
+            if stored_events.get(seq) == encoded:
+                continue
+            fields = answer_fields(entry) if isinstance(entry, dict) else answer_fields({})
+            rows.append((user_id, seq, fields['question_id'], fields['category'], fields['department'],
+                         fields['question_type'], fields['is_correct'], fields['elapsed'],
+                         fields['answered_at'], fields['answered_day'], encoded))
+        conn.executemany('INSERT OR REPLACE INTO answer_events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        if any(seq >= len(history) for seq in stored_events):
+            conn.execute('DELETE FROM answer_events WHERE user_id = ? AND seq >= ?', (user_id, len(history)))
+
+        stored_srs = dict(conn.execute('SELECT question_id, data FROM srs_state WHERE user_id = ?', (user_id,)))
+        srs_rows = []
+        for question_id, state in srs_data.items():
+            question_id = str(question_id)
+            encoded = json.dumps(state, ensure_ascii=False)
+            if stored_srs.pop(question_id, None) == encoded:
+                continue
+            detail = state if isinstance(state, dict) else {}
+            srs_rows.append((user_id, question_id, detail.get('difficulty_level'),
+                             1 if detail.get('mastered') else 0, detail.get('next_review'), encoded))
+        conn.executemany('INSERT OR REPLACE INTO srs_state VALUES (?, ?, ?, ?, ?, ?)', srs_rows)
+        if stored_srs:
+            conn.executemany('DELETE FROM srs_state WHERE user_id = ? AND question_id = ?',
+                             [(user_id, question_id) for question_id in stored_srs])
+        return len(history), len(srs_data)
+
+    def _read_user(self, conn: sqlite3.Connection, user_id: str, document: str) -> Dict[str, Any]:
+        data = json.loads(document)
+        data['history'] = [json.loads(row[0]) for row in conn.execute(
+            'SELECT data FROM answer_events WHERE user_id = ? ORDER BY seq', (user_id,))]
+        data['srs_data'] = {row[0]: json.loads(row[1]) for row in conn.execute(
+            'SELECT question_id, data FROM srs_state WHERE user_id = ?', (user_id,))}
+        return data
+
+    def get_user(self, user_id: str) -> Dict[str, Any]:
+        conn = self._connection()
+        row = conn.execute('SELECT document FROM users WHERE user_id = ?', (user_id,)).fetchone()
+        if not row:
+            return {}
+        return self._read_user(conn, user_id, row[0])
+
+    def update_user(self, user_id: str, updater: Callable[[Dict[str, Any]], Any]) -> Dict[str, Any]:
+        # BEGIN IMMEDIATE で書き込みロックを取得してから読み込むため、他の更新と直列化される
+        with self._transaction() as conn:
+            row = conn.execute('SELECT document FROM users WHERE user_id = ?', (user_id,)).fetchone()
+            data = self._read_user(conn, user_id, row[0]) if row else {}
+            updater(data)
+            self._write_user(conn, user_id, data, self._bump_revision(conn))
+        if self.json_mirror:
+            self._write_json(self._user_file(user_id), data)
+        self._notify_user_saved(user_id, data)
+        return data
+
+    def save_user(self, user_id: str, data: Dict[str, Any]) -> None:
+        with self._transaction() as conn:
+            self._write_user(conn, user_id, data, self._bump_revision(conn))
+        if self.json_mirror:
+            self._write_json(self._user_file(user_id), data)
+        self._notify_user_saved(user_id, data)
+
+    def iter_users(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        conn = self._connection()
+        for user_id, document in conn.execute('SELECT user_id, document FROM users ORDER BY user_id').fetchall():
+            yield user_id, self._read_user(conn, user_id, document)
+
+    def user_ids(self) -> List[str]:
+        return [row[0] for row in self._connection().execute('SELECT user_id FROM users ORDER BY user_id')]
+
+    def count_users(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM users').fetchone()[0]
+
+    def user_summaries(self) -> Dict[str, Dict[str, Any]]:
+        rows = self._connection().execute(
+            """SELECT u.user_id, u.user_name, u.last_updated, u.bookmark_count,
+                      COALESCE(a.total, 0), COALESCE(a.correct, 0), COALESCE(a.days, 0),
+                      (SELECT COUNT(*) FROM srs_state s WHERE s.user_id = u.user_id)
+               FROM users u
+               LEFT JOIN (SELECT user_id, COUNT(*) AS total, SUM(is_correct) AS correct,
+                                 COUNT(DISTINCT answered_day) AS days
+                          FROM answer_events GROUP BY user_id) a ON a.user_id = u.user_id"""
+        )
+        return {
+            user_id: self._summary_row(user_id, user_name, last_updated, total, correct, days, srs_count, bookmarks)
+            for user_id, user_name, last_updated, bookmarks, total, correct, days, srs_count in rows
+        }
+
+    def answer_aggregates(self, department: Optional[str] = None,
+                          since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        conditions, params = [], []
+        if since:
+            conditions.append('answered_at >= ?')
+            params.append(_format_since(since))
+        if department:
+            conditions.append('department = ?')
+            params.append(department)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        conn = self._connection()
+
+        # 主要部門: 回答数最多（同数なら先に回答した部門 = Counter.most_common と同じ）
+        primary = {}
+        for user_id, dept, count, first_seq in conn.execute(
+                f"""SELECT user_id, COALESCE(department, 'unknown'), COUNT(*), MIN(seq)
+                    FROM answer_events {where} GROUP BY user_id, COALESCE(department, 'unknown')""", params):
+            best = primary.get(user_id)
+            if best is None or (count, -first_seq) > (best[1], -best[2]):
+                primary[user_id] = (dept, count, first_seq)
+
+        return [
+            {'user_id': user_id, 'total': total, 'correct': correct or 0, 'study_days': days,
+             'primary_department': primary.get(user_id, ('unknown',))[0]}
+            for user_id, total, correct, days in conn.execute(
+                f"""SELECT user_id, COUNT(*), SUM(is_correct), COUNT(DISTINCT answered_day)
+                    FROM answer_events {where} GROUP BY user_id""", params)
+        ]
+
+    def answer_rollups(self, user_id: Optional[str] = None) -> Iterator[Tuple[str, Optional[str], Optional[str], int, int, int]]:
+        where, params = ('WHERE user_id = ?', (user_id,)) if user_id else ('', ())
+        yield from self._connection().execute(
+            f"""SELECT user_id, department, answered_day, COUNT(*), SUM(is_correct), MIN(seq)
+                FROM answer_events {where} GROUP BY user_id, department, answered_day""", params)
+
+    def activity_rollups(self, user_id: Optional[str] = None) -> Iterator[Tuple[str, Optional[str], Optional[str], int, int, float, Optional[str]]]:
+        where, params = ('WHERE user_id = ?', (user_id,)) if user_id else ('', ())
+        yield from self._connection().execute(
+            f"""SELECT user_id, department, answered_day, COUNT(*), SUM(is_correct), TOTAL(elapsed), MAX(answered_at)
+                FROM answer_events {where} GROUP BY user_id, department, answered_day""", params)
+
+    def category_rollups(self, user_id: Optional[str] = None) -> Iterator[Tuple[str, Optional[str], Optional[str], int, int]]:
+        where, params = ('WHERE user_id = ?', (user_id,)) if user_id else ('', ())
+        yield from self._connection().execute(
+            f"""SELECT user_id, category, department, COUNT(*), SUM(is_correct)
+                FROM answer_events {where} GROUP BY user_id, category, department""", params)
+
+    def changed_users_since(self, revision: str) -> Optional[List[str]]:
+        try:
+            since = int(revision)
+        except (TypeError, ValueError):
+            return None
+        return [row[0] for row in self._connection().execute(
+            'SELECT user_id FROM users WHERE revision > ?', (since,))]
+
+    # --- 学習グループ・ディスカッション ---
+
+    def load_groups(self) -> Dict[str, Any]:
+        return {group_id: json.loads(document) for group_id, document in
+                self._connection().execute('SELECT group_id, document FROM study_groups')}
+
+    @staticmethod
+    def _write_groups(conn: sqlite3.Connection, groups: Dict[str, Any]) -> None:
+        conn.execute('DELETE FROM study_groups')
+        conn.execute('DELETE FROM group_members')
+        for group_id, group in groups.items():
+            conn.execute('INSERT INTO study_groups VALUES (?, ?, ?, ?, ?, ?, ?)', (
+                group_id, group.get('name'), _scalar_text(group.get('department')), group.get('creator_id'),
+                0 if group.get('is_public') is False else 1, group.get('created_at'),
+                json.dumps(group, ensure_ascii=False)
+            ))
+            moderators = set(group.get('moderators') or [])
+            conn.executemany('INSERT OR IGNORE INTO group_members VALUES (?, ?, ?)', [
+                (group_id, member, 1 if member in moderators else 0) for member in group.get('members') or []
+            ])
+
+    def save_groups(self, groups: Dict[str, Any]) -> None:
+        with self._transaction() as conn:
+            self._write_groups(conn, groups)
+            self._mark_social_saved(conn, 'groups', self._bump_revision(conn))
+        if self.json_mirror:
+            self._write_json(self._social_file('groups'), groups)
+
+    def load_discussions(self) -> Dict[str, Any]:
+        return {discussion_id: json.loads(document) for discussion_id, document in
+                self._connection().execute('SELECT discussion_id, document FROM discussions')}
+
+    @staticmethod
+    def _write_discussions(conn: sqlite3.Connection, discussions: Dict[str, Any]) -> None:
+        conn.execute('DELETE FROM discussions')
+        conn.executemany('INSERT INTO discussions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', [
+            (discussion_id, _scalar_text(discussion.get('group_id')), discussion.get('author_id'),
+             discussion.get('category'), _scalar_text(discussion.get('question_id')),
+             1 if discussion.get('is_pinned') else 0, discussion.get('created_at'),
+             discussion.get('updated_at'), json.dumps(discussion, ensure_ascii=False))
+            for discussion_id, discussion in discussions.items()
+        ])
+
+    def save_discussions(self, discussions: Dict[str, Any]) -> None:
+        with self._transaction() as conn:
+            self._write_discussions(conn, discussions)
+            self._mark_social_saved(conn, 'discussions', self._bump_revision(conn))
+        if self.json_mirror:
+            self._write_json(self._social_file('discussions'), discussions)
+
+    @staticmethod
+    def _mark_social_saved(conn: sqlite3.Connection, name: str, revision: int) -> None:
+        conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (f'{name}_revision', str(revision)))
+
+    def social_revision(self, name: str) -> str:
+        return self._get_meta(f'{name}_revision') or '0'
+
+    # --- 版数・移行 ---
+
+    def revision(self) -> str:
+        return self._get_meta('revision') or '0'
+
+    def user_revision(self, user_id: str) -> Optional[str]:
+        row = self._connection().execute('SELECT revision FROM users WHERE user_id = ?', (user_id,)).fetchone()
+        return str(row[0]) if row else None
+
+    def import_json(self, user_data_dir: Optional[str] = None,
+                    social_data_dir: Optional[str] = None) -> Dict[str, int]:
+        """既存の JSON ファイルを1トランザクションで取り込み（同じIDは上書き）"""
+        json_source = JSONUserRepository(user_data_dir or self.user_data_dir,
+                                         social_data_dir or self.social_data_dir)
+        stats = {'users': 0, 'answers': 0, 'srs': 0, 'groups': 0, 'discussions': 0}
+        with self._transaction() as conn:
+            revision = self._bump_revision(conn)
+            for user_id, data in json_source.iter_users():
+                answers, srs = self._write_user(conn, user_id, data, revision)
+                stats['users'] += 1
+                stats['answers'] += answers
+                stats['srs'] += srs
+            groups = json_source.load_groups()
+            if groups:
+                self._write_groups(conn, groups)
+                self._mark_social_saved(conn, 'groups', revision)
+                stats['groups'] = len(groups)
+            discussions = json_source.load_discussions()
+            if discussions:
+                self._write_discussions(conn, discussions)
+                self._mark_social_saved(conn, 'discussions', revision)
+                stats['discussions'] = len(discussions)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', ?)",
+                         (datetime.now().isoformat(),))
+        logger.info(f"✅ JSON→SQLite 取り込み完了: {stats}")
+        return stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update({'db_path': self.db_path, 'json_mirror': self.json_mirror,
+                      'json_imported': self._get_meta('json_imported')})
+        return stats
+
+
+class RepositoryView(abc.ABC):
+    """
+    リポジトリから派生したメモリ上のビュー（リーダーボード・類似ユーザー索引・組織集計）の同期
+
+    - このプロセスでの保存: add_listener(view.on_user_saved) で該当ユーザーのみ _apply_user
+    - 他プロセスでの保存: 参照時に revision() を比較し、changed_users_since() の対象を _reload_user
+    - 差分を返せないバックエンド（json）: 構築時に記録したユーザー毎の版数（user_revision）と比較し、
+      変わったユーザーのみ _reload_user。revision() に現れない上書きは refresh_interval 秒毎の同じ比較で拾う
+    サブクラスは _load_all / _reload_user / _apply_user を実装し、参照前に self._lock 内で _sync() を呼ぶ
+    """
+
+    def __init__(self, repository: UserRepository, refresh_interval: int):
+        self.repository = repository
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        self._revision: Optional[str] = None
+        self._supports_delta = False
+        # 差分を返せないバックエンド用: user_id → 構築・比較時点の user_revision
+        self._user_revisions: Optional[Dict[str, Optional[str]]] = None
+        self._checked_at = 0.0
+        self._stats = {'rebuilds': 0, 'user_updates': 0, 'revision_scans': 0, 'reads': 0}
+
+    def on_user_saved(self, user_id: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._revision is None:
+                return  # 未構築（初回参照時に全件から構築される）
+            self._apply_user(user_id, data.get('history', []))
+            self._stats['user_updates'] += 1
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._revision = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, revision=self._revision, incremental_sync=self._supports_delta)
+
+    def _sync(self) -> None:
+        revision = str(self.repository.revision())
+        if self._revision is None:
+            self._rebuild(revision)
+        elif revision != self._revision:
+            changed = self._changed_users()
+            if changed is None:
+                self._rebuild(revision)
+                return
+            self._reload_users(changed)
+            self._revision = revision
+        elif not self._supports_delta and time.monotonic() - self._checked_at >= self.refresh_interval:
+            changed = self._changed_users()
+            if changed is None:
+                self._rebuild(revision)
+            else:
+                self._reload_users(changed)
+
+    def _changed_users(self) -> Optional[List[str]]:
+        """前回の同期以降に更新・削除されたユーザー（判定できなければ None = 全件再構築）"""
+        if self._supports_delta:
+            return self.repository.changed_users_since(self._revision)
+        if self._user_revisions is None:
+            return None
+        # このプロセスの保存も版数が変わるため再読み込みの対象になる（1ユーザー分の読み込みで済む）
+        current = self._scan_user_revisions()
+        previous, self._user_revisions = self._user_revisions, current
+        changed = [user_id for user_id, revision in current.items() if previous.get(user_id) != revision]
+        changed.extend(user_id for user_id in previous if user_id not in current)
+        return changed
+
+    def _scan_user_revisions(self) -> Dict[str, Optional[str]]:
+        self._checked_at = time.monotonic()
+        self._stats['revision_scans'] += 1
+        return {user_id: self.repository.user_revision(user_id) for user_id in self.repository.user_ids()}
+
+    def _reload_users(self, user_ids: List[str]) -> None:
+        for user_id in user_ids:
+            self._reload_user(user_id)
+            self._stats['user_updates'] += 1
+
+    def _rebuild(self, revision: str) -> None:
+        started = time.perf_counter()
+        self._supports_delta = self.repository.changed_users_since(revision) is not None
+        # 版数は読み込みより先に記録（読み込み中の保存は次回の比較で再読み込みされる）
+        self._user_revisions = None if self._supports_delta else self._scan_user_revisions()
+        self._load_all()
+        self._revision = revision
+        self._stats['rebuilds'] += 1
+        logger.debug("🔄 %s 再構築 (%.1fms)", type(self).__name__, (time.perf_counter() - started) * 1000)
+
+    @abc.abstractmethod
+    def _load_all(self) -> None:
+        """全ユーザーから構築"""
+
+    @abc.abstractmethod
+    def _reload_user(self, user_id: str) -> None:
+        """リポジトリから1ユーザー分を読み直す（削除済みユーザーは除去）"""
+
+    @abc.abstractmethod
+    def _apply_user(self, user_id: str, history: List[Any]) -> None:
+        """保存された履歴で1ユーザー分を置き換える"""
+
+
+_repositories: Dict[Tuple[str, str, str], UserRepository] = {}
+_repositories_lock = threading.Lock()
+
+
+def get_user_repository(user_data_dir: str = 'user_data', social_data_dir: str = 'social_data',
+                        backend: Optional[str] = None) -> UserRepository:
+    """共有リポジトリを取得（同じ保存先には同じインスタンスを返す）"""
+    backend = (backend or UserStoreConfig.BACKEND).lower()
+    key = (backend, os.path.abspath(user_data_dir), os.path.abspath(social_data_dir))
+    repository = _repositories.get(key)
+    if repository is not None:
+        return repository
+
+    with _repositories_lock:
+        repository = _repositories.get(key)
+        if repository is None:
+            if backend == 'sqlite':
+                try:
+                    repository = SQLiteUserRepository(
+                        UserStoreConfig.DB_PATH or os.path.join(user_data_dir, 'rccm_user_store.db'),
+                        user_data_dir, social_data_dir,
+                        json_mirror=UserStoreConfig.JSON_MIRROR,
+                        auto_migrate=UserStoreConfig.AUTO_MIGRATE,
+                    )
+                except sqlite3.Error as e:
+                    logger.error(f"❌ SQLiteユーザーストア初期化失敗、JSONにフォールバック: {e}")
+                    repository = JSONUserRepository(user_data_dir, social_data_dir)
+            else:
+                repository = JSONUserRepository(user_data_dir, social_data_dir)
+            _repositories[key] = repository
+    return repository
@@ -12,7 +12,7 @@ import hashlib
 import functools
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any, Callable, Tuple
-from collections import OrderedDict
+from collections import Counter, OrderedDict
 # 🔥 ULTRA SYNC FILE SAFETY: ファイル処理安全性強化インポート
 from contextlib import contextmanager
 from concurrent.futures import ThreadPoolExecutor
@@ -35,41 +35,44 @@ logger = logging.getLogger(__name__)
 
 # === セキュリティ関数 ===
 
+# よくある問題文字の置換マップ
+_CP932_TRANSLATION = str.maketrans({
+    '\u00b2': '²',  # 上付き2
+    '\u00b3': '³',  # 上付き3
+    '\u00bd': '1/2',  # 1/2分数
+    '\u00bc': '1/4',  # 1/4分数
+    '\u00be': '3/4',  # 3/4分数
+    '\u2013': '-',   # エンダッシュ
+    '\u2014': '-',   # エムダッシュ
+    '\u2018': "'",   # 左シングルクォート
+    '\u2019': "'",   # 右シングルクォート
+    '\u201c': '"',   # 左ダブルクォート
+    '\u201d': '"',   # 右ダブルクォート
+    '\u2026': '...',  # 三点リーダー
+})
+
+
+def _cp932_char(char):
+    try:
+        char.encode('cp932')
+        return char
+    except UnicodeEncodeError:
+        return '?'  # 問題文字を?に置換
+
+
 def clean_unicode_for_cp932(text):
-    """CP932でエンコードできない文字を安全な文字に置換"""
-    if not text:
+    """CP932でエンコードできない文字を安全な文字に置換（CSV読み込みの各セルで呼ばれるため一括処理）"""
+    if not text or text.isascii():
         return text
     
-    # よくある問題文字の置換マップ
-    replacements = {
-        '\u00b2': '²',  # 上付き2
-        '\u00b3': '³',  # 上付き3
-        '\u00bd': '1/2',  # 1/2分数
-        '\u00bc': '1/4',  # 1/4分数
-        '\u00be': '3/4',  # 3/4分数
-        '\u2013': '-',   # エンダッシュ
-        '\u2014': '-',   # エムダッシュ
-        '\u2018': "'",   # 左シングルクォート
-        '\u2019': "'",   # 右シングルクォート
-        '\u201c': '"',   # 左ダブルクォート
-        '\u201d': '"',   # 右ダブルクォート
-        '\u2026': '...',  # 三点リーダー
-    }
-    
-    cleaned_text = text
-    for problematic_char, replacement in replacements.items():
-        cleaned_text = cleaned_text.replace(problematic_char, replacement)
-    
-    # それでもエンコードできない文字があれば削除
-    result = ""
-    for char in cleaned_text:
-        try:
-            char.encode('cp932')
-            result += char
-        except UnicodeEncodeError:
-            result += '?'  # 問題文字を?に置換
+    cleaned_text = text.translate(_CP932_TRANSLATION)
     
-    return result
+    # それでもエンコードできない文字があれば削除（大半の文字列は一括エンコードで判定）
+    try:
+        cleaned_text.encode('cp932')
+        return cleaned_text
+    except UnicodeEncodeError:
+        return ''.join(_cp932_char(char) for char in cleaned_text)
 
 def validate_file_path(path: str, allowed_dir: str = None) -> str:
     """
@@ -188,6 +191,23 @@ class LRUCache:
             self.timestamps[key] = time.time()
             self.access_count[key] = 0
     
+    def delete(self, key: str) -> bool:
+        with self.lock:
+            if key not in self.cache:
+                return False
+            del self.cache[key]
+            self.timestamps.pop(key, None)
+            self.access_count.pop(key, None)
+            return True
+    
+    def __contains__(self, key: str) -> bool:
+        # ヒット率・LRU順に影響しない存在確認
+        with self.lock:
+            return key in self.cache
+    
+    def __len__(self) -> int:
+        return len(self.cache)
+    
     def _is_expired(self, key: str) -> bool:
         if key not in self.timestamps:
             return True
@@ -1231,7 +1251,7 @@ def emergency_load_all_questions():
     data_dir = os.path.join(os.path.dirname(__file__), 'data')
     all_questions = []
     
-    print(f"Emergency data loading from: {data_dir}")
+    logger.debug(f"Emergency data loading from: {data_dir}")
     
     # Emergency bypass: Direct CSV loading
     csv_files = {
@@ -1241,7 +1261,7 @@ def emergency_load_all_questions():
     
     for filename, question_type in csv_files.items():
         filepath = os.path.join(data_dir, filename)
-        print(f"Loading: {filepath}")
+        logger.debug(f"Loading: {filepath}")
         
         if os.path.exists(filepath):
             try:
@@ -1259,19 +1279,19 @@ def emergency_load_all_questions():
                                 file_questions.append(row)
                             
                             all_questions.extend(file_questions)
-                            print(f"SUCCESS {filename}: {len(file_questions)} questions loaded (encoding: {encoding})")
+                            logger.debug(f"SUCCESS {filename}: {len(file_questions)} questions loaded (encoding: {encoding})")
                             break
                     except UnicodeDecodeError:
                         continue
                     except Exception as e:
-                        print(f"WARNING Error with {filename}: {e}")
+                        logger.warning(f"WARNING Error with {filename}: {e}")
                         continue
             except Exception as e:
-                print(f"ERROR Failed to load {filename}: {e}")
+                logger.error(f"ERROR Failed to load {filename}: {e}")
         else:
-            print(f"ERROR File not found: {filepath}")
+            logger.error(f"ERROR File not found: {filepath}")
     
-    print(f"Emergency loader result: {len(all_questions)} total questions")
+    logger.debug(f"Emergency loader result: {len(all_questions)} total questions")
     return all_questions
 
 
@@ -1298,7 +1318,7 @@ def emergency_load_all_questions():
     data_dir = os.path.join(os.path.dirname(__file__), 'data')
     all_questions = []
     
-    print(f"Emergency data loading from: {data_dir}")
+    logger.debug(f"Emergency data loading from: {data_dir}")
     
     # Emergency bypass: Direct CSV loading
     csv_files = {
@@ -1308,7 +1328,7 @@ def emergency_load_all_questions():
     
     for filename, question_type in csv_files.items():
         filepath = os.path.join(data_dir, filename)
-        print(f"Loading: {filepath}")
+        logger.debug(f"Loading: {filepath}")
         
         if os.path.exists(filepath):
             try:
@@ -1326,19 +1346,19 @@ def emergency_load_all_questions():
                                 file_questions.append(row)
                             
                             all_questions.extend(file_questions)
-                            print(f"SUCCESS {filename}: {len(file_questions)} questions loaded (encoding: {encoding})")
+                            logger.debug(f"SUCCESS {filename}: {len(file_questions)} questions loaded (encoding: {encoding})")
                             break
                     except UnicodeDecodeError:
                         continue
                     except Exception as e:
-                        print(f"WARNING Error with {filename}: {e}")
+                        logger.warning(f"WARNING Error with {filename}: {e}")
                         continue
             except Exception as e:
-                print(f"ERROR Failed to load {filename}: {e}")
+                logger.error(f"ERROR Failed to load {filename}: {e}")
         else:
-            print(f"ERROR File not found: {filepath}")
+            logger.error(f"ERROR File not found: {filepath}")
     
-    print(f"Emergency loader result: {len(all_questions)} total questions")
+    logger.debug(f"Emergency loader result: {len(all_questions)} total questions")
     return all_questions
 
 
@@ -1365,7 +1385,7 @@ def emergency_load_all_questions():
     data_dir = os.path.join(os.path.dirname(__file__), 'data')
     all_questions = []
     
-    print(f"Emergency data loading from: {data_dir}")
+    logger.debug(f"Emergency data loading from: {data_dir}")
     
     # Emergency bypass: Direct CSV loading
     csv_files = {
@@ -1375,7 +1395,7 @@ def emergency_load_all_questions():
     
     for filename, question_type in csv_files.items():
         filepath = os.path.join(data_dir, filename)
-        print(f"Loading: {filepath}")
+        logger.debug(f"Loading: {filepath}")
         
         if os.path.exists(filepath):
             try:
@@ -1393,19 +1413,19 @@ def emergency_load_all_questions():
                                 file_questions.append(row)
                             
                             all_questions.extend(file_questions)
-                            print(f"SUCCESS {filename}: {len(file_questions)} questions loaded (encoding: {encoding})")
+                            logger.debug(f"SUCCESS {filename}: {len(file_questions)} questions loaded (encoding: {encoding})")
                             break
                     except UnicodeDecodeError:
                         continue
                     except Exception as e:
-                        print(f"WARNING Error with {filename}: {e}")
+                        logger.warning(f"WARNING Error with {filename}: {e}")
                         continue
             except Exception as e:
-                print(f"ERROR Failed to load {filename}: {e}")
+                logger.error(f"ERROR Failed to load {filename}: {e}")
         else:
-            print(f"ERROR File not found: {filepath}")
+            logger.error(f"ERROR File not found: {filepath}")
     
-    print(f"Emergency loader result: {len(all_questions)} total questions")
+    logger.debug(f"Emergency loader result: {len(all_questions)} total questions")
     return all_questions
 
 def emergency_get_questions(department=None, question_type=None, count=10):
@@ -1416,7 +1436,7 @@ def emergency_get_questions(department=None, question_type=None, count=10):
     all_questions = emergency_load_all_questions()
     
     if not all_questions:
-        print("ERROR EMERGENCY: No questions loaded - check CSV files")
+        logger.error("ERROR EMERGENCY: No questions loaded - check CSV files")
         return []
     
     # Filter questions based on parameters
@@ -1424,7 +1444,7 @@ def emergency_get_questions(department=None, question_type=None, count=10):
     
     # ✅ CRITICAL FIX: CSVには'question_type'フィールドが存在しないため、この処理をスキップ
     # 基礎科目は4-1.csv、専門科目は4-2.csvで既に分離されている
-    print(f"FIXED: Total questions loaded: {len(filtered_questions)}")
+    logger.debug(f"FIXED: Total questions loaded: {len(filtered_questions)}")
     
     if department and question_type == 'specialist':
         # CLAUDE.md COMPLIANCE: 日本語カテゴリで直接フィルタ
@@ -1445,21 +1465,19 @@ def emergency_get_questions(department=None, question_type=None, count=10):
         
         target_category = department_mapping.get(department, department)
         filtered_questions = [q for q in filtered_questions if q.get('category') == target_category]
-        print(f"FIXED: Filtered by department '{department}' (category: {target_category}): {len(filtered_questions)} questions")
+        logger.debug(f"FIXED: Filtered by department '{department}' (category: {target_category}): {len(filtered_questions)} questions")
         
         if len(filtered_questions) == 0:
-            print(f"WARNING: No questions found for category '{target_category}' - available categories:")
-            available_categories = set(q.get('category', 'N/A') for q in all_questions)
-            for cat in sorted(available_categories):
-                count_for_cat = len([q for q in all_questions if q.get('category') == cat])
-                print(f"  - {cat}: {count_for_cat} questions")
+            category_counts = Counter(q.get('category', 'N/A') for q in all_questions)
+            logger.warning(f"WARNING: No questions found for category '{target_category}' - available categories: "
+                           + ', '.join(f"{cat}: {count_for_cat} questions" for cat, count_for_cat in sorted(category_counts.items())))
     
     # Return requested count
     if count and len(filtered_questions) > count:
         import random
         filtered_questions = random.sample(filtered_questions, count)
     
-    print(f"FIXED: Final result: {len(filtered_questions)} questions")
+    logger.debug(f"FIXED: Final result: {len(filtered_questions)} questions")
     return filtered_questions
 
 